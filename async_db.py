@@ -13,7 +13,7 @@
 # @Author  : relakkes@gmail.com
 # @Time    : 2024/4/6 14:21
 # @Desc    : 异步Aiomysql的增删改查封装
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Union
 
 import aiomysql
 
@@ -94,6 +94,109 @@ class AsyncMysqlDB:
                 rows = await cur.execute(sql, values)
                 return rows
 
+    async def query_exist_values(self, table_name: str, field: str, values: List[Union[str, int]]) -> Set[str]:
+        """
+        一次查询给定的值中哪些已经存在于表中
+        :param table_name: 表名
+        :param field: 字段名
+        :param values: 需要查询的字段值
+        :return: 已存在的字段值(转换为字符串)
+        """
+        if not values:
+            return set()
+        sql = "SELECT `%s` FROM %s WHERE `%s` IN (%s)" % (field, table_name, field, ','.join(['%s'] * len(values)))
+        rows = await self.query(sql, *values)
+        return {str(row[field]) for row in rows}
+
+    @staticmethod
+    def _to_rows(items: Sequence[Any], fields: Optional[List[str]] = None) -> Tuple[List[str], List[Tuple]]:
+        """
+        批量写入的记录转换成列名和按列顺序的元组列表
+        :param items: 字典列表，或者传入 fields 时按 fields 列顺序的元组列表
+        :param fields: 列名，不传时使用第一条记录的字段
+        :return: (列名, 元组列表)
+        """
+        if fields is not None:
+            return fields, list(items)
+        fields = list(items[0].keys())
+        return fields, [tuple(item.get(field) for field in fields) for item in items]
+
+    async def items_to_table(self, table_name: str, items: Sequence[Union[Dict[str, Any], Tuple]],
+                             fields: Optional[List[str]] = None) -> int:
+        """
+        表中批量插入数据，executemany 会合并成一条多行 INSERT 语句
+        :param table_name: 表名
+        :param items: 记录列表，每条记录的字段需要和第一条相同；传入 fields 时为按 fields 列顺序的元组
+        :param fields: 列名，不传时使用第一条记录的字段
+        :return: 插入的行数
+        """
+        if not items:
+            return 0
+        fields, rows = self._to_rows(items, fields)
+        fieldstr = ','.join([f'`{field}`' for field in fields])
+        valstr = ','.join(['%s'] * len(fields))
+        sql = "INSERT INTO %s (%s) VALUES(%s)" % (table_name, fieldstr, valstr)
+        async with self.__pool.acquire() as conn:
+            async with conn.cursor() as cur:
+                return await cur.executemany(sql, rows)
+
+    async def update_table_many(self, table_name: str, items: Sequence[Union[Dict[str, Any], Tuple]],
+                                field_where: str, fields: Optional[List[str]] = None) -> int:
+        """
+        批量更新记录，每条记录按 field_where 字段的值更新，在同一个连接上执行
+        :param table_name: 表名
+        :param items: 记录列表，每条记录的字段需要和第一条相同；传入 fields 时为按 fields 列顺序的元组
+        :param field_where: update 语句 where 条件中的字段名
+        :param fields: 列名，需要包含 field_where，不传时使用第一条记录的字段
+        :return: 更新的行数
+        """
+        if not items:
+            return 0
+        fields, rows = self._to_rows(items, fields)
+        where_index = fields.index(field_where)
+        upsets = ','.join(['`%s`=%%s' % field for field in fields])
+        sql = 'UPDATE %s SET %s WHERE `%s`=%%s' % (table_name, upsets, field_where)
+        async with self.__pool.acquire() as conn:
+            async with conn.cursor() as cur:
+                return await cur.executemany(sql, [row + (row[where_index],) for row in rows])
+
+    async def batch_insert_or_update(self, table_name: str, items: Sequence[Union[Dict[str, Any], Tuple]],
+                                     field_where: str, insert_only: Optional[Dict[str, Any]] = None,
+                                     fields: Optional[List[str]] = None) -> int:
+        """
+        批量写入一页记录: 一次查询已存在的记录，不存在的一次插入，已存在的按 field_where 更新
+        :param table_name: 表名
+        :param items: 记录列表，字典或者传入 fields 时按 fields 列顺序的元组
+        :param field_where: 判断记录是否存在的字段名，如 comment_id
+        :param insert_only: 只在插入时写入的字段，如 add_ts
+        :param fields: 列名，需要包含 field_where，不传时使用第一条记录的字段
+        :return: 插入和更新的行数
+        """
+        if not items:
+            return 0
+        fields, rows = self._to_rows(items, fields)
+        where_index = fields.index(field_where)
+        # 同一页中重复的记录只保留最后一条
+        unique_rows = {str(row[where_index]): row for row in rows}
+        exist_values = await self.query_exist_values(table_name, field_where, list(unique_rows.keys()))
+
+        insert_only = insert_only or {}
+        # insert_only 中已经在 fields 里的字段替换原来的值，其余字段追加到每行末尾
+        replace_values = {index: insert_only[field] for index, field in enumerate(fields) if field in insert_only}
+        append_fields = [field for field in insert_only if field not in fields]
+        append_values = tuple(insert_only[field] for field in append_fields)
+        new_rows, update_rows = [], []
+        for value, row in unique_rows.items():
+            if value in exist_values:
+                update_rows.append(row)
+                continue
+            if replace_values:
+                row = tuple(replace_values.get(index, column) for index, column in enumerate(row))
+            new_rows.append(row + append_values)
+        effect_rows = await self.items_to_table(table_name, new_rows, fields + append_fields)
+        effect_rows += await self.update_table_many(table_name, update_rows, field_where, fields)
+        return effect_rows
+
     async def execute(self, sql: str, *args: Union[str, int]) -> int:
         """
         需要更新、写入等操作的 excute 执行语句
@@ -10,10 +10,15 @@
 
 
 from abc import ABC, abstractmethod
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 from playwright.async_api import BrowserContext, BrowserType
 
+from tools.circuit_breaker import guard_request
+from tools.concurrency_governor import govern_request
+from tools.metrics import instrument_request, instrument_store
+from tools.single_flight import coalesce_request
+
 
 class AbstractCrawler(ABC):
     @abstractmethod
@@ -63,6 +68,15 @@ class AbstractLogin(ABC):
 
 
 class AbstractStore(ABC):
+    STORE_METHODS = ("store_content", "store_comment", "store_creator", "store_contents_bulk", "store_comments_bulk")
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # 各平台存储实现的 store_* 方法自动统计耗时
+        for method_name in cls.STORE_METHODS:
+            if method_name in cls.__dict__:
+                setattr(cls, method_name, instrument_store(cls.__dict__[method_name]))
+
     @abstractmethod
     async def store_content(self, content_item: Dict):
         pass
@@ -77,6 +91,20 @@ class AbstractStore(ABC):
     async def store_creator(self, creator: Dict):
         pass
 
+    async def store_contents_bulk(self, content_items: List[Dict]):
+        """
+        批量存储一页内容，默认逐条调用 store_content，存储实现应重写为一次 I/O 写入整页
+        """
+        for content_item in content_items:
+            await self.store_content(content_item)
+
+    async def store_comments_bulk(self, comment_items: List[Dict]):
+        """
+        批量存储一页评论，默认逐条调用 store_comment，存储实现应重写为一次 I/O 写入整页
+        """
+        for comment_item in comment_items:
+            await self.store_comment(comment_item)
+
 
 class AbstractStoreImage(ABC):
     # TODO: support all platform
@@ -87,6 +115,21 @@ class AbstractStoreImage(ABC):
 
 
 class AbstractApiClient(ABC):
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # 各平台客户端的 request 方法自动统计耗时，开启自适应并发时从平台的 ConcurrencyGovernor 获取请求名额，
+        # 开启熔断时线路被熔断的请求先等待线路恢复，同时发出的相同 GET 请求合并成一次
+        # request 上的 @retry_policy() 移到获取请求名额的外层，每次重试重新获取名额，熔断器只记录重试后的最终结果
+        if "request" in cls.__dict__:
+            request = cls.__dict__["request"]
+            retry_decorator = getattr(request, "retry_decorator", None)
+            if retry_decorator is not None:
+                request = request.__wrapped__
+            request = govern_request(instrument_request(request))
+            if retry_decorator is not None:
+                request = retry_decorator(request)
+            cls.request = coalesce_request(guard_request(request))
+
     @abstractmethod
     async def request(self, method, url, **kwargs):
         pass
@@ -94,3 +137,9 @@ class AbstractApiClient(ABC):
     @abstractmethod
     async def update_cookies(self, browser_context: BrowserContext):
         pass
+
+    async def switch_lane(self) -> bool:
+        """
+        当前线路(代理IP)被熔断时切换到新的线路，切换成功返回 True，默认不支持切换
+        """
+        return False
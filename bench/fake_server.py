@@ -0,0 +1,162 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/6/20 10:50
+# @Desc    : 本地模拟平台服务，回放各平台接口响应，支持配置延迟、错误率以及验证码响应比例
+import argparse
+import json
+import multiprocessing
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from bench.fixtures import FakeResponse, Route, get_captcha_response, get_routes
+
+# 查询各路由命中次数，基准测试结束后用来统计实际发出的 HTTP 请求数
+HITS_PATH = "/__bench__/hits"
+
+
+class FakeServerConfig:
+    def __init__(self, platform: str, latency_ms: float = 0, error_rate: float = 0, captcha_rate: float = 0,
+                 seed: Optional[int] = None):
+        self.platform = platform
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.captcha_rate = captcha_rate
+        self.seed = seed
+
+
+class FakePlatformServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, server_config: FakeServerConfig, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _FakePlatformHandler)
+        self.server_config = server_config
+        # 响应内容提前渲染好，避免模拟服务自身的序列化耗时影响测试结果
+        self.routes: List[Tuple[Route, bytes]] = [
+            (route, route.render(server_config.platform)) for route in get_routes(server_config.platform)
+        ]
+        self.random = random.Random(server_config.seed)
+        self.hits: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def dispatch(self, method: str, path: str, body: bytes) -> FakeResponse:
+        split_result = urlsplit(path)
+        with self._lock:
+            dice = self.random.random()
+        if dice < self.server_config.captcha_rate:
+            self._hit("captcha")
+            return get_captcha_response(self.server_config.platform)
+        if dice < self.server_config.captcha_rate + self.server_config.error_rate:
+            self._hit("error")
+            return 500, {"Content-Type": "text/plain"}, b"bench injected error"
+        for route, content in self.routes:
+            if route.matches(method, split_result.path, split_result.query, body):
+                self._hit(route.name)
+                return 200, {"Content-Type": route.content_type}, content
+        self._hit("not_found")
+        return 404, {"Content-Type": "text/plain"}, b"not found"
+
+    def _hit(self, name: str):
+        with self._lock:
+            self.hits[name] = self.hits.get(name, 0) + 1
+
+    def start(self) -> "FakePlatformServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="fake-platform-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread:
+            self._thread.join()
+
+
+class _FakePlatformHandler(BaseHTTPRequestHandler):
+    server: FakePlatformServer
+
+    def _handle(self):
+        if self.path == HITS_PATH:
+            self._send(200, {"Content-Type": "application/json"}, json.dumps(self.server.hits).encode("utf-8"))
+            return
+        content_length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(content_length) if content_length else b""
+        if self.server.server_config.latency_ms > 0:
+            time.sleep(self.server.server_config.latency_ms / 1000)
+        self._send(*self.server.dispatch(self.command, self.path, body))
+
+    def _send(self, status_code: int, headers: Dict[str, str], content: bytes):
+        self.send_response(status_code)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_GET = _handle
+    do_POST = _handle
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _serve_forever(server_config: FakeServerConfig, ready_queue: multiprocessing.Queue):
+    server = FakePlatformServer(server_config)
+    ready_queue.put(server.base_url)
+    server.serve_forever()
+
+
+def start_server_process(server_config: FakeServerConfig) -> Tuple[multiprocessing.Process, str]:
+    """
+    在独立进程中启动模拟服务，这样被测进程的 CPU 和内存统计不包含模拟服务自身的开销
+    Returns:
+        (进程, 服务地址)
+    """
+    ready_queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_serve_forever, args=(server_config, ready_queue), daemon=True)
+    process.start()
+    return process, ready_queue.get(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local fake platform server for benchmarks.")
+    parser.add_argument("--platform", type=str, required=True, help="xhs | bili | dy | ks | wb | tieba | zhihu")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--captcha-rate", type=float, default=0)
+    args = parser.parse_args()
+    server = FakePlatformServer(
+        FakeServerConfig(args.platform, args.latency_ms, args.error_rate, args.captcha_rate), port=args.port
+    )
+    print(json.dumps({"platform": args.platform, "base_url": server.base_url}), flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,447 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/6/20 10:20
+# @Desc    : 基准测试使用的平台接口响应，优先使用 bench/recordings 下录制的真实响应，没有录制时使用合成数据
+import json
+import os
+import random
+from typing import Callable, Dict, List, Optional, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RECORDINGS_DIR = os.path.join(PROJECT_ROOT, "bench", "recordings")
+TIEBA_TEST_DATA_DIR = os.path.join(PROJECT_ROOT, "media_platform", "tieba", "test_data")
+
+# 每页返回的数据条数，和各平台接口默认的分页大小接近
+PAGE_SIZE = 20
+
+JSON_CONTENT_TYPE = "application/json; charset=utf-8"
+HTML_CONTENT_TYPE = "text/html; charset=utf-8"
+
+# (status_code, headers, body)
+FakeResponse = Tuple[int, Dict[str, str], bytes]
+
+
+class Route:
+    """
+    模拟服务的一条路由，method + path 前缀匹配，match 用于区分同一路径下的不同请求（例如快手 GraphQL 的 operationName）
+    """
+
+    def __init__(
+        self,
+        name: str,
+        method: str,
+        path: str,
+        build: Callable[[], object],
+        content_type: str = JSON_CONTENT_TYPE,
+        match: Optional[Callable[[str, bytes], bool]] = None,
+    ):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.build = build
+        self.content_type = content_type
+        self.match = match
+
+    def matches(self, method: str, path: str, query: str, body: bytes) -> bool:
+        if method != self.method or not path.startswith(self.path):
+            return False
+        return self.match is None or self.match(query, body)
+
+    def render(self, platform: str) -> bytes:
+        """
+        渲染路由的响应内容，bench/recordings/<platform>/<name>.json|html 存在时直接回放录制的响应
+        """
+        for ext in ("json", "html"):
+            recording_file = os.path.join(RECORDINGS_DIR, platform, f"{self.name}.{ext}")
+            if os.path.exists(recording_file):
+                with open(recording_file, "rb") as f:
+                    return f.read()
+        content = self.build()
+        if isinstance(content, str):
+            return content.encode("utf-8")
+        return json.dumps(content, ensure_ascii=False).encode("utf-8")
+
+
+def _read_tieba_test_data(file_name: str) -> str:
+    with open(os.path.join(TIEBA_TEST_DATA_DIR, file_name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _user(index: int) -> Dict:
+    return {
+        "user_id": f"5f1e{index:020d}",
+        "nickname": f"bench_user_{index}",
+        "avatar": f"https://sns-avatar.example.com/avatar/{index}.jpg",
+    }
+
+
+# ------------------------------------------------------------------ xhs
+def _xhs_note(index: int) -> Dict:
+    note_id = f"6650{index:020d}"
+    return {
+        "note_id": note_id,
+        "type": "normal",
+        "title": f"基准测试笔记 {index}",
+        "desc": "这是一条用于性能基准测试的笔记内容 #测试[话题]# " * 4,
+        "time": 1718000000000 + index,
+        "last_update_time": 1718000000000 + index,
+        "user": _user(index),
+        "interact_info": {"liked_count": "1024", "collected_count": "512", "comment_count": "128",
+                          "share_count": "64"},
+        "image_list": [
+            {"url_default": f"https://sns-webpic-qc.xhscdn.com/202406/{note_id}/{i}!nd_dft_wlteh_webp_3",
+             "width": 1080, "height": 1440}
+            for i in range(4)
+        ],
+        "tag_list": [{"id": str(i), "name": f"话题{i}", "type": "topic"} for i in range(3)],
+        "ip_location": "上海",
+        "xsec_token": "ABbenchmarktoken=",
+    }
+
+
+def _xhs_comment(index: int) -> Dict:
+    return {
+        "id": f"6651{index:020d}",
+        "create_time": 1718000000000 + index,
+        "ip_location": "北京",
+        "content": f"基准测试评论 {index}，写得很好！",
+        "user_info": {"user_id": f"5f1e{index:020d}", "nickname": f"bench_user_{index}",
+                      "image": f"https://sns-avatar.example.com/avatar/{index}.jpg"},
+        "sub_comment_count": "2",
+        "pictures": [],
+        "target_comment": {},
+        "like_count": "16",
+        "sub_comment_has_more": False,
+        "sub_comments": [],
+    }
+
+
+def _xhs_routes() -> List[Route]:
+    return [
+        Route("search_notes", "POST", "/api/sns/web/v1/search/notes", lambda: {
+            "success": True, "code": 0, "msg": "成功",
+            "data": {"has_more": True, "items": [
+                {"id": note["note_id"], "model_type": "note", "xsec_token": note["xsec_token"], "note_card": note}
+                for note in map(_xhs_note, range(PAGE_SIZE))
+            ]},
+        }),
+        Route("note_feed", "POST", "/api/sns/web/v1/feed", lambda: {
+            "success": True, "code": 0, "msg": "成功",
+            "data": {"items": [{"id": _xhs_note(0)["note_id"], "model_type": "note", "note_card": _xhs_note(0)}]},
+        }),
+        Route("note_comments", "GET", "/api/sns/web/v2/comment/page", lambda: {
+            "success": True, "code": 0, "msg": "成功",
+            "data": {"has_more": True, "cursor": "6651benchcursor",
+                     "comments": [_xhs_comment(i) for i in range(PAGE_SIZE)]},
+        }),
+    ]
+
+
+# ------------------------------------------------------------------ bilibili
+def _bili_view(index: int) -> Dict:
+    return {
+        "aid": 1000000 + index,
+        "bvid": f"BV1bench{index:04d}",
+        "cid": 2000000 + index,
+        "title": f"基准测试视频 {index}",
+        "desc": "这是一个用于性能基准测试的视频简介" * 4,
+        "pubdate": 1718000000 + index,
+        "pic": f"https://i0.hdslb.com/bfs/archive/{index}.jpg",
+        "owner": {"mid": 3000000 + index, "name": f"bench_up_{index}", "face": "https://i0.hdslb.com/face.jpg"},
+        "stat": {"view": 10000, "danmaku": 100, "reply": 256, "favorite": 64, "coin": 32, "share": 16,
+                 "like": 1024, "dislike": 0},
+    }
+
+
+def _bili_comment(index: int) -> Dict:
+    return {
+        "rpid": 4000000 + index,
+        "oid": 1000000,
+        "parent": 0,
+        "root": 0,
+        "ctime": 1718000000 + index,
+        "rcount": 3,
+        "like": 12,
+        "content": {"message": f"基准测试评论 {index}，前排支持！"},
+        "member": {"mid": str(5000000 + index), "uname": f"bench_user_{index}", "sex": "保密",
+                   "sign": "bench", "avatar": "https://i0.hdslb.com/face.jpg"},
+    }
+
+
+def _bili_routes() -> List[Route]:
+    return [
+        Route("search_videos", "GET", "/x/web-interface/wbi/search/type", lambda: {
+            "code": 0, "message": "0",
+            "data": {"page": 1, "pagesize": PAGE_SIZE, "numPages": 50, "result": [
+                {"type": "video", "aid": view["aid"], "bvid": view["bvid"], "title": view["title"]}
+                for view in map(_bili_view, range(PAGE_SIZE))
+            ]},
+        }),
+        Route("video_detail", "GET", "/x/web-interface/view/detail", lambda: {
+            "code": 0, "message": "0",
+            "data": {"View": _bili_view(0), "Card": {
+                "card": {"mid": "3000000", "name": "bench_up_0", "sex": "保密", "sign": "bench",
+                         "face": "https://i0.hdslb.com/face.jpg", "fans": 10000, "video_count": 100,
+                         "level_info": {"current_level": 6}, "official_verify": {"type": -1}},
+                "like_num": 1024}},
+        }),
+        Route("video_comments", "GET", "/x/v2/reply/wbi/main", lambda: {
+            "code": 0, "message": "0",
+            "data": {"cursor": {"is_begin": False, "is_end": False, "next": 2, "mode": 3},
+                     "replies": [_bili_comment(i) for i in range(PAGE_SIZE)]},
+        }),
+    ]
+
+
+# ------------------------------------------------------------------ douyin
+def _dy_aweme(index: int) -> Dict:
+    return {
+        "aweme_id": f"7380{index:015d}",
+        "aweme_type": 0,
+        "desc": f"基准测试视频 {index} #测试",
+        "create_time": 1718000000 + index,
+        "author": {"uid": f"{index:016d}", "sec_uid": f"MS4wLjABAAAA{index:032d}", "short_id": str(index),
+                   "unique_id": f"bench_{index}", "signature": "bench", "nickname": f"bench_user_{index}",
+                   "avatar_thumb": {"url_list": ["https://p3.douyinpic.com/avatar.jpeg"]}},
+        "statistics": {"digg_count": 1024, "collect_count": 64, "comment_count": 256, "share_count": 16},
+        "ip_label": "广东",
+    }
+
+
+def _dy_comment(index: int) -> Dict:
+    return {
+        "aweme_id": _dy_aweme(0)["aweme_id"],
+        "cid": f"7381{index:015d}",
+        "text": f"基准测试评论 {index}",
+        "create_time": 1718000000 + index,
+        "digg_count": 8,
+        "reply_id": "0",
+        "reply_comment_total": 2,
+        "ip_label": "浙江",
+        "user": {"uid": f"{index:016d}", "sec_uid": f"MS4wLjABAAAA{index:032d}", "short_id": str(index),
+                 "unique_id": f"bench_{index}", "signature": "bench", "nickname": f"bench_user_{index}",
+                 "avatar_thumb": {"url_list": ["https://p3.douyinpic.com/avatar.jpeg"]}},
+    }
+
+
+def _dy_routes() -> List[Route]:
+    return [
+        Route("search_awemes", "GET", "/aweme/v1/web/general/search/single/", lambda: {
+            "status_code": 0, "has_more": 1, "cursor": PAGE_SIZE,
+            "data": [{"type": 1, "aweme_info": _dy_aweme(i)} for i in range(PAGE_SIZE)],
+        }),
+        Route("aweme_comments", "GET", "/aweme/v1/web/comment/list/", lambda: {
+            "status_code": 0, "has_more": 1, "cursor": PAGE_SIZE, "total": 1000,
+            "comments": [_dy_comment(i) for i in range(PAGE_SIZE)],
+        }),
+    ]
+
+
+# ------------------------------------------------------------------ kuaishou
+def _ks_feed(index: int) -> Dict:
+    return {
+        "type": 1,
+        "author": {"id": f"3x{index:014d}", "name": f"bench_user_{index}", "headerUrl": "https://p2.a.yximgs.com/a.jpg"},
+        "photo": {"id": f"3xbench{index:010d}", "caption": f"基准测试视频 {index}", "timestamp": 1718000000000 + index,
+                  "realLikeCount": 1024, "viewCount": 10000, "coverUrl": "https://p2.a.yximgs.com/c.jpg",
+                  "photoUrl": "https://v2.kwaicdn.com/v.mp4"},
+    }
+
+
+def _ks_comment(index: int) -> Dict:
+    return {
+        "commentId": f"{900000000 + index}",
+        "authorId": f"3x{index:014d}",
+        "authorName": f"bench_user_{index}",
+        "content": f"基准测试评论 {index}",
+        "headurl": "https://p2.a.yximgs.com/a.jpg",
+        "timestamp": 1718000000000 + index,
+        "likedCount": 8,
+        "subCommentCount": 2,
+    }
+
+
+def _ks_operation(operation_name: str) -> Callable[[str, bytes], bool]:
+    marker = f'"operationName":"{operation_name}"'.encode("utf-8")
+    return lambda query, body: marker in body
+
+
+def _ks_routes() -> List[Route]:
+    return [
+        Route("search_photos", "POST", "/graphql", lambda: {
+            "data": {"visionSearchPhoto": {"result": 1, "pcursor": "1", "searchSessionId": "bench",
+                                           "feeds": [_ks_feed(i) for i in range(PAGE_SIZE)]}},
+        }, match=_ks_operation("visionSearchPhoto")),
+        Route("video_comments", "POST", "/graphql", lambda: {
+            "data": {"visionCommentList": {"pcursor": "bench", "commentCount": 1000,
+                                           "rootComments": [_ks_comment(i) for i in range(PAGE_SIZE)]}},
+        }, match=_ks_operation("commentListQuery")),
+    ]
+
+
+# ------------------------------------------------------------------ weibo
+def _wb_user(index: int) -> Dict:
+    return {"id": 6000000000 + index, "screen_name": f"bench_user_{index}", "gender": "f",
+            "profile_url": f"https://m.weibo.cn/u/{6000000000 + index}",
+            "profile_image_url": "https://tvax1.sinaimg.cn/avatar.jpg"}
+
+
+def _wb_mblog(index: int) -> Dict:
+    return {
+        "id": f"{5040000000000000 + index}",
+        "text": f"基准测试微博 {index} <a href='/n/bench'>@bench</a> " * 3,
+        "created_at": "Sat Jun 15 10:00:00 +0800 2024",
+        "attitudes_count": 1024,
+        "comments_count": 256,
+        "reposts_count": 16,
+        "region_name": "发布于 北京",
+        "user": _wb_user(index),
+    }
+
+
+def _wb_comment(index: int) -> Dict:
+    return {
+        "id": f"{5041000000000000 + index}",
+        "rootid": f"{5041000000000000 + index}",
+        "text": f"基准测试评论 {index} <span class='url-icon'>[赞]</span>",
+        "created_at": "Sat Jun 15 10:05:00 +0800 2024",
+        "source": "来自上海",
+        "total_number": 2,
+        "like_count": 8,
+        "user": _wb_user(index),
+    }
+
+
+def _wb_routes() -> List[Route]:
+    return [
+        Route("search_notes", "GET", "/api/container/getIndex", lambda: {
+            "ok": 1,
+            "data": {"cardlistInfo": {"page": 2}, "cards": [
+                {"card_type": 9, "mblog": _wb_mblog(i)} for i in range(PAGE_SIZE)
+            ]},
+        }),
+        Route("note_comments", "GET", "/comments/hotflow", lambda: {
+            "ok": 1,
+            "data": {"data": [_wb_comment(i) for i in range(PAGE_SIZE)], "total_number": 1000,
+                     "max_id": 139000000000000, "max_id_type": 0},
+        }),
+    ]
+
+
+# ------------------------------------------------------------------ tieba
+def _has_query_param(name: str) -> Callable[[str, bytes], bool]:
+    return lambda query, body: f"{name}=" in query
+
+
+def _tieba_routes() -> List[Route]:
+    return [
+        Route("search_notes", "GET", "/f/search/res",
+              lambda: _read_tieba_test_data("search_keyword_notes.html"), content_type=HTML_CONTENT_TYPE),
+        Route("note_sub_comments", "GET", "/p/comment",
+              lambda: _read_tieba_test_data("note_sub_comments.html"), content_type=HTML_CONTENT_TYPE),
+        Route("note_comments", "GET", "/p/",
+              lambda: _read_tieba_test_data("note_comments.html"), content_type=HTML_CONTENT_TYPE,
+              match=_has_query_param("pn")),
+        Route("note_detail", "GET", "/p/",
+              lambda: _read_tieba_test_data("note_detail.html"), content_type=HTML_CONTENT_TYPE),
+    ]
+
+
+# ------------------------------------------------------------------ zhihu
+def _zhihu_author(index: int) -> Dict:
+    return {"id": f"{index:032x}", "url_token": f"bench-user-{index}", "name": f"bench_user_{index}",
+            "avatar_url": "https://picx.zhimg.com/avatar.jpg"}
+
+
+def _zhihu_answer(index: int) -> Dict:
+    return {
+        "type": "answer",
+        "id": str(3500000000 + index),
+        "content": f"<p>基准测试回答 {index}</p>" * 8,
+        "question": {"id": str(600000000 + index)},
+        "title": f"<em>基准测试</em>问题 {index}",
+        "excerpt": f"基准测试回答摘要 {index}",
+        "created_time": 1718000000 + index,
+        "updated_time": 1718000000 + index,
+        "voteup_count": 1024,
+        "comment_count": 256,
+        "author": _zhihu_author(index),
+    }
+
+
+def _zhihu_comment(index: int) -> Dict:
+    return {
+        "type": "comment",
+        "id": str(10000000000 + index),
+        "content": f"<p>基准测试评论 {index}</p>",
+        "created_time": 1718000000 + index,
+        "comment_tag": [{"type": "ip_info", "text": "IP 属地北京"}],
+        "child_comment_count": 2,
+        "like_count": 8,
+        "author": _zhihu_author(index),
+    }
+
+
+def _zhihu_routes() -> List[Route]:
+    return [
+        Route("search_contents", "GET", "/api/v4/search_v3", lambda: {
+            "paging": {"is_end": False, "next": ""},
+            "data": [{"type": "search_result", "object": _zhihu_answer(i)} for i in range(PAGE_SIZE)],
+        }),
+        Route("root_comments", "GET", "/api/v4/comment_v5/", lambda: {
+            "paging": {"is_end": False,
+                       "next": "https://www.zhihu.com/api/v4/comment_v5/answers/1/root_comment?offset=bench_offset"},
+            "data": [_zhihu_comment(i) for i in range(PAGE_SIZE)],
+        }),
+    ]
+
+
+PLATFORM_ROUTES: Dict[str, Callable[[], List[Route]]] = {
+    "xhs": _xhs_routes,
+    "bili": _bili_routes,
+    "dy": _dy_routes,
+    "ks": _ks_routes,
+    "wb": _wb_routes,
+    "tieba": _tieba_routes,
+    "zhihu": _zhihu_routes,
+}
+
+
+def get_routes(platform: str) -> List[Route]:
+    if platform not in PLATFORM_ROUTES:
+        raise ValueError(f"Invalid platform: {platform}, only supported {list(PLATFORM_ROUTES.keys())}")
+    return PLATFORM_ROUTES[platform]()
+
+
+def get_captcha_response(platform: str) -> FakeResponse:
+    """
+    各平台触发风控/验证码时的响应，和各个客户端里面的判断逻辑对应
+    """
+    json_headers = {"Content-Type": JSON_CONTENT_TYPE}
+    if platform == "xhs":
+        # 461 和 471 两种验证码都会出现
+        status_code = random.choice((461, 471))
+        return status_code, {"Content-Type": JSON_CONTENT_TYPE, "Verifytype": "124", "Verifyuuid": "bench-uuid"}, \
+            json.dumps({"success": False, "code": status_code, "msg": "需要验证"}).encode("utf-8")
+    if platform == "bili":
+        return 200, json_headers, json.dumps({"code": -352, "message": "风控校验失败"}).encode("utf-8")
+    if platform == "ks":
+        return 200, json_headers, json.dumps({"errors": [{"message": "need captcha"}], "data": {}}).encode("utf-8")
+    if platform == "wb":
+        return 200, json_headers, json.dumps({"ok": 0, "msg": "这里还没有内容"}, ensure_ascii=False).encode("utf-8")
+    if platform == "zhihu":
+        return 403, json_headers, json.dumps({"error": {"code": 40362, "message": "需要验证"}},
+                                             ensure_ascii=False).encode("utf-8")
+    # 抖音/贴吧被风控时返回 blocked
+    return 200, {"Content-Type": HTML_CONTENT_TYPE}, b"blocked"
@@ -0,0 +1,134 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/6/22 15:20
+# @Desc    : 评论存储日志的 CPU 开销对比：f-string 立即格式化 vs %s + utils.truncate 延迟格式化，同步输出 vs 后台线程输出
+#
+# 用法(在项目根目录执行):
+#   python -m bench.log_bench --comments 10000
+import argparse
+import logging
+import os
+import sys
+import time
+from typing import Callable, Dict, List
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+
+def build_comments(count: int) -> List[Dict]:
+    """
+    和 store.xhs.update_xhs_note_comment 中的 local_db_item 字段一致
+    """
+    return [
+        {
+            "comment_id": f"bench_comment_{index}",
+            "create_time": 1718000000000 + index,
+            "ip_location": "上海",
+            "note_id": f"bench_note_{index // 20}",
+            "content": "基准测试评论内容，" * 8 + str(index),
+            "user_id": f"bench_user_{index}",
+            "nickname": f"bench_user_{index}",
+            "avatar": f"https://sns-avatar.example.com/avatar/{index}.jpg",
+            "sub_comment_count": index % 7,
+            "pictures": "",
+            "parent_comment_id": 0,
+            "last_modify_ts": 1718000000000,
+            "like_count": index % 100,
+        }
+        for index in range(count)
+    ]
+
+
+def build_pages(comments: List[Dict], page_size: int = 20) -> List[Dict]:
+    """
+    评论接口响应，每页 page_size 条评论，对应 xhs client 中打印 comments_res 的日志
+    """
+    return [
+        {"cursor": str(index), "has_more": True, "comments": comments[index:index + page_size]}
+        for index in range(0, len(comments), page_size)
+    ]
+
+
+def eager_log(payload: Dict):
+    from tools import utils
+    utils.logger.info(f"[store.xhs.update_xhs_note_comment] xhs note comment:{payload}")
+
+
+def lazy_log(payload: Dict):
+    from tools import utils
+    utils.logger.info("[store.xhs.update_xhs_note_comment] xhs note comment:%s", utils.truncate(payload))
+
+
+def run_case(log_func: Callable[[Dict], None], payloads: List[Dict], level: str, async_log: bool) -> Dict:
+    import config
+    from tools import log_util, utils
+
+    config.LOG_LEVEL = level
+    config.ENABLE_ASYNC_LOG = async_log
+    utils.apply_logging_config(utils.logger)
+    with open(os.devnull, "w", encoding="utf-8") as devnull:
+        for handler in utils.logger.handlers:
+            if isinstance(handler, logging.StreamHandler):
+                handler.setStream(devnull)
+        for listener_handler in getattr(log_util._queue_listener, "handlers", ()):
+            listener_handler.setStream(devnull)
+
+        cpu_start = time.process_time()
+        caller_cpu_start = time.thread_time()
+        for payload in payloads:
+            log_func(payload)
+        caller_cpu = time.thread_time() - caller_cpu_start
+        log_util.stop_queue_listener()
+        cpu = time.process_time() - cpu_start
+    return {
+        "log": log_func.__name__.replace("_log", ""),
+        "level": level,
+        "async": async_log,
+        "caller_cpu_ms": round(caller_cpu * 1000, 1),
+        "total_cpu_ms": round(cpu * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Logging overhead benchmark.")
+    parser.add_argument("--comments", type=int, default=10000)
+    args = parser.parse_args()
+
+    import config
+    comments = build_comments(args.comments)
+    payload_groups = {"comment": comments, "page": build_pages(comments)}
+    saved_level, saved_async = config.LOG_LEVEL, config.ENABLE_ASYNC_LOG
+    rows = []
+    try:
+        for payload_name, payloads in payload_groups.items():
+            for level in ("INFO", "WARNING"):
+                for async_log in (False, True):
+                    for log_func in (eager_log, lazy_log):
+                        row = run_case(log_func, payloads, level, async_log)
+                        row["payload"] = payload_name
+                        rows.append(row)
+    finally:
+        config.LOG_LEVEL, config.ENABLE_ASYNC_LOG = saved_level, saved_async
+
+    print(f"{args.comments} comments, LOG_PAYLOAD_MAX_LENGTH={config.LOG_PAYLOAD_MAX_LENGTH}")
+    print(f"{'payload':<8} {'log':<6} {'level':<8} {'async':<6} {'caller_cpu_ms':>14} {'total_cpu_ms':>13}")
+    for row in rows:
+        print(f"{row['payload']:<8} {row['log']:<6} {row['level']:<8} {str(row['async']):<6} "
+              f"{row['caller_cpu_ms']:>14} {row['total_cpu_ms']:>13}")
+
+
+if __name__ == '__main__':
+    main()
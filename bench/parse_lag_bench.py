@@ -0,0 +1,103 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/6/24 11:40
+# @Desc    : 解析大页面时的事件循环卡顿(lag)，对比 PARSE_EXECUTOR=none | thread | process
+#
+# 用法(在项目根目录执行):
+#   python -m bench.parse_lag_bench --pages 40 --concurrency 8
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import Dict, List
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+TEST_DATA_DIR = os.path.join(PROJECT_ROOT, "media_platform", "tieba", "test_data")
+TICK_INTERVAL = 0.001
+
+
+def percentile(values: List[float], percent: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent))]
+
+
+async def run_mode(mode: str, pages: int, concurrency: int) -> Dict[str, float]:
+    import config
+    from media_platform.tieba.help import TieBaExtractor
+    from tools.parse_executor import parse_executor
+
+    config.PARSE_EXECUTOR = mode
+    config.PARSE_OFFLOAD_MIN_SIZE = 0
+    extractor = TieBaExtractor()
+    with open(os.path.join(TEST_DATA_DIR, "note_comments.html"), "r", encoding="utf-8") as f:
+        page_content = f.read()
+
+    # 预热执行器(进程池启动子进程、子进程导入解析模块)，不计入结果
+    await asyncio.gather(*[
+        parse_executor.parse(extractor.extract_tieba_note_parment_comments, page_content, note_id="1")
+        for _ in range(config.PARSE_EXECUTOR_MAX_WORKERS)
+    ])
+
+    lags: List[float] = []
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            start_time = time.perf_counter()
+            await asyncio.sleep(TICK_INTERVAL)
+            lags.append(time.perf_counter() - start_time - TICK_INTERVAL)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def parse_page():
+        async with semaphore:
+            await parse_executor.parse(extractor.extract_tieba_note_parment_comments, page_content, note_id="1")
+
+    ticker_task = asyncio.create_task(ticker())
+    start_time = time.perf_counter()
+    await asyncio.gather(*[parse_page() for _ in range(pages)])
+    elapsed = time.perf_counter() - start_time
+    done.set()
+    await ticker_task
+    parse_executor.shutdown()
+    return {
+        "pages_per_s": pages / elapsed,
+        "lag_p50_ms": percentile(lags, 0.5) * 1000,
+        "lag_p99_ms": percentile(lags, 0.99) * 1000,
+        "lag_max_ms": max(lags, default=0.0) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Event loop lag while parsing large pages.")
+    parser.add_argument("--pages", type=int, default=40, help="pages parsed in each mode")
+    parser.add_argument("--concurrency", type=int, default=8, help="pages parsed at the same time")
+    parser.add_argument("--modes", type=str, default="none,thread,process", help="executor modes to compare")
+    args = parser.parse_args()
+
+    print(f"{'executor':<10} {'pages_per_s':>12} {'lag_p50_ms':>11} {'lag_p99_ms':>11} {'lag_max_ms':>11}")
+    for mode in args.modes.split(","):
+        result = asyncio.run(run_mode(mode, args.pages, args.concurrency))
+        print(f"{mode:<10} {result['pages_per_s']:>12.1f} {result['lag_p50_ms']:>11.2f} "
+              f"{result['lag_p99_ms']:>11.2f} {result['lag_max_ms']:>11.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/6/28 11:20
+# @Desc    : 存储记录的内存占用和构建速度，对比字典和 __slots__ 记录(以小红书评论为例)
+#
+# 用法(在项目根目录执行):
+#   python -m bench.record_memory_bench --count 100000
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+
+def build_dict(i: int) -> Dict:
+    return {
+        "comment_id": str(i),
+        "create_time": 1719540000000 + i,
+        "ip_location": "上海",
+        "note_id": "6672fb2a000000001c037e6c",
+        "content": "评论内容",
+        "user_id": "5c6a8a1c000000001103c1a0",
+        "nickname": "nickname",
+        "avatar": "https://sns-avatar-qc.xhscdn.com/avatar/1.jpg",
+        "sub_comment_count": 0,
+        "pictures": "",
+        "parent_comment_id": 0,
+        "last_modify_ts": 1719540000000,
+        "like_count": 0,
+    }
+
+
+def build_record(i: int):
+    from store.xhs.xhs_store_record import XhsNoteCommentRecord
+    return XhsNoteCommentRecord(
+        comment_id=str(i),
+        create_time=1719540000000 + i,
+        ip_location="上海",
+        note_id="6672fb2a000000001c037e6c",
+        content="评论内容",
+        user_id="5c6a8a1c000000001103c1a0",
+        nickname="nickname",
+        avatar="https://sns-avatar-qc.xhscdn.com/avatar/1.jpg",
+        sub_comment_count=0,
+        pictures="",
+        parent_comment_id=0,
+        last_modify_ts=1719540000000,
+        like_count=0,
+    )
+
+
+def run_case(builder: Callable, count: int) -> Dict[str, float]:
+    builder(0)
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    items: List = [builder(i) for i in range(count)]
+    elapsed = time.perf_counter() - start_time
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del items
+    return {
+        "build_per_s": count / elapsed,
+        "mb": current / 1024 / 1024,
+        "bytes_per_item": current / count,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory footprint of store items: dict vs slotted record.")
+    parser.add_argument("--count", type=int, default=100000, help="items held in memory")
+    args = parser.parse_args()
+
+    print(f"{'item':<8} {'build_per_s':>12} {'mb':>8} {'bytes_per_item':>15}")
+    for name, builder in (("dict", build_dict), ("record", build_record)):
+        result = run_case(builder, args.count)
+        print(f"{name:<8} {result['build_per_s']:>12.0f} {result['mb']:>8.1f} {result['bytes_per_item']:>15.0f}")
+
+
+if __name__ == '__main__':
+    main()
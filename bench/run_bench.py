@@ -0,0 +1,259 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/6/20 16:00
+# @Desc    : 离线基准测试入口，统计各平台在不同爬取模式、存储方式下的吞吐、延迟、CPU 和内存峰值
+#
+# 用法(在项目根目录执行):
+#   python -m bench.run_bench --platform xhs --mode comments --store csv --pages 100 --concurrency 4
+#   python -m bench.run_bench --platform all --latency-ms 50 --error-rate 0.01 --output bench_output.txt
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+from urllib.request import urlopen
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+PLATFORMS = ["xhs", "bili", "dy", "ks", "wb", "tieba", "zhihu"]
+MODES = ["search", "comments"]
+STORES = ["csv", "json", "db", "none"]
+
+
+def percentile(values: List[float], percent: float) -> float:
+    if not values:
+        return 0.0
+    sorted_values = sorted(values)
+    index = min(len(sorted_values) - 1, max(0, int(round(percent / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def fetch_server_hits(base_url: str) -> Dict[str, int]:
+    from bench.fake_server import HITS_PATH
+    with urlopen(f"{base_url}{HITS_PATH}", timeout=10) as response:
+        return json.loads(response.read().decode("utf-8"))
+
+
+async def run_scenario(args: argparse.Namespace, base_url: str) -> Dict:
+    from bench.scenarios import create_scenario
+    from tools import utils
+    from var import crawler_type_var, source_keyword_var
+
+    scenario = create_scenario(args.platform, base_url, with_js_sign=args.with_js_sign,
+                               enable_store=args.store != "none")
+    # 快手的 GraphQL 语句等资源按照相对项目根目录的路径加载，先创建客户端再切换工作目录
+    scenario.create_client()
+    work_dir = tempfile.mkdtemp(prefix="mediacrawler_bench_")
+    os.chdir(work_dir)
+
+    if args.store == "db":
+        import db
+        await db.init_db()
+    crawler_type_var.set("search")
+    source_keyword_var.set("基准测试")
+
+    operation = scenario.search if args.mode == "search" else scenario.comments
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    item_count = 0
+    next_page = 0
+
+    async def worker():
+        nonlocal item_count, next_page
+        while next_page < args.pages:
+            next_page += 1
+            start_time = time.perf_counter()
+            try:
+                page_item_count = await operation(next_page)
+                item_count += page_item_count
+                latencies.append(time.perf_counter() - start_time)
+            except Exception as e:
+                error_name = type(e).__name__
+                errors[error_name] = errors.get(error_name, 0) + 1
+                utils.logger.debug(f"[run_bench.worker] operation error: {e}")
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(max(1, args.concurrency))])
+    wall_time = time.perf_counter() - wall_start
+    cpu_time = time.process_time() - cpu_start
+
+    if args.store == "db":
+        import db
+        await db.close()
+
+    hits = fetch_server_hits(base_url)
+    http_requests = sum(hits.values())
+    result = {
+        "platform": args.platform,
+        "mode": args.mode,
+        "store": args.store,
+        "pages": args.pages,
+        "concurrency": args.concurrency,
+        "latency_ms": args.latency_ms,
+        "error_rate": args.error_rate,
+        "captcha_rate": args.captcha_rate,
+        "with_js_sign": args.with_js_sign,
+        "ok_pages": len(latencies),
+        "errors": errors,
+        "items": item_count,
+        "http_requests": http_requests,
+        "server_hits": hits,
+        "wall_s": round(wall_time, 4),
+        "req_per_s": round(http_requests / wall_time, 2) if wall_time else 0,
+        "items_per_s": round(item_count / wall_time, 2) if wall_time else 0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "cpu_s": round(cpu_time, 4),
+        "cpu_pct": round(cpu_time / wall_time * 100, 1) if wall_time else 0,
+        # linux 下 ru_maxrss 单位是 KB
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "work_dir": work_dir,
+    }
+    if args.metrics:
+        result["metrics"] = summarize_metrics()
+    return result
+
+
+def summarize_metrics() -> Dict[str, Dict]:
+    """
+    按指标汇总耗时，用来判断瓶颈在签名、网络、解析还是存储
+    """
+    from tools.metrics import metrics_registry
+    summary: Dict[str, Dict] = {}
+    for name, _, histogram in metrics_registry.collect():
+        item = summary.setdefault(name.replace("mediacrawler_", "").replace("_seconds", ""), {"count": 0, "total_s": 0.0})
+        item["count"] += histogram.count
+        item["total_s"] = round(item["total_s"] + histogram.sum, 4)
+    return summary
+
+
+def run_single(args: argparse.Namespace) -> Dict:
+    import config
+    from bench.fake_server import FakeServerConfig, start_server_process
+
+    if args.store != "none":
+        config.SAVE_DATA_OPTION = args.store
+    config.ENABLE_GET_WORDCLOUD = False
+    config.ENABLE_METRICS = args.metrics
+    if args.quiet:
+        from tools import utils
+        utils.logger.setLevel("WARNING")
+
+    server_process, base_url = start_server_process(FakeServerConfig(
+        platform=args.platform,
+        latency_ms=args.latency_ms,
+        error_rate=args.error_rate,
+        captcha_rate=args.captcha_rate,
+        seed=args.seed,
+    ))
+    try:
+        return asyncio.get_event_loop().run_until_complete(run_scenario(args, base_url))
+    finally:
+        server_process.terminate()
+        server_process.join()
+
+
+def run_matrix(args: argparse.Namespace) -> List[Dict]:
+    """
+    每个 平台/模式/存储 组合在独立的子进程中执行，保证内存峰值等指标互不影响
+    """
+    platforms = PLATFORMS if args.platform == "all" else [args.platform]
+    modes = MODES if args.mode == "all" else [args.mode]
+    stores = ["csv", "json", "none"] if args.store == "all" else [args.store]
+    results: List[Dict] = []
+    for platform in platforms:
+        for mode in modes:
+            for store in stores:
+                cmd = [
+                    sys.executable, "-m", "bench.run_bench",
+                    "--platform", platform, "--mode", mode, "--store", store,
+                    "--pages", str(args.pages), "--concurrency", str(args.concurrency),
+                    "--latency-ms", str(args.latency_ms), "--error-rate", str(args.error_rate),
+                    "--captcha-rate", str(args.captcha_rate), "--seed", str(args.seed), "--quiet",
+                ]
+                if args.with_js_sign:
+                    cmd.append("--with-js-sign")
+                if args.metrics:
+                    cmd.append("--metrics")
+                completed = subprocess.run(cmd, cwd=PROJECT_ROOT, stdout=subprocess.PIPE)
+                if completed.returncode != 0:
+                    results.append({"platform": platform, "mode": mode, "store": store,
+                                    "failed": f"exit code {completed.returncode}"})
+                    continue
+                results.append(json.loads(completed.stdout.decode("utf-8").strip().splitlines()[-1]))
+    return results
+
+
+def print_summary(results: List[Dict]):
+    header = f"{'platform':<8} {'mode':<9} {'store':<6} {'req/s':>9} {'items/s':>9} {'p50ms':>9} {'p99ms':>9} " \
+             f"{'cpu_s':>8} {'rss_mb':>8} {'errors':>7}"
+    print(header, file=sys.stderr)
+    for result in results:
+        if result.get("failed"):
+            print(f"{result['platform']:<8} {result['mode']:<9} {result['store']:<6} {result['failed']}", file=sys.stderr)
+            continue
+        print(
+            f"{result['platform']:<8} {result['mode']:<9} {result['store']:<6} {result['req_per_s']:>9} "
+            f"{result['items_per_s']:>9} {result['p50_ms']:>9} {result['p99_ms']:>9} {result['cpu_s']:>8} "
+            f"{result['peak_rss_mb']:>8} {sum(result['errors'].values()):>7}",
+            file=sys.stderr
+        )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline MediaCrawler benchmark against a local fake platform server.")
+    parser.add_argument("--platform", type=str, choices=PLATFORMS + ["all"], default="all")
+    parser.add_argument("--mode", type=str, choices=MODES + ["all"], default="all")
+    parser.add_argument("--store", type=str, choices=STORES + ["all"], default="none",
+                        help="store backend, none means skip storing")
+    parser.add_argument("--pages", type=int, default=50, help="number of search/comment pages to crawl")
+    parser.add_argument("--concurrency", type=int, default=4, help="number of pages crawled concurrently")
+    parser.add_argument("--latency-ms", type=float, default=0, help="fake server response latency")
+    parser.add_argument("--error-rate", type=float, default=0, help="ratio of 500 responses")
+    parser.add_argument("--captcha-rate", type=float, default=0,
+                        help="ratio of captcha/risk control responses, e.g. xhs 461/471")
+    parser.add_argument("--seed", type=int, default=2025, help="random seed of the fake server")
+    parser.add_argument("--with-js-sign", action="store_true",
+                        help="run the real douyin/zhihu js sign, requires node")
+    parser.add_argument("--metrics", action="store_true",
+                        help="collect request/sign/extract/store timings, see tools/metrics.py")
+    parser.add_argument("--quiet", action="store_true", help="only log warnings of the crawler")
+    parser.add_argument("--output", type=str, default="", help="append json lines results to this file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    is_single = args.platform != "all" and args.mode != "all" and args.store != "all"
+    results = [run_single(args)] if is_single else run_matrix(args)
+    for result in results:
+        print(json.dumps(result, ensure_ascii=False), flush=True)
+    if not is_single:
+        print_summary(results)
+    if args.output:
+        with open(os.path.join(PROJECT_ROOT, args.output), "a", encoding="utf-8") as f:
+            for result in results:
+                f.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,332 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/6/20 14:30
+# @Desc    : 各平台的基准测试场景，一次操作对应爬虫搜索/评论流程中的一页数据：请求 -> 解析 -> 存储
+import asyncio
+from typing import Any, Dict, List
+
+import config
+from bench.fixtures import PAGE_SIZE
+
+BENCH_KEYWORD = "基准测试"
+BENCH_USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) " \
+                   "Chrome/125.0.0.0 Safari/537.36"
+# 和真实签名长度一致，xhs 的 sign 会按固定长度读取 x_t + x_s + b1
+BENCH_XHS_X_S = "XYW_eyJzaWduU3ZuIjoiNTYiLCJzaWduVHlwZSI6IngyIiwiYXBwSWQiOiJ4aHMtcGMtd2ViIiwic2lnblZlcnNpb24iOiIxIiwi" \
+                "cGF5bG9hZCI6ImJlbmNobWFyayJ9"
+BENCH_WBI_IMG_URLS = "https://i0.hdslb.com/bfs/wbi/7cd084941338484aae1ad9425b84077c.png-" \
+                     "https://i0.hdslb.com/bfs/wbi/4932caff0ff746eab6f01bf08b70ac45.png"
+
+
+class FakeSignPage:
+    """
+    替代 playwright page，签名相关的 evaluate 返回固定值，基准测试不需要启动浏览器
+    """
+
+    url = "https://bench.local/"
+
+    def is_closed(self) -> bool:
+        return False
+
+    async def evaluate(self, expression: str, arg: Any = None) -> Any:
+        if "_webmsxyw" in expression:
+            return {"X-s": BENCH_XHS_X_S, "X-t": 1718000000000}
+        if "localStorage" in expression:
+            return {"b1": "benchmark", "wbi_img_urls": BENCH_WBI_IMG_URLS, "xmst": "benchmark"}
+        return None
+
+    async def goto(self, url: str):
+        pass
+
+
+async def _fake_a_bogus(url: str, params: str, post_data: dict, user_agent: str, page=None) -> str:
+    return "benchmark_a_bogus"
+
+
+def _fake_zhihu_sign(url: str, cookies: str) -> Dict:
+    return {"x-zst-81": "benchmark", "x-zse-96": "2.0_benchmark"}
+
+
+async def _gather_with_semaphore(coroutines: List) -> List:
+    """
+    和爬虫一样使用 MAX_CONCURRENCY_NUM 限制单页内详情请求的并发数
+    """
+    semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+
+    async def _run(coroutine):
+        async with semaphore:
+            return await coroutine
+
+    return await asyncio.gather(*[_run(coroutine) for coroutine in coroutines])
+
+
+class BenchScenario:
+    """
+    基准测试场景基类
+    - create_client: 创建平台客户端并把 _host 指向本地模拟服务
+    - search: 爬取一页搜索结果(包含爬虫在搜索模式下会请求的详情)并存储，返回数据条数
+    - comments: 爬取一页评论并存储，返回评论条数
+    """
+
+    def __init__(self, base_url: str, with_js_sign: bool = False, enable_store: bool = True):
+        self.base_url = base_url
+        self.with_js_sign = with_js_sign
+        self.enable_store = enable_store
+        self.client = None
+
+    def create_client(self):
+        raise NotImplementedError
+
+    async def search(self, page: int) -> int:
+        raise NotImplementedError
+
+    async def comments(self, page: int) -> int:
+        raise NotImplementedError
+
+
+class XhsBenchScenario(BenchScenario):
+    def create_client(self):
+        from media_platform.xhs.client import XiaoHongShuClient
+        self.client = XiaoHongShuClient(
+            headers={"User-Agent": BENCH_USER_AGENT, "Cookie": "a1=benchmark", "Content-Type": "application/json"},
+            playwright_page=FakeSignPage(),
+            cookie_dict={"a1": "benchmark"},
+        )
+        self.client._host = self.base_url
+
+    async def search(self, page: int) -> int:
+        from store import xhs as xhs_store
+        notes_res = await self.client.get_note_by_keyword(keyword=BENCH_KEYWORD, page=page)
+        items = [item for item in notes_res.get("items", {}) if item.get("model_type") not in ("rec_query", "hot_query")]
+        note_details = await _gather_with_semaphore([
+            self.client.get_note_by_id(item.get("id"), item.get("xsec_source", ""), item.get("xsec_token", ""))
+            for item in items
+        ])
+        if self.enable_store:
+            for note_detail in note_details:
+                if note_detail:
+                    await xhs_store.update_xhs_note(note_detail)
+        return len(note_details)
+
+    async def comments(self, page: int) -> int:
+        from store import xhs as xhs_store
+        comments_res = await self.client.get_note_comments(note_id="6650benchmark", xsec_token="", cursor=str(page))
+        comments = comments_res.get("comments", [])
+        if self.enable_store:
+            await xhs_store.batch_update_xhs_note_comments("6650benchmark", comments)
+        return len(comments)
+
+
+class BilibiliBenchScenario(BenchScenario):
+    def create_client(self):
+        from media_platform.bilibili.client import BilibiliClient
+        self.client = BilibiliClient(
+            headers={"User-Agent": BENCH_USER_AGENT, "Cookie": "SESSDATA=benchmark"},
+            playwright_page=FakeSignPage(),
+            cookie_dict={"SESSDATA": "benchmark"},
+        )
+        self.client._host = self.base_url
+
+    async def search(self, page: int) -> int:
+        from store import bilibili as bilibili_store
+        videos_res = await self.client.search_video_by_keyword(keyword=BENCH_KEYWORD, page=page, page_size=PAGE_SIZE)
+        video_list: List[Dict] = videos_res.get("result") or []
+        video_items = await _gather_with_semaphore([
+            self.client.get_video_info(aid=video_item.get("aid")) for video_item in video_list
+        ])
+        if self.enable_store:
+            for video_item in video_items:
+                if video_item:
+                    await bilibili_store.update_bilibili_video(video_item)
+                    await bilibili_store.update_up_info(video_item)
+        return len(video_items)
+
+    async def comments(self, page: int) -> int:
+        from store import bilibili as bilibili_store
+        comments_res = await self.client.get_video_comments(video_id="1000000", next=page)
+        comments = comments_res.get("replies") or []
+        if self.enable_store:
+            await bilibili_store.batch_update_bilibili_video_comments("1000000", comments)
+        return len(comments)
+
+
+class DouYinBenchScenario(BenchScenario):
+    def create_client(self):
+        from media_platform.douyin import client as douyin_client
+        if not self.with_js_sign:
+            douyin_client.get_a_bogus = _fake_a_bogus
+        self.client = douyin_client.DOUYINClient(
+            headers={"User-Agent": BENCH_USER_AGENT, "Cookie": "benchmark=1", "Host": "www.douyin.com",
+                     "Origin": "https://www.douyin.com/", "Referer": "https://www.douyin.com/",
+                     "Content-Type": "application/json;charset=UTF-8"},
+            playwright_page=FakeSignPage(),
+            cookie_dict={},
+        )
+        self.client._host = self.base_url
+
+    async def search(self, page: int) -> int:
+        from store import douyin as douyin_store
+        posts_res = await self.client.search_info_by_keyword(keyword=BENCH_KEYWORD, offset=page * PAGE_SIZE)
+        aweme_list = [post_item.get("aweme_info") for post_item in posts_res.get("data", []) if post_item.get("aweme_info")]
+        if self.enable_store:
+            for aweme_info in aweme_list:
+                await douyin_store.update_douyin_aweme(aweme_item=aweme_info)
+        return len(aweme_list)
+
+    async def comments(self, page: int) -> int:
+        from store import douyin as douyin_store
+        comments_res = await self.client.get_aweme_comments("7380000000000000000", cursor=page * PAGE_SIZE)
+        comments = comments_res.get("comments", [])
+        if self.enable_store:
+            await douyin_store.batch_update_dy_aweme_comments("7380000000000000000", comments)
+        return len(comments)
+
+
+class KuaishouBenchScenario(BenchScenario):
+    def create_client(self):
+        from media_platform.kuaishou.client import KuaiShouClient
+        self.client = KuaiShouClient(
+            headers={"User-Agent": BENCH_USER_AGENT, "Cookie": "benchmark=1", "Content-Type": "application/json;charset=UTF-8"},
+            playwright_page=FakeSignPage(),
+            cookie_dict={},
+        )
+        self.client._host = f"{self.base_url}/graphql"
+
+    async def search(self, page: int) -> int:
+        from store import kuaishou as kuaishou_store
+        videos_res = await self.client.search_info_by_keyword(keyword=BENCH_KEYWORD, pcursor=str(page))
+        feeds: List[Dict] = videos_res.get("visionSearchPhoto", {}).get("feeds", [])
+        if self.enable_store:
+            for video_detail in feeds:
+                await kuaishou_store.update_kuaishou_video(video_item=video_detail)
+        return len(feeds)
+
+    async def comments(self, page: int) -> int:
+        from store import kuaishou as kuaishou_store
+        comments_res = await self.client.get_video_comments("3xbenchmark", pcursor=str(page))
+        comments = comments_res.get("visionCommentList", {}).get("rootComments", [])
+        if self.enable_store:
+            await kuaishou_store.batch_update_ks_video_comments("3xbenchmark", comments)
+        return len(comments)
+
+
+class WeiboBenchScenario(BenchScenario):
+    def create_client(self):
+        from media_platform.weibo.client import WeiboClient
+        self.client = WeiboClient(
+            headers={"User-Agent": BENCH_USER_AGENT, "Cookie": "SUB=benchmark", "Origin": "https://m.weibo.cn",
+                     "Referer": "https://m.weibo.cn", "Content-Type": "application/json;charset=UTF-8"},
+            playwright_page=FakeSignPage(),
+            cookie_dict={"SUB": "benchmark"},
+        )
+        self.client._host = self.base_url
+
+    async def search(self, page: int) -> int:
+        from media_platform.weibo.help import filter_search_result_card
+        from store import weibo as weibo_store
+        search_res = await self.client.get_note_by_keyword(keyword=BENCH_KEYWORD, page=page)
+        note_list = filter_search_result_card(search_res.get("cards", []))
+        if self.enable_store:
+            for note_item in note_list:
+                await weibo_store.update_weibo_note(note_item)
+        return len(note_list)
+
+    async def comments(self, page: int) -> int:
+        from store import weibo as weibo_store
+        comments_res = await self.client.get_note_comments("5040000000000000", max_id=page)
+        comments = comments_res.get("data", [])
+        if self.enable_store:
+            await weibo_store.batch_update_weibo_note_comments("5040000000000000", comments)
+        return len(comments)
+
+
+class TieBaBenchScenario(BenchScenario):
+    def create_client(self):
+        from media_platform.tieba.client import BaiduTieBaClient
+        from media_platform.tieba.help import TieBaExtractor
+        self.client = BaiduTieBaClient()
+        self.client._host = self.base_url
+        self.extractor = TieBaExtractor()
+
+    async def search(self, page: int) -> int:
+        from store import tieba as tieba_store
+        notes = await self.client.get_notes_by_keyword(keyword=BENCH_KEYWORD, page=page)
+        note_details = await _gather_with_semaphore([self.client.get_note_by_id(note.note_id) for note in notes])
+        if self.enable_store:
+            for note_detail in note_details:
+                await tieba_store.update_tieba_note(note_detail)
+        return len(note_details)
+
+    async def comments(self, page: int) -> int:
+        from store import tieba as tieba_store
+        page_content = await self.client.get("/p/9117888152", params={"pn": page}, return_ori_content=True)
+        comments = self.extractor.extract_tieba_note_parment_comments(page_content, note_id="9117888152")
+        if self.enable_store:
+            await tieba_store.batch_update_tieba_note_comments("9117888152", comments)
+        return len(comments)
+
+
+class ZhihuBenchScenario(BenchScenario):
+    def create_client(self):
+        from media_platform.zhihu import client as zhihu_client
+        from media_platform.zhihu.help import ZhihuExtractor
+        from model.m_zhihu import ZhihuContent
+        if not self.with_js_sign:
+            zhihu_client.sign = _fake_zhihu_sign
+        self.client = zhihu_client.ZhiHuClient(
+            headers={"User-Agent": BENCH_USER_AGENT, "cookie": "d_c0=benchmark", "x-api-version": "3.0.91",
+                     "x-app-za": "OS=Web", "x-requested-with": "fetch", "x-zse-93": "101_3_3.0"},
+            playwright_page=FakeSignPage(),
+            cookie_dict={"d_c0": "benchmark"},
+        )
+        self.client._host = self.base_url
+        self.client._zhuanlan_host = self.base_url
+        self.extractor = ZhihuExtractor()
+        self.content = ZhihuContent(content_id="3500000000", content_type="answer")
+
+    async def search(self, page: int) -> int:
+        from store import zhihu as zhihu_store
+        contents = await self.client.get_note_by_keyword(keyword=BENCH_KEYWORD, page=page)
+        if self.enable_store:
+            for content in contents:
+                await zhihu_store.update_zhihu_content(content)
+        return len(contents)
+
+    async def comments(self, page: int) -> int:
+        from store import zhihu as zhihu_store
+        comments_res = await self.client.get_root_comments(self.content.content_id, self.content.content_type,
+                                                           offset=str(page), limit=PAGE_SIZE)
+        comments = self.extractor.extract_comments(self.content, comments_res.get("data"))
+        if self.enable_store:
+            await zhihu_store.batch_update_zhihu_note_comments(comments)
+        return len(comments)
+
+
+SCENARIOS = {
+    "xhs": XhsBenchScenario,
+    "bili": BilibiliBenchScenario,
+    "dy": DouYinBenchScenario,
+    "ks": KuaishouBenchScenario,
+    "wb": WeiboBenchScenario,
+    "tieba": TieBaBenchScenario,
+    "zhihu": ZhihuBenchScenario,
+}
+
+
+def create_scenario(platform: str, base_url: str, with_js_sign: bool = False,
+                    enable_store: bool = True) -> BenchScenario:
+    scenario_class = SCENARIOS.get(platform)
+    if not scenario_class:
+        raise ValueError(f"Invalid platform: {platform}, only supported {list(SCENARIOS.keys())}")
+    return scenario_class(base_url, with_js_sign=with_js_sign, enable_store=enable_store)
@@ -0,0 +1,83 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/6/23 14:00
+# @Desc    : 贴吧页面解析吞吐(pages/s)，使用 media_platform/tieba/test_data 下保存的真实页面
+#
+# 用法(在项目根目录执行):
+#   python -m bench.tieba_extract_bench --seconds 3
+import argparse
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+TEST_DATA_DIR = os.path.join(PROJECT_ROOT, "media_platform", "tieba", "test_data")
+
+
+def build_cases() -> List[Tuple[str, int, Callable[[], object]]]:
+    from media_platform.tieba.help import TieBaExtractor
+    from model.m_baidu_tieba import TiebaComment
+
+    extractor = TieBaExtractor()
+    parent_comment = TiebaComment(comment_id="123456", content="", note_id="9117888152", note_url="",
+                                  tieba_id="4513750", tieba_name="", tieba_link="")
+
+    def read(file_name: str) -> str:
+        with open(os.path.join(TEST_DATA_DIR, file_name), "r", encoding="utf-8") as f:
+            return f.read()
+
+    pages: Dict[str, str] = {
+        "search_keyword_notes": read("search_keyword_notes.html"),
+        "tieba_note_list": read("tieba_note_list.html"),
+        "note_detail": read("note_detail.html"),
+        "note_comments": read("note_comments.html"),
+        "note_sub_comments": read("note_sub_comments.html"),
+    }
+    return [
+        ("search_keyword_notes", len(pages["search_keyword_notes"]),
+         lambda: extractor.extract_search_note_list(pages["search_keyword_notes"])),
+        ("tieba_note_list", len(pages["tieba_note_list"]),
+         lambda: extractor.extract_tieba_note_list(pages["tieba_note_list"])),
+        ("note_detail", len(pages["note_detail"]),
+         lambda: extractor.extract_note_detail(pages["note_detail"])),
+        ("note_comments", len(pages["note_comments"]),
+         lambda: extractor.extract_tieba_note_parment_comments(pages["note_comments"], note_id="9117888152")),
+        ("note_sub_comments", len(pages["note_sub_comments"]),
+         lambda: extractor.extract_tieba_note_sub_comments(pages["note_sub_comments"], parent_comment)),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tieba extractor throughput benchmark.")
+    parser.add_argument("--seconds", type=float, default=2, help="run time of each page type")
+    args = parser.parse_args()
+
+    print(f"{'page':<22} {'size_kb':>8} {'pages':>6} {'pages_per_s':>12} {'ms_per_page':>12}")
+    for name, size, extract in build_cases():
+        extract()
+        pages = 0
+        start_time = time.perf_counter()
+        while time.perf_counter() - start_time < args.seconds:
+            extract()
+            pages += 1
+        elapsed = time.perf_counter() - start_time
+        print(f"{name:<22} {size / 1024:>8.0f} {pages:>6} {pages / elapsed:>12.1f} {elapsed / pages * 1000:>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
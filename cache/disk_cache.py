@@ -0,0 +1,133 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Name    : 程序员阿江-Relakkes
+# @Time    : 2025/7/5 10:00
+# @Desc    : 磁盘缓存，每个键保存为一个文件，程序重新运行之后也可以使用
+
+import fnmatch
+import hashlib
+import json
+import os
+import time
+from typing import Any, List, Optional
+
+from cache.abs_cache import AbstractCache
+
+
+class ExpiringDiskCache(AbstractCache):
+
+    def __init__(self, cache_dir: str, max_size: int = 0):
+        """
+        初始化磁盘缓存
+        :param cache_dir: 缓存目录
+        :param max_size: 最多缓存的键数量，超过时先删除过期的键，再删除最早设置的键，0 为不限制
+        :return:
+        """
+        self._cache_dir = cache_dir
+        self._max_size = max_size
+        os.makedirs(cache_dir, exist_ok=True)
+        self._size = len(self._cache_files())
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        从缓存中获取键的值
+        :param key:
+        :return:
+        """
+        item = self._read(self._cache_file(key))
+        if item is None or item.get("key") != key:
+            return None
+
+        # 如果键已过期，则删除键并返回None
+        if item.get("expire_at", 0) < time.time():
+            self._remove(self._cache_file(key))
+            return None
+
+        return item.get("value")
+
+    def set(self, key: str, value: Any, expire_time: int) -> None:
+        """
+        将键的值设置到缓存中，值需要可以序列化为 JSON
+        :param key:
+        :param value:
+        :param expire_time:
+        :return:
+        """
+        cache_file = self._cache_file(key)
+        is_new_key = not os.path.exists(cache_file)
+        tmp_file = f"{cache_file}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "value": value, "expire_at": time.time() + expire_time}, f, ensure_ascii=False)
+        os.replace(tmp_file, cache_file)
+
+        if is_new_key:
+            self._size += 1
+            if self._max_size and self._size > self._max_size:
+                self._evict()
+
+    def keys(self, pattern: str) -> List[str]:
+        """
+        获取所有符合pattern的key
+        :param pattern: 匹配模式
+        :return:
+        """
+        keys = []
+        for cache_file in self._cache_files():
+            item = self._read(cache_file)
+            if item is not None and fnmatch.fnmatchcase(item.get("key", ""), pattern):
+                keys.append(item["key"])
+        return keys
+
+    def _cache_file(self, key: str) -> str:
+        return os.path.join(self._cache_dir, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json")
+
+    def _cache_files(self) -> List[str]:
+        return [
+            os.path.join(self._cache_dir, file_name)
+            for file_name in os.listdir(self._cache_dir) if file_name.endswith(".json")
+        ]
+
+    @staticmethod
+    def _read(cache_file: str) -> Optional[dict]:
+        try:
+            with open(cache_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _remove(self, cache_file: str):
+        try:
+            os.remove(cache_file)
+            self._size -= 1
+        except OSError:
+            pass
+
+    def _evict(self):
+        """
+        删除过期的键，仍然超过 max_size 时按修改时间删除最早设置的键，
+        多删除 max_size 的 1/10，避免缓存满了之后每次 set 都要遍历缓存目录
+        :return:
+        """
+        now = time.time()
+        cache_files = sorted(self._cache_files(), key=os.path.getmtime)
+        remain_files = []
+        for cache_file in cache_files:
+            item = self._read(cache_file)
+            if item is None or item.get("expire_at", 0) < now:
+                self._remove(cache_file)
+            else:
+                remain_files.append(cache_file)
+        self._size = len(remain_files)
+        for cache_file in remain_files[:max(self._size - self._max_size + self._max_size // 10, 0)]:
+            self._remove(cache_file)
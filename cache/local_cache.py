@@ -24,13 +24,15 @@ from cache.abs_cache import AbstractCache
 
 class ExpiringLocalCache(AbstractCache):
 
-    def __init__(self, cron_interval: int = 10):
+    def __init__(self, cron_interval: int = 10, max_size: int = 0):
         """
         初始化本地缓存
         :param cron_interval: 定时清楚cache的时间间隔
+        :param max_size: 最多缓存的键数量，超过时删除最早设置的键，0 为不限制
         :return:
         """
         self._cron_interval = cron_interval
+        self._max_size = max_size
         self._cache_container: Dict[str, Tuple[Any, float]] = {}
         self._cron_task: Optional[asyncio.Task] = None
         # 开启定时清理任务
@@ -69,6 +71,12 @@ class ExpiringLocalCache(AbstractCache):
         :param expire_time:
         :return:
         """
+        self._schedule_clear()
+        self._cache_container.pop(key, None)
+        if self._max_size and len(self._cache_container) >= self._max_size:
+            self._clear()
+            while len(self._cache_container) >= self._max_size:
+                del self._cache_container[next(iter(self._cache_container))]
         self._cache_container[key] = (value, time.time() + expire_time)
 
     def keys(self, pattern: str) -> List[str]:
@@ -88,15 +96,16 @@ class ExpiringLocalCache(AbstractCache):
 
     def _schedule_clear(self):
         """
-        开启定时清理任务,
+        开启定时清理任务，只在运行中的事件循环里开启，不自己新建事件循环(新建的事件循环不会被关闭)；
+        没有运行中的事件循环时等到在事件循环中 set 时再开启，在此之前过期的键在 get 时删除
         :return:
         """
-
+        if self._cron_task is not None and not self._cron_task.done():
+            return
         try:
-            loop = asyncio.get_event_loop()
+            loop = asyncio.get_running_loop()
         except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+            return
 
         self._cron_task = loop.create_task(self._start_clear_cron())
 
@@ -105,7 +114,7 @@ class ExpiringLocalCache(AbstractCache):
         根据过期时间清理缓存
         :return:
         """
-        for key, (value, expire_time) in self._cache_container.items():
+        for key, (value, expire_time) in list(self._cache_container.items()):
             if expire_time < time.time():
                 del self._cache_container[key]
 
@@ -12,6 +12,8 @@
 import argparse
 
 import config
+from tools import utils
+from tools.log_util import parse_module_levels
 from tools.utils import str2bool
 
 
@@ -36,6 +38,21 @@ async def parse_cmd():
                         help='where to save the data (csv or db or json)', choices=['csv', 'db', 'json'], default=config.SAVE_DATA_OPTION)
     parser.add_argument('--cookies', type=str,
                         help='cookies used for cookie login type', default=config.COOKIES)
+    parser.add_argument('--profile-startup', dest='profile_startup', action='store_true',
+                        help='report import time breakdown and startup phases', default=config.ENABLE_PROFILE_STARTUP)
+    parser.add_argument('--metrics', dest='enable_metrics', action='store_true',
+                        help='collect request/sign/parse/store timings and print a summary table', default=config.ENABLE_METRICS)
+    parser.add_argument('--metrics_port', type=int,
+                        help='serve prometheus metrics on this port, 0 means disabled', default=config.METRICS_PORT)
+    parser.add_argument('--log_level', type=str, help='Log level (DEBUG | INFO | WARNING | ERROR)',
+                        choices=["DEBUG", "INFO", "WARNING", "ERROR"], default=config.LOG_LEVEL)
+    parser.add_argument('--log_module_levels', type=parse_module_levels,
+                        help='per module log levels, e.g. store=WARNING,media_platform.xhs=DEBUG',
+                        default=config.LOG_MODULE_LEVELS)
+    parser.add_argument('--log_format', type=str, help='Log format (text | json)',
+                        choices=["text", "json"], default=config.LOG_FORMAT)
+    parser.add_argument('--parse_executor', type=str, help='Where to parse large pages (thread | process | none)',
+                        choices=["thread", "process", "none"], default=config.PARSE_EXECUTOR)
 
     args = parser.parse_args()
 
@@ -49,3 +66,11 @@ async def parse_cmd():
     config.ENABLE_GET_SUB_COMMENTS = args.get_sub_comment
     config.SAVE_DATA_OPTION = args.save_data_option
     config.COOKIES = args.cookies
+    config.ENABLE_PROFILE_STARTUP = args.profile_startup
+    config.ENABLE_METRICS = args.enable_metrics or args.metrics_port > 0
+    config.METRICS_PORT = args.metrics_port
+    config.LOG_LEVEL = args.log_level
+    config.LOG_MODULE_LEVELS = args.log_module_levels
+    config.LOG_FORMAT = args.log_format
+    config.PARSE_EXECUTOR = args.parse_executor
+    utils.apply_logging_config(utils.logger)
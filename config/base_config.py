@@ -56,12 +56,65 @@ HEADLESS = False
 # 是否保存登录状态
 SAVE_LOGIN_STATE = True
 
+# 浏览器页面池大小，签名等依赖页面 evaluate 的操作会从页面池中租用页面并发执行，建议不超过 MAX_CONCURRENCY_NUM
+BROWSER_PAGE_POOL_SIZE = 1
+
 # 数据保存类型选项配置,支持三种类型：csv、db、json, 最好保存到DB，有排重的功能。
 SAVE_DATA_OPTION = "db"  # csv or db or json
 
 # 用户浏览器缓存的浏览器文件配置
 USER_DATA_DIR = "%s_user_data_dir"  # %s will be replaced by platform name
 
+# 是否开启无浏览器快速启动，开启后优先使用保存的登录态(cookie/localStorage)并通过 HTTP 校验登录态，
+# 签名不依赖浏览器的平台(目前为 bilibili，贴吧本身不需要浏览器)校验通过后不再启动浏览器，校验失败时回退到浏览器登录
+ENABLE_FAST_START = False
+
+# 是否输出启动耗时分析(各模块导入耗时、启动各阶段耗时)，也可以通过命令行参数 --profile-startup 开启
+ENABLE_PROFILE_STARTUP = False
+
+# 是否开启耗时统计(请求、签名、解析、存储)，开启后运行结束时输出汇总表，也可以通过命令行参数 --metrics 开启
+ENABLE_METRICS = False
+
+# 大于 0 时在该端口上提供 Prometheus/OpenMetrics 格式的 /metrics 接口(需要同时开启 ENABLE_METRICS)
+METRICS_PORT = 0
+
+# 日志级别 DEBUG | INFO | WARNING | ERROR，也可以通过命令行参数 --log_level 指定
+LOG_LEVEL = "INFO"
+
+# 按模块单独设置日志级别，模块名按前缀匹配，最长的前缀优先，例如存储模块只输出警告：{"store": "WARNING"}
+# 命令行参数格式：--log_module_levels store=WARNING,media_platform.xhs=DEBUG
+LOG_MODULE_LEVELS = {}
+
+# 日志格式 text | json，json 格式每行输出一个 JSON 对象，方便日志采集
+LOG_FORMAT = "text"
+
+# 日志中打印的接口响应、笔记、评论等数据的最大长度，超出部分截断，0 表示不截断
+LOG_PAYLOAD_MAX_LENGTH = 512
+
+# 打印数据内容的日志采样比例(0~1)，大批量爬取评论时可以调小，1 表示全部输出
+LOG_PAYLOAD_SAMPLE_RATE = 1.0
+
+# 是否在后台线程中格式化和输出日志，开启后日志的格式化和写入不再占用事件循环，
+# 进程被强制结束(kill -9)时队列中还没有输出的日志会丢失
+ENABLE_ASYNC_LOG = False
+
+# 大页面(帖子详情 HTML、内嵌 JSON 的网页等)的解析执行器 none | process | thread
+# none: 在事件循环中直接解析；process: 进程池，解析不占用主进程 CPU；
+# thread: 线程池，没有序列化开销，但解析大部分时间持有 GIL，只能减少一部分事件循环卡顿
+PARSE_EXECUTOR = "none"
+
+# 解析执行器的线程数/进程数
+PARSE_EXECUTOR_MAX_WORKERS = 4
+
+# 页面内容长度(字符数)不小于该值时才放到解析执行器中解析，小页面直接解析更快
+PARSE_OFFLOAD_MIN_SIZE = 128 * 1024
+
+# 快速启动使用的登录态保存文件
+SESSION_STATE_FILE = "browser_data/%s_session.json"  # %s will be replaced by platform name
+
+# 登录态保存文件的有效期(小时)，超过之后重新走浏览器登录流程
+SESSION_STATE_MAX_AGE_HOURS = 72
+
 # 爬取开始页数 默认从第一页开始
 START_PAGE = 1
 
@@ -71,9 +124,81 @@ CRAWLER_MAX_NOTES_COUNT = 200
 # 并发爬虫数量控制
 MAX_CONCURRENCY_NUM = 1
 
+# 自适应并发(AIMD)：同一平台所有阶段的请求共用一个并发控制，以 MAX_CONCURRENCY_NUM 为初始并发数，
+# 请求正常时逐步增加并发，遇到验证码(461/471)、IP 被封、-352 风控、blocked 响应时成倍减少并发
+ENABLE_ADAPTIVE_CONCURRENCY = False
+
+# 自适应并发的最大并发数
+ADAPTIVE_CONCURRENCY_MAX = 8
+
+# 自适应并发被风控时并发数乘以的系数
+ADAPTIVE_CONCURRENCY_DECREASE_FACTOR = 0.5
+
+# 请求失败时最多请求的次数(包含第一次)，只重试网络错误、5xx 和 429 限流，验证码/风控和其他错误不重试
+RETRY_MAX_ATTEMPTS = 3
+
+# 重试等待时间(秒)，第 n 次失败后等待 RETRY_BACKOFF_BASE_SEC * 2^(n-1) 秒(带随机抖动)，最多 RETRY_BACKOFF_MAX_SEC 秒，
+# 429 响应带有 Retry-After 时至少等待 Retry-After
+RETRY_BACKOFF_BASE_SEC = 1
+RETRY_BACKOFF_MAX_SEC = 30
+
+# 一次运行所有请求最多重试的次数，用完之后失败的请求不再重试，0 为不限制
+RETRY_BUDGET = 200
+
+# 熔断：同一平台同一线路(代理IP)连续 CIRCUIT_BREAKER_THRESHOLD 个请求遇到验证码、IP 被封、风控或重试次数用完时，
+# 暂停该线路 CIRCUIT_BREAKER_OPEN_SEC 秒，到时间后用 pong 探测(没有可用的 pong 时放行一个请求)，
+# 仍然被风控时暂停时间翻倍，最多 CIRCUIT_BREAKER_MAX_OPEN_SEC 秒；
+# 开启 ENABLE_IP_PROXY 时客户端从代理IP池中换一个新的代理IP继续请求，不用等待线路恢复
+ENABLE_CIRCUIT_BREAKER = False
+CIRCUIT_BREAKER_THRESHOLD = 3
+CIRCUIT_BREAKER_OPEN_SEC = 60
+CIRCUIT_BREAKER_MAX_OPEN_SEC = 600
+
+# 合并同一个客户端同时发出的相同 GET 请求(忽略 w_rid、wts、a_bogus、X-S 等签名参数)，只请求一次，结果共用
+# 默认关闭，开启前确认平台的接口在忽略签名参数后返回相同的结果
+ENABLE_REQUEST_COALESCING = False
+
+# 响应缓存：创作者信息、视频/帖子详情等不常变化的接口，在缓存时间内重复获取直接使用缓存的结果，不再请求平台
+# 只缓存所有请求都返回 200 的非空结果
+ENABLE_RESPONSE_CACHE = False
+
+# 响应缓存类型: memory 只在本次运行内有效；disk 同时保存到 RESPONSE_CACHE_DIR 目录，下次运行也可以使用
+RESPONSE_CACHE_TYPE = "disk"
+
+# 磁盘响应缓存目录，%s 为平台
+RESPONSE_CACHE_DIR = "data/%s/response_cache"
+
+# 各类接口的缓存时间(秒)，0 为不缓存
+RESPONSE_CACHE_TTL_SEC = {
+    "creator_info": 24 * 60 * 60,  # 创作者信息
+    "content_detail": 6 * 60 * 60,  # 视频/帖子详情
+}
+
+# 内存和磁盘中最多缓存的响应数量，超过时删除最早缓存的响应
+RESPONSE_CACHE_MAX_ITEMS = 2000
+RESPONSE_CACHE_MAX_DISK_ITEMS = 50000
+
+# creator 模式同时爬取的创作者数量，所有创作者共用 MAX_CONCURRENCY_NUM 个请求名额，名额在创作者之间轮流分配
+CREATOR_CONCURRENCY_NUM = 1
+
 # 是否开启爬图片模式, 默认不开启爬图片
 ENABLE_GET_IMAGES = False
 
+# 图片/视频下载的并发数量，下载任务在独立的下载池中执行，不阻塞元数据爬取
+MEDIA_DOWNLOAD_CONCURRENCY = 4
+
+# 图片/视频流式下载时每次写入磁盘的分块大小(字节)
+MEDIA_DOWNLOAD_CHUNK_SIZE = 256 * 1024
+
+# 单个媒体文件下载失败后的重试次数，重试时通过 HTTP Range 断点续传
+MEDIA_DOWNLOAD_MAX_RETRIES = 3
+
+# 多镜像/CDN 对冲下载的等待时间(秒)，最快的镜像超过该时间仍未下载完成时并发请求下一个镜像
+MEDIA_DOWNLOAD_HEDGE_DELAY_SEC = 2
+
+# 媒体文件内容哈希索引文件，相同内容的图片/视频只落盘一次
+MEDIA_DEDUP_INDEX_FILE = "data/media_hash_index.json"
+
 # 是否开启爬评论模式, 默认开启爬评论
 ENABLE_GET_COMMENTS = False
 
@@ -84,6 +209,37 @@ CRAWLER_MAX_COMMENTS_COUNT_SINGLENOTES = 10
 # 老版本项目使用了 db, 则需参考 schema/tables.sql line 287 增加表字段
 ENABLE_GET_SUB_COMMENTS = False
 
+# 爬取二级评论的数量控制(单视频/帖子)，在一级评论数量之外单独计算，按一级评论的回复数依次分配给保留下来的一级评论
+CRAWLER_MAX_SUB_COMMENTS_COUNT_SINGLENOTES = 50
+
+# 同一个视频/帖子并发拉取二级评论的一级评论数量
+MAX_SUB_COMMENTS_CONCURRENCY_NUM = 3
+
+# 贴吧同一个帖子并发请求的评论页数(一级评论分页、楼中楼分页)，每个请求结束后间隔 crawl_interval 才发起下一个请求
+TIEBA_COMMENT_PAGE_CONCURRENCY = 3
+
+# 是否保存评论翻页游标，开启后爬取中断的视频/帖子在下次运行时从上次的游标继续爬取评论(目前支持 bilibili)
+ENABLE_COMMENT_CURSOR_RESUME = False
+
+# 爬取进度(评论翻页游标等)保存文件
+CRAWL_STATE_FILE = "data/%s/crawl_state.json"  # %s will be replaced by platform name
+
+# creator 模式是否开启增量爬取，开启后记录每个创作者已爬取的最新帖子(保存在 CRAWL_STATE_FILE 中)，下次运行翻页到已爬取的帖子就停止
+ENABLE_CREATOR_INCREMENTAL = False
+
+# creator 模式是否只爬取 START_DAY 至 END_DAY 发布的帖子，翻页到 START_DAY 之前的帖子就停止(贴吧的帖子列表没有发布时间，不支持)
+ENABLE_CREATOR_DAY_RANGE = False
+
+# 是否开启评论增量爬取，开启后记录每个视频/帖子已爬取的最新评论(保存在 CRAWL_STATE_FILE 中)，重新爬取时只保存新的一级评论及其二级评论
+# 只支持 bilibili、知乎，改为按时间排序翻页，翻到已爬取的评论就停止；其他平台的评论接口不按时间排序，按时间过滤会漏掉没有爬取过的旧评论
+ENABLE_COMMENT_INCREMENTAL = False
+
+# 按名字爬取创作者时(目前为 bilibili 的 BILI_CREATOR_LIST)，名字 -> 创作者ID 搜索结果的缓存有效期(小时)，缓存保存在 CRAWL_STATE_FILE 中
+CREATOR_ID_CACHE_TTL_HOURS = 7 * 24
+
+# 手动指定的创作者名字 -> 创作者ID 对照文件，JSON 格式，例如 {"宝藏大飞": "12345"}，优先于搜索结果并且不会过期
+CREATOR_ID_OVERRIDE_FILE = "data/%s/creator_id_override.json"  # %s will be replaced by platform name
+
 # 已废弃⚠️⚠️⚠️指定小红书需要爬虫的笔记ID列表
 # 已废弃⚠️⚠️⚠️ 指定笔记ID笔记列表会因为缺少xsec_token和xsec_source参数导致爬取失败
 # XHS_SPECIFIED_ID_LIST = [
@@ -107,6 +263,9 @@ DY_SPECIFIED_ID_LIST = [
 # 指定快手平台需要爬取的ID列表
 KS_SPECIFIED_ID_LIST = ["3xf8enb8dbj6uig", "3x6zz972bchmvqe"]
 
+# 快手 GraphQL 批量请求时一次 POST 合并的操作数量(视频详情、二级评论分页)，接口不支持批量请求时自动退回到逐个请求，1 表示不合并
+KS_GRAPHQL_BATCH_SIZE = 10
+
 # 指定B站平台需要爬取的视频bvid列表
 BILI_SPECIFIED_ID_LIST = [
     "BV1d54y1g7db",
@@ -236,13 +395,17 @@ STOP_WORDS_FILE = "./docs/hit_stopwords.txt"
 # 中文字体文件路径
 FONT_PATH = "./docs/STZHONGS.TTF"
 
-# 爬取开始的天数，仅支持 bilibili 关键字搜索，YYYY-MM-DD 格式，若为 None 则表示不设置时间范围，按照默认关键字最多返回 1000 条视频的结果处理
+# 爬取开始的天数，仅支持 bilibili 关键字搜索和 creator 模式(ENABLE_CREATOR_DAY_RANGE)，YYYY-MM-DD 格式，若为 None 则表示不设置时间范围，按照默认关键字最多返回 1000 条视频的结果处理
 START_DAY = '2024-01-01'
 
-# 爬取结束的天数，仅支持 bilibili 关键字搜索，YYYY-MM-DD 格式，若为 None 则表示不设置时间范围，按照默认关键字最多返回 1000 条视频的结果处理
+# 爬取结束的天数，仅支持 bilibili 关键字搜索和 creator 模式(ENABLE_CREATOR_DAY_RANGE)，YYYY-MM-DD 格式，若为 None 则表示不设置时间范围，按照默认关键字最多返回 1000 条视频的结果处理
 END_DAY = '2024-01-01'
 
-# 是否开启按每一天进行爬取的选项，仅支持 bilibili 关键字搜索
+# 是否开启按发布时间分片爬取的选项，仅支持 bilibili 关键字搜索
 # 若为 False，则忽略 START_DAY 与 END_DAY 设置的值
-# 若为 True，则按照 START_DAY 至 END_DAY 按照每一天进行筛选，这样能够突破 1000 条视频的限制，最大程度爬取该关键词下的所有视频
-ALL_DAY = False
\ No newline at end of file
+# 若为 True，则把 START_DAY 至 END_DAY 按发布时间分片，结果数量达到 1000 条上限的时间窗口会继续对半拆分，
+# 这样能够突破 1000 条视频的限制，最大程度爬取该关键词下的所有视频，每个时间窗口最多爬取 CRAWLER_MAX_NOTES_COUNT 条视频
+ALL_DAY = False
+
+# 发布时间分片的最小窗口长度(秒)，窗口小于该长度时即使结果数量达到上限也不再拆分
+SEARCH_SHARD_MIN_WINDOW_SECONDS = 3600
\ No newline at end of file
@@ -10,54 +10,71 @@
 
 
 import asyncio
+import importlib
 import sys
 
-import cmd_arg
 import config
+from tools.startup_profile import startup_profiler
+
+if "--profile-startup" in sys.argv or config.ENABLE_PROFILE_STARTUP:
+    # 需要在导入其他模块之前注册，才能统计到所有模块的导入耗时
+    startup_profiler.install()
+
+import cmd_arg
 import db
 from base.base_crawler import AbstractCrawler
-from media_platform.bilibili import BilibiliCrawler
-from media_platform.douyin import DouYinCrawler
-from media_platform.kuaishou import KuaishouCrawler
-from media_platform.tieba import TieBaCrawler
-from media_platform.weibo import WeiboCrawler
-from media_platform.xhs import XiaoHongShuCrawler
-from media_platform.zhihu import ZhihuCrawler
+from tools.metrics import metrics_registry
+from tools.parse_executor import parse_executor
 
 
 class CrawlerFactory:
+    # 只导入选中的平台，避免加载其他平台的依赖(pandas、execjs 等)拖慢启动
     CRAWLERS = {
-        "xhs": XiaoHongShuCrawler,
-        "dy": DouYinCrawler,
-        "ks": KuaishouCrawler,
-        "bili": BilibiliCrawler,
-        "wb": WeiboCrawler,
-        "tieba": TieBaCrawler,
-        "zhihu": ZhihuCrawler
+        "xhs": ("media_platform.xhs", "XiaoHongShuCrawler"),
+        "dy": ("media_platform.douyin", "DouYinCrawler"),
+        "ks": ("media_platform.kuaishou", "KuaishouCrawler"),
+        "bili": ("media_platform.bilibili", "BilibiliCrawler"),
+        "wb": ("media_platform.weibo", "WeiboCrawler"),
+        "tieba": ("media_platform.tieba", "TieBaCrawler"),
+        "zhihu": ("media_platform.zhihu", "ZhihuCrawler")
     }
 
     @staticmethod
     def create_crawler(platform: str) -> AbstractCrawler:
-        crawler_class = CrawlerFactory.CRAWLERS.get(platform)
-        if not crawler_class:
+        crawler_path = CrawlerFactory.CRAWLERS.get(platform)
+        if not crawler_path:
             raise ValueError("Invalid Media Platform Currently only supported xhs or dy or ks or bili ...")
+        module_name, class_name = crawler_path
+        crawler_class = getattr(importlib.import_module(module_name), class_name)
         return crawler_class()
 
 
 async def main():
+    startup_profiler.mark("import")
     # parse cmd
     await cmd_arg.parse_cmd()
+    startup_profiler.mark("parse_cmd")
+    if config.ENABLE_METRICS and config.METRICS_PORT > 0:
+        metrics_registry.start_http_server(config.METRICS_PORT)
 
     # init db
     if config.SAVE_DATA_OPTION == "db":
         await db.init_db()
+        startup_profiler.mark("init_db")
 
     crawler = CrawlerFactory.create_crawler(platform=config.PLATFORM)
+    startup_profiler.mark("create_crawler")
+    if startup_profiler.installed:
+        startup_profiler.report()
     await crawler.start()
+    parse_executor.shutdown()
 
     if config.SAVE_DATA_OPTION == "db":
         await db.close()
 
+    if config.ENABLE_METRICS:
+        metrics_registry.report()
+
     
 
 if __name__ == '__main__':
@@ -15,6 +15,7 @@
 # @Desc    : bilibili 请求客户端
 import asyncio
 import json
+import time
 from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 from urllib.parse import urlencode
 
@@ -23,11 +24,19 @@ from playwright.async_api import BrowserContext, Page
 
 from base.base_crawler import AbstractApiClient
 from tools import utils
+from tools.browser_pool import BrowserPagePool
+from tools.concurrency_governor import mark_request_blocked
+from tools.metrics import metrics_registry, record_response_status
+from tools.response_cache import cache_response
+from tools.watermark import Watermark
 
 from .exception import DataFetchError
 from .field import CommentOrderType, SearchOrderType
 from .help import BilibiliSign
 
+# wbi key 每天都会变化，没有浏览器页面时从 nav 接口获取的 key 最多使用这么久(秒)
+WBI_KEYS_TTL_SEC = 6 * 60 * 60
+
 
 class BilibiliClient(AbstractApiClient):
     def __init__(
@@ -36,15 +45,20 @@ class BilibiliClient(AbstractApiClient):
             proxies=None,
             *,
             headers: Dict[str, str],
-            playwright_page: Page,
+            playwright_page: Optional[Page],
             cookie_dict: Dict[str, str],
+            page_pool: Optional[BrowserPagePool] = None,
     ):
         self.proxies = proxies
         self.timeout = timeout
         self.headers = headers
         self._host = "https://api.bilibili.com"
         self.playwright_page = playwright_page
+        self.page_pool = page_pool or (BrowserPagePool.from_page(playwright_page) if playwright_page else None)
         self.cookie_dict = cookie_dict
+        # 无浏览器快速启动时从 nav 接口获取的 wbi key: "img_url-sub_url"
+        self._wbi_img_urls = ""
+        self._wbi_keys_updated_at = 0.0
 
     async def request(self, method, url, **kwargs) -> Any:
         async with httpx.AsyncClient(proxies=self.proxies) as client:
@@ -52,12 +66,17 @@ class BilibiliClient(AbstractApiClient):
                 method, url, timeout=self.timeout,
                 **kwargs
             )
+        record_response_status(response.status_code)
         data: Dict = response.json()
+        if data.get("code") == -352:
+            # -352 风控校验失败，请求太快了
+            mark_request_blocked()
         if data.get("code") != 0:
             raise DataFetchError(data.get("message", "unkonw error"))
         else:
             return data.get("data", {})
 
+    @metrics_registry.timed("mediacrawler_sign_seconds", platform="bilibili")
     async def pre_request_data(self, req_data: Dict) -> Dict:
         """
         发送请求进行请求参数签名
@@ -74,21 +93,37 @@ class BilibiliClient(AbstractApiClient):
     async def get_wbi_keys(self) -> Tuple[str, str]:
         """
         获取最新的 img_key 和 sub_key
+        有浏览器页面时从页面的 localStorage 中获取，否则使用 nav 接口返回的 key，超过 WBI_KEYS_TTL_SEC 重新获取
         :return:
         """
-        local_storage = await self.playwright_page.evaluate("() => window.localStorage")
-        wbi_img_urls = local_storage.get("wbi_img_urls", "") or local_storage.get(
-            "wbi_img_url") + "-" + local_storage.get("wbi_sub_url")
-        if wbi_img_urls and "-" in wbi_img_urls:
-            img_url, sub_url = wbi_img_urls.split("-")
-        else:
-            resp = await self.request(method="GET", url=self._host + "/x/web-interface/nav")
-            img_url: str = resp['wbi_img']['img_url']
-            sub_url: str = resp['wbi_img']['sub_url']
+        wbi_img_urls = ""
+        if self.page_pool:
+            async with self.page_pool.lease() as page:
+                local_storage = await page.evaluate("() => window.localStorage")
+            wbi_img_urls = local_storage.get("wbi_img_urls", "")
+            if not wbi_img_urls and local_storage.get("wbi_img_url") and local_storage.get("wbi_sub_url"):
+                wbi_img_urls = local_storage.get("wbi_img_url") + "-" + local_storage.get("wbi_sub_url")
+        if not wbi_img_urls or "-" not in wbi_img_urls:
+            if not self._wbi_img_urls or time.monotonic() - self._wbi_keys_updated_at > WBI_KEYS_TTL_SEC:
+                resp = await self.request(method="GET", url=self._host + "/x/web-interface/nav")
+                self.update_wbi_keys(resp)
+            wbi_img_urls = self._wbi_img_urls
+        img_url, sub_url = wbi_img_urls.split("-")
         img_key = img_url.rsplit('/', 1)[1].split('.')[0]
         sub_key = sub_url.rsplit('/', 1)[1].split('.')[0]
         return img_key, sub_key
 
+    def update_wbi_keys(self, nav_data: Dict):
+        """
+        保存 nav 接口返回的 wbi key
+        :param nav_data: /x/web-interface/nav 接口返回的 data
+        :return:
+        """
+        wbi_img: Dict = nav_data.get("wbi_img") or {}
+        if wbi_img.get("img_url") and wbi_img.get("sub_url"):
+            self._wbi_img_urls = f"{wbi_img['img_url']}-{wbi_img['sub_url']}"
+            self._wbi_keys_updated_at = time.monotonic()
+
     async def get(self, uri: str, params=None, enable_params_sign: bool = True) -> Dict:
         final_uri = uri
         if enable_params_sign:
@@ -111,6 +146,8 @@ class BilibiliClient(AbstractApiClient):
         try:
             check_login_uri = "/x/web-interface/nav"
             response = await self.get(check_login_uri)
+            # 快速启动时保存的 localStorage 中的 wbi key 可能已经过期，使用 nav 接口返回的最新 key
+            self.update_wbi_keys(response)
             if response.get("isLogin"):
                 utils.logger.info(
                     "[BilibiliClient.pong] Use cache login state get web interface successfull!")
@@ -140,7 +177,7 @@ class BilibiliClient(AbstractApiClient):
         :param pubtime_end_s: 发布时间结束时间戳
         :return:
         """
-        print(f"搜索内容{keyword}")
+        utils.logger.debug("[BilibiliClient.search_video_by_keyword] search keyword: %s", keyword)
         uri = "/x/web-interface/wbi/search/type"
         post_data = {
             "search_type": "video",
@@ -187,6 +224,7 @@ class BilibiliClient(AbstractApiClient):
         }
         return await self.get(uri, post_data)
     
+    @cache_response("content_detail")
     async def get_video_info(self, aid: Union[int, None] = None, bvid: Union[str, None] = None) -> Dict:
         """
         Bilibli web video detail api, aid 和 bvid任选一个参数
@@ -226,24 +264,17 @@ class BilibiliClient(AbstractApiClient):
 
         return await self.get(uri, params, enable_params_sign=True)
 
-    async def get_video_media(self, url: str) -> Union[bytes, None]:
-        async with httpx.AsyncClient(proxies=self.proxies) as client:
-            response = await client.request("GET", url, timeout=self.timeout, headers=self.headers)
-            if not response.reason_phrase == "OK":
-                utils.logger.error(f"[BilibiliClient.get_video_media] request {url} err, res:{response.text}")
-                return None
-            else:
-                return response.content
-
     async def get_video_comments(self,
                                  video_id: str,
                                  order_mode: CommentOrderType = CommentOrderType.DEFAULT,
-                                 next: int = 0
+                                 next: int = 0,
+                                 pagination_offset: Optional[str] = None,
                                  ) -> Dict:
         """get video comments
         :param video_id: 视频 ID
         :param order_mode: 排序方式
-        :param next: 评论页选择
+        :param next: 评论页选择(旧的页码翻页方式)
+        :param pagination_offset: 游标翻页方式的游标，首页为空字符串，下一页的游标为 cursor.pagination_reply.next_offset
         :return:
         """
         uri = "/x/v2/reply/wbi/main"
@@ -252,51 +283,109 @@ class BilibiliClient(AbstractApiClient):
             "mode": order_mode.value,
             "type": 1,
             "ps": 20,
-            "next": next
         }
+        if pagination_offset is None:
+            post_data["next"] = next
+        else:
+            post_data["pagination_str"] = json.dumps({"offset": pagination_offset}, separators=(',', ':'))
         return await self.get(uri, post_data)
 
     async def get_video_all_comments(self, video_id: str, crawl_interval: float = 1.0, is_fetch_sub_comments=False,
                                      callback: Optional[Callable] = None,
-                                     max_count: int = 10,):
+                                     max_count: int = 10,
+                                     max_sub_count: int = 50,
+                                     sub_concurrency: int = 3,
+                                     cursor: str = "",
+                                     cursor_callback: Optional[Callable] = None,
+                                     watermark: Optional[Watermark] = None,
+                                     fetched_count: int = 0,
+                                     fetched_sub_count: int = 0,
+                                     ) -> List[Dict]:
         """
         get video all comments include sub comments
+        一级评论按游标翻页，拿到一页就先截断到 max_count 并交给 callback 保存，
+        再只为保留下来的一级评论并发拉取二级评论，剩余的二级评论数量在发起请求前按各条一级评论的 rcount 比例分配好
         :param video_id:
         :param crawl_interval:
         :param is_fetch_sub_comments:
-        :param callback:
-        max_count: 一次笔记爬取的最大评论数量
-
-        :return:
+        :param callback: 每拿到一页一级评论/二级评论就调用一次 callback(video_id, comments)
+        :param max_count: 一次笔记爬取的最大一级评论数量
+        :param max_sub_count: 一次笔记爬取的最大二级评论数量
+        :param sub_concurrency: 并发拉取二级评论的一级评论数量
+        :param cursor: 开始的游标，为空时从第一页开始，用于中断后继续爬取
+        :param cursor_callback: 一页评论(包括它的二级评论)处理完之后调用
+                                cursor_callback(video_id, next_cursor, fetched_count, fetched_sub_count)，
+                                评论已经爬完或者达到数量上限时 next_cursor 为 None
+        :param watermark: 评论增量爬取状态，不为空时按时间排序翻页，翻到已经爬取过的评论就停止
+        :param fetched_count: 从 cursor 继续爬取时，之前已经爬取的一级评论数量，计入 max_count
+        :param fetched_sub_count: 从 cursor 继续爬取时，之前已经爬取的二级评论数量，计入 max_sub_count
+        :return: 一级评论列表
         """
 
-        result = []
-        is_end = False
-        next_page = 0
-        while not is_end and len(result) < max_count:
-            comments_res = await self.get_video_comments(video_id, CommentOrderType.DEFAULT, next_page)
-            cursor_info: Dict = comments_res.get("cursor")
-            comment_list: List[Dict] = comments_res.get("replies", [])
-            is_end = cursor_info.get("is_end")
-            next_page = cursor_info.get("next")
-            if is_fetch_sub_comments:
-                for comment in comment_list:
-                    comment_id = comment['rpid']
-                    if (comment.get("rcount", 0) > 0):
-                        {
-                            await self.get_video_all_level_two_comments(
-                                video_id, comment_id, CommentOrderType.DEFAULT, 10, crawl_interval,  callback)
-                        }
-            if len(result) + len(comment_list) > max_count:
-                comment_list = comment_list[:max_count - len(result)]
-            if callback:  # 如果有回调函数，就执行回调函数
+        result: List[Dict] = []
+        sub_semaphore = asyncio.Semaphore(max(sub_concurrency, 1))
+        order_mode = CommentOrderType.TIME if watermark else CommentOrderType.DEFAULT
+        while fetched_count + len(result) < max_count:
+            comments_res = await self.get_video_comments(video_id, order_mode, pagination_offset=cursor)
+            cursor_info: Dict = comments_res.get("cursor") or {}
+            comment_list: List[Dict] = comments_res.get("replies") or []
+            if watermark:
+                comment_list = watermark.filter_page(comment_list, lambda comment: comment.get("ctime"))
+            comment_list = comment_list[:max_count - fetched_count - len(result)]
+            if callback and comment_list:  # 如果有回调函数，就执行回调函数
                 await callback(video_id, comment_list)
+            result.extend(comment_list)
+
+            sub_budget = max_sub_count - fetched_sub_count
+            if is_fetch_sub_comments and sub_budget > 0:
+                sub_counts = self._split_sub_comment_budget(
+                    sub_budget, [comment.get("rcount", 0) for comment in comment_list])
+                sub_tasks = [
+                    self._get_level_two_comments_with_semaphore(
+                        sub_semaphore, video_id, comment["rpid"], crawl_interval, callback, sub_count)
+                    for comment, sub_count in zip(comment_list, sub_counts) if sub_count > 0
+                ]
+                for sub_comments in await asyncio.gather(*sub_tasks):
+                    fetched_sub_count += len(sub_comments)
+
+            next_cursor = (cursor_info.get("pagination_reply") or {}).get("next_offset", "")
+            is_end = cursor_info.get("is_end") or not next_cursor or not comment_list or (watermark and watermark.reached)
+            if is_end or fetched_count + len(result) >= max_count:
+                if cursor_callback:
+                    await cursor_callback(video_id, None, fetched_count + len(result), fetched_sub_count)
+                break
+            if cursor_callback:
+                await cursor_callback(video_id, next_cursor, fetched_count + len(result), fetched_sub_count)
+            cursor = next_cursor
             await asyncio.sleep(crawl_interval)
-            if not is_fetch_sub_comments:
-                result.extend(comment_list)
-                continue
         return result
 
+    @staticmethod
+    def _split_sub_comment_budget(budget: int, rcounts: List[int]) -> List[int]:
+        """
+        按 rcount 的比例把二级评论数量分配给一页的一级评论，每条一级评论分到的数量不超过它的 rcount，
+        按比例取整后剩下的名额按小数部分从大到小补齐(最大余数法)
+        :param budget: 可以分配的二级评论数量
+        :param rcounts: 每条一级评论的二级评论数量
+        :return: 每条一级评论分到的二级评论数量
+        """
+        rcounts = [max(int(rcount or 0), 0) for rcount in rcounts]
+        total = sum(rcounts)
+        if total <= budget:
+            return rcounts
+        shares = [budget * rcount // total for rcount in rcounts]
+        remainders = sorted(range(len(rcounts)), key=lambda i: budget * rcounts[i] % total, reverse=True)
+        for i in remainders[:budget - sum(shares)]:
+            shares[i] += 1
+        return shares
+
+    async def _get_level_two_comments_with_semaphore(self, semaphore: asyncio.Semaphore, video_id: str,
+                                                     level_one_comment_id: int, crawl_interval: float,
+                                                     callback: Optional[Callable], max_count: int) -> List[Dict]:
+        async with semaphore:
+            return await self.get_video_all_level_two_comments(
+                video_id, level_one_comment_id, CommentOrderType.DEFAULT, 10, crawl_interval, callback, max_count)
+
     async def get_video_all_level_two_comments(self,
                                                video_id: str,
                                                level_one_comment_id: int,
@@ -304,7 +393,8 @@ class BilibiliClient(AbstractApiClient):
                                                ps: int = 10,
                                                crawl_interval: float = 1.0,
                                                callback: Optional[Callable] = None,
-                                               ) -> Dict:
+                                               max_count: Optional[int] = None,
+                                               ) -> List[Dict]:
         """
         get video all level two comments for a level one comment
         :param video_id: 视频 ID
@@ -313,21 +403,28 @@ class BilibiliClient(AbstractApiClient):
         :param ps: 一页评论数
         :param crawl_interval:
         :param callback:
+        :param max_count: 最多爬取的二级评论数量，为 None 时不限制
         :return:
         """
 
+        all_comments: List[Dict] = []
         pn = 1
-        while True:
+        while max_count is None or len(all_comments) < max_count:
             result = await self.get_video_level_two_comments(
                 video_id, level_one_comment_id, pn, ps, order_mode)
-            comment_list: List[Dict] = result.get("replies", [])
-            if callback:  # 如果有回调函数，就执行回调函数
+            comment_list: List[Dict] = result.get("replies") or []
+            if max_count is not None:
+                comment_list = comment_list[:max_count - len(all_comments)]
+            if callback and comment_list:  # 如果有回调函数，就执行回调函数
                 await callback(video_id, comment_list)
-            await asyncio.sleep(crawl_interval)
-            if (int(result["page"]["count"]) <= pn * ps):
+            all_comments.extend(comment_list)
+            if not comment_list or int(result["page"]["count"]) <= pn * ps:
                 break
-
+            if max_count is not None and len(all_comments) >= max_count:
+                break
+            await asyncio.sleep(crawl_interval)
             pn += 1
+        return all_comments
 
     async def get_video_level_two_comments(self,
                                            video_id: str,
@@ -15,13 +15,14 @@
 # @Desc    : B站爬虫
 
 import asyncio
+import functools
 import keyword
 import os
 import random
+import re
 from asyncio import Task
 from typing import Dict, List, Optional, Tuple, Union
 from datetime import datetime, timedelta
-import pandas as pd
 
 from config.base_config import BILI_CREATOR_LIST
 from playwright.async_api import (BrowserContext, BrowserType, Page, async_playwright)
@@ -32,6 +33,15 @@ from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
 from store import bilibili as bilibili_store
 from store.bilibili.bilibili_store_sql import update_setting_key,add_new_setting_key,query_setting_by_key
 from tools import utils
+from tools.browser_pool import BrowserPagePool
+from tools.creator_id_cache import CreatorIdCache
+from tools.creator_scheduler import CreatorScheduler, add_creator_progress, crawl_semaphore
+from tools.concurrency_governor import stage_concurrency
+from tools.media_downloader import MediaDownloader
+from tools.crawl_state import get_crawl_state_store
+from tools.search_shard import SearchShardPlanner, TimeWindow
+from tools.session_state import load_session_state, save_session_state
+from tools.watermark import get_comment_watermark, get_creator_watermark
 from var import crawler_type_var, source_keyword_var
 
 from .client import BilibiliClient
@@ -42,10 +52,19 @@ from .login import BilibiliLogin
 from datetime import datetime
 import sys
 
+# 评论翻页游标在爬取进度文件中的分组名
+COMMENT_CURSOR_NAMESPACE = "comment_cursor"
+
+# bilibili 关键词搜索单次最多返回的视频数量
+BILI_SEARCH_RESULT_CAP = 1000
+
+
 class BilibiliCrawler(AbstractCrawler):
     context_page: Page
     bili_client: BilibiliClient
     browser_context: BrowserContext
+    page_pool: BrowserPagePool
+    media_downloader: MediaDownloader
 
     def __init__(self):
         self.index_url = "https://www.bilibili.com"
@@ -59,6 +78,25 @@ class BilibiliCrawler(AbstractCrawler):
             playwright_proxy_format, httpx_proxy_format = self.format_proxy_info(
                 ip_proxy_info)
 
+        self.media_downloader = MediaDownloader(proxies=httpx_proxy_format)
+        try:
+            if config.ENABLE_FAST_START and await self.fast_start(httpx_proxy_format):
+                # 登录态有效并且B站签名不依赖浏览器，直接开始爬取
+                await self.crawl()
+            else:
+                await self.browser_start(httpx_proxy_format)
+        finally:
+            # 等待下载池中的视频下载完成，爬取出错时也要保存已下载媒体的去重索引
+            await self.media_downloader.close()
+        utils.logger.info(
+            "[BilibiliCrawler.start] Bilibili Crawler finished ...")
+
+    async def browser_start(self, httpx_proxy_format: Optional[str]):
+        """
+        启动浏览器，登录之后开始爬取
+        :param httpx_proxy_format: httpx proxy
+        :return:
+        """
         async with async_playwright() as playwright:
             # Launch a browser context.
             chromium = playwright.chromium
@@ -85,72 +123,79 @@ class BilibiliCrawler(AbstractCrawler):
                 )
                 await login_obj.begin()
                 await self.bili_client.update_cookies(browser_context=self.browser_context)
+            if config.ENABLE_FAST_START:
+                # 保存登录态，下次启动时可以跳过浏览器
+                await save_session_state(self.browser_context, self.context_page, self.user_agent)
 
-            crawler_type_var.set(config.CRAWLER_TYPE)
-            if config.CRAWLER_TYPE == "search":
-                # Search for video and retrieve their comment information.
-                await self.search()
-            elif config.CRAWLER_TYPE == "detail":
-                # Get the information and comments of the specified post
-                await self.get_specified_videos(config.BILI_SPECIFIED_ID_LIST)
-            elif config.CRAWLER_TYPE == "creator":
-                # 根据up主名字搜索 [ Mia edited @ 2025.06.06 ]
-                current_time = datetime.now()
-                # 增加断点处重新开始，主要逻辑为开始某个博主的时候记录名称和时间，72小时之内则从该博主名称的位置重新开始 [ Mia edited @ 2025.06.08 ]
-                bilibili_creator_break_point = await query_setting_by_key("bilibili_creator_break_point")
-                history_expiry_hours = 72
-                crawl_creator_init = True
-                if bilibili_creator_break_point:
-                    # target_trecord_datetimeime = datetime.strptime(target_time_str, "%Y-%m-%d %H:%M:%S")
-                    record_datetime = bilibili_creator_break_point["datetime"]
-                    time_diff = current_time - record_datetime
-                    if time_diff > timedelta(hours=history_expiry_hours):
-                        # 超过72小时，从头更新
-                        crawl_creator_init = True
-                    else:
-                        # 没超过72小时，断点开始
-                        crawl_creator_init = False
-                else:
-                    # 没有记录，从头更新
+            # 登录态就绪后预热页面池，签名等依赖页面 evaluate 的操作从页面池中租用页面并发执行
+            self.page_pool = BrowserPagePool(self.browser_context, self.index_url)
+            await self.page_pool.start(self.context_page)
+            self.bili_client.page_pool = self.page_pool
+
+            try:
+                await self.crawl()
+            finally:
+                await self.page_pool.close()
+
+    async def crawl(self):
+        """
+        根据爬虫类型执行对应的爬取流程
+        :return:
+        """
+        crawler_type_var.set(config.CRAWLER_TYPE)
+        if config.CRAWLER_TYPE == "search":
+            # Search for video and retrieve their comment information.
+            await self.search()
+        elif config.CRAWLER_TYPE == "detail":
+            # Get the information and comments of the specified post
+            await self.get_specified_videos(config.BILI_SPECIFIED_ID_LIST)
+        elif config.CRAWLER_TYPE == "creator":
+            # 根据up主名字搜索 [ Mia edited @ 2025.06.06 ]
+            current_time = datetime.now()
+            # 增加断点处重新开始，主要逻辑为开始某个博主的时候记录名称和时间，72小时之内则从该博主名称的位置重新开始 [ Mia edited @ 2025.06.08 ]
+            bilibili_creator_break_point = await query_setting_by_key("bilibili_creator_break_point")
+            history_expiry_hours = 72
+            crawl_creator_init = True
+            if bilibili_creator_break_point:
+                # target_trecord_datetimeime = datetime.strptime(target_time_str, "%Y-%m-%d %H:%M:%S")
+                record_datetime = bilibili_creator_break_point["datetime"]
+                time_diff = current_time - record_datetime
+                if time_diff > timedelta(hours=history_expiry_hours):
+                    # 超过72小时，从头更新
                     crawl_creator_init = True
-                if crawl_creator_init:
-                    utils.logger.info(f"[BilibiliCrawler] 断点爬虫功能开启，没有历史爬虫记录或记录超过{history_expiry_hours}小时")
-                    for keyword in config.BILI_CREATOR_LIST:
-                        
-                        bilibili_creator_break_point = await query_setting_by_key("bilibili_creator_break_point")
-                        if bilibili_creator_break_point:
-                            # 如果已存在，则更新 bilibili_creator_break_point
-                            await update_setting_key("bilibili_creator_break_point",{"value":keyword,"datetime":current_time.strftime('%Y-%m-%d %H:%M:%S')})
-                        else:
-                            # 如果不存在，则新增 bilibili_creator_break_point
-                            await add_new_setting_key({"key":"bilibili_creator_break_point","value":keyword,"datetime":current_time.strftime('%Y-%m-%d %H:%M:%S')})
-                        get_creator = await self.search_creator(keyword)
-                        if get_creator:
-                            await self.get_creator_videos(int(get_creator[0]["mid"]))
-                        else:
-                            utils.logger.info(f"[BilibiliCrawler] 没有找到此用户：{keyword}")
                 else:
-                    
-                    creator_list = config.BILI_CREATOR_LIST
-                    last_break_creator = bilibili_creator_break_point["value"]
-                    utils.logger.info(f"[BilibiliCrawler] 断点爬虫功能开启，找到历史记录，从“{last_break_creator}”开始继续往下爬")
-                    
-                    remain_list = creator_list[creator_list.index(last_break_creator):]
-                    for keyword in remain_list:
-                        # 更新 bilibili_creator_break_point
-                        await update_setting_key("bilibili_creator_break_point",{"value":keyword,"datetime":current_time.strftime('%Y-%m-%d %H:%M:%S')})
-                        get_creator = await self.search_creator(keyword)
-                        if get_creator:
-                            await self.get_creator_videos(int(get_creator[0]["mid"]))
-                        else:
-                            utils.logger.info(f"[BilibiliCrawler] 没有找到此用户：{keyword}")
-                # 原版的根据up主ID爬取信息
-                # for creator_id in config.BILI_CREATOR_ID_LIST:
-                #     await self.get_creator_videos(int(creator_id))
+                    # 没超过72小时，断点开始
+                    crawl_creator_init = False
             else:
-                pass
-            utils.logger.info(
-                "[BilibiliCrawler.start] Bilibili Crawler finished ...")
+                # 没有记录，从头更新
+                crawl_creator_init = True
+            if crawl_creator_init:
+                utils.logger.info(f"[BilibiliCrawler] 断点爬虫功能开启，没有历史爬虫记录或记录超过{history_expiry_hours}小时")
+                remain_list = config.BILI_CREATOR_LIST
+            else:
+                
+                creator_list = config.BILI_CREATOR_LIST
+                last_break_creator = bilibili_creator_break_point["value"]
+                utils.logger.info(f"[BilibiliCrawler] 断点爬虫功能开启，找到历史记录，从“{last_break_creator}”开始继续往下爬")
+                
+                remain_list = creator_list[creator_list.index(last_break_creator):]
+            if remain_list and not bilibili_creator_break_point:
+                # 如果不存在，则新增 bilibili_creator_break_point，之后每个up主开始时更新
+                await add_new_setting_key({"key":"bilibili_creator_break_point","value":remain_list[0],"datetime":current_time.strftime('%Y-%m-%d %H:%M:%S')})
+            # up主名字 -> mid 优先使用缓存，只搜索没有缓存的up主
+            creator_mids = await CreatorIdCache().resolve_many(
+                remain_list, self.resolve_creator_mid, concurrency=stage_concurrency()
+            )
+            creator_scheduler = CreatorScheduler(config.CREATOR_CONCURRENCY_NUM, stage_concurrency())
+            await creator_scheduler.run(
+                remain_list,
+                functools.partial(self.get_creator_by_keyword, creator_scheduler, current_time, creator_mids)
+            )
+            # 原版的根据up主ID爬取信息
+            # for creator_id in config.BILI_CREATOR_ID_LIST:
+            #     await self.get_creator_videos(int(creator_id))
+        else:
+            pass
 
     @staticmethod
     async def get_pubtime_datetime(start: str = config.START_DAY, end: str = config.END_DAY) -> Tuple[str, str]:
@@ -205,7 +250,6 @@ class BilibiliCrawler(AbstractCrawler):
                         continue
 
                     utils.logger.info(f"[BilibiliCrawler.search] search bilibili keyword: {keyword}, page: {page}")
-                    video_id_list: List[str] = []
                     videos_res = await self.bili_client.search_video_by_keyword(
                         keyword=keyword,
                         page=page,
@@ -216,68 +260,125 @@ class BilibiliCrawler(AbstractCrawler):
                     )
                     video_list: List[Dict] = videos_res.get("result")
 
-                    semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
-                    task_list = []
-                    try:
-                        task_list = [self.get_video_info_task(aid=video_item.get("aid"), bvid="", semaphore=semaphore) for video_item in video_list]
-                    except Exception as e:
-                        utils.logger.warning(f"[BilibiliCrawler.search] error in the task list. The video for this page will not be included. {e}")
-                    video_items = await asyncio.gather(*task_list)
-                    for video_item in video_items:
-                        if video_item:
-                            video_id_list.append(video_item.get("View").get("aid"))
-                            await bilibili_store.update_bilibili_video(video_item)
-                            # while search, update up info [ Mia edited @ 2025.05.01 ]
-                            await bilibili_store.update_up_info(video_item)
-                            await self.get_bilibili_video(video_item, semaphore)
+                    video_id_list = await self.store_search_videos(video_list)
                     page += 1
                     await self.batch_get_video_comments(video_id_list)
-            # 按照 START_DAY 至 END_DAY 按照每一天进行筛选，这样能够突破 1000 条视频的限制，最大程度爬取该关键词下每一天的所有视频
+            # 按照 START_DAY 至 END_DAY 的发布时间分片搜索，这样能够突破 1000 条视频的限制，最大程度爬取该关键词下的所有视频
             else:
-                for day in pd.date_range(start=config.START_DAY, end=config.END_DAY, freq='D'):
-                    # 按照每一天进行爬取的时间戳参数
-                    pubtime_begin_s, pubtime_end_s = await self.get_pubtime_datetime(start=day.strftime('%Y-%m-%d'), end=day.strftime('%Y-%m-%d'))
-                    page = 1
-                    #!该段 while 语句在发生异常时（通常情况下为当天数据为空时）会自动跳转到下一天，以实现最大程度爬取该关键词下当天的所有视频
-                    #!除了仅保留现在原有的 try, except Exception 语句外，不要再添加其他的异常处理！！！否则将使该段代码失效，使其仅能爬取当天一天数据而无法跳转到下一天
-                    #!除非将该段代码的逻辑进行重构以实现相同的功能，否则不要进行修改！！！
-                    while (page - start_page + 1) * bili_limit_count <= config.CRAWLER_MAX_NOTES_COUNT:
-                        #! Catch any error if response return nothing, go to next day
-                        try:
-                            #! Don't skip any page, to make sure gather all video in one day
-                            # if page < start_page:
-                            #     utils.logger.info(f"[BilibiliCrawler.search] Skip page: {page}")
-                            #     page += 1
-                            #     continue
-
-                            utils.logger.info(f"[BilibiliCrawler.search] search bilibili keyword: {keyword}, date: {day.ctime()}, page: {page}")
-                            video_id_list: List[str] = []
-                            videos_res = await self.bili_client.search_video_by_keyword(
-                                keyword=keyword,
-                                page=page,
-                                page_size=bili_limit_count,
-                                order=SearchOrderType.DEFAULT,
-                                pubtime_begin_s=pubtime_begin_s,  # 作品发布日期起始时间戳
-                                pubtime_end_s=pubtime_end_s  # 作品发布日期结束日期时间戳
-                            )
-                            video_list: List[Dict] = videos_res.get("result")
-
-                            semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
-                            task_list = [self.get_video_info_task(aid=video_item.get("aid"), bvid="", semaphore=semaphore) for video_item in video_list]
-                            video_items = await asyncio.gather(*task_list)
-                            for video_item in video_items:
-                                if video_item:
-                                    video_id_list.append(video_item.get("View").get("aid"))
-                                    await bilibili_store.update_bilibili_video(video_item)
-                                    # while search, update up info [ Mia edited @ 2025.05.01 ]
-                                    await bilibili_store.update_up_info(video_item)
-                                    await self.get_bilibili_video(video_item, semaphore)
-                            page += 1
-                            await self.batch_get_video_comments(video_id_list)
-                        # go to next day
-                        except Exception as e:
-                            print(e)
-                            break
+                await self.search_by_time_shards(keyword)
+
+    async def store_search_videos(self, video_list: List[Dict]) -> List[str]:
+        """
+        获取搜索结果中视频的详情并保存
+        :param video_list: 搜索结果
+        :return: 视频 aid 列表
+        """
+        video_id_list: List[str] = []
+        semaphore = crawl_semaphore()
+        task_list = []
+        try:
+            task_list = [self.get_video_info_task(aid=video_item.get("aid"), bvid="", semaphore=semaphore) for video_item in video_list]
+        except Exception as e:
+            utils.logger.warning(f"[BilibiliCrawler.store_search_videos] error in the task list. The video for this page will not be included. {e}")
+        video_items = [video_item for video_item in await asyncio.gather(*task_list) if video_item]
+        await bilibili_store.batch_update_bilibili_videos(video_items)
+        for video_item in video_items:
+            video_id_list.append(video_item.get("View").get("aid"))
+            # while search, update up info [ Mia edited @ 2025.05.01 ]
+            await bilibili_store.update_up_info(video_item)
+            await self.get_bilibili_video(video_item, semaphore)
+        return video_id_list
+
+    async def search_by_time_shards(self, keyword: str):
+        """
+        按发布时间分片搜索关键词，先探测每个时间窗口的结果数量，结果数量达到 1000 条上限的窗口对半拆分，
+        然后并发爬取每个窗口，每个窗口最多爬取 CRAWLER_MAX_NOTES_COUNT 条视频
+        :param keyword:
+        :return:
+        """
+        bili_limit_count = 20  # bilibili limit page fixed value
+        pubtime_begin_s, pubtime_end_s = await self.get_pubtime_datetime(start=config.START_DAY, end=config.END_DAY)
+        # 探测时拿到的第一页结果，爬取窗口时直接使用，不再重复请求
+        first_pages: Dict[TimeWindow, Dict] = {}
+
+        async def search_window(window: TimeWindow, page: int) -> Dict:
+            return await self.bili_client.search_video_by_keyword(
+                keyword=keyword,
+                page=page,
+                page_size=bili_limit_count,
+                order=SearchOrderType.DEFAULT,
+                pubtime_begin_s=window.start,  # 作品发布日期起始时间戳
+                pubtime_end_s=window.end  # 作品发布日期结束日期时间戳
+            )
+
+        async def count_window(window: TimeWindow) -> int:
+            try:
+                videos_res = await search_window(window, 1)
+            except DataFetchError as e:
+                utils.logger.error(f"[BilibiliCrawler.search_by_time_shards] count window {window} error: {e}")
+                return 0
+            first_pages[window] = videos_res
+            return int(videos_res.get("numResults") or 0)
+
+        async def crawl_window(window: TimeWindow):
+            page = 1
+            num_pages = 1
+            while page <= num_pages and page * bili_limit_count <= config.CRAWLER_MAX_NOTES_COUNT:
+                utils.logger.info(f"[BilibiliCrawler.search_by_time_shards] search bilibili keyword: {keyword}, "
+                                  f"window: {datetime.fromtimestamp(window.start)} - {datetime.fromtimestamp(window.end)}, page: {page}")
+                videos_res = first_pages.pop(window, None) if page == 1 else None
+                if videos_res is None:
+                    videos_res = await search_window(window, page)
+                video_list: List[Dict] = videos_res.get("result") or []
+                if not video_list:
+                    break
+                num_pages = int(videos_res.get("numPages") or 1)
+                video_id_list = await self.store_search_videos(video_list)
+                await self.batch_get_video_comments(video_id_list)
+                page += 1
+
+        planner = SearchShardPlanner(result_cap=BILI_SEARCH_RESULT_CAP,
+                                     min_window_seconds=config.SEARCH_SHARD_MIN_WINDOW_SECONDS,
+                                     concurrency=stage_concurrency())
+        windows = await planner.plan(int(pubtime_begin_s), int(pubtime_end_s), count_window)
+        utils.logger.info(f"[BilibiliCrawler.search_by_time_shards] keyword: {keyword}, planned {len(windows)} windows")
+        await planner.run(windows, crawl_window)
+
+    async def get_creator_by_keyword(self, creator_scheduler: CreatorScheduler, break_point_time: datetime,
+                                     creator_mids: Dict[str, Optional[str]], keyword: str):
+        """
+        根据up主名字爬取一个up主的视频
+        多个up主并发爬取时，断点记录为列表中第一个还没有完成的up主，重新运行时不会漏掉正在爬取的up主
+        :param creator_scheduler: 当前的创作者调度器
+        :param break_point_time: 断点记录时间
+        :param creator_mids: 已经解析好的 up主名字 -> mid
+        :param keyword: up主名字
+        :return:
+        """
+        break_point_creator = creator_scheduler.first_unfinished() or keyword
+        # 更新 bilibili_creator_break_point
+        await update_setting_key("bilibili_creator_break_point",{"value":break_point_creator,"datetime":break_point_time.strftime('%Y-%m-%d %H:%M:%S')})
+        creator_mid = creator_mids.get(keyword)
+        if creator_mid:
+            await self.get_creator_videos(int(creator_mid))
+        else:
+            utils.logger.info(f"[BilibiliCrawler] 没有找到此用户：{keyword}")
+
+    async def resolve_creator_mid(self, keyword: str) -> Optional[str]:
+        """
+        根据up主名字搜索 mid，优先使用名字完全相同的搜索结果，没有时使用第一个搜索结果
+        :param keyword: up主名字
+        :return:
+        """
+        creators = await self.search_creator(keyword)
+        if not creators:
+            return None
+        for creator in creators:
+            # 搜索结果的名字中关键词可能带有高亮标签
+            if re.sub(r"<[^>]+>", "", creator.get("uname", "")) == keyword:
+                return str(creator["mid"])
+        return str(creators[0]["mid"])
+
     # 新增函数，根据关键字搜索UP主 [ Mia edited @ 2025.06.06 ]
     async def search_creator(self,keyword):
         videos_res = await self.bili_client.search_creator_by_keyword(
@@ -304,9 +405,8 @@ class BilibiliCrawler(AbstractCrawler):
                 f"[BilibiliCrawler.batch_get_note_comments] Crawling comment mode is not enabled")
             return
 
-        utils.logger.info(
-            f"[BilibiliCrawler.batch_get_video_comments] video ids:{video_id_list}")
-        semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+        utils.logger.info("[BilibiliCrawler.batch_get_video_comments] video ids:%s", utils.truncate(video_id_list))
+        semaphore = crawl_semaphore()
         task_list: List[Task] = []
         for video_id in video_id_list:
             task = asyncio.create_task(self.get_comments(
@@ -325,13 +425,35 @@ class BilibiliCrawler(AbstractCrawler):
             try:
                 utils.logger.info(
                     f"[BilibiliCrawler.get_comments] begin get video_id: {video_id} comments ...")
+                cursor_state = {}
+                cursor_callback = None
+                if config.ENABLE_COMMENT_CURSOR_RESUME:
+                    cursor_state = get_crawl_state_store().get(COMMENT_CURSOR_NAMESPACE, video_id) or {}
+                    if isinstance(cursor_state, str):
+                        # 旧版本只保存了游标
+                        cursor_state = {"cursor": cursor_state}
+                    cursor_callback = self.save_comment_cursor
+                cursor = cursor_state.get("cursor", "")
+                if cursor:
+                    utils.logger.info(
+                        f"[BilibiliCrawler.get_comments] resume video_id: {video_id} comments from saved cursor")
+                watermark = get_comment_watermark(video_id)
                 await self.bili_client.get_video_all_comments(
                     video_id=video_id,
                     crawl_interval=random.random(),
                     is_fetch_sub_comments=config.ENABLE_GET_SUB_COMMENTS,
                     callback=bilibili_store.batch_update_bilibili_video_comments,
                     max_count=config.CRAWLER_MAX_COMMENTS_COUNT_SINGLENOTES,
+                    max_sub_count=config.CRAWLER_MAX_SUB_COMMENTS_COUNT_SINGLENOTES,
+                    sub_concurrency=config.MAX_SUB_COMMENTS_CONCURRENCY_NUM,
+                    cursor=cursor,
+                    cursor_callback=cursor_callback,
+                    watermark=watermark,
+                    fetched_count=cursor_state.get("count", 0),
+                    fetched_sub_count=cursor_state.get("sub_count", 0),
                 )
+                if watermark:
+                    watermark.commit()
 
             except DataFetchError as ex:
                 utils.logger.error(
@@ -340,6 +462,24 @@ class BilibiliCrawler(AbstractCrawler):
                 utils.logger.error(
                     f"[BilibiliCrawler.get_comments] may be been blocked, err:{e}")
 
+    @staticmethod
+    async def save_comment_cursor(video_id: str, next_cursor: Optional[str], fetched_count: int,
+                                  fetched_sub_count: int):
+        """
+        保存视频评论的翻页游标和已经爬取的评论数量，评论已经爬完时删除游标，下次运行重新从第一页开始
+        :param video_id:
+        :param next_cursor:
+        :param fetched_count: 已经爬取的一级评论数量
+        :param fetched_sub_count: 已经爬取的二级评论数量
+        :return:
+        """
+        crawl_state_store = get_crawl_state_store()
+        if next_cursor is None:
+            crawl_state_store.delete(COMMENT_CURSOR_NAMESPACE, video_id)
+        else:
+            crawl_state_store.set(COMMENT_CURSOR_NAMESPACE, video_id,
+                                  {"cursor": next_cursor, "count": fetched_count, "sub_count": fetched_sub_count})
+
     async def get_creator_videos(self, creator_id: int):
         """
         get videos for a creator
@@ -348,25 +488,33 @@ class BilibiliCrawler(AbstractCrawler):
         ps = 30
         pn = 1
         video_bvids_list = []
+        # 视频按发布时间从新到旧排列，增量爬取时翻页到已经爬取过的视频就停止
+        watermark = get_creator_watermark(str(creator_id))
         while True:
             result = await self.bili_client.get_creator_videos(creator_id, pn, ps)
-            for video in result["list"]["vlist"]:
+            vlist = result["list"]["vlist"]
+            if watermark:
+                vlist = watermark.filter_page(vlist, lambda video: video.get("created"))
+            for video in vlist:
                 video_bvids_list.append(video["bvid"])
-            if (int(result["page"]["count"]) <= pn * ps):
+            add_creator_progress(len(vlist))
+            if (int(result["page"]["count"]) <= pn * ps) or (watermark and watermark.reached):
                 break
             await asyncio.sleep(random.random())
             pn += 1
         # video number of this creator [ Mia edited @ 2025.05.01 ]
-        video_count = len(video_bvids_list)
+        video_count = int(result["page"]["count"]) if watermark else len(video_bvids_list)
         
         await self.get_specified_videos(video_bvids_list,video_count)
+        if watermark:
+            watermark.commit()
 
     async def get_specified_videos(self, bvids_list: List[str],video_count):
         """
         get specified videos info
         :return:
         """
-        semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+        semaphore = crawl_semaphore()
         task_list = [
             self.get_video_info_task(aid=0, bvid=video_id, semaphore=semaphore) for video_id in
             bvids_list
@@ -381,7 +529,7 @@ class BilibiliCrawler(AbstractCrawler):
                     video_aids_list.append(video_aid)
                 await bilibili_store.update_bilibili_video(video_detail)
                 # get specified video, update up info [ Mia edited @ 2025.05.01 ]
-                print(f"视频细节：{video_detail}")
+                utils.logger.debug("[BilibiliCrawler.get_specified_videos] video detail: %s", utils.truncate(video_detail))
                 video_detail["Card"]["card"]["video_count"] = video_count
                 await bilibili_store.update_up_info(video_detail)
                 await self.get_bilibili_video(video_detail, semaphore)
@@ -429,15 +577,40 @@ class BilibiliCrawler(AbstractCrawler):
                     f"[BilibiliCrawler.get_video_play_url_task] have not fund play url from :{aid}|{cid}, err: {ex}")
                 return None
 
-    async def create_bilibili_client(self, httpx_proxy: Optional[str]) -> BilibiliClient:
+    async def fast_start(self, httpx_proxy: Optional[str]) -> bool:
+        """
+        无浏览器快速启动：使用保存的登录态创建 API 客户端并通过 HTTP pong 校验登录态
+        B站签名所需的 wbi key 从 pong 调用的 nav 接口中获取，不需要浏览器
+        :param httpx_proxy: httpx proxy
+        :return: 登录态是否有效
+        """
+        session_state = load_session_state()
+        if not session_state:
+            utils.logger.info("[BilibiliCrawler.fast_start] No saved session state, launch browser to login ...")
+            return False
+        self.user_agent = session_state.get("user_agent") or self.user_agent
+        self.bili_client = await self.create_bilibili_client(httpx_proxy, session_state)
+        if not await self.bili_client.pong():
+            utils.logger.info("[BilibiliCrawler.fast_start] Saved session state is invalid, launch browser to login ...")
+            return False
+        utils.logger.info("[BilibiliCrawler.fast_start] Use saved session state, skip launching browser ...")
+        return True
+
+    async def create_bilibili_client(self, httpx_proxy: Optional[str], session_state: Optional[Dict] = None) -> BilibiliClient:
         """
         create bilibili client
         :param httpx_proxy: httpx proxy
+        :param session_state: 保存的登录态，传入时不依赖浏览器创建客户端
         :return: bilibili client
         """
         utils.logger.info(
             "[BilibiliCrawler.create_bilibili_client] Begin create bilibili API client ...")
-        cookie_str, cookie_dict = utils.convert_cookies(await self.browser_context.cookies())
+        if session_state:
+            cookie_str, cookie_dict = utils.convert_cookies(session_state.get("cookies"))
+            playwright_page = None
+        else:
+            cookie_str, cookie_dict = utils.convert_cookies(await self.browser_context.cookies())
+            playwright_page = self.context_page
         bilibili_client_obj = BilibiliClient(
             proxies=httpx_proxy,
             headers={
@@ -447,7 +620,7 @@ class BilibiliCrawler(AbstractCrawler):
                 "Referer": "https://www.bilibili.com",
                 "Content-Type": "application/json;charset=UTF-8"
             },
-            playwright_page=self.context_page,
+            playwright_page=playwright_page,
             cookie_dict=cookie_dict,
         )
         return bilibili_client_obj
@@ -538,9 +711,11 @@ class BilibiliCrawler(AbstractCrawler):
             utils.logger.info("[BilibiliCrawler.get_bilibili_video] get video url failed")
             return
 
-        content = await self.bili_client.get_video_media(video_url)
-        if content is None:
-            return
         extension_file_name = f"video.mp4"
-        await bilibili_store.store_video(aid, content, extension_file_name)
+        # 视频体积较大，交给下载池流式写入磁盘，B站视频 CDN 需要携带 Referer 等请求头
+        await self.media_downloader.submit(
+            video_url,
+            bilibili_store.get_video_file_name(aid, extension_file_name),
+            headers=self.bili_client.headers,
+        )
 
@@ -19,7 +19,13 @@ import requests
 from playwright.async_api import BrowserContext
 
 from base.base_crawler import AbstractApiClient
+from proxy.proxy_ip_pool import ProxyIpPool
 from tools import utils
+from tools.browser_pool import BrowserPagePool
+from tools.concurrency_governor import mark_request_blocked
+from tools.metrics import metrics_registry, record_response_status
+from tools.response_cache import cache_response
+from tools.watermark import CreatorWatermark
 from var import request_keyword_var
 
 from .exception import *
@@ -35,15 +41,20 @@ class DOUYINClient(AbstractApiClient):
             *,
             headers: Dict,
             playwright_page: Optional[Page],
-            cookie_dict: Dict
+            cookie_dict: Dict,
+            page_pool: Optional[BrowserPagePool] = None,
+            ip_pool: Optional[ProxyIpPool] = None,
     ):
         self.proxies = proxies
+        self.ip_pool = ip_pool
         self.timeout = timeout
         self.headers = headers
         self._host = "https://www.douyin.com"
         self.playwright_page = playwright_page
+        self.page_pool = page_pool or BrowserPagePool.from_page(playwright_page)
         self.cookie_dict = cookie_dict
 
+    @metrics_registry.timed("mediacrawler_sign_seconds", platform="douyin")
     async def __process_req_params(
             self, uri: str, params: Optional[Dict] = None, headers: Optional[Dict] = None,
             request_method="GET"
@@ -52,7 +63,8 @@ class DOUYINClient(AbstractApiClient):
         if not params:
             return
         headers = headers or self.headers
-        local_storage: Dict = await self.playwright_page.evaluate("() => window.localStorage")  # type: ignore
+        async with self.page_pool.lease() as page:
+            local_storage: Dict = await page.evaluate("() => window.localStorage")  # type: ignore
         common_params = {
             "device_platform": "webapp",
             "aid": "6383",
@@ -98,8 +110,10 @@ class DOUYINClient(AbstractApiClient):
         elif method == "POST":
             response = requests.request(method, url, **kwargs)
         try:
+            record_response_status(response.status_code)
             if response.text == "" or response.text == "blocked":
-                utils.logger.error(f"request params incrr, response.text: {response.text}")
+                utils.logger.error("request params incrr, response.text: %s", utils.truncate(response.text))
+                mark_request_blocked()
                 raise Exception("account blocked")
             return response.json()
         except Exception as e:
@@ -118,6 +132,22 @@ class DOUYINClient(AbstractApiClient):
         headers = headers or self.headers
         return await self.request(method="POST", url=f"{self._host}{uri}", data=data, headers=headers)
 
+    async def switch_lane(self) -> bool:
+        """
+        当前代理IP被熔断时从代理池中换一个代理IP
+        Returns:
+
+        """
+        if not self.ip_pool:
+            return False
+        try:
+            ip_proxy_info = await self.ip_pool.get_proxy()
+        except Exception as e:
+            utils.logger.error(f"[DOUYINClient.switch_lane] get proxy from ip pool err: {e}")
+            return False
+        _, self.proxies = utils.format_proxy_info(ip_proxy_info)
+        return True
+
     async def pong(self, browser_context: BrowserContext) -> bool:
         local_storage = await self.playwright_page.evaluate("() => window.localStorage")
         if local_storage.get("HasUserLogin", "") == "1":
@@ -176,6 +206,7 @@ class DOUYINClient(AbstractApiClient):
         headers["Referer"] = urllib.parse.quote(referer_url, safe=':/')
         return await self.get("/aweme/v1/web/general/search/single/", query_params, headers=headers)
 
+    @cache_response("content_detail")
     async def get_video_by_id(self, aweme_id: str) -> Any:
         """
         DouYin Video Detail API
@@ -283,6 +314,7 @@ class DOUYINClient(AbstractApiClient):
                         await asyncio.sleep(crawl_interval)
         return result
 
+    @cache_response("creator_info")
     async def get_user_info(self, sec_user_id: str):
         uri = "/aweme/v1/web/user/profile/other/"
         params = {
@@ -305,7 +337,8 @@ class DOUYINClient(AbstractApiClient):
         }
         return await self.get(uri, params)
 
-    async def get_all_user_aweme_posts(self, sec_user_id: str, callback: Optional[Callable] = None):
+    async def get_all_user_aweme_posts(self, sec_user_id: str, callback: Optional[Callable] = None,
+                                       watermark: Optional[CreatorWatermark] = None):
         posts_has_more = 1
         max_cursor = ""
         result = []
@@ -316,6 +349,10 @@ class DOUYINClient(AbstractApiClient):
             aweme_list = aweme_post_res.get("aweme_list") if aweme_post_res.get("aweme_list") else []
             utils.logger.info(
                 f"[DOUYINClient.get_all_user_aweme_posts] got sec_user_id:{sec_user_id} video len : {len(aweme_list)}")
+            if watermark:
+                aweme_list = watermark.filter_page(aweme_list, lambda aweme: aweme.get("create_time"))
+                if watermark.reached:
+                    posts_has_more = 0
             if callback:
                 await callback(aweme_list)
             result.extend(aweme_list)
@@ -20,9 +20,13 @@ from playwright.async_api import (BrowserContext, BrowserType, Page,
 
 import config
 from base.base_crawler import AbstractCrawler
-from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
+from proxy.proxy_ip_pool import IpInfoModel, ProxyIpPool, create_ip_pool
 from store import douyin as douyin_store
 from tools import utils
+from tools.browser_pool import BrowserPagePool
+from tools.creator_scheduler import CreatorScheduler, crawl_semaphore, track_creator_pages
+from tools.concurrency_governor import stage_concurrency
+from tools.watermark import get_creator_watermark
 from var import crawler_type_var, source_keyword_var
 
 from .client import DOUYINClient
@@ -35,12 +39,13 @@ class DouYinCrawler(AbstractCrawler):
     context_page: Page
     dy_client: DOUYINClient
     browser_context: BrowserContext
+    page_pool: BrowserPagePool
 
     def __init__(self) -> None:
         self.index_url = "https://www.douyin.com"
 
     async def start(self) -> None:
-        playwright_proxy_format, httpx_proxy_format = None, None
+        ip_proxy_pool, playwright_proxy_format, httpx_proxy_format = None, None, None
         if config.ENABLE_IP_PROXY:
             ip_proxy_pool = await create_ip_pool(config.IP_PROXY_POOL_COUNT, enable_validate_ip=True)
             ip_proxy_info: IpInfoModel = await ip_proxy_pool.get_proxy()
@@ -60,7 +65,7 @@ class DouYinCrawler(AbstractCrawler):
             self.context_page = await self.browser_context.new_page()
             await self.context_page.goto(self.index_url)
 
-            self.dy_client = await self.create_douyin_client(httpx_proxy_format)
+            self.dy_client = await self.create_douyin_client(httpx_proxy_format, ip_proxy_pool)
             if not await self.dy_client.pong(browser_context=self.browser_context):
                 login_obj = DouYinLogin(
                     login_type=config.LOGIN_TYPE,
@@ -71,16 +76,24 @@ class DouYinCrawler(AbstractCrawler):
                 )
                 await login_obj.begin()
                 await self.dy_client.update_cookies(browser_context=self.browser_context)
+
+            # 登录态就绪后预热页面池，签名等依赖页面 evaluate 的操作从页面池中租用页面并发执行
+            self.page_pool = BrowserPagePool(self.browser_context, self.index_url)
+            await self.page_pool.start(self.context_page)
+            self.dy_client.page_pool = self.page_pool
             crawler_type_var.set(config.CRAWLER_TYPE)
-            if config.CRAWLER_TYPE == "search":
-                # Search for notes and retrieve their comment information.
-                await self.search()
-            elif config.CRAWLER_TYPE == "detail":
-                # Get the information and comments of the specified post
-                await self.get_specified_awemes()
-            elif config.CRAWLER_TYPE == "creator":
-                # Get the information and comments of the specified creator
-                await self.get_creators_and_videos()
+            try:
+                if config.CRAWLER_TYPE == "search":
+                    # Search for notes and retrieve their comment information.
+                    await self.search()
+                elif config.CRAWLER_TYPE == "detail":
+                    # Get the information and comments of the specified post
+                    await self.get_specified_awemes()
+                elif config.CRAWLER_TYPE == "creator":
+                    # Get the information and comments of the specified creator
+                    await self.get_creators_and_videos()
+            finally:
+                await self.page_pool.close()
 
             utils.logger.info("[DouYinCrawler.start] Douyin Crawler finished ...")
 
@@ -109,7 +122,10 @@ class DouYinCrawler(AbstractCrawler):
                                                                             search_id=dy_search_id
                                                                             )
                     if posts_res.get("data") is None or posts_res.get("data") == []:
-                        utils.logger.info(f"[DouYinCrawler.search] search douyin keyword: {keyword}, page: {page} is empty,{posts_res.get('data')}`")
+                        utils.logger.info(
+                            "[DouYinCrawler.search] search douyin keyword: %s, page: %s is empty,%s`",
+                            keyword, page, utils.truncate(posts_res.get('data'))
+                        )
                         break
                 except DataFetchError:
                     utils.logger.error(f"[DouYinCrawler.search] search douyin keyword: {keyword} failed")
@@ -129,12 +145,12 @@ class DouYinCrawler(AbstractCrawler):
                         continue
                     aweme_list.append(aweme_info.get("aweme_id", ""))
                     await douyin_store.update_douyin_aweme(aweme_item=aweme_info)
-            utils.logger.info(f"[DouYinCrawler.search] keyword:{keyword}, aweme_list:{aweme_list}")
+            utils.logger.info("[DouYinCrawler.search] keyword:%s, aweme_list:%s", keyword, utils.truncate(aweme_list))
             await self.batch_get_note_comments(aweme_list)
 
     async def get_specified_awemes(self):
         """Get the information and comments of the specified post"""
-        semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+        semaphore = crawl_semaphore()
         task_list = [
             self.get_aweme_detail(aweme_id=aweme_id, semaphore=semaphore) for aweme_id in config.DY_SPECIFIED_ID_LIST
         ]
@@ -166,7 +182,7 @@ class DouYinCrawler(AbstractCrawler):
             return
 
         task_list: List[Task] = []
-        semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+        semaphore = crawl_semaphore()
         for aweme_id in aweme_list:
             task = asyncio.create_task(
                 self.get_comments(aweme_id, semaphore), name=aweme_id)
@@ -195,25 +211,35 @@ class DouYinCrawler(AbstractCrawler):
         Get the information and videos of the specified creator
         """
         utils.logger.info("[DouYinCrawler.get_creators_and_videos] Begin get douyin creators")
-        for user_id in config.DY_CREATOR_ID_LIST:
-            creator_info: Dict = await self.dy_client.get_user_info(user_id)
-            if creator_info:
-                await douyin_store.save_creator(user_id, creator=creator_info)
+        creator_scheduler = CreatorScheduler(config.CREATOR_CONCURRENCY_NUM, stage_concurrency())
+        await creator_scheduler.run(config.DY_CREATOR_ID_LIST, self.get_creator_and_videos)
 
-            # Get all video information of the creator
-            all_video_list = await self.dy_client.get_all_user_aweme_posts(
-                sec_user_id=user_id,
-                callback=self.fetch_creator_video_detail
-            )
+    async def get_creator_and_videos(self, user_id: str) -> None:
+        """
+        Get the information, videos and comments of one creator
+        """
+        creator_info: Dict = await self.dy_client.get_user_info(user_id)
+        if creator_info:
+            await douyin_store.save_creator(user_id, creator=creator_info)
+
+        # Get all video information of the creator
+        watermark = get_creator_watermark(user_id)
+        all_video_list = await self.dy_client.get_all_user_aweme_posts(
+            sec_user_id=user_id,
+            callback=track_creator_pages(self.fetch_creator_video_detail),
+            watermark=watermark
+        )
 
-            video_ids = [video_item.get("aweme_id") for video_item in all_video_list]
-            await self.batch_get_note_comments(video_ids)
+        video_ids = [video_item.get("aweme_id") for video_item in all_video_list]
+        await self.batch_get_note_comments(video_ids)
+        if watermark:
+            watermark.commit()
 
     async def fetch_creator_video_detail(self, video_list: List[Dict]):
         """
         Concurrently obtain the specified post list and save the data
         """
-        semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+        semaphore = crawl_semaphore()
         task_list = [
             self.get_aweme_detail(post_item.get("aweme_id"), semaphore) for post_item in video_list
         ]
@@ -236,11 +262,12 @@ class DouYinCrawler(AbstractCrawler):
         }
         return playwright_proxy, httpx_proxy
 
-    async def create_douyin_client(self, httpx_proxy: Optional[str]) -> DOUYINClient:
+    async def create_douyin_client(self, httpx_proxy: Optional[str], ip_pool: Optional[ProxyIpPool] = None) -> DOUYINClient:
         """Create douyin client"""
         cookie_str, cookie_dict = utils.convert_cookies(await self.browser_context.cookies())  # type: ignore
         douyin_client = DOUYINClient(
             proxies=httpx_proxy,
+            ip_pool=ip_pool,
             headers={
                 "User-Agent": await self.context_page.evaluate("() => navigator.userAgent"),
                 "Cookie": cookie_str,
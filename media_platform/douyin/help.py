@@ -17,10 +17,22 @@
 
 import random
 
-import execjs
 from playwright.async_api import Page
 
-douyin_sign_obj = execjs.compile(open('libs/douyin.js', encoding='utf-8-sig').read())
+from tools import utils
+from tools.metrics import metrics_registry
+
+# execjs 编译 douyin.js 耗时较长，第一次签名时才编译
+douyin_sign_obj = None
+
+
+def get_douyin_sign_obj():
+    global douyin_sign_obj
+    if not douyin_sign_obj:
+        import execjs
+        with open('libs/douyin.js', encoding='utf-8-sig') as f:
+            douyin_sign_obj = execjs.compile(f.read())
+    return douyin_sign_obj
 
 def get_web_id():
     """
@@ -44,13 +56,12 @@ def get_web_id():
 
 
 
+@metrics_registry.timed("mediacrawler_sign_seconds", platform="douyin")
 async def get_a_bogus(url: str, params: str, post_data: dict, user_agent: str, page: Page = None):
     """
     获取 a_bogus 参数, 目前不支持post请求类型的签名
     """
-    print(url)
-    print(params)
-    print(user_agent)
+    utils.logger.debug("[get_a_bogus] url: %s, params: %s, user_agent: %s", url, utils.truncate(params), user_agent)
     return get_a_bogus_from_js(url, params, user_agent)
 
 def get_a_bogus_from_js(url: str, params: str, user_agent: str):
@@ -67,7 +78,7 @@ def get_a_bogus_from_js(url: str, params: str, user_agent: str):
     sign_js_name = "sign_datail"
     if "/reply" in url:
         sign_js_name = "sign_reply"
-    return douyin_sign_obj.call(sign_js_name, params, user_agent)
+    return get_douyin_sign_obj().call(sign_js_name, params, user_agent)
 
 
 
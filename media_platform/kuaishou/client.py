@@ -20,7 +20,12 @@ from playwright.async_api import BrowserContext, Page
 
 import config
 from base.base_crawler import AbstractApiClient
+from proxy.proxy_ip_pool import ProxyIpPool
 from tools import utils
+from tools.concurrency_governor import stage_concurrency
+from tools.metrics import record_response_status
+from tools.response_cache import cache_response
+from tools.watermark import CreatorWatermark
 
 from .exception import DataFetchError
 from .graphql import KuaiShouGraphQL
@@ -35,19 +40,27 @@ class KuaiShouClient(AbstractApiClient):
         headers: Dict[str, str],
         playwright_page: Page,
         cookie_dict: Dict[str, str],
+        ip_pool: Optional[ProxyIpPool] = None,
     ):
         self.proxies = proxies
+        self.ip_pool = ip_pool
         self.timeout = timeout
         self.headers = headers
         self._host = "https://www.kuaishou.com/graphql"
         self.playwright_page = playwright_page
         self.cookie_dict = cookie_dict
         self.graphql = KuaiShouGraphQL()
+        # 接口是否支持一次 POST 多个操作(请求体为操作数组)，None 表示还没有探测过
+        self._batch_supported: Optional[bool] = None
 
     async def request(self, method, url, **kwargs) -> Any:
         async with httpx.AsyncClient(proxies=self.proxies) as client:
             response = await client.request(method, url, timeout=self.timeout, **kwargs)
-        data: Dict = response.json()
+        record_response_status(response.status_code)
+        data = response.json()
+        if isinstance(data, list):
+            # 批量请求返回与操作一一对应的数组，由调用方逐个检查每个操作的 errors
+            return data
         if data.get("errors"):
             raise DataFetchError(data.get("errors", "unkonw error"))
         else:
@@ -67,6 +80,89 @@ class KuaiShouClient(AbstractApiClient):
             method="POST", url=f"{self._host}{uri}", data=json_str, headers=self.headers
         )
 
+    async def post_batch(self, operations: List[Dict]) -> List[Optional[Dict]]:
+        """
+        发送多个 GraphQL 操作，每 KS_GRAPHQL_BATCH_SIZE 个操作合并成一次 POST(请求体为操作数组)，
+        接口不支持批量请求时退回到逐个请求，并发数为 stage_concurrency()
+        Args:
+            operations: GraphQL 操作列表，每个操作包含 operationName、variables、query
+
+        Returns:
+            与 operations 一一对应的 data，请求失败的操作为 None
+        """
+        results: List[Optional[Dict]] = []
+        batch_size = config.KS_GRAPHQL_BATCH_SIZE
+        while batch_size > 1 and self._batch_supported is not False and len(operations) - len(results) > 1:
+            chunk = operations[len(results):len(results) + batch_size]
+            chunk_results = await self._post_batch_chunk(chunk)
+            if chunk_results is None:
+                break
+            results.extend(chunk_results)
+
+        semaphore = asyncio.Semaphore(stage_concurrency())
+
+        async def post_one(operation: Dict) -> Optional[Dict]:
+            async with semaphore:
+                try:
+                    return await self.post("", operation)
+                except Exception as ex:
+                    # 单个操作失败(包括网络错误)不影响同一批的其他操作
+                    utils.logger.error(f"[KuaiShouClient.post_batch] {operation.get('operationName')} error: {ex}")
+                    return None
+
+        results.extend(await asyncio.gather(*[post_one(operation) for operation in operations[len(results):]]))
+        return results
+
+    async def _post_batch_chunk(self, chunk: List[Dict]) -> Optional[List[Optional[Dict]]]:
+        """
+        一次 POST 发送多个操作，返回 None 表示这一批需要退回到逐个请求
+        """
+        json_str = json.dumps(chunk, separators=(",", ":"), ensure_ascii=False)
+        try:
+            data = await self.request(method="POST", url=self._host, data=json_str, headers=self.headers)
+        except DataFetchError as e:
+            # 接口返回了错误信息，一般是不接受操作数组
+            utils.logger.warning(f"[KuaiShouClient._post_batch_chunk] batch request error: {e}")
+            data = None
+        except Exception as e:
+            # 网络错误等与是否支持批量请求无关，只让这一批退回到逐个请求
+            utils.logger.warning(f"[KuaiShouClient._post_batch_chunk] batch request error: {e}")
+            return None
+        if not isinstance(data, list) or len(data) != len(chunk):
+            if self._batch_supported is None:
+                # 第一次批量请求就失败，说明接口不支持批量请求，之后都逐个请求
+                utils.logger.info("[KuaiShouClient._post_batch_chunk] graphql batch is not supported, "
+                                  "fall back to one operation per request")
+                self._batch_supported = False
+            return None
+        self._batch_supported = True
+
+        chunk_results: List[Optional[Dict]] = []
+        for operation, item in zip(chunk, data):
+            if not isinstance(item, dict) or item.get("errors"):
+                utils.logger.error(f"[KuaiShouClient._post_batch_chunk] {operation.get('operationName')} error: "
+                                   f"{item.get('errors') if isinstance(item, dict) else item}")
+                chunk_results.append(None)
+            else:
+                chunk_results.append(item.get("data", {}))
+        return chunk_results
+
+    async def switch_lane(self) -> bool:
+        """
+        当前代理IP被熔断时从代理池中换一个代理IP
+        Returns:
+
+        """
+        if not self.ip_pool:
+            return False
+        try:
+            ip_proxy_info = await self.ip_pool.get_proxy()
+        except Exception as e:
+            utils.logger.error(f"[KuaiShouClient.switch_lane] get proxy from ip pool err: {e}")
+            return False
+        _, self.proxies = utils.format_proxy_info(ip_proxy_info)
+        return True
+
     async def pong(self) -> bool:
         """get a note to check if login state is ok"""
         utils.logger.info("[KuaiShouClient.pong] Begin pong kuaishou...")
@@ -116,18 +212,30 @@ class KuaiShouClient(AbstractApiClient):
         }
         return await self.post("", post_data)
 
+    @cache_response("content_detail")
     async def get_video_info(self, photo_id: str) -> Dict:
         """
         Kuaishou web video detail api
         :param photo_id:
         :return:
         """
-        post_data = {
+        return await self.post("", self._video_detail_operation(photo_id))
+
+    async def get_video_infos(self, photo_ids: List[str]) -> List[Optional[Dict]]:
+        """
+        批量获取视频详情，多个视频详情合并到一次请求中
+        :param photo_ids:
+        :return: 与 photo_ids 一一对应的 visionVideoDetail，获取失败的视频为 None
+        """
+        results = await self.post_batch([self._video_detail_operation(photo_id) for photo_id in photo_ids])
+        return [result.get("visionVideoDetail") if result else None for result in results]
+
+    def _video_detail_operation(self, photo_id: str) -> Dict:
+        return {
             "operationName": "visionVideoDetail",
             "variables": {"photoId": photo_id, "page": "search"},
             "query": self.graphql.get("video_detail"),
         }
-        return await self.post("", post_data)
 
     async def get_video_comments(self, photo_id: str, pcursor: str = "") -> Dict:
         """get video comments
@@ -150,16 +258,18 @@ class KuaiShouClient(AbstractApiClient):
         :param pcursor: last you get pcursor, defaults to ""
         :return:
         """
-        post_data = {
+        return await self.post("", self._sub_comments_operation(photo_id, rootCommentId, pcursor))
+
+    def _sub_comments_operation(self, photo_id: str, root_comment_id: str, pcursor: str = "") -> Dict:
+        return {
             "operationName": "visionSubCommentList",
             "variables": {
                 "photoId": photo_id,
                 "pcursor": pcursor,
-                "rootCommentId": rootCommentId,
+                "rootCommentId": root_comment_id,
             },
             "query": self.graphql.get("vision_sub_comment_list"),
         }
-        return await self.post("", post_data)
 
     async def get_creator_profile(self, userId: str) -> Dict:
         post_data = {
@@ -237,6 +347,8 @@ class KuaiShouClient(AbstractApiClient):
             return []
 
         result = []
+        # 还有更多二级评论的一级评论 id -> 下一页的游标，每一轮把所有一级评论的下一页合并到一次批量请求中
+        sub_comment_cursors: Dict[str, str] = {}
         for comment in comments:
             sub_comments = comment.get("subComments")
             if sub_comments and callback:
@@ -245,24 +357,30 @@ class KuaiShouClient(AbstractApiClient):
             sub_comment_pcursor = comment.get("subCommentsPcursor")
             if sub_comment_pcursor == "no_more":
                 continue
-
-            root_comment_id = comment.get("commentId")
-            sub_comment_pcursor = ""
-
-            while sub_comment_pcursor != "no_more":
-                comments_res = await self.get_video_sub_comments(
-                    photo_id, root_comment_id, sub_comment_pcursor
-                )
-                vision_sub_comment_list = comments_res.get("visionSubCommentList", {})
+            sub_comment_cursors[comment.get("commentId")] = ""
+
+        while sub_comment_cursors:
+            root_comment_ids = list(sub_comment_cursors.keys())
+            comments_res_list = await self.post_batch([
+                self._sub_comments_operation(photo_id, root_comment_id, sub_comment_cursors[root_comment_id])
+                for root_comment_id in root_comment_ids
+            ])
+            for root_comment_id, comments_res in zip(root_comment_ids, comments_res_list):
+                vision_sub_comment_list = (comments_res or {}).get("visionSubCommentList", {})
                 sub_comment_pcursor = vision_sub_comment_list.get("pcursor", "no_more")
+                if sub_comment_pcursor == "no_more":
+                    del sub_comment_cursors[root_comment_id]
+                else:
+                    sub_comment_cursors[root_comment_id] = sub_comment_pcursor
 
-                comments = vision_sub_comment_list.get("subComments", {})
-                if callback:
+                comments = vision_sub_comment_list.get("subComments", [])
+                if callback and comments:
                     await callback(photo_id, comments)
-                await asyncio.sleep(crawl_interval)
                 result.extend(comments)
+            await asyncio.sleep(crawl_interval)
         return result
 
+    @cache_response("creator_info")
     async def get_creator_info(self, user_id: str) -> Dict:
         """
         eg: https://www.kuaishou.com/profile/3x4jtnbfter525a
@@ -277,6 +395,7 @@ class KuaiShouClient(AbstractApiClient):
         user_id: str,
         crawl_interval: float = 1.0,
         callback: Optional[Callable] = None,
+        watermark: Optional[CreatorWatermark] = None,
     ) -> List[Dict]:
         """
         获取指定用户下的所有发过的帖子，该方法会一直查找一个用户下的所有帖子信息
@@ -284,6 +403,7 @@ class KuaiShouClient(AbstractApiClient):
             user_id: 用户ID
             crawl_interval: 爬取一次的延迟单位（秒）
             callback: 一次分页爬取结束后的更新回调函数
+            watermark: 增量爬取状态，翻页到已经爬取过的视频时停止
         Returns:
 
         """
@@ -305,6 +425,11 @@ class KuaiShouClient(AbstractApiClient):
             utils.logger.info(
                 f"[KuaiShouClient.get_all_videos_by_creator] got user_id:{user_id} videos len : {len(videos)}"
             )
+            if watermark:
+                # 视频的发布时间戳单位是毫秒
+                videos = watermark.filter_page(videos, lambda video: video.get("photo", {}).get("timestamp", 0) // 1000)
+                if watermark.reached:
+                    pcursor = "no_more"
 
             if callback:
                 await callback(videos)
@@ -20,9 +20,12 @@ from playwright.async_api import BrowserContext, BrowserType, Page, async_playwr
 
 import config
 from base.base_crawler import AbstractCrawler
-from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
+from proxy.proxy_ip_pool import IpInfoModel, ProxyIpPool, create_ip_pool
 from store import kuaishou as kuaishou_store
 from tools import utils
+from tools.creator_scheduler import CreatorScheduler, crawl_semaphore, track_creator_pages
+from tools.concurrency_governor import stage_concurrency
+from tools.watermark import get_creator_watermark
 from var import comment_tasks_var, crawler_type_var, source_keyword_var
 
 from .client import KuaiShouClient
@@ -40,7 +43,7 @@ class KuaishouCrawler(AbstractCrawler):
         self.user_agent = utils.get_user_agent()
 
     async def start(self):
-        playwright_proxy_format, httpx_proxy_format = None, None
+        ip_proxy_pool, playwright_proxy_format, httpx_proxy_format = None, None, None
         if config.ENABLE_IP_PROXY:
             ip_proxy_pool = await create_ip_pool(
                 config.IP_PROXY_POOL_COUNT, enable_validate_ip=True
@@ -62,7 +65,7 @@ class KuaishouCrawler(AbstractCrawler):
             await self.context_page.goto(f"{self.index_url}?isHome=1")
 
             # Create a client to interact with the kuaishou website.
-            self.ks_client = await self.create_ks_client(httpx_proxy_format)
+            self.ks_client = await self.create_ks_client(httpx_proxy_format, ip_proxy_pool)
             if not await self.ks_client.pong():
                 login_obj = KuaishouLogin(
                     login_type=config.LOGIN_TYPE,
@@ -143,38 +146,25 @@ class KuaishouCrawler(AbstractCrawler):
 
     async def get_specified_videos(self):
         """Get the information and comments of the specified post"""
-        semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
-        task_list = [
-            self.get_video_info_task(video_id=video_id, semaphore=semaphore)
-            for video_id in config.KS_SPECIFIED_ID_LIST
-        ]
-        video_details = await asyncio.gather(*task_list)
-        for video_detail in video_details:
-            if video_detail is not None:
-                await kuaishou_store.update_kuaishou_video(video_detail)
+        await self.fetch_video_details(config.KS_SPECIFIED_ID_LIST)
         await self.batch_get_video_comments(config.KS_SPECIFIED_ID_LIST)
 
-    async def get_video_info_task(
-        self, video_id: str, semaphore: asyncio.Semaphore
-    ) -> Optional[Dict]:
-        """Get video detail task"""
-        async with semaphore:
-            try:
-                result = await self.ks_client.get_video_info(video_id)
-                utils.logger.info(
-                    f"[KuaishouCrawler.get_video_info_task] Get video_id:{video_id} info result: {result} ..."
-                )
-                return result.get("visionVideoDetail")
-            except DataFetchError as ex:
-                utils.logger.error(
-                    f"[KuaishouCrawler.get_video_info_task] Get video detail error: {ex}"
-                )
-                return None
-            except KeyError as ex:
+    async def fetch_video_details(self, video_ids: List[str]):
+        """
+        批量获取视频详情并保存，多个视频详情合并到一次 GraphQL 请求中
+        """
+        video_details = await self.ks_client.get_video_infos(video_ids)
+        for video_id, video_detail in zip(video_ids, video_details):
+            if video_detail is None:
                 utils.logger.error(
-                    f"[KuaishouCrawler.get_video_info_task] have not fund video detail video_id:{video_id}, err: {ex}"
+                    f"[KuaishouCrawler.fetch_video_details] have not fund video detail video_id:{video_id}"
                 )
-                return None
+                continue
+            utils.logger.info(
+                "[KuaishouCrawler.fetch_video_details] Get video_id:%s info result: %s ...",
+                video_id, utils.truncate(video_detail)
+            )
+            await kuaishou_store.update_kuaishou_video(video_detail)
 
     async def batch_get_video_comments(self, video_id_list: List[str]):
         """
@@ -188,10 +178,8 @@ class KuaishouCrawler(AbstractCrawler):
             )
             return
 
-        utils.logger.info(
-            f"[KuaishouCrawler.batch_get_video_comments] video ids:{video_id_list}"
-        )
-        semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+        utils.logger.info("[KuaishouCrawler.batch_get_video_comments] video ids:%s", utils.truncate(video_id_list))
+        semaphore = crawl_semaphore()
         task_list: List[Task] = []
         for video_id in video_id_list:
             task = asyncio.create_task(
@@ -254,7 +242,7 @@ class KuaishouCrawler(AbstractCrawler):
         }
         return playwright_proxy, httpx_proxy
 
-    async def create_ks_client(self, httpx_proxy: Optional[str]) -> KuaiShouClient:
+    async def create_ks_client(self, httpx_proxy: Optional[str], ip_pool: Optional[ProxyIpPool] = None) -> KuaiShouClient:
         """Create ks client"""
         utils.logger.info(
             "[KuaishouCrawler.create_ks_client] Begin create kuaishou API client ..."
@@ -264,6 +252,7 @@ class KuaishouCrawler(AbstractCrawler):
         )
         ks_client_obj = KuaiShouClient(
             proxies=httpx_proxy,
+            ip_pool=ip_pool,
             headers={
                 "User-Agent": self.user_agent,
                 "Cookie": cookie_str,
@@ -312,38 +301,37 @@ class KuaishouCrawler(AbstractCrawler):
         utils.logger.info(
             "[KuaiShouCrawler.get_creators_and_videos] Begin get kuaishou creators"
         )
-        for user_id in config.KS_CREATOR_ID_LIST:
-            # get creator detail info from web html content
-            createor_info: Dict = await self.ks_client.get_creator_info(user_id=user_id)
-            if createor_info:
-                await kuaishou_store.save_creator(user_id, creator=createor_info)
+        creator_scheduler = CreatorScheduler(config.CREATOR_CONCURRENCY_NUM, stage_concurrency())
+        await creator_scheduler.run(config.KS_CREATOR_ID_LIST, self.get_creator_and_videos)
 
-            # Get all video information of the creator
-            all_video_list = await self.ks_client.get_all_videos_by_creator(
-                user_id=user_id,
-                crawl_interval=random.random(),
-                callback=self.fetch_creator_video_detail,
-            )
+    async def get_creator_and_videos(self, user_id: str) -> None:
+        """Get one creator's info, videos and comments"""
+        # get creator detail info from web html content
+        createor_info: Dict = await self.ks_client.get_creator_info(user_id=user_id)
+        if createor_info:
+            await kuaishou_store.save_creator(user_id, creator=createor_info)
 
-            video_ids = [
-                video_item.get("photo", {}).get("id") for video_item in all_video_list
-            ]
-            await self.batch_get_video_comments(video_ids)
+        # Get all video information of the creator
+        watermark = get_creator_watermark(user_id)
+        all_video_list = await self.ks_client.get_all_videos_by_creator(
+            user_id=user_id,
+            crawl_interval=random.random(),
+            callback=track_creator_pages(self.fetch_creator_video_detail),
+            watermark=watermark,
+        )
+
+        video_ids = [
+            video_item.get("photo", {}).get("id") for video_item in all_video_list
+        ]
+        await self.batch_get_video_comments(video_ids)
+        if watermark:
+            watermark.commit()
 
     async def fetch_creator_video_detail(self, video_list: List[Dict]):
         """
         Concurrently obtain the specified post list and save the data
         """
-        semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
-        task_list = [
-            self.get_video_info_task(post_item.get("photo", {}).get("id"), semaphore)
-            for post_item in video_list
-        ]
-
-        video_details = await asyncio.gather(*task_list)
-        for video_detail in video_details:
-            if video_detail is not None:
-                await kuaishou_store.update_kuaishou_video(video_detail)
+        await self.fetch_video_details([post_item.get("photo", {}).get("id") for post_item in video_list])
 
     async def close(self):
         """Close browser context"""
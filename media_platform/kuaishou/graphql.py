@@ -11,23 +11,48 @@
 
 # 快手的数据传输是基于GraphQL实现的
 # 这个类负责获取一些GraphQL的schema
+import os
+import re
 from typing import Dict
 
+GRAPHQL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "graphql")
+
+# GraphQL 中逗号、空白和 # 注释都是无意义的，这些标点两侧的空白可以去掉
+_COMMENT_PATTERN = re.compile(r"#[^\n]*")
+_IGNORED_PATTERN = re.compile(r"[\s,]+")
+_PUNCTUATOR_SPACE_PATTERN = re.compile(r" ?([{}()\[\]:=!@$|&]) ?")
+
+
+def minify_graphql(query: str) -> str:
+    """
+    压缩 GraphQL 查询文档，去掉注释和多余的空白，快手的查询文档中没有字符串字面量，不需要处理字符串内的空白
+    Args:
+        query: 查询文档
+
+    Returns:
+
+    """
+    query = _COMMENT_PATTERN.sub("", query)
+    query = _IGNORED_PATTERN.sub(" ", query).strip()
+    return _PUNCTUATOR_SPACE_PATTERN.sub(r"\1", query)
+
 
 class KuaiShouGraphQL:
+    # 查询文档在进程内只读取和压缩一次，所有实例共用
     graphql_queries: Dict[str, str]= {}
 
     def __init__(self):
-        self.graphql_dir = "media_platform/kuaishou/graphql/"
-        self.load_graphql_queries()
+        self.graphql_dir = GRAPHQL_DIR
+        if not self.graphql_queries:
+            self.load_graphql_queries()
 
     def load_graphql_queries(self):
         graphql_files = ["search_query.graphql", "video_detail.graphql", "comment_list.graphql", "vision_profile.graphql","vision_profile_photo_list.graphql","vision_profile_user_list.graphql","vision_sub_comment_list.graphql"]
 
         for file in graphql_files:
-            with open(self.graphql_dir + file, mode="r") as f:
+            with open(os.path.join(self.graphql_dir, file), mode="r", encoding="utf-8") as f:
                 query_name = file.split(".")[0]
-                self.graphql_queries[query_name] = f.read()
+                self.graphql_queries[query_name] = minify_graphql(f.read())
 
     def get(self, query_name: str) -> str:
         return self.graphql_queries.get(query_name, "Query not found")
@@ -10,19 +10,27 @@
 
 
 import asyncio
+import functools
 import json
-from typing import Any, Callable, Dict, List, Optional, Union
+import math
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
 from urllib.parse import urlencode
 
 import httpx
 from playwright.async_api import BrowserContext
-from tenacity import RetryError, retry, stop_after_attempt, wait_fixed
 
 import config
 from base.base_crawler import AbstractApiClient
 from model.m_baidu_tieba import TiebaComment, TiebaCreator, TiebaNote
 from proxy.proxy_ip_pool import ProxyIpPool
 from tools import utils
+from tools.concurrency_governor import mark_request_blocked
+from tools.creator_scheduler import crawl_semaphore
+from tools.metrics import record_response_status
+from tools.parse_executor import parse_executor
+from tools.response_cache import cache_response
+from tools.retry_policy import ErrorKind, classify_error, retry_policy
+from tools.watermark import CreatorWatermark
 
 from .field import SearchNoteType, SearchSortType
 from .help import TieBaExtractor
@@ -45,7 +53,7 @@ class BaiduTieBaClient(AbstractApiClient):
         self._page_extractor = TieBaExtractor()
         self.default_ip_proxy = default_ip_proxy
 
-    @retry(stop=stop_after_attempt(3), wait=wait_fixed(1))
+    @retry_policy()
     async def request(self, method, url, return_ori_content=False, proxies=None, **kwargs) -> Union[str, Any]:
         """
         封装httpx的公共请求方法，对请求响应做一些处理
@@ -65,14 +73,20 @@ class BaiduTieBaClient(AbstractApiClient):
                 method, url, timeout=self.timeout,
                 headers=self.headers, **kwargs
             )
+        record_response_status(response.status_code)
 
         if response.status_code != 200:
             utils.logger.error(f"Request failed, method: {method}, url: {url}, status code: {response.status_code}")
-            utils.logger.error(f"Request failed, response: {response.text}")
-            raise Exception(f"Request failed, method: {method}, url: {url}, status code: {response.status_code}")
+            utils.logger.error("Request failed, response: %s", utils.truncate(response.text))
+            if response.status_code == 403 or 300 <= response.status_code < 400:
+                # IP 被封或者跳转到安全验证页面，由 get 换代理IP重新请求
+                mark_request_blocked()
+                raise Exception(f"ip blocked, method: {method}, url: {url}, status code: {response.status_code}")
+            response.raise_for_status()
 
         if response.text == "" or response.text == "blocked":
-            utils.logger.error(f"request params incrr, response.text: {response.text}")
+            utils.logger.error("request params incrr, response.text: %s", utils.truncate(response.text))
+            mark_request_blocked()
             raise Exception("account blocked")
 
         if return_ori_content:
@@ -100,7 +114,9 @@ class BaiduTieBaClient(AbstractApiClient):
                                      return_ori_content=return_ori_content,
                                      **kwargs)
             return res
-        except RetryError as e:
+        except Exception as e:
+            if classify_error(e) == ErrorKind.PERMANENT:
+                raise
             if self.ip_pool:
                 proxie_model = await self.ip_pool.get_proxy()
                 _, proxies = utils.format_proxy_info(proxie_model)
@@ -128,6 +144,22 @@ class BaiduTieBaClient(AbstractApiClient):
         return await self.request(method="POST", url=f"{self._host}{uri}",
                                   data=json_str, **kwargs)
 
+    async def switch_lane(self) -> bool:
+        """
+        当前代理IP被熔断时从代理池中换一个代理IP
+        Returns:
+
+        """
+        if not self.ip_pool:
+            return False
+        try:
+            proxie_model = await self.ip_pool.get_proxy()
+        except Exception as e:
+            utils.logger.error(f"[BaiduTieBaClient.switch_lane] get proxy from ip pool err: {e}")
+            return False
+        _, self.default_ip_proxy = utils.format_proxy_info(proxie_model)
+        return True
+
     async def pong(self) -> bool:
         """
         用于检查登录态是否失效了
@@ -138,7 +170,7 @@ class BaiduTieBaClient(AbstractApiClient):
         try:
             uri = "/mo/q/sync"
             res: Dict = await self.get(uri)
-            utils.logger.info(f"[BaiduTieBaClient.pong] res: {res}")
+            utils.logger.info("[BaiduTieBaClient.pong] res: %s", utils.truncate(res))
             if res and res.get("no") == 0:
                 ping_flag = True
             else:
@@ -188,8 +220,9 @@ class BaiduTieBaClient(AbstractApiClient):
             "only_thread": note_type.value
         }
         page_content = await self.get(uri, params=params, return_ori_content=True)
-        return self._page_extractor.extract_search_note_list(page_content)
+        return await parse_executor.parse(self._page_extractor.extract_search_note_list, page_content)
 
+    @cache_response("content_detail")
     async def get_note_by_id(self, note_id: str) -> TiebaNote:
         """
         根据帖子ID获取帖子详情
@@ -201,7 +234,7 @@ class BaiduTieBaClient(AbstractApiClient):
         """
         uri = f"/p/{note_id}"
         page_content = await self.get(uri, return_ori_content=True)
-        return self._page_extractor.extract_note_detail(page_content)
+        return await parse_executor.parse(self._page_extractor.extract_note_detail, page_content)
 
     async def get_note_all_comments(self, note_detail: TiebaNote, crawl_interval: float = 1.0,
                                     callback: Optional[Callable] = None,
@@ -209,6 +242,8 @@ class BaiduTieBaClient(AbstractApiClient):
                                     ) -> List[TiebaComment]:
         """
         获取指定帖子下的所有一级评论，该方法会一直查找一个帖子下的所有评论信息
+        帖子详情中已经有评论总页数，多个分页并发请求(最多 TIEBA_COMMENT_PAGE_CONCURRENCY 个)，结果按页码顺序处理，
+        按第一页的评论数估算还需要的页数，达到 max_count 之后不再请求多余的分页
         Args:
             note_detail: 帖子详情对象
             crawl_interval: 爬取一次笔记的延迟单位（秒）
@@ -219,31 +254,46 @@ class BaiduTieBaClient(AbstractApiClient):
         """
         uri = f"/p/{note_detail.note_id}"
         result: List[TiebaComment] = []
+        concurrency = max(config.TIEBA_COMMENT_PAGE_CONCURRENCY, 1)
+        semaphore = asyncio.Semaphore(concurrency)
         current_page = 1
-        while note_detail.total_replay_page >= current_page and len(result) < max_count:
-            params = {
-                "pn": current_page
-            }
-            page_content = await self.get(uri, params=params, return_ori_content=True)
-            comments = self._page_extractor.extract_tieba_note_parment_comments(page_content,
-                                                                                note_id=note_detail.note_id)
-            if not comments:
-                break
-            if len(result) + len(comments) > max_count:
-                comments = comments[:max_count - len(result)]
-            if callback:
-                await callback(note_detail.note_id, comments)
-            result.extend(comments)
-            # 获取所有子评论
-            await self.get_comments_all_sub_comments(comments, crawl_interval=crawl_interval, callback=callback)
-            await asyncio.sleep(crawl_interval)
-            current_page += 1
+        page_size = 0
+        is_end = False
+        while not is_end and note_detail.total_replay_page >= current_page and len(result) < max_count:
+            need_pages = math.ceil((max_count - len(result)) / page_size) if page_size else 1
+            page_numbers = range(current_page, min(current_page + min(need_pages, concurrency),
+                                                   note_detail.total_replay_page + 1))
+            pages_comments = await self._gather_pages(
+                [functools.partial(self._get_note_comment_page, uri, note_detail.note_id, page_number)
+                 for page_number in page_numbers],
+                semaphore, crawl_interval
+            )
+            current_page += len(page_numbers)
+            for comments in pages_comments:
+                if not comments:
+                    is_end = True
+                    break
+                page_size = page_size or len(comments)
+                if len(result) + len(comments) > max_count:
+                    comments = comments[:max_count - len(result)]
+                if callback:
+                    await callback(note_detail.note_id, comments)
+                result.extend(comments)
+                # 获取所有子评论
+                await self.get_comments_all_sub_comments(comments, crawl_interval=crawl_interval, callback=callback)
+                if len(result) >= max_count:
+                    break
         return result
 
+    async def _get_note_comment_page(self, uri: str, note_id: str, page_number: int) -> List[TiebaComment]:
+        page_content = await self.get(uri, params={"pn": page_number}, return_ori_content=True)
+        return await parse_executor.parse(self._page_extractor.extract_tieba_note_parment_comments,
+                                          page_content, note_id=note_id)
+
     async def get_comments_all_sub_comments(self, comments: List[TiebaComment], crawl_interval: float = 1.0,
                                             callback: Optional[Callable] = None) -> List[TiebaComment]:
         """
-        获取指定评论下的所有子评论
+        获取指定评论下的所有子评论，所有楼层的楼中楼分页并发请求(最多 TIEBA_COMMENT_PAGE_CONCURRENCY 个)，结果按楼层、页码顺序处理
         Args:
             comments: 评论列表
             crawl_interval: 爬取一次笔记的延迟单位（秒）
@@ -252,7 +302,6 @@ class BaiduTieBaClient(AbstractApiClient):
         Returns:
 
         """
-        uri = "/p/comment"
         if not config.ENABLE_GET_SUB_COMMENTS:
             return []
 
@@ -260,33 +309,63 @@ class BaiduTieBaClient(AbstractApiClient):
         # if self.headers.get("Cookies") == "" or not self.pong():
         #     raise Exception(f"[BaiduTieBaClient.pong] Cookies is empty, please login first...")
 
+        # 每页 10 条楼中楼
+        page_requests = [
+            (parment_comment, page_number)
+            for parment_comment in comments
+            for page_number in range(1, math.ceil(parment_comment.sub_comment_count / 10) + 1)
+        ]
+        pages_sub_comments = await self._gather_pages(
+            [functools.partial(self._get_sub_comment_page, parment_comment, page_number)
+             for parment_comment, page_number in page_requests],
+            asyncio.Semaphore(max(config.TIEBA_COMMENT_PAGE_CONCURRENCY, 1)), crawl_interval
+        )
+
         all_sub_comments: List[TiebaComment] = []
-        for parment_comment in comments:
-            if parment_comment.sub_comment_count == 0:
+        for (parment_comment, _), sub_comments in zip(page_requests, pages_sub_comments):
+            if not sub_comments:
                 continue
-
-            current_page = 1
-            max_sub_page_num = parment_comment.sub_comment_count // 10 + 1
-            while max_sub_page_num >= current_page:
-                params = {
-                    "tid": parment_comment.note_id,  # 帖子ID
-                    "pid": parment_comment.comment_id,  # 父级评论ID
-                    "fid": parment_comment.tieba_id,  # 贴吧ID
-                    "pn": current_page  # 页码
-                }
-                page_content = await self.get(uri, params=params, return_ori_content=True)
-                sub_comments = self._page_extractor.extract_tieba_note_sub_comments(page_content,
-                                                                                    parent_comment=parment_comment)
-
-                if not sub_comments:
-                    break
-                if callback:
-                    await callback(parment_comment.note_id, sub_comments)
-                all_sub_comments.extend(sub_comments)
-                await asyncio.sleep(crawl_interval)
-                current_page += 1
+            if callback:
+                await callback(parment_comment.note_id, sub_comments)
+            all_sub_comments.extend(sub_comments)
         return all_sub_comments
 
+    async def _get_sub_comment_page(self, parment_comment: TiebaComment, page_number: int) -> List[TiebaComment]:
+        params = {
+            "tid": parment_comment.note_id,  # 帖子ID
+            "pid": parment_comment.comment_id,  # 父级评论ID
+            "fid": parment_comment.tieba_id,  # 贴吧ID
+            "pn": page_number  # 页码
+        }
+        page_content = await self.get("/p/comment", params=params, return_ori_content=True)
+        return await parse_executor.parse(self._page_extractor.extract_tieba_note_sub_comments,
+                                          page_content, parent_comment=parment_comment)
+
+    @staticmethod
+    async def _gather_pages(page_fetchers: List[Callable[[], Awaitable]], semaphore: Union[asyncio.Semaphore, Any],
+                            crawl_interval: float = 0) -> List:
+        """
+        并发请求多个分页，同时进行的请求数量由 semaphore 限制，每个请求结束后等待 crawl_interval 再让出名额，
+        结果按传入的顺序返回
+        Args:
+            page_fetchers: 请求一个分页的协程函数列表
+            semaphore: 并发限制
+            crawl_interval: 请求间隔（秒）
+
+        Returns:
+
+        """
+
+        async def fetch(page_fetcher: Callable[[], Awaitable]):
+            async with semaphore:
+                try:
+                    return await page_fetcher()
+                finally:
+                    if crawl_interval:
+                        await asyncio.sleep(crawl_interval)
+
+        return await asyncio.gather(*[fetch(page_fetcher) for page_fetcher in page_fetchers])
+
     async def get_notes_by_tieba_name(self, tieba_name: str, page_num: int) -> List[TiebaNote]:
         """
         根据贴吧名称获取帖子列表
@@ -299,8 +378,9 @@ class BaiduTieBaClient(AbstractApiClient):
         """
         uri = f"/f?kw={tieba_name}&pn={page_num}"
         page_content = await self.get(uri, return_ori_content=True)
-        return self._page_extractor.extract_tieba_note_list(page_content)
+        return await parse_executor.parse(self._page_extractor.extract_tieba_note_list, page_content)
 
+    @cache_response("creator_info")
     async def get_creator_info_by_url(self, creator_url: str) -> str:
         """
         根据创作者ID获取创作者信息
@@ -337,6 +417,7 @@ class BaiduTieBaClient(AbstractApiClient):
                                                  callback: Optional[Callable] = None,
                                                  max_note_count: int = 0,
                                                  creator_page_html_content: str = None,
+                                                 watermark: Optional[CreatorWatermark] = None,
                                                  ) -> List[TiebaNote]:
 
         """
@@ -347,6 +428,7 @@ class BaiduTieBaClient(AbstractApiClient):
             callback: 一次笔记爬取结束后的回调函数，是一个awaitable类型的函数
             max_note_count: 帖子最大获取数量，如果为0则获取所有
             creator_page_html_content: 创作者主页HTML内容
+            watermark: 增量爬取状态，翻页到已经爬取过的帖子时停止，帖子列表没有发布时间，按帖子ID的先后判断
 
         Returns:
 
@@ -362,15 +444,18 @@ class BaiduTieBaClient(AbstractApiClient):
             utils.logger.info(
                 f"[BaiduTieBaClient.get_all_notes_by_creator] got user_name:{user_name} thread_id_list len : {len(thread_id_list)}"
             )
-            note_detail_task = [
-                self.get_note_by_id(thread_id) for thread_id in thread_id_list
-            ]
-            notes = await asyncio.gather(*note_detail_task)
+            if watermark:
+                # 在获取帖子详情之前过滤，已经爬取过的帖子不再请求详情
+                thread_id_list = watermark.filter_page(thread_id_list, int, by_publish_time=False)
+            notes = await self._gather_pages(
+                [functools.partial(self.get_note_by_id, thread_id) for thread_id in thread_id_list],
+                crawl_semaphore()
+            )
             if callback:
                 await callback(notes)
             result.extend(notes)
 
-        notes_has_more = 1
+        notes_has_more = 0 if watermark and watermark.reached else 1
         page_number = 1
         page_per_count = 20
         total_get_count = 0
@@ -378,16 +463,24 @@ class BaiduTieBaClient(AbstractApiClient):
             notes_res = await self.get_notes_by_creator(user_name, page_number)
             if not notes_res or notes_res.get("no") != 0:
                 utils.logger.error(
-                    f"[WeiboClient.get_notes_by_creator] got user_name:{user_name} notes failed, notes_res: {notes_res}")
+                    "[WeiboClient.get_notes_by_creator] got user_name:%s notes failed, notes_res: %s",
+                    user_name, utils.truncate(notes_res)
+                )
                 break
             notes_data = notes_res.get("data")
             notes_has_more = notes_data.get("has_more")
             notes = notes_data["thread_list"]
             utils.logger.info(
                 f"[WeiboClient.get_all_notes_by_creator] got user_name:{user_name} notes len : {len(notes)}")
-
-            note_detail_task = [self.get_note_by_id(note['thread_id']) for note in notes]
-            notes = await asyncio.gather(*note_detail_task)
+            if watermark:
+                notes = watermark.filter_page(notes, lambda note: int(note["thread_id"]), by_publish_time=False)
+                if watermark.reached:
+                    notes_has_more = 0
+
+            notes = await self._gather_pages(
+                [functools.partial(self.get_note_by_id, note['thread_id']) for note in notes],
+                crawl_semaphore()
+            )
             if callback:
                 await callback(notes)
             await asyncio.sleep(crawl_interval)
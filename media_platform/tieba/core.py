@@ -24,7 +24,11 @@ from model.m_baidu_tieba import TiebaCreator, TiebaNote
 from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
 from store import tieba as tieba_store
 from tools import utils
+from tools.creator_scheduler import CreatorScheduler, crawl_semaphore, track_creator_pages
+from tools.concurrency_governor import stage_concurrency
 from tools.crawler_util import format_proxy_info
+from tools.parse_executor import parse_executor
+from tools.watermark import get_creator_watermark
 from var import crawler_type_var, source_keyword_var
 
 from .client import BaiduTieBaClient
@@ -155,7 +159,7 @@ class TieBaCrawler(AbstractCrawler):
         Returns:
 
         """
-        semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+        semaphore = crawl_semaphore()
         task_list = [
             self.get_note_detail_async_task(note_id=note_id, semaphore=semaphore) for note_id in note_id_list
         ]
@@ -206,7 +210,7 @@ class TieBaCrawler(AbstractCrawler):
         if not config.ENABLE_GET_COMMENTS:
             return
 
-        semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+        semaphore = crawl_semaphore()
         task_list: List[Task] = []
         for note_detail in note_detail_list:
             task = asyncio.create_task(self.get_comments_async_task(note_detail, semaphore), name=note_detail.note_id)
@@ -239,30 +243,49 @@ class TieBaCrawler(AbstractCrawler):
 
         """
         utils.logger.info("[WeiboCrawler.get_creators_and_notes] Begin get weibo creators")
-        for creator_url in config.TIEBA_CREATOR_URL_LIST:
-            creator_page_html_content = await self.tieba_client.get_creator_info_by_url(creator_url=creator_url)
-            creator_info: TiebaCreator = self._page_extractor.extract_creator_info(creator_page_html_content)
-            if creator_info:
-                utils.logger.info(f"[WeiboCrawler.get_creators_and_notes] creator info: {creator_info}")
-                if not creator_info:
-                    raise Exception("Get creator info error")
-
-                await tieba_store.save_creator(user_info=creator_info)
-
-                # Get all note information of the creator
-                all_notes_list = await self.tieba_client.get_all_notes_by_creator_user_name(
-                    user_name=creator_info.user_name,
-                    crawl_interval=0,
-                    callback=tieba_store.batch_update_tieba_notes,
-                    max_note_count=config.CRAWLER_MAX_NOTES_COUNT,
-                    creator_page_html_content=creator_page_html_content,
-                )
+        creator_scheduler = CreatorScheduler(config.CREATOR_CONCURRENCY_NUM, stage_concurrency())
+        await creator_scheduler.run(config.TIEBA_CREATOR_URL_LIST, self.get_creator_and_notes)
 
-                await self.batch_get_note_comments(all_notes_list)
+    async def get_creator_and_notes(self, creator_url: str) -> None:
+        """
+        Get one creator's information and their notes and comments
+        Args:
+            creator_url: creator home page url
 
-            else:
-                utils.logger.error(
-                    f"[WeiboCrawler.get_creators_and_notes] get creator info error, creator_url:{creator_url}")
+        Returns:
+
+        """
+        creator_page_html_content = await self.tieba_client.get_creator_info_by_url(creator_url=creator_url)
+        creator_info: TiebaCreator = await parse_executor.parse(self._page_extractor.extract_creator_info,
+                                                                creator_page_html_content)
+        if creator_info:
+            utils.logger.info(
+                "[BaiduTieBaCrawler.get_creator_and_notes] creator info: %s",
+                utils.truncate(creator_info)
+            )
+            if not creator_info:
+                raise Exception("Get creator info error")
+
+            await tieba_store.save_creator(user_info=creator_info)
+
+            # Get all note information of the creator
+            watermark = get_creator_watermark(creator_info.user_name)
+            all_notes_list = await self.tieba_client.get_all_notes_by_creator_user_name(
+                user_name=creator_info.user_name,
+                crawl_interval=0,
+                callback=track_creator_pages(tieba_store.batch_update_tieba_notes),
+                max_note_count=config.CRAWLER_MAX_NOTES_COUNT,
+                creator_page_html_content=creator_page_html_content,
+                watermark=watermark,
+            )
+
+            await self.batch_get_note_comments(all_notes_list)
+            if watermark:
+                watermark.commit()
+
+        else:
+            utils.logger.error(
+                f"[BaiduTieBaCrawler.get_creator_and_notes] get creator info error, creator_url:{creator_url}")
 
     async def launch_browser(
             self,
@@ -16,21 +16,112 @@ import re
 from typing import Dict, List, Tuple
 from urllib.parse import parse_qs, unquote
 
+from lxml import etree
 from parsel import Selector
 
 from constant import baidu_tieba as const
 from model.m_baidu_tieba import TiebaComment, TiebaCreator, TiebaNote
 from tools import utils
+from tools.metrics import metrics_registry
 
 GENDER_MALE = "sex_male"
 GENDER_FEMALE = "sex_female"
 
+# XPath 表达式在导入时编译一次，解析时直接在 lxml 节点上执行，避免每次调用都重新编译表达式和创建 Selector 对象
+_SEARCH_POST = etree.XPath("//div[@class='s_post']")
+_SEARCH_TITLE_TID = etree.XPath(".//span[@class='p_title']/a/@data-tid")
+_SEARCH_TITLE_TEXT = etree.XPath(".//span[@class='p_title']/a/text()")
+_SEARCH_TITLE_HREF = etree.XPath(".//span[@class='p_title']/a/@href")
+_SEARCH_CONTENT_TEXT = etree.XPath(".//div[@class='p_content']/text()")
+_SEARCH_USER_NICKNAME = etree.XPath(".//a[starts-with(@href, '/home/main')]/font/text()")
+_SEARCH_USER_HREF = etree.XPath(".//a[starts-with(@href, '/home/main')]/@href")
+_SEARCH_FORUM_TEXT = etree.XPath(".//a[@class='p_forum']/font/text()")
+_SEARCH_FORUM_HREF = etree.XPath(".//a[@class='p_forum']/@href")
+_SEARCH_DATE_TEXT = etree.XPath(".//font[@class='p_green p_date']/text()")
+
+_TIEBA_NAME_TEXT = etree.XPath("//a[@class='card_title_fname']/text()")
+_TIEBA_NAME_HREF = etree.XPath("//a[@class='card_title_fname']/@href")
+
+_THREAD_LIST_ITEM = etree.XPath("//ul[@id='thread_list']/li")
+_THREAD_TITLE_TEXT = etree.XPath(".//a[@class='j_th_tit ']/text()")
+_THREAD_ABSTRACT_TEXT = etree.XPath(".//div[@class='threadlist_abs threadlist_abs_onlyline ']/text()")
+_THREAD_AUTHOR_HREF = etree.XPath(".//a[@class='frs-author-name j_user_card ']/@href")
+
+_FIRST_FLOOR = etree.XPath("//div[@class='p_postlist'][1]")
+_ONLY_VIEW_AUTHOR_HREF = etree.XPath("//*[@id='lzonly_cntn']/@href")
+_THREAD_REPLY_NUM_NODE = etree.XPath("//div[@id='thread_theme_5']//li[@class='l_reply_num']//span[@class='red']")
+_POST_TAIL_WRAP = etree.XPath(".//div[@class='post-tail-wrap']")
+_TITLE_TEXT = etree.XPath("//title/text()")
+_META_DESCRIPTION = etree.XPath("//meta[@name='description']/@content")
+
+_COMMENT_POST = etree.XPath("//div[@class='l_post l_post_bright j_l_post clearfix  ']")
+_AUTHOR_FACE_HREF = etree.XPath(".//a[@class='p_author_face ']/@href")
+_AUTHOR_FACE_IMG_SRC = etree.XPath(".//a[@class='p_author_face ']/img/@src")
+_AUTHOR_NAME_TEXT = etree.XPath(".//a[@class='p_author_name j_user_card']/text()")
+
+# 楼中楼第一条评论的 class 多了 first_no_border，合并成一个表达式只扫描一遍文档
+_SUB_COMMENT_ITEM = etree.XPath(
+    "//li[@class='lzl_single_post j_lzl_s_p first_no_border' or @class='lzl_single_post j_lzl_s_p ']"
+)
+_SUB_COMMENT_USER = etree.XPath("./a[@class='j_user_card lzl_p_p']")
+_SUB_COMMENT_CONTENT = etree.XPath(".//span[@class='lzl_content_main']")
+_SUB_COMMENT_TIME_TEXT = etree.XPath(".//span[@class='lzl_time']/text()")
+_TEXT = etree.XPath("./text()")
+_HREF = etree.XPath("./@href")
+_IMG_SRC = etree.XPath("./img/@src")
+
+_CREATOR_USER_LINK_HREF = etree.XPath("//p[@class='space']/a/@href")
+_CREATOR_USERDATA = etree.XPath("//div[@class='userinfo_userdata']")
+_CREATOR_CONCERN_NUM = etree.XPath("//span[@class='concern_num']")
+_CREATOR_USERNAME_TEXT = etree.XPath(".//span[@class='userinfo_username ']/text()")
+_CREATOR_AVATAR_SRC = etree.XPath(".//div[@class='userinfo_left_head']//img/@src")
+
+_CREATOR_THREAD_HREF = etree.XPath("//ul[@class='new_list clearfix']//div[@class='thread_name']/a[1]/@href")
+
+_PUB_TIME_PATTERN = re.compile(r'<span class="tail-info">(\d{4}-\d{2}-\d{2} \d{2}:\d{2})</span>')
+_IP_PATTERN = re.compile(r'IP属地:(\S+)</span>')
+_CONCERN_NUM_PATTERN = re.compile(r'<span class="concern_num">\(<a[^>]*>(\d+)</a>\)</span>')
+_REGISTRATION_DURATION_PATTERN = re.compile(r'<span>吧龄:(\S+)</span>')
+
+
+def _parse_html(page_content: str) -> etree._Element:
+    """
+    整个页面只解析一次，使用和 parsel.Selector 相同的解析器配置
+    """
+    return Selector(text=page_content).root
+
+
+def _to_str(value) -> str:
+    if isinstance(value, etree._Element):
+        return etree.tostring(value, method="html", encoding="unicode", with_tail=False)
+    return str(value)
+
+
+def _get(xpath: etree.XPath, node: etree._Element, default: str = "") -> str:
+    """
+    等同于 Selector.xpath(...).get(default)
+    """
+    result = xpath(node)
+    return _to_str(result[0]) if result else default
+
+
+def _get_from_nodes(xpath: etree.XPath, nodes: List[etree._Element], default: str = "") -> str:
+    """
+    等同于 SelectorList.xpath(...).get(default)
+    """
+    for node in nodes:
+        result = xpath(node)
+        if result:
+            return _to_str(result[0])
+    return default
+
 
 class TieBaExtractor:
     def __init__(self):
         pass
 
     @staticmethod
+    @metrics_registry.timed("mediacrawler_extract_seconds", platform="tieba")
     def extract_search_note_list(page_content: str) -> List[TiebaNote]:
         """
         提取贴吧帖子列表，这里提取的关键词搜索结果页的数据，还缺少帖子的回复数和回复页等数据
@@ -40,26 +131,21 @@ class TieBaExtractor:
         Returns:
             包含帖子信息的字典列表
         """
-        xpath_selector = "//div[@class='s_post']"
-        post_list = Selector(text=page_content).xpath(xpath_selector)
         result: List[TiebaNote] = []
-        for post in post_list:
-            tieba_note = TiebaNote(note_id=post.xpath(".//span[@class='p_title']/a/@data-tid").get(default='').strip(),
-                                   title=post.xpath(".//span[@class='p_title']/a/text()").get(default='').strip(),
-                                   desc=post.xpath(".//div[@class='p_content']/text()").get(default='').strip(),
-                                   note_url=const.TIEBA_URL + post.xpath(".//span[@class='p_title']/a/@href").get(
-                                       default=''),
-                                   user_nickname=post.xpath(".//a[starts-with(@href, '/home/main')]/font/text()").get(
-                                       default='').strip(), user_link=const.TIEBA_URL + post.xpath(
-                    ".//a[starts-with(@href, '/home/main')]/@href").get(default=''),
-                                   tieba_name=post.xpath(".//a[@class='p_forum']/font/text()").get(default='').strip(),
-                                   tieba_link=const.TIEBA_URL + post.xpath(".//a[@class='p_forum']/@href").get(
-                                       default=''),
-                                   publish_time=post.xpath(".//font[@class='p_green p_date']/text()").get(
-                                       default='').strip(), )
+        for post in _SEARCH_POST(_parse_html(page_content)):
+            tieba_note = TiebaNote(note_id=_get(_SEARCH_TITLE_TID, post).strip(),
+                                   title=_get(_SEARCH_TITLE_TEXT, post).strip(),
+                                   desc=_get(_SEARCH_CONTENT_TEXT, post).strip(),
+                                   note_url=const.TIEBA_URL + _get(_SEARCH_TITLE_HREF, post),
+                                   user_nickname=_get(_SEARCH_USER_NICKNAME, post).strip(),
+                                   user_link=const.TIEBA_URL + _get(_SEARCH_USER_HREF, post),
+                                   tieba_name=_get(_SEARCH_FORUM_TEXT, post).strip(),
+                                   tieba_link=const.TIEBA_URL + _get(_SEARCH_FORUM_HREF, post),
+                                   publish_time=_get(_SEARCH_DATE_TEXT, post).strip(), )
             result.append(tieba_note)
         return result
 
+    @metrics_registry.timed("mediacrawler_extract_seconds", platform="tieba")
     def extract_tieba_note_list(self, page_content: str) -> List[TiebaNote]:
         """
         提取贴吧帖子列表
@@ -70,31 +156,29 @@ class TieBaExtractor:
 
         """
         page_content = page_content.replace('<!--', "")
-        content_selector = Selector(text=page_content)
-        xpath_selector = "//ul[@id='thread_list']/li"
-        post_list = content_selector.xpath(xpath_selector)
+        root = _parse_html(page_content)
+        # 贴吧名称和链接整个页面只有一份，不需要在每个帖子里重新查找
+        tieba_name = _get(_TIEBA_NAME_TEXT, root).strip()
+        tieba_link = const.TIEBA_URL + _get(_TIEBA_NAME_HREF, root)
         result: List[TiebaNote] = []
-        for post_selector in post_list:
-            post_field_value: Dict = self.extract_data_field_value(post_selector)
+        for post in _THREAD_LIST_ITEM(root):
+            post_field_value: Dict = self._extract_data_field_value(post)
             if not post_field_value:
                 continue
             note_id = str(post_field_value.get("id"))
             tieba_note = TiebaNote(note_id=note_id,
-                                   title=post_selector.xpath(".//a[@class='j_th_tit ']/text()").get(default='').strip(),
-                                   desc=post_selector.xpath(
-                                       ".//div[@class='threadlist_abs threadlist_abs_onlyline ']/text()").get(
-                                       default='').strip(), note_url=const.TIEBA_URL + f"/p/{note_id}",
-                                   user_link=const.TIEBA_URL + post_selector.xpath(
-                                       ".//a[@class='frs-author-name j_user_card ']/@href").get(default='').strip(),
+                                   title=_get(_THREAD_TITLE_TEXT, post).strip(),
+                                   desc=_get(_THREAD_ABSTRACT_TEXT, post).strip(),
+                                   note_url=const.TIEBA_URL + f"/p/{note_id}",
+                                   user_link=const.TIEBA_URL + _get(_THREAD_AUTHOR_HREF, post).strip(),
                                    user_nickname=post_field_value.get("authoer_nickname") or post_field_value.get(
                                        "author_name"),
-                                   tieba_name=content_selector.xpath("//a[@class='card_title_fname']/text()").get(
-                                       default='').strip(), tieba_link=const.TIEBA_URL + content_selector.xpath(
-                    "//a[@class='card_title_fname']/@href").get(default=''),
+                                   tieba_name=tieba_name, tieba_link=tieba_link,
                                    total_replay_num=post_field_value.get("reply_num", 0))
             result.append(tieba_note)
         return result
 
+    @metrics_registry.timed("mediacrawler_extract_seconds", platform="tieba")
     def extract_note_detail(self, page_content: str) -> TiebaNote:
         """
         提取贴吧帖子详情
@@ -104,34 +188,31 @@ class TieBaExtractor:
         Returns:
 
         """
-        content_selector = Selector(text=page_content)
-        first_floor_selector = content_selector.xpath("//div[@class='p_postlist'][1]")
-        only_view_author_link = content_selector.xpath("//*[@id='lzonly_cntn']/@href").get(default='').strip()
+        root = _parse_html(page_content)
+        first_floor_nodes = _FIRST_FLOOR(root)
+        only_view_author_link = _get(_ONLY_VIEW_AUTHOR_HREF, root).strip()
         note_id = only_view_author_link.split("?")[0].split("/")[-1]
         # 帖子回复数、回复页数
-        thread_num_infos = content_selector.xpath(
-            "//div[@id='thread_theme_5']//li[@class='l_reply_num']//span[@class='red']")
+        thread_num_infos = _THREAD_REPLY_NUM_NODE(root)
         # IP地理位置、发表时间
-        other_info_content = content_selector.xpath(".//div[@class='post-tail-wrap']").get(default="").strip()
+        other_info_content = _get(_POST_TAIL_WRAP, root).strip()
         ip_location, publish_time = self.extract_ip_and_pub_time(other_info_content)
-        note = TiebaNote(note_id=note_id, title=content_selector.xpath("//title/text()").get(default='').strip(),
-                         desc=content_selector.xpath("//meta[@name='description']/@content").get(default='').strip(),
+        tieba_name = _get(_TIEBA_NAME_TEXT, root).strip()
+        note = TiebaNote(note_id=note_id, title=_get(_TITLE_TEXT, root).strip(),
+                         desc=_get(_META_DESCRIPTION, root).strip(),
                          note_url=const.TIEBA_URL + f"/p/{note_id}",
-                         user_link=const.TIEBA_URL + first_floor_selector.xpath(
-                             ".//a[@class='p_author_face ']/@href").get(default='').strip(),
-                         user_nickname=first_floor_selector.xpath(
-                             ".//a[@class='p_author_name j_user_card']/text()").get(default='').strip(),
-                         user_avatar=first_floor_selector.xpath(".//a[@class='p_author_face ']/img/@src").get(
-                             default='').strip(),
-                         tieba_name=content_selector.xpath("//a[@class='card_title_fname']/text()").get(
-                             default='').strip(), tieba_link=const.TIEBA_URL + content_selector.xpath(
-                "//a[@class='card_title_fname']/@href").get(default=''), ip_location=ip_location,
+                         user_link=const.TIEBA_URL + _get_from_nodes(_AUTHOR_FACE_HREF, first_floor_nodes).strip(),
+                         user_nickname=_get_from_nodes(_AUTHOR_NAME_TEXT, first_floor_nodes).strip(),
+                         user_avatar=_get_from_nodes(_AUTHOR_FACE_IMG_SRC, first_floor_nodes).strip(),
+                         tieba_name=tieba_name, tieba_link=const.TIEBA_URL + _get(_TIEBA_NAME_HREF, root),
+                         ip_location=ip_location,
                          publish_time=publish_time,
-                         total_replay_num=thread_num_infos[0].xpath("./text()").get(default='').strip(),
-                         total_replay_page=thread_num_infos[1].xpath("./text()").get(default='').strip(), )
+                         total_replay_num=_get(_TEXT, thread_num_infos[0]).strip(),
+                         total_replay_page=_get(_TEXT, thread_num_infos[1]).strip(), )
         note.title = note.title.replace(f"【{note.tieba_name}】_百度贴吧", "")
         return note
 
+    @metrics_registry.timed("mediacrawler_extract_seconds", platform="tieba")
     def extract_tieba_note_parment_comments(self, page_content: str, note_id: str) -> List[TiebaComment]:
         """
         提取贴吧帖子一级评论
@@ -142,33 +223,36 @@ class TieBaExtractor:
         Returns:
 
         """
-        xpath_selector = "//div[@class='l_post l_post_bright j_l_post clearfix  ']"
-        comment_list = Selector(text=page_content).xpath(xpath_selector)
+        root = _parse_html(page_content)
+        comment_nodes = _COMMENT_POST(root)
+        if not comment_nodes:
+            return []
+        # 贴吧名称、帖子链接整个页面只有一份，放到循环外只查找一次
+        tieba_name = _get(_TIEBA_NAME_TEXT, root).strip()
+        tieba_link = f"https://tieba.baidu.com/f?kw={tieba_name}"
+        note_url = const.TIEBA_URL + f"/p/{note_id}"
         result: List[TiebaComment] = []
-        for comment_selector in comment_list:
-            comment_field_value: Dict = self.extract_data_field_value(comment_selector)
+        for comment_node in comment_nodes:
+            comment_field_value: Dict = self._extract_data_field_value(comment_node)
             if not comment_field_value:
                 continue
-            tieba_name = comment_selector.xpath("//a[@class='card_title_fname']/text()").get(default='').strip()
-            other_info_content = comment_selector.xpath(".//div[@class='post-tail-wrap']").get(default="").strip()
+            other_info_content = _get(_POST_TAIL_WRAP, comment_node).strip()
             ip_location, publish_time = self.extract_ip_and_pub_time(other_info_content)
-            tieba_comment = TiebaComment(comment_id=str(comment_field_value.get("content").get("post_id")),
-                                         sub_comment_count=comment_field_value.get("content").get("comment_num"),
-                                         content=utils.extract_text_from_html(
-                                             comment_field_value.get("content").get("content")),
-                                         note_url=const.TIEBA_URL + f"/p/{note_id}",
-                                         user_link=const.TIEBA_URL + comment_selector.xpath(
-                                             ".//a[@class='p_author_face ']/@href").get(default='').strip(),
-                                         user_nickname=comment_selector.xpath(
-                                             ".//a[@class='p_author_name j_user_card']/text()").get(default='').strip(),
-                                         user_avatar=comment_selector.xpath(
-                                             ".//a[@class='p_author_face ']/img/@src").get(default='').strip(),
-                                         tieba_id=str(comment_field_value.get("content").get("forum_id", "")),
-                                         tieba_name=tieba_name, tieba_link=f"https://tieba.baidu.com/f?kw={tieba_name}",
+            comment_content: Dict = comment_field_value.get("content")
+            tieba_comment = TiebaComment(comment_id=str(comment_content.get("post_id")),
+                                         sub_comment_count=comment_content.get("comment_num"),
+                                         content=utils.extract_text_from_html(comment_content.get("content")),
+                                         note_url=note_url,
+                                         user_link=const.TIEBA_URL + _get(_AUTHOR_FACE_HREF, comment_node).strip(),
+                                         user_nickname=_get(_AUTHOR_NAME_TEXT, comment_node).strip(),
+                                         user_avatar=_get(_AUTHOR_FACE_IMG_SRC, comment_node).strip(),
+                                         tieba_id=str(comment_content.get("forum_id", "")),
+                                         tieba_name=tieba_name, tieba_link=tieba_link,
                                          ip_location=ip_location, publish_time=publish_time, note_id=note_id, )
             result.append(tieba_comment)
         return result
 
+    @metrics_registry.timed("mediacrawler_extract_seconds", platform="tieba")
     def extract_tieba_note_sub_comments(self, page_content: str, parent_comment: TiebaComment) -> List[TiebaComment]:
         """
         提取贴吧帖子二级评论
@@ -179,23 +263,19 @@ class TieBaExtractor:
         Returns:
 
         """
-        selector = Selector(page_content)
         comments = []
-        comment_ele_list = selector.xpath("//li[@class='lzl_single_post j_lzl_s_p first_no_border']")
-        comment_ele_list.extend(selector.xpath("//li[@class='lzl_single_post j_lzl_s_p ']"))
-        for comment_ele in comment_ele_list:
-            comment_value = self.extract_data_field_value(comment_ele)
+        for comment_node in _SUB_COMMENT_ITEM(_parse_html(page_content)):
+            comment_value = self._extract_data_field_value(comment_node)
             if not comment_value:
                 continue
-            comment_user_a_selector = comment_ele.xpath("./a[@class='j_user_card lzl_p_p']")[0]
-            content = utils.extract_text_from_html(
-                comment_ele.xpath(".//span[@class='lzl_content_main']").get(default=""))
+            comment_user_a_node = _SUB_COMMENT_USER(comment_node)[0]
+            content = utils.extract_text_from_html(_get(_SUB_COMMENT_CONTENT, comment_node))
             comment = TiebaComment(
                 comment_id=str(comment_value.get("spid")), content=content,
-                user_link=comment_user_a_selector.xpath("./@href").get(default=""),
+                user_link=_get(_HREF, comment_user_a_node),
                 user_nickname=comment_value.get("showname"),
-                user_avatar=comment_user_a_selector.xpath("./img/@src").get(default=""),
-                publish_time=comment_ele.xpath(".//span[@class='lzl_time']/text()").get(default="").strip(),
+                user_avatar=_get(_IMG_SRC, comment_user_a_node),
+                publish_time=_get(_SUB_COMMENT_TIME_TEXT, comment_node).strip(),
                 parent_comment_id=parent_comment.comment_id,
                 note_id=parent_comment.note_id, note_url=parent_comment.note_url,
                 tieba_id=parent_comment.tieba_id, tieba_name=parent_comment.tieba_name,
@@ -204,6 +284,7 @@ class TieBaExtractor:
 
         return comments
 
+    @metrics_registry.timed("mediacrawler_extract_seconds", platform="tieba")
     def extract_creator_info(self, html_content: str) -> TiebaCreator:
         """
         提取贴吧创作者信息
@@ -213,23 +294,19 @@ class TieBaExtractor:
         Returns:
 
         """
-        selector = Selector(text=html_content)
-        user_link_selector = selector.xpath("//p[@class='space']/a")
-        user_link: str = user_link_selector.xpath("./@href").get(default='')
+        root = _parse_html(html_content)
+        user_link: str = _get(_CREATOR_USER_LINK_HREF, root)
         user_link_params: Dict = parse_qs(unquote(user_link.split("?")[-1]))
         user_name = user_link_params.get("un")[0] if user_link_params.get("un") else ""
         user_id = user_link_params.get("id")[0] if user_link_params.get("id") else ""
-        userinfo_userdata_selector = selector.xpath("//div[@class='userinfo_userdata']")
-        follow_fans_selector = selector.xpath("//span[@class='concern_num']")
+        follow_fans_nodes = _CREATOR_CONCERN_NUM(root)
         follows, fans = 0, 0
-        if len(follow_fans_selector) == 2:
-            follows, fans = self.extract_follow_and_fans(follow_fans_selector)
-        user_content = userinfo_userdata_selector.get(default='')
+        if len(follow_fans_nodes) == 2:
+            follows, fans = self.extract_follow_and_fans([Selector(root=node) for node in follow_fans_nodes])
+        user_content = _get(_CREATOR_USERDATA, root)
         return TiebaCreator(user_id=user_id, user_name=user_name,
-                            nickname=selector.xpath(".//span[@class='userinfo_username ']/text()").get(
-                                default='').strip(),
-                            avatar=selector.xpath(".//div[@class='userinfo_left_head']//img/@src").get(
-                                default='').strip(),
+                            nickname=_get(_CREATOR_USERNAME_TEXT, root).strip(),
+                            avatar=_get(_CREATOR_AVATAR_SRC, root).strip(),
                             gender=self.extract_gender(user_content),
                             ip_location=self.extract_ip(user_content),
                             follows=follows,
@@ -249,14 +326,9 @@ class TieBaExtractor:
         Returns:
 
         """
-        selector = Selector(text=html_content)
         thread_id_list = []
-        xpath_selector = (
-            "//ul[@class='new_list clearfix']//div[@class='thread_name']/a[1]/@href"
-        )
-        thread_url_list = selector.xpath(xpath_selector).getall()
-        for thread_url in thread_url_list:
-            thread_id = thread_url.split("?")[0].split("/")[-1]
+        for thread_url in _CREATOR_THREAD_HREF(_parse_html(html_content)):
+            thread_id = str(thread_url).split("?")[0].split("/")[-1]
             thread_id_list.append(thread_id)
         return thread_id_list
 
@@ -269,8 +341,7 @@ class TieBaExtractor:
         Returns:
 
         """
-        pattern_pub_time = re.compile(r'<span class="tail-info">(\d{4}-\d{2}-\d{2} \d{2}:\d{2})</span>')
-        time_match = pattern_pub_time.search(html_content)
+        time_match = _PUB_TIME_PATTERN.search(html_content)
         pub_time = time_match.group(1) if time_match else ""
         return self.extract_ip(html_content), pub_time
 
@@ -284,8 +355,7 @@ class TieBaExtractor:
         Returns:
 
         """
-        pattern_ip = re.compile(r'IP属地:(\S+)</span>')
-        ip_match = pattern_ip.search(html_content)
+        ip_match = _IP_PATTERN.search(html_content)
         ip = ip_match.group(1) if ip_match else ""
         return ip
 
@@ -315,9 +385,8 @@ class TieBaExtractor:
         Returns:
 
         """
-        pattern = re.compile(r'<span class="concern_num">\(<a[^>]*>(\d+)</a>\)</span>')
-        follow_match = pattern.findall(selectors[0].get())
-        fans_match = pattern.findall(selectors[1].get())
+        follow_match = _CONCERN_NUM_PATTERN.findall(selectors[0].get())
+        fans_match = _CONCERN_NUM_PATTERN.findall(selectors[1].get())
         follows = follow_match[0] if follow_match else 0
         fans = fans_match[0] if fans_match else 0
         return follows, fans
@@ -329,8 +398,7 @@ class TieBaExtractor:
         Returns: 1.9年
 
         """
-        pattern = re.compile(r'<span>吧龄:(\S+)</span>')
-        match = pattern.search(html_content)
+        match = _REGISTRATION_DURATION_PATTERN.search(html_content)
         return match.group(1) if match else ""
 
     @staticmethod
@@ -343,7 +411,11 @@ class TieBaExtractor:
         Returns:
 
         """
-        data_field_value = selector.xpath("./@data-field").get(default='').strip()
+        return TieBaExtractor._extract_data_field_value(selector.root)
+
+    @staticmethod
+    def _extract_data_field_value(node: etree._Element) -> Dict:
+        data_field_value = (node.get("data-field") or "").strip()
         if not data_field_value or data_field_value == "{}":
             return {}
         try:
@@ -351,7 +423,7 @@ class TieBaExtractor:
             unescaped_json_str = html.unescape(data_field_value)
             data_field_dict_value = json.loads(unescaped_json_str)
         except Exception as ex:
-            print(f"extract_data_field_value，错误信息：{ex}, 尝试使用其他方式解析")
+            utils.logger.warning(f"[TieBaExtractor.extract_data_field_value] 错误信息：{ex}, 尝试使用其他方式解析")
             data_field_dict_value = {}
         return data_field_dict_value
 
@@ -17,7 +17,6 @@
 import asyncio
 import copy
 import json
-import re
 from typing import Callable, Dict, List, Optional, Union
 from urllib.parse import parse_qs, unquote, urlencode
 
@@ -26,13 +25,20 @@ from httpx import Response
 from playwright.async_api import BrowserContext, Page
 
 import config
+from base.base_crawler import AbstractApiClient
+from proxy.proxy_ip_pool import ProxyIpPool
 from tools import utils
+from tools.metrics import record_response_status
+from tools.parse_executor import parse_executor
+from tools.response_cache import cache_response
+from tools.watermark import CreatorWatermark
 
 from .exception import DataFetchError
 from .field import SearchType
+from .help import parse_note_detail_from_html
 
 
-class WeiboClient:
+class WeiboClient(AbstractApiClient):
     def __init__(
             self,
             timeout=10,
@@ -41,8 +47,10 @@ class WeiboClient:
             headers: Dict[str, str],
             playwright_page: Page,
             cookie_dict: Dict[str, str],
+            ip_pool: Optional[ProxyIpPool] = None,
     ):
         self.proxies = proxies
+        self.ip_pool = ip_pool
         self.timeout = timeout
         self.headers = headers
         self._host = "https://m.weibo.cn"
@@ -57,6 +65,7 @@ class WeiboClient:
                 method, url, timeout=self.timeout,
                 **kwargs
             )
+        record_response_status(response.status_code)
 
         if enable_return_response:
             return response
@@ -64,10 +73,10 @@ class WeiboClient:
         data: Dict = response.json()
         ok_code = data.get("ok")
         if ok_code == 0:  # response error
-            utils.logger.error(f"[WeiboClient.request] request {method}:{url} err, res:{data}")
+            utils.logger.error("[WeiboClient.request] request %s:%s err, res:%s", method, url, utils.truncate(data))
             raise DataFetchError(data.get("msg", "response error"))
         elif ok_code != 1:  # unknown error
-            utils.logger.error(f"[WeiboClient.request] request {method}:{url} err, res:{data}")
+            utils.logger.error("[WeiboClient.request] request %s:%s err, res:%s", method, url, utils.truncate(data))
             raise DataFetchError(data.get("msg", "unknown error"))
         else:  # response right
             return data.get("data", {})
@@ -87,6 +96,22 @@ class WeiboClient:
         return await self.request(method="POST", url=f"{self._host}{uri}",
                                   data=json_str, headers=self.headers)
 
+    async def switch_lane(self) -> bool:
+        """
+        当前代理IP被熔断时从代理池中换一个代理IP
+        Returns:
+
+        """
+        if not self.ip_pool:
+            return False
+        try:
+            ip_proxy_info = await self.ip_pool.get_proxy()
+        except Exception as e:
+            utils.logger.error(f"[WeiboClient.switch_lane] get proxy from ip pool err: {e}")
+            return False
+        _, self.proxies = utils.format_proxy_info(ip_proxy_info)
+        return True
+
     async def pong(self) -> bool:
         """get a note to check if login state is ok"""
         utils.logger.info("[WeiboClient.pong] Begin pong weibo...")
@@ -212,6 +237,7 @@ class WeiboClient:
                 res_sub_comments.extend(sub_comments)
         return res_sub_comments
 
+    @cache_response("content_detail")
     async def get_note_info_by_id(self, note_id: str) -> Dict:
         """
         根据帖子ID获取详情
@@ -225,18 +251,11 @@ class WeiboClient:
             )
             if response.status_code != 200:
                 raise DataFetchError(f"get weibo detail err: {response.text}")
-            match = re.search(r'var \$render_data = (\[.*?\])\[0\]', response.text, re.DOTALL)
-            if match:
-                render_data_json = match.group(1)
-                render_data_dict = json.loads(render_data_json)
-                note_detail = render_data_dict[0].get("status")
-                note_item = {
-                    "mblog": note_detail
-                }
-                return note_item
-            else:
-                utils.logger.info(f"[WeiboClient.get_note_info_by_id] 未找到$render_data的值")
-                return dict()
+        note_item = await parse_executor.parse(parse_note_detail_from_html, response.text)
+        if note_item is None:
+            utils.logger.info(f"[WeiboClient.get_note_info_by_id] 未找到$render_data的值")
+            return dict()
+        return note_item
 
     async def get_note_image(self, image_url: str) -> bytes:
         image_url = image_url[8:]  # 去掉 https://
@@ -255,7 +274,10 @@ class WeiboClient:
         async with httpx.AsyncClient(proxies=self.proxies) as client:
             response = await client.request("GET", final_uri, timeout=self.timeout)
             if not response.reason_phrase == "OK":
-                utils.logger.error(f"[WeiboClient.get_note_image] request {final_uri} err, res:{response.text}")
+                utils.logger.error(
+                    "[WeiboClient.get_note_image] request %s err, res:%s",
+                    final_uri, utils.truncate(response.text)
+                )
                 return None
             else:
                 return response.content
@@ -283,6 +305,7 @@ class WeiboClient:
             "lfid_container_id": m_weibocn_params_dict.get("lfid", [""])[0]
         }
 
+    @cache_response("creator_info")
     async def get_creator_info_by_id(self, creator_id: str) -> Dict:
         """
         根据用户ID获取用户详情
@@ -338,7 +361,8 @@ class WeiboClient:
         return await self.get(uri, params)
 
     async def get_all_notes_by_creator_id(self, creator_id: str, container_id: str, crawl_interval: float = 1.0,
-                                          callback: Optional[Callable] = None) -> List[Dict]:
+                                          callback: Optional[Callable] = None,
+                                          watermark: Optional[CreatorWatermark] = None) -> List[Dict]:
         """
         获取指定用户下的所有发过的帖子，该方法会一直查找一个用户下的所有帖子信息
         Args:
@@ -346,6 +370,7 @@ class WeiboClient:
             container_id:
             crawl_interval:
             callback:
+            watermark: 增量爬取状态，翻页到已经爬取过的帖子时停止
 
         Returns:
 
@@ -363,18 +388,26 @@ class WeiboClient:
             since_id = notes_res.get("cardlistInfo", {}).get("since_id", "0")
             if "cards" not in notes_res:
                 utils.logger.info(
-                    f"[WeiboClient.get_all_notes_by_creator] No 'notes' key found in response: {notes_res}")
+                    "[WeiboClient.get_all_notes_by_creator] No 'notes' key found in response: %s",
+                    utils.truncate(notes_res)
+                )
                 break
 
             notes = notes_res["cards"]
             utils.logger.info(
                 f"[WeiboClient.get_all_notes_by_creator] got user_id:{creator_id} notes len : {len(notes)}")
             notes = [note for note  in notes if note.get("card_type") == 9]
+            if watermark:
+                notes = watermark.filter_page(
+                    notes, lambda note: utils.rfc2822_to_timestamp(note["mblog"]["created_at"]) if note.get("mblog", {}).get("created_at") else 0
+                )
             if callback:
                 await callback(notes)
             await asyncio.sleep(crawl_interval)
             result.extend(notes)
             crawler_total_count += 10
             notes_has_more = notes_res.get("cardlistInfo", {}).get("total", 0) > crawler_total_count
+            if watermark and watermark.reached:
+                break
         return result
 
@@ -26,9 +26,12 @@ from playwright.async_api import (BrowserContext, BrowserType, Page,
 
 import config
 from base.base_crawler import AbstractCrawler
-from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
+from proxy.proxy_ip_pool import IpInfoModel, ProxyIpPool, create_ip_pool
 from store import weibo as weibo_store
 from tools import utils
+from tools.creator_scheduler import CreatorScheduler, crawl_semaphore, track_creator_pages
+from tools.concurrency_governor import stage_concurrency
+from tools.watermark import get_creator_watermark
 from var import crawler_type_var, source_keyword_var
 
 from .client import WeiboClient
@@ -50,7 +53,7 @@ class WeiboCrawler(AbstractCrawler):
         self.mobile_user_agent = utils.get_mobile_user_agent()
 
     async def start(self):
-        playwright_proxy_format, httpx_proxy_format = None, None
+        ip_proxy_pool, playwright_proxy_format, httpx_proxy_format = None, None, None
         if config.ENABLE_IP_PROXY:
             ip_proxy_pool = await create_ip_pool(config.IP_PROXY_POOL_COUNT, enable_validate_ip=True)
             ip_proxy_info: IpInfoModel = await ip_proxy_pool.get_proxy()
@@ -71,7 +74,7 @@ class WeiboCrawler(AbstractCrawler):
             await self.context_page.goto(self.mobile_index_url)
 
             # Create a client to interact with the xiaohongshu website.
-            self.wb_client = await self.create_weibo_client(httpx_proxy_format)
+            self.wb_client = await self.create_weibo_client(httpx_proxy_format, ip_proxy_pool)
             if not await self.wb_client.pong():
                 login_obj = WeiboLogin(
                     login_type=config.LOGIN_TYPE,
@@ -145,7 +148,7 @@ class WeiboCrawler(AbstractCrawler):
         get specified notes info
         :return:
         """
-        semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+        semaphore = crawl_semaphore()
         task_list = [
             self.get_note_info_task(note_id=note_id, semaphore=semaphore) for note_id in
             config.WEIBO_SPECIFIED_ID_LIST
@@ -185,8 +188,8 @@ class WeiboCrawler(AbstractCrawler):
             utils.logger.info(f"[WeiboCrawler.batch_get_note_comments] Crawling comment mode is not enabled")
             return
 
-        utils.logger.info(f"[WeiboCrawler.batch_get_notes_comments] note ids:{note_id_list}")
-        semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+        utils.logger.info("[WeiboCrawler.batch_get_notes_comments] note ids:%s", utils.truncate(note_id_list))
+        semaphore = crawl_semaphore()
         task_list: List[Task] = []
         for note_id in note_id_list:
             task = asyncio.create_task(self.get_note_comments(note_id, semaphore), name=note_id)
@@ -244,39 +247,58 @@ class WeiboCrawler(AbstractCrawler):
 
         """
         utils.logger.info("[WeiboCrawler.get_creators_and_notes] Begin get weibo creators")
-        for user_id in config.WEIBO_CREATOR_ID_LIST:
-            createor_info_res: Dict = await self.wb_client.get_creator_info_by_id(creator_id=user_id)
-            if createor_info_res:
-                createor_info: Dict = createor_info_res.get("userInfo", {})
-                utils.logger.info(f"[WeiboCrawler.get_creators_and_notes] creator info: {createor_info}")
-                if not createor_info:
-                    raise DataFetchError("Get creator info error")
-                await weibo_store.save_creator(user_id, user_info=createor_info)
-
-                # Get all note information of the creator
-                all_notes_list = await self.wb_client.get_all_notes_by_creator_id(
-                    creator_id=user_id,
-                    container_id=createor_info_res.get("lfid_container_id"),
-                    crawl_interval=0,
-                    callback=weibo_store.batch_update_weibo_notes
-                )
+        creator_scheduler = CreatorScheduler(config.CREATOR_CONCURRENCY_NUM, stage_concurrency())
+        await creator_scheduler.run(config.WEIBO_CREATOR_ID_LIST, self.get_creator_and_notes)
 
-                note_ids = [note_item.get("mblog", {}).get("id") for note_item in all_notes_list if
-                            note_item.get("mblog", {}).get("id")]
-                await self.batch_get_notes_comments(note_ids)
+    async def get_creator_and_notes(self, user_id: str) -> None:
+        """
+        Get one creator's information and their notes and comments
+        Args:
+            user_id: creator id
 
-            else:
-                utils.logger.error(
-                    f"[WeiboCrawler.get_creators_and_notes] get creator info error, creator_id:{user_id}")
+        Returns:
+
+        """
+        createor_info_res: Dict = await self.wb_client.get_creator_info_by_id(creator_id=user_id)
+        if createor_info_res:
+            createor_info: Dict = createor_info_res.get("userInfo", {})
+            utils.logger.info(
+                "[WeiboCrawler.get_creator_and_notes] creator info: %s",
+                utils.truncate(createor_info)
+            )
+            if not createor_info:
+                raise DataFetchError("Get creator info error")
+            await weibo_store.save_creator(user_id, user_info=createor_info)
+
+            # Get all note information of the creator
+            watermark = get_creator_watermark(user_id)
+            all_notes_list = await self.wb_client.get_all_notes_by_creator_id(
+                creator_id=user_id,
+                container_id=createor_info_res.get("lfid_container_id"),
+                crawl_interval=0,
+                callback=track_creator_pages(weibo_store.batch_update_weibo_notes),
+                watermark=watermark
+            )
+
+            note_ids = [note_item.get("mblog", {}).get("id") for note_item in all_notes_list if
+                        note_item.get("mblog", {}).get("id")]
+            await self.batch_get_notes_comments(note_ids)
+            if watermark:
+                watermark.commit()
+
+        else:
+            utils.logger.error(
+                f"[WeiboCrawler.get_creator_and_notes] get creator info error, creator_id:{user_id}")
 
 
 
-    async def create_weibo_client(self, httpx_proxy: Optional[str]) -> WeiboClient:
+    async def create_weibo_client(self, httpx_proxy: Optional[str], ip_pool: Optional[ProxyIpPool] = None) -> WeiboClient:
         """Create xhs client"""
         utils.logger.info("[WeiboCrawler.create_weibo_client] Begin create weibo API client ...")
         cookie_str, cookie_dict = utils.convert_cookies(await self.browser_context.cookies())
         weibo_client_obj = WeiboClient(
             proxies=httpx_proxy,
+            ip_pool=ip_pool,
             headers={
                 "User-Agent": utils.get_mobile_user_agent(),
                 "Cookie": cookie_str,
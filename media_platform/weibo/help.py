@@ -14,7 +14,11 @@
 # @Time    : 2023/12/24 17:37
 # @Desc    :
 
-from typing import Dict, List
+import json
+import re
+from typing import Dict, List, Optional
+
+_RENDER_DATA_PATTERN = re.compile(r'var \$render_data = (\[.*?\])\[0\]', re.DOTALL)
 
 
 def filter_search_result_card(card_list: List[Dict]) -> List[Dict]:
@@ -34,3 +38,19 @@ def filter_search_result_card(card_list: List[Dict]) -> List[Dict]:
                     note_list.append(card_group_item)
 
     return note_list
+
+
+def parse_note_detail_from_html(html: str) -> Optional[Dict]:
+    """
+    从微博详情页HTML的 $render_data 变量中解析出帖子详情
+    :param html: 详情页HTML
+    :return: {"mblog": 帖子详情}，未找到$render_data时返回None
+    """
+    match = _RENDER_DATA_PATTERN.search(html)
+    if not match:
+        return None
+    render_data_dict = json.loads(match.group(1))
+    note_detail = render_data_dict[0].get("status")
+    return {
+        "mblog": note_detail
+    }
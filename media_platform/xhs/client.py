@@ -11,22 +11,29 @@
 
 import asyncio
 import json
-import re
 from typing import Any, Callable, Dict, List, Optional, Union
 from urllib.parse import urlencode
 
 import httpx
 from playwright.async_api import BrowserContext, Page
-from tenacity import retry, stop_after_attempt, wait_fixed, retry_if_result
 
 import config
 from base.base_crawler import AbstractApiClient
+from proxy.proxy_ip_pool import ProxyIpPool
 from tools import utils
+from tools.browser_pool import BrowserPagePool
+from tools.concurrency_governor import mark_request_blocked
+from tools.metrics import metrics_registry, record_response_status
+from tools.parse_executor import parse_executor
+from tools.response_cache import cache_response
+from tools.retry_policy import retry_policy
+from tools.watermark import CreatorWatermark
 from html import unescape
 
 from .exception import DataFetchError, IPBlockError
 from .field import SearchNoteType, SearchSortType
-from .help import get_search_id, sign
+from .help import (get_search_id, parse_creator_info_from_html, parse_note_detail_from_html,
+                   sign)
 
 
 class XiaoHongShuClient(AbstractApiClient):
@@ -38,8 +45,11 @@ class XiaoHongShuClient(AbstractApiClient):
         headers: Dict[str, str],
         playwright_page: Page,
         cookie_dict: Dict[str, str],
+        page_pool: Optional[BrowserPagePool] = None,
+        ip_pool: Optional[ProxyIpPool] = None,
     ):
         self.proxies = proxies
+        self.ip_pool = ip_pool
         self.timeout = timeout
         self.headers = headers
         self._host = "https://edith.xiaohongshu.com"
@@ -49,8 +59,10 @@ class XiaoHongShuClient(AbstractApiClient):
         self.NOTE_ABNORMAL_STR = "笔记状态异常，请稍后查看"
         self.NOTE_ABNORMAL_CODE = -510001
         self.playwright_page = playwright_page
+        self.page_pool = page_pool or BrowserPagePool.from_page(playwright_page)
         self.cookie_dict = cookie_dict
 
+    @metrics_registry.timed("mediacrawler_sign_seconds", platform="xhs")
     async def _pre_headers(self, url: str, data=None) -> Dict:
         """
         请求头参数签名
@@ -61,10 +73,11 @@ class XiaoHongShuClient(AbstractApiClient):
         Returns:
 
         """
-        encrypt_params = await self.playwright_page.evaluate(
-            "([url, data]) => window._webmsxyw(url,data)", [url, data]
-        )
-        local_storage = await self.playwright_page.evaluate("() => window.localStorage")
+        async with self.page_pool.lease() as page:
+            encrypt_params = await page.evaluate(
+                "([url, data]) => window._webmsxyw(url,data)", [url, data]
+            )
+            local_storage = await page.evaluate("() => window.localStorage")
         signs = sign(
             a1=self.cookie_dict.get("a1", ""),
             b1=local_storage.get("b1", ""),
@@ -81,7 +94,7 @@ class XiaoHongShuClient(AbstractApiClient):
         self.headers.update(headers)
         return self.headers
 
-    @retry(stop=stop_after_attempt(3), wait=wait_fixed(1))
+    @retry_policy()
     async def request(self, method, url, **kwargs) -> Union[str, Any]:
         """
         封装httpx的公共请求方法，对请求响应做一些处理
@@ -98,14 +111,19 @@ class XiaoHongShuClient(AbstractApiClient):
 
         async with httpx.AsyncClient(proxies=self.proxies) as client:
             response = await client.request(method, url, timeout=self.timeout, **kwargs)
+        record_response_status(response.status_code)
 
         if response.status_code == 471 or response.status_code == 461:
             # someday someone maybe will bypass captcha
+            mark_request_blocked()
             verify_type = response.headers["Verifytype"]
             verify_uuid = response.headers["Verifyuuid"]
             raise Exception(
                 f"出现验证码，请求失败，Verifytype: {verify_type}，Verifyuuid: {verify_uuid}, Response: {response}"
             )
+        if response.status_code == 429 or response.status_code >= 500:
+            # 限流和服务端错误可以重试
+            response.raise_for_status()
 
         if return_response:
             return response.text
@@ -113,6 +131,7 @@ class XiaoHongShuClient(AbstractApiClient):
         if data["success"]:
             return data.get("data", data.get("success", {}))
         elif data["code"] == self.IP_ERROR_CODE:
+            mark_request_blocked()
             raise IPBlockError(self.IP_ERROR_STR)
         else:
             raise DataFetchError(data.get("msg", None))
@@ -155,16 +174,21 @@ class XiaoHongShuClient(AbstractApiClient):
             **kwargs,
         )
 
-    async def get_note_media(self, url: str) -> Union[bytes, None]:
-        async with httpx.AsyncClient(proxies=self.proxies) as client:
-            response = await client.request("GET", url, timeout=self.timeout)
-            if not response.reason_phrase == "OK":
-                utils.logger.error(
-                    f"[XiaoHongShuClient.get_note_media] request {url} err, res:{response.text}"
-                )
-                return None
-            else:
-                return response.content
+    async def switch_lane(self) -> bool:
+        """
+        当前代理IP被熔断时从代理池中换一个代理IP
+        Returns:
+
+        """
+        if not self.ip_pool:
+            return False
+        try:
+            ip_proxy_info = await self.ip_pool.get_proxy()
+        except Exception as e:
+            utils.logger.error(f"[XiaoHongShuClient.switch_lane] get proxy from ip pool err: {e}")
+            return False
+        _, self.proxies = utils.format_proxy_info(ip_proxy_info)
+        return True
 
     async def pong(self) -> bool:
         """
@@ -231,6 +255,7 @@ class XiaoHongShuClient(AbstractApiClient):
         }
         return await self.post(uri, data)
 
+    @cache_response("content_detail")
     async def get_note_by_id(
         self, note_id: str, xsec_source: str, xsec_token: str
     ) -> Dict:
@@ -261,7 +286,8 @@ class XiaoHongShuClient(AbstractApiClient):
             return res_dict
         # 爬取频繁了可能会出现有的笔记能有结果有的没有
         utils.logger.error(
-            f"[XiaoHongShuClient.get_note_by_id] get note id:{note_id} empty and res:{res}"
+            "[XiaoHongShuClient.get_note_by_id] get note id:%s empty and res:%s",
+            note_id, utils.truncate(res)
         )
         return dict()
 
@@ -350,7 +376,8 @@ class XiaoHongShuClient(AbstractApiClient):
             comments_cursor = comments_res.get("cursor", "")
             if "comments" not in comments_res:
                 utils.logger.info(
-                    f"[XiaoHongShuClient.get_note_all_comments] No 'comments' key found in response: {comments_res}"
+                    "[XiaoHongShuClient.get_note_all_comments] No 'comments' key found in response: %s",
+                    utils.truncate(comments_res)
                 )
                 break
             comments = comments_res["comments"]
@@ -425,7 +452,8 @@ class XiaoHongShuClient(AbstractApiClient):
                 sub_comment_cursor = comments_res.get("cursor", "")
                 if "comments" not in comments_res:
                     utils.logger.info(
-                        f"[XiaoHongShuClient.get_comments_all_sub_comments] No 'comments' key found in response: {comments_res}"
+                        "[XiaoHongShuClient.get_comments_all_sub_comments] No 'comments' key found in response: %s",
+                        utils.truncate(comments_res)
                     )
                     break
                 comments = comments_res["comments"]
@@ -435,6 +463,7 @@ class XiaoHongShuClient(AbstractApiClient):
                 result.extend(comments)
         return result
 
+    @cache_response("creator_info")
     async def get_creator_info(self, user_id: str) -> Dict:
         """
         通过解析网页版的用户主页HTML，获取用户个人简要信息
@@ -445,17 +474,7 @@ class XiaoHongShuClient(AbstractApiClient):
         html_content = await self.request(
             "GET", self._domain + uri, return_response=True, headers=self.headers
         )
-        match = re.search(
-            r"<script>window.__INITIAL_STATE__=(.+)<\/script>", html_content, re.M
-        )
-
-        if match is None:
-            return {}
-
-        info = json.loads(match.group(1).replace(":undefined", ":null"), strict=False)
-        if info is None:
-            return {}
-        return info.get("user").get("userPageData")
+        return await parse_executor.parse(parse_creator_info_from_html, html_content)
 
     async def get_notes_by_creator(
         self, creator: str, cursor: str, page_size: int = 30
@@ -484,6 +503,7 @@ class XiaoHongShuClient(AbstractApiClient):
         user_id: str,
         crawl_interval: float = 1.0,
         callback: Optional[Callable] = None,
+        watermark: Optional[CreatorWatermark] = None,
     ) -> List[Dict]:
         """
         获取指定用户下的所有发过的帖子，该方法会一直查找一个用户下的所有帖子信息
@@ -491,6 +511,7 @@ class XiaoHongShuClient(AbstractApiClient):
             user_id: 用户ID
             crawl_interval: 爬取一次的延迟单位（秒）
             callback: 一次分页爬取结束后的更新回调函数
+            watermark: 增量爬取状态，翻页到已经爬取过的帖子时停止
 
         Returns:
 
@@ -510,7 +531,8 @@ class XiaoHongShuClient(AbstractApiClient):
             notes_cursor = notes_res.get("cursor", "")
             if "notes" not in notes_res:
                 utils.logger.info(
-                    f"[XiaoHongShuClient.get_all_notes_by_creator] No 'notes' key found in response: {notes_res}"
+                    "[XiaoHongShuClient.get_all_notes_by_creator] No 'notes' key found in response: %s",
+                    utils.truncate(notes_res)
                 )
                 break
 
@@ -518,6 +540,10 @@ class XiaoHongShuClient(AbstractApiClient):
             utils.logger.info(
                 f"[XiaoHongShuClient.get_all_notes_by_creator] got user_id:{user_id} notes len : {len(notes)}"
             )
+            if watermark:
+                # 笔记ID的前8位是16进制的发布时间戳
+                notes = watermark.filter_page(notes, lambda note: int(note.get("note_id", "")[:8] or "0", 16))
+                notes_has_more = notes_has_more and not watermark.reached
             if callback:
                 await callback(notes)
             await asyncio.sleep(crawl_interval)
@@ -537,7 +563,8 @@ class XiaoHongShuClient(AbstractApiClient):
         data = {"original_url": f"{self._domain}/discovery/item/{note_id}"}
         return await self.post(uri, data=data, return_response=True)
 
-    @retry(stop=stop_after_attempt(3), wait=wait_fixed(1))
+    @cache_response("content_detail")
+    @retry_policy()
     async def get_note_by_id_from_html(
         self,
         note_id: str,
@@ -559,31 +586,6 @@ class XiaoHongShuClient(AbstractApiClient):
 
         """
 
-        def camel_to_underscore(key):
-            return re.sub(r"(?<!^)(?=[A-Z])", "_", key).lower()
-
-        def transform_json_keys(json_data):
-            data_dict = json.loads(json_data)
-            dict_new = {}
-            for key, value in data_dict.items():
-                new_key = camel_to_underscore(key)
-                if not value:
-                    dict_new[new_key] = value
-                elif isinstance(value, dict):
-                    dict_new[new_key] = transform_json_keys(json.dumps(value))
-                elif isinstance(value, list):
-                    dict_new[new_key] = [
-                        (
-                            transform_json_keys(json.dumps(item))
-                            if (item and isinstance(item, dict))
-                            else item
-                        )
-                        for item in value
-                    ]
-                else:
-                    dict_new[new_key] = value
-            return dict_new
-
         url = (
             "https://www.xiaohongshu.com/explore/"
             + note_id
@@ -597,17 +599,4 @@ class XiaoHongShuClient(AbstractApiClient):
             method="GET", url=url, return_response=True, headers=copy_headers
         )
 
-        def get_note_dict(html):
-            state = re.findall(r"window.__INITIAL_STATE__=({.*})</script>", html)[
-                0
-            ].replace("undefined", '""')
-
-            if state != "{}":
-                note_dict = transform_json_keys(state)
-                return note_dict["note"]["note_detail_map"][note_id]["note"]
-            return {}
-
-        try:
-            return get_note_dict(html)
-        except:
-            return None
+        return await parse_executor.parse(parse_note_detail_from_html, html, note_id)
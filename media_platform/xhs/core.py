@@ -12,7 +12,6 @@
 import asyncio
 import os
 import random
-import time
 from asyncio import Task
 from typing import Dict, List, Optional, Tuple
 
@@ -23,15 +22,20 @@ import config
 from base.base_crawler import AbstractCrawler
 from config import CRAWLER_MAX_COMMENTS_COUNT_SINGLENOTES
 from model.m_xiaohongshu import NoteUrlInfo
-from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
+from proxy.proxy_ip_pool import IpInfoModel, ProxyIpPool, create_ip_pool
 from store import xhs as xhs_store
 from tools import utils
+from tools.browser_pool import BrowserPagePool
+from tools.creator_scheduler import CreatorScheduler, crawl_semaphore, track_creator_pages
+from tools.concurrency_governor import stage_concurrency
+from tools.media_downloader import MediaDownloader
+from tools.watermark import get_creator_watermark
 from var import crawler_type_var, source_keyword_var
 
 from .client import XiaoHongShuClient
 from .exception import DataFetchError
 from .field import SearchSortType
-from .help import parse_note_info_from_note_url, get_search_id
+from .help import get_img_mirror_urls, get_search_id, parse_note_info_from_note_url
 from .login import XiaoHongShuLogin
 
 
@@ -39,6 +43,8 @@ class XiaoHongShuCrawler(AbstractCrawler):
     context_page: Page
     xhs_client: XiaoHongShuClient
     browser_context: BrowserContext
+    page_pool: BrowserPagePool
+    media_downloader: MediaDownloader
 
     def __init__(self) -> None:
         self.index_url = "https://www.xiaohongshu.com"
@@ -46,7 +52,7 @@ class XiaoHongShuCrawler(AbstractCrawler):
         self.user_agent = config.UA if config.UA else "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36"
 
     async def start(self) -> None:
-        playwright_proxy_format, httpx_proxy_format = None, None
+        ip_proxy_pool, playwright_proxy_format, httpx_proxy_format = None, None, None
         if config.ENABLE_IP_PROXY:
             ip_proxy_pool = await create_ip_pool(
                 config.IP_PROXY_POOL_COUNT, enable_validate_ip=True
@@ -79,33 +85,45 @@ class XiaoHongShuCrawler(AbstractCrawler):
             await self.context_page.goto(self.index_url)
 
             # Create a client to interact with the xiaohongshu website.
-            self.xhs_client = await self.create_xhs_client(httpx_proxy_format)
-            if not await self.xhs_client.pong():
-                login_obj = XiaoHongShuLogin(
-                    login_type=config.LOGIN_TYPE,
-                    login_phone="",  # input your phone number
-                    browser_context=self.browser_context,
-                    context_page=self.context_page,
-                    cookie_str=config.COOKIES,
-                )
-                await login_obj.begin()
-                await self.xhs_client.update_cookies(
-                    browser_context=self.browser_context
-                )
-            # 获取爬虫的类型
-            crawler_type_var.set(config.CRAWLER_TYPE)
-            if config.CRAWLER_TYPE == "search":
-                # Search for notes and retrieve their comment information.
-                await self.search()
-            elif config.CRAWLER_TYPE == "detail":
-                # Get the information and comments of the specified post
-                await self.get_specified_notes()
-            elif config.CRAWLER_TYPE == "creator":
-                # Get creator's information and their notes and comments
-                await self.get_creators_and_notes()
-            else:
-                pass
+            self.xhs_client = await self.create_xhs_client(httpx_proxy_format, ip_proxy_pool)
+            self.media_downloader = MediaDownloader(proxies=httpx_proxy_format)
+            try:
+                if not await self.xhs_client.pong():
+                    login_obj = XiaoHongShuLogin(
+                        login_type=config.LOGIN_TYPE,
+                        login_phone="",  # input your phone number
+                        browser_context=self.browser_context,
+                        context_page=self.context_page,
+                        cookie_str=config.COOKIES,
+                    )
+                    await login_obj.begin()
+                    await self.xhs_client.update_cookies(
+                        browser_context=self.browser_context
+                    )
 
+                # 登录态就绪后预热页面池，签名等依赖页面 evaluate 的操作从页面池中租用页面并发执行
+                self.page_pool = BrowserPagePool(self.browser_context, self.index_url)
+                await self.page_pool.start(self.context_page)
+                self.xhs_client.page_pool = self.page_pool
+                # 获取爬虫的类型
+                crawler_type_var.set(config.CRAWLER_TYPE)
+                try:
+                    if config.CRAWLER_TYPE == "search":
+                        # Search for notes and retrieve their comment information.
+                        await self.search()
+                    elif config.CRAWLER_TYPE == "detail":
+                        # Get the information and comments of the specified post
+                        await self.get_specified_notes()
+                    elif config.CRAWLER_TYPE == "creator":
+                        # Get creator's information and their notes and comments
+                        await self.get_creators_and_notes()
+                    else:
+                        pass
+                finally:
+                    await self.page_pool.close()
+            finally:
+                # 等待下载池中的图片/视频下载完成，爬取出错时也要保存已下载媒体的去重索引
+                await self.media_downloader.close()
             utils.logger.info("[XiaoHongShuCrawler.start] Xhs Crawler finished ...")
 
     async def search(self) -> None:
@@ -148,13 +166,11 @@ class XiaoHongShuCrawler(AbstractCrawler):
                             else SearchSortType.GENERAL
                         ),
                     )
-                    utils.logger.info(
-                        f"[XiaoHongShuCrawler.search] Search notes res:{notes_res}"
-                    )
+                    utils.logger.info("[XiaoHongShuCrawler.search] Search notes res:%s", utils.truncate(notes_res))
                     if not notes_res or not notes_res.get("has_more", False):
                         utils.logger.info("No more content!")
                         break
-                    semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+                    semaphore = crawl_semaphore()
                     task_list = [
                         self.get_note_detail_async_task(
                             note_id=post_item.get("id"),
@@ -173,9 +189,7 @@ class XiaoHongShuCrawler(AbstractCrawler):
                             note_ids.append(note_detail.get("note_id"))
                             xsec_tokens.append(note_detail.get("xsec_token"))
                     page += 1
-                    utils.logger.info(
-                        f"[XiaoHongShuCrawler.search] Note details: {note_details}"
-                    )
+                    utils.logger.info("[XiaoHongShuCrawler.search] Note details: %s", utils.truncate(note_details))
                     await self.batch_get_note_comments(note_ids, xsec_tokens)
                 except DataFetchError:
                     utils.logger.error(
@@ -188,38 +202,46 @@ class XiaoHongShuCrawler(AbstractCrawler):
         utils.logger.info(
             "[XiaoHongShuCrawler.get_creators_and_notes] Begin get xiaohongshu creators"
         )
-        for user_id in config.XHS_CREATOR_ID_LIST:
-            # get creator detail info from web html content
-            createor_info: Dict = await self.xhs_client.get_creator_info(
-                user_id=user_id
-            )
-            if createor_info:
-                await xhs_store.save_creator(user_id, creator=createor_info)
+        creator_scheduler = CreatorScheduler(config.CREATOR_CONCURRENCY_NUM, stage_concurrency())
+        await creator_scheduler.run(config.XHS_CREATOR_ID_LIST, self.get_creator_and_notes)
+
+    async def get_creator_and_notes(self, user_id: str) -> None:
+        """Get one creator's info, notes and comments"""
+        # get creator detail info from web html content
+        createor_info: Dict = await self.xhs_client.get_creator_info(
+            user_id=user_id
+        )
+        if createor_info:
+            await xhs_store.save_creator(user_id, creator=createor_info)
 
-            # When proxy is not enabled, increase the crawling interval
-            if config.ENABLE_IP_PROXY:
-                crawl_interval = random.random()
-            else:
-                crawl_interval = random.uniform(config.CRAWLER_MIN_SLEEP_SEC, config.CRAWLER_MAX_SLEEP_SEC)
-            # Get all note information of the creator
-            all_notes_list = await self.xhs_client.get_all_notes_by_creator(
-                user_id=user_id,
-                crawl_interval=crawl_interval,
-                callback=self.fetch_creator_notes_detail,
-            )
+        # When proxy is not enabled, increase the crawling interval
+        if config.ENABLE_IP_PROXY:
+            crawl_interval = random.random()
+        else:
+            crawl_interval = random.uniform(config.CRAWLER_MIN_SLEEP_SEC, config.CRAWLER_MAX_SLEEP_SEC)
+        # Get all note information of the creator
+        watermark = get_creator_watermark(user_id)
+        all_notes_list = await self.xhs_client.get_all_notes_by_creator(
+            user_id=user_id,
+            crawl_interval=crawl_interval,
+            callback=track_creator_pages(self.fetch_creator_notes_detail),
+            watermark=watermark,
+        )
 
-            note_ids = []
-            xsec_tokens = []
-            for note_item in all_notes_list:
-                note_ids.append(note_item.get("note_id"))
-                xsec_tokens.append(note_item.get("xsec_token"))
-            await self.batch_get_note_comments(note_ids, xsec_tokens)
+        note_ids = []
+        xsec_tokens = []
+        for note_item in all_notes_list:
+            note_ids.append(note_item.get("note_id"))
+            xsec_tokens.append(note_item.get("xsec_token"))
+        await self.batch_get_note_comments(note_ids, xsec_tokens)
+        if watermark:
+            watermark.commit()
 
     async def fetch_creator_notes_detail(self, note_list: List[Dict]):
         """
         Concurrently obtain the specified post list and save the data
         """
-        semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+        semaphore = crawl_semaphore()
         task_list = [
             self.get_note_detail_async_task(
                 note_id=post_item.get("note_id"),
@@ -246,13 +268,14 @@ class XiaoHongShuCrawler(AbstractCrawler):
         for full_note_url in config.XHS_SPECIFIED_NOTE_URL_LIST:
             note_url_info: NoteUrlInfo = parse_note_info_from_note_url(full_note_url)
             utils.logger.info(
-                f"[XiaoHongShuCrawler.get_specified_notes] Parse note url info: {note_url_info}"
+                "[XiaoHongShuCrawler.get_specified_notes] Parse note url info: %s",
+                utils.truncate(note_url_info)
             )
             crawler_task = self.get_note_detail_async_task(
                 note_id=note_url_info.note_id,
                 xsec_source=note_url_info.xsec_source,
                 xsec_token=note_url_info.xsec_token,
-                semaphore=asyncio.Semaphore(config.MAX_CONCURRENCY_NUM),
+                semaphore=crawl_semaphore(),
             )
             get_note_detail_task_list.append(crawler_task)
 
@@ -298,7 +321,7 @@ class XiaoHongShuCrawler(AbstractCrawler):
                         note_id, xsec_source, xsec_token, enable_cookie=True
                     )
                 )
-                time.sleep(crawl_interval)
+                await asyncio.sleep(crawl_interval)
                 if not note_detail_from_html:
                     # 如果网页版笔记详情获取失败，则尝试不使用cookie获取
                     note_detail_from_html = (
@@ -344,9 +367,10 @@ class XiaoHongShuCrawler(AbstractCrawler):
             return
 
         utils.logger.info(
-            f"[XiaoHongShuCrawler.batch_get_note_comments] Begin batch get note comments, note list: {note_list}"
+            "[XiaoHongShuCrawler.batch_get_note_comments] Begin batch get note comments, note list: %s",
+            utils.truncate(note_list)
         )
-        semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+        semaphore = crawl_semaphore()
         task_list: List[Task] = []
         for index, note_id in enumerate(note_list):
             task = asyncio.create_task(
@@ -394,7 +418,7 @@ class XiaoHongShuCrawler(AbstractCrawler):
         }
         return playwright_proxy, httpx_proxy
 
-    async def create_xhs_client(self, httpx_proxy: Optional[str]) -> XiaoHongShuClient:
+    async def create_xhs_client(self, httpx_proxy: Optional[str], ip_pool: Optional[ProxyIpPool] = None) -> XiaoHongShuClient:
         """Create xhs client"""
         utils.logger.info(
             "[XiaoHongShuCrawler.create_xhs_client] Begin create xiaohongshu API client ..."
@@ -404,6 +428,7 @@ class XiaoHongShuCrawler(AbstractCrawler):
         )
         xhs_client_obj = XiaoHongShuClient(
             proxies=httpx_proxy,
+            ip_pool=ip_pool,
             headers={
                 "User-Agent": self.user_agent,
                 "Cookie": cookie_str,
@@ -485,12 +510,14 @@ class XiaoHongShuCrawler(AbstractCrawler):
             url = pic.get("url")
             if not url:
                 continue
-            content = await self.xhs_client.get_note_media(url)
-            if content is None:
-                continue
             extension_file_name = f"{picNum}.jpg"
             picNum += 1
-            await xhs_store.update_xhs_note_image(note_id, content, extension_file_name)
+            # 同一张图片在多个 CDN 上都有镜像，由下载池按各 CDN 的耗时/失败率选择并对冲请求，笔记的多张图片并发下载
+            await self.media_downloader.submit(
+                url,
+                xhs_store.get_xhs_note_media_file_name(note_id, extension_file_name),
+                mirror_urls=get_img_mirror_urls(url),
+            )
 
     async def get_notice_video(self, note_item: Dict):
         """
@@ -508,9 +535,8 @@ class XiaoHongShuCrawler(AbstractCrawler):
             return
         videoNum = 0
         for url in videos:
-            content = await self.xhs_client.get_note_media(url)
-            if content is None:
-                continue
             extension_file_name = f"{videoNum}.mp4"
             videoNum += 1
-            await xhs_store.update_xhs_note_image(note_id, content, extension_file_name)
+            await self.media_downloader.submit(
+                url, xhs_store.get_xhs_note_media_file_name(note_id, extension_file_name)
+            )
@@ -12,8 +12,10 @@
 import ctypes
 import json
 import random
+import re
 import time
 import urllib.parse
+from typing import Dict, List, Optional
 
 from model.m_xiaohongshu import NoteUrlInfo
 from tools.crawler_util import extract_url_params_to_dict
@@ -278,6 +280,10 @@ img_cdns = [
     "https://sns-img-qn.xhscdn.com",
 ]
 
+# 图片 CDN 域名 sns-img-qc.xhscdn.com、sns-webpic-qc.xhscdn.com 中的 qc/hw/bd/qn 为 CDN 厂商，同一路径在各厂商上是同一个文件
+IMG_CDN_VENDORS = ("qc", "hw", "bd", "qn")
+IMG_CDN_HOST_PATTERN = re.compile(r"^(sns-[a-z]+)-(qc|hw|bd|qn)\.xhscdn\.com$")
+
 def get_img_url_by_trace_id(trace_id: str, format_type: str = "png"):
     return f"{random.choice(img_cdns)}/{trace_id}?imageView2/format/{format_type}"
 
@@ -287,8 +293,29 @@ def get_img_urls_by_trace_id(trace_id: str, format_type: str = "png"):
 
 
 def get_trace_id(img_url: str):
-    # 浏览器端上传的图片多了 /spectrum/ 这个路径
-    return f"spectrum/{img_url.split('/')[-1]}" if img_url.find("spectrum") != -1 else img_url.split("/")[-1]
+    # 浏览器端上传的图片多了 /spectrum/ 这个路径，笔记详情中的图片地址末尾会带上 !nd_dft_wlteh_webp_3 这类样式后缀
+    trace_id = img_url.split("/")[-1].split("!")[0].split("?")[0]
+    return f"spectrum/{trace_id}" if img_url.find("spectrum") != -1 else trace_id
+
+
+def get_img_mirror_urls(img_url: str) -> List[str]:
+    """
+    获取笔记图片在其他 CDN 厂商上的镜像地址，只替换域名中的厂商，路径和参数不变，
+    保证镜像返回的内容和原图完全一致(imageView2 转码后的图片内容不同，下载后无法按 sha256 去重)
+    Args:
+        img_url: 笔记详情中的图片地址
+
+    Returns:
+
+    """
+    split_result = urllib.parse.urlsplit(img_url)
+    match = IMG_CDN_HOST_PATTERN.match(split_result.netloc)
+    if not match:
+        return []
+    return [
+        urllib.parse.urlunsplit(split_result._replace(netloc=f"{match.group(1)}-{vendor}.xhscdn.com"))
+        for vendor in IMG_CDN_VENDORS if vendor != match.group(2)
+    ]
 
 
 def parse_note_info_from_note_url(url: str) -> NoteUrlInfo:
@@ -306,6 +333,80 @@ def parse_note_info_from_note_url(url: str) -> NoteUrlInfo:
     return NoteUrlInfo(note_id=note_id, xsec_token=xsec_token, xsec_source=xsec_source)
 
 
+_CAMEL_TO_UNDERSCORE_PATTERN = re.compile(r"(?<!^)(?=[A-Z])")
+_NOTE_INITIAL_STATE_PATTERN = re.compile(r"window.__INITIAL_STATE__=({.*})</script>")
+_CREATOR_INITIAL_STATE_PATTERN = re.compile(r"<script>window.__INITIAL_STATE__=(.+)<\/script>", re.M)
+
+
+def camel_to_underscore(key: str) -> str:
+    return _CAMEL_TO_UNDERSCORE_PATTERN.sub("_", key).lower()
+
+
+def transform_json_keys(data_dict: Dict) -> Dict:
+    """
+    将字典(包括嵌套的字典和列表中的字典)的key由驼峰转换为下划线
+    Args:
+        data_dict: json.loads 后的字典
+
+    Returns:
+
+    """
+    dict_new = {}
+    for key, value in data_dict.items():
+        new_key = camel_to_underscore(key)
+        if not value:
+            dict_new[new_key] = value
+        elif isinstance(value, dict):
+            dict_new[new_key] = transform_json_keys(value)
+        elif isinstance(value, list):
+            dict_new[new_key] = [
+                transform_json_keys(item) if (item and isinstance(item, dict)) else item
+                for item in value
+            ]
+        else:
+            dict_new[new_key] = value
+    return dict_new
+
+
+def parse_note_detail_from_html(html: str, note_id: str) -> Optional[Dict]:
+    """
+    从笔记详情页HTML的 window.__INITIAL_STATE__ 中解析出笔记详情
+    Args:
+        html: 笔记详情页HTML
+        note_id: 笔记ID
+
+    Returns:
+        笔记详情，解析失败返回None
+    """
+    try:
+        state = _NOTE_INITIAL_STATE_PATTERN.findall(html)[0].replace("undefined", '""')
+        if state != "{}":
+            note_dict = transform_json_keys(json.loads(state))
+            return note_dict["note"]["note_detail_map"][note_id]["note"]
+        return {}
+    except:
+        return None
+
+
+def parse_creator_info_from_html(html_content: str) -> Dict:
+    """
+    从用户主页HTML的 window.__INITIAL_STATE__ 中解析出用户个人简要信息
+    Args:
+        html_content: 用户主页HTML
+
+    Returns:
+
+    """
+    match = _CREATOR_INITIAL_STATE_PATTERN.search(html_content)
+    if match is None:
+        return {}
+
+    info = json.loads(match.group(1).replace(":undefined", ":null"), strict=False)
+    if info is None:
+        return {}
+    return info.get("user").get("userPageData")
+
+
 if __name__ == '__main__':
     _img_url = "https://sns-img-bd.xhscdn.com/7a3abfaf-90c1-a828-5de7-022c80b92aa3"
     # 获取一个图片地址在多个cdn下的url地址
@@ -11,6 +11,7 @@
 
 # -*- coding: utf-8 -*-
 import asyncio
+import functools
 import json
 from typing import Any, Callable, Dict, List, Optional, Union
 from urllib.parse import urlencode
@@ -18,13 +19,18 @@ from urllib.parse import urlencode
 import httpx
 from httpx import Response
 from playwright.async_api import BrowserContext, Page
-from tenacity import retry, stop_after_attempt, wait_fixed
 
 import config
 from base.base_crawler import AbstractApiClient
+from proxy.proxy_ip_pool import ProxyIpPool
 from constant import zhihu as zhihu_constant
 from model.m_zhihu import ZhihuComment, ZhihuContent, ZhihuCreator
 from tools import utils
+from tools.metrics import metrics_registry, record_response_status
+from tools.parse_executor import parse_executor
+from tools.response_cache import cache_response
+from tools.retry_policy import retry_policy
+from tools.watermark import CreatorWatermark, Watermark
 
 from .exception import DataFetchError, ForbiddenError
 from .field import SearchSort, SearchTime, SearchType
@@ -40,13 +46,18 @@ class ZhiHuClient(AbstractApiClient):
             headers: Dict[str, str],
             playwright_page: Page,
             cookie_dict: Dict[str, str],
+            ip_pool: Optional[ProxyIpPool] = None,
     ):
         self.proxies = proxies
+        self.ip_pool = ip_pool
         self.timeout = timeout
         self.default_headers = headers
         self.cookie_dict = cookie_dict
+        self._host = zhihu_constant.ZHIHU_URL
+        self._zhuanlan_host = zhihu_constant.ZHIHU_ZHUANLAN_URL
         self._extractor = ZhihuExtractor()
 
+    @metrics_registry.timed("mediacrawler_sign_seconds", platform="zhihu")
     async def _pre_headers(self, url: str) -> Dict:
         """
         请求头参数签名
@@ -64,7 +75,7 @@ class ZhiHuClient(AbstractApiClient):
         headers['x-zse-96'] = sign_res["x-zse-96"]
         return headers
 
-    @retry(stop=stop_after_attempt(3), wait=wait_fixed(1))
+    @retry_policy()
     async def request(self, method, url, **kwargs) -> Union[str, Any]:
         """
         封装httpx的公共请求方法，对请求响应做一些处理
@@ -84,9 +95,16 @@ class ZhiHuClient(AbstractApiClient):
                 method, url, timeout=self.timeout,
                 **kwargs
             )
+        record_response_status(response.status_code)
 
         if response.status_code != 200:
-            utils.logger.error(f"[ZhiHuClient.request] Requset Url: {url}, Request error: {response.text}")
+            utils.logger.error(
+                "[ZhiHuClient.request] Requset Url: %s, Request error: %s",
+                url, utils.truncate(response.text)
+            )
+            if response.status_code == 429 or response.status_code >= 500:
+                # 限流和服务端错误可以重试
+                response.raise_for_status()
             if response.status_code == 403:
                 raise ForbiddenError(response.text)
             elif response.status_code == 404: # 如果一个content没有评论也是404
@@ -99,11 +117,11 @@ class ZhiHuClient(AbstractApiClient):
         try:
             data: Dict = response.json()
             if data.get("error"):
-                utils.logger.error(f"[ZhiHuClient.request] Request error: {data}")
+                utils.logger.error("[ZhiHuClient.request] Request error: %s", utils.truncate(data))
                 raise DataFetchError(data.get("error", {}).get("message"))
             return data
         except json.JSONDecodeError:
-            utils.logger.error(f"[ZhiHuClient.request] Request error: {response.text}")
+            utils.logger.error("[ZhiHuClient.request] Request error: %s", utils.truncate(response.text))
             raise DataFetchError(response.text)
 
 
@@ -122,12 +140,28 @@ class ZhiHuClient(AbstractApiClient):
             final_uri += '?' + urlencode(params)
         headers = await self._pre_headers(final_uri)
         base_url = (
-            zhihu_constant.ZHIHU_URL
+            self._host
             if "/p/" not in uri
-            else zhihu_constant.ZHIHU_ZHUANLAN_URL
+            else self._zhuanlan_host
         )
         return await self.request(method="GET", url=base_url + final_uri, headers=headers, **kwargs)
 
+    async def switch_lane(self) -> bool:
+        """
+        当前代理IP被熔断时从代理池中换一个代理IP
+        Returns:
+
+        """
+        if not self.ip_pool:
+            return False
+        try:
+            ip_proxy_info = await self.ip_pool.get_proxy()
+        except Exception as e:
+            utils.logger.error(f"[ZhiHuClient.switch_lane] get proxy from ip pool err: {e}")
+            return False
+        _, self.proxies = utils.format_proxy_info(ip_proxy_info)
+        return True
+
     async def pong(self) -> bool:
         """
         用于检查登录态是否失效了
@@ -142,7 +176,7 @@ class ZhiHuClient(AbstractApiClient):
                 ping_flag = True
                 utils.logger.info("[ZhiHuClient.pong] Ping zhihu successfully")
             else:
-                utils.logger.error(f"[ZhiHuClient.pong] Ping zhihu failed, response data: {res}")
+                utils.logger.error("[ZhiHuClient.pong] Ping zhihu failed, response data: %s", utils.truncate(res))
         except Exception as e:
             utils.logger.error(f"[ZhiHuClient.pong] Ping zhihu failed: {e}, and try to login again...")
             ping_flag = False
@@ -210,7 +244,7 @@ class ZhiHuClient(AbstractApiClient):
             "vertical": note_type.value,
         }
         search_res = await self.get(uri, params)
-        utils.logger.info(f"[ZhiHuClient.get_note_by_keyword] Search result: {search_res}")
+        utils.logger.info("[ZhiHuClient.get_note_by_keyword] Search result: %s", utils.truncate(search_res))
         return self._extractor.extract_contents_from_search(search_res)
 
     async def get_root_comments(self, content_id: str, content_type: str, offset: str = "", limit: int = 10,
@@ -260,13 +294,15 @@ class ZhiHuClient(AbstractApiClient):
         return await self.get(uri, params)
 
     async def get_note_all_comments(self, content: ZhihuContent, crawl_interval: float = 1.0,
-                                    callback: Optional[Callable] = None) -> List[ZhihuComment]:
+                                    callback: Optional[Callable] = None,
+                                    watermark: Optional[Watermark] = None) -> List[ZhihuComment]:
         """
         获取指定帖子下的所有一级评论，该方法会一直查找一个帖子下的所有评论信息
         Args:
             content: 内容详情对象(问题｜文章｜视频)
             crawl_interval: 爬取一次笔记的延迟单位（秒）
             callback: 一次笔记爬取结束后
+            watermark: 评论增量爬取状态，不为空时按时间排序翻页，翻到已经爬取过的评论就停止
 
         Returns:
 
@@ -275,14 +311,19 @@ class ZhiHuClient(AbstractApiClient):
         is_end: bool = False
         offset: str = ""
         limit: int = 10
+        order_by = "ts" if watermark else "score"
         while not is_end:
-            root_comment_res = await self.get_root_comments(content.content_id, content.content_type, offset, limit)
+            root_comment_res = await self.get_root_comments(content.content_id, content.content_type, offset, limit,
+                                                            order_by=order_by)
             if not root_comment_res:
                 break
             paging_info = root_comment_res.get("paging", {})
             is_end = paging_info.get("is_end")
             offset = self._extractor.extract_offset(paging_info)
             comments = self._extractor.extract_comments(content, root_comment_res.get("data"))
+            if watermark:
+                comments = watermark.filter_page(comments, lambda comment: comment.publish_time)
+                is_end = is_end or watermark.reached
 
             if not comments:
                 break
@@ -338,6 +379,7 @@ class ZhiHuClient(AbstractApiClient):
                 await asyncio.sleep(crawl_interval)
         return all_sub_comments
 
+    @cache_response("creator_info")
     async def get_creator_info(self, url_token: str) -> Optional[ZhihuCreator]:
         """
         获取创作者信息
@@ -349,7 +391,7 @@ class ZhiHuClient(AbstractApiClient):
         """
         uri = f"/people/{url_token}"
         html_content: str = await self.get(uri, return_response=True)
-        return self._extractor.extract_creator(url_token, html_content)
+        return await parse_executor.parse(functools.partial(self._extractor.extract_creator, url_token), html_content)
 
     async def get_creator_answers(self, url_token: str, offset: int = 0, limit: int = 20) -> Dict:
         """
@@ -413,13 +455,15 @@ class ZhiHuClient(AbstractApiClient):
         return await self.get(uri, params)
 
     async def get_all_anwser_by_creator(self, creator: ZhihuCreator, crawl_interval: float = 1.0,
-                                        callback: Optional[Callable] = None) -> List[ZhihuContent]:
+                                        callback: Optional[Callable] = None,
+                                        watermark: Optional[CreatorWatermark] = None) -> List[ZhihuContent]:
         """
         获取创作者的所有回答
         Args:
             creator: 创作者信息
             crawl_interval: 爬取一次笔记的延迟单位（秒）
             callback: 一次笔记爬取结束后
+            watermark: 增量爬取状态，翻页到已经爬取过的内容时停止
 
         Returns:
 
@@ -432,10 +476,16 @@ class ZhiHuClient(AbstractApiClient):
             res = await self.get_creator_answers(creator.url_token, offset, limit)
             if not res:
                 break
-            utils.logger.info(f"[ZhiHuClient.get_all_anwser_by_creator] Get creator {creator.url_token} answers: {res}")
+            utils.logger.info(
+                "[ZhiHuClient.get_all_anwser_by_creator] Get creator %s answers: %s",
+                creator.url_token, utils.truncate(res)
+            )
             paging_info = res.get("paging", {})
             is_end = paging_info.get("is_end")
             contents = self._extractor.extract_content_list_from_creator(res.get("data"))
+            if watermark:
+                contents = watermark.filter_page(contents, lambda content: content.created_time)
+                is_end = is_end or watermark.reached
             if callback:
                 await callback(contents)
             all_contents.extend(contents)
@@ -445,13 +495,15 @@ class ZhiHuClient(AbstractApiClient):
 
 
     async def get_all_articles_by_creator(self, creator: ZhihuCreator, crawl_interval: float = 1.0,
-                                          callback: Optional[Callable] = None) -> List[ZhihuContent]:
+                                          callback: Optional[Callable] = None,
+                                          watermark: Optional[CreatorWatermark] = None) -> List[ZhihuContent]:
         """
         获取创作者的所有文章
         Args:
             creator:
             crawl_interval:
             callback:
+            watermark:
 
         Returns:
 
@@ -467,6 +519,9 @@ class ZhiHuClient(AbstractApiClient):
             paging_info = res.get("paging", {})
             is_end = paging_info.get("is_end")
             contents = self._extractor.extract_content_list_from_creator(res.get("data"))
+            if watermark:
+                contents = watermark.filter_page(contents, lambda content: content.created_time)
+                is_end = is_end or watermark.reached
             if callback:
                 await callback(contents)
             all_contents.extend(contents)
@@ -476,13 +531,15 @@ class ZhiHuClient(AbstractApiClient):
 
 
     async def get_all_videos_by_creator(self, creator: ZhihuCreator, crawl_interval: float = 1.0,
-                                        callback: Optional[Callable] = None) -> List[ZhihuContent]:
+                                        callback: Optional[Callable] = None,
+                                        watermark: Optional[CreatorWatermark] = None) -> List[ZhihuContent]:
         """
         获取创作者的所有视频
         Args:
             creator:
             crawl_interval:
             callback:
+            watermark:
 
         Returns:
 
@@ -498,6 +555,9 @@ class ZhiHuClient(AbstractApiClient):
             paging_info = res.get("paging", {})
             is_end = paging_info.get("is_end")
             contents = self._extractor.extract_content_list_from_creator(res.get("data"))
+            if watermark:
+                contents = watermark.filter_page(contents, lambda content: content.created_time)
+                is_end = is_end or watermark.reached
             if callback:
                 await callback(contents)
             all_contents.extend(contents)
@@ -506,6 +566,7 @@ class ZhiHuClient(AbstractApiClient):
         return all_contents
 
 
+    @cache_response("content_detail")
     async def get_answer_info(
         self, question_id: str, answer_id: str
     ) -> Optional[ZhihuContent]:
@@ -520,8 +581,9 @@ class ZhiHuClient(AbstractApiClient):
         """
         uri = f"/question/{question_id}/answer/{answer_id}"
         response_html = await self.get(uri, return_response=True)
-        return self._extractor.extract_answer_content_from_html(response_html)
+        return await parse_executor.parse(self._extractor.extract_answer_content_from_html, response_html)
 
+    @cache_response("content_detail")
     async def get_article_info(self, article_id: str) -> Optional[ZhihuContent]:
         """
         获取文章信息
@@ -533,8 +595,9 @@ class ZhiHuClient(AbstractApiClient):
         """
         uri = f"/p/{article_id}"
         response_html = await self.get(uri, return_response=True)
-        return self._extractor.extract_article_content_from_html(response_html)
+        return await parse_executor.parse(self._extractor.extract_article_content_from_html, response_html)
 
+    @cache_response("content_detail")
     async def get_video_info(self, video_id: str) -> Optional[ZhihuContent]:
         """
         获取视频信息
@@ -546,4 +609,4 @@ class ZhiHuClient(AbstractApiClient):
         """
         uri = f"/zvideo/{video_id}"
         response_html = await self.get(uri, return_response=True)
-        return self._extractor.extract_zvideo_content_from_html(response_html)
+        return await parse_executor.parse(self._extractor.extract_zvideo_content_from_html, response_html)
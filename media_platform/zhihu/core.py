@@ -23,9 +23,12 @@ import config
 from constant import zhihu as constant
 from base.base_crawler import AbstractCrawler
 from model.m_zhihu import ZhihuContent, ZhihuCreator
-from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
+from proxy.proxy_ip_pool import IpInfoModel, ProxyIpPool, create_ip_pool
 from store import zhihu as zhihu_store
 from tools import utils
+from tools.creator_scheduler import CreatorScheduler, crawl_semaphore, track_creator_pages
+from tools.concurrency_governor import stage_concurrency
+from tools.watermark import get_comment_watermark, get_creator_watermark
 from var import crawler_type_var, source_keyword_var
 
 from .client import ZhiHuClient
@@ -51,7 +54,7 @@ class ZhihuCrawler(AbstractCrawler):
         Returns:
 
         """
-        playwright_proxy_format, httpx_proxy_format = None, None
+        ip_proxy_pool, playwright_proxy_format, httpx_proxy_format = None, None, None
         if config.ENABLE_IP_PROXY:
             ip_proxy_pool = await create_ip_pool(config.IP_PROXY_POOL_COUNT, enable_validate_ip=True)
             ip_proxy_info: IpInfoModel = await ip_proxy_pool.get_proxy()
@@ -73,7 +76,7 @@ class ZhihuCrawler(AbstractCrawler):
             await self.context_page.goto(self.index_url, wait_until="domcontentloaded")
 
             # Create a client to interact with the zhihu website.
-            self.zhihu_client = await self.create_zhihu_client(httpx_proxy_format)
+            self.zhihu_client = await self.create_zhihu_client(httpx_proxy_format, ip_proxy_pool)
             if not await self.zhihu_client.pong():
                 login_obj = ZhiHuLogin(
                     login_type=config.LOGIN_TYPE,
@@ -129,14 +132,13 @@ class ZhihuCrawler(AbstractCrawler):
                         keyword=keyword,
                         page=page,
                     )
-                    utils.logger.info(f"[ZhihuCrawler.search] Search contents :{content_list}")
+                    utils.logger.info("[ZhihuCrawler.search] Search contents :%s", utils.truncate(content_list))
                     if not content_list:
                         utils.logger.info("No more content!")
                         break
 
                     page += 1
-                    for content in content_list:
-                        await zhihu_store.update_zhihu_content(content)
+                    await zhihu_store.batch_update_zhihu_contents(content_list)
 
                     await self.batch_get_content_comments(content_list)
                 except DataFetchError:
@@ -156,7 +158,7 @@ class ZhihuCrawler(AbstractCrawler):
             utils.logger.info(f"[ZhihuCrawler.batch_get_content_comments] Crawling comment mode is not enabled")
             return
 
-        semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+        semaphore = crawl_semaphore()
         task_list: List[Task] = []
         for content_item in content_list:
             task = asyncio.create_task(self.get_comments(content_item, semaphore), name=content_item.content_id)
@@ -175,11 +177,15 @@ class ZhihuCrawler(AbstractCrawler):
         """
         async with semaphore:
             utils.logger.info(f"[ZhihuCrawler.get_comments] Begin get note id comments {content_item.content_id}")
+            watermark = get_comment_watermark(content_item.content_id)
             await self.zhihu_client.get_note_all_comments(
                 content=content_item,
                 crawl_interval=random.random(),
-                callback=zhihu_store.batch_update_zhihu_note_comments
+                callback=zhihu_store.batch_update_zhihu_note_comments,
+                watermark=watermark
             )
+            if watermark:
+                watermark.commit()
 
     async def get_creators_and_notes(self) -> None:
         """
@@ -188,44 +194,61 @@ class ZhihuCrawler(AbstractCrawler):
 
         """
         utils.logger.info("[ZhihuCrawler.get_creators_and_notes] Begin get xiaohongshu creators")
-        for user_link in config.ZHIHU_CREATOR_URL_LIST:
-            utils.logger.info(f"[ZhihuCrawler.get_creators_and_notes] Begin get creator {user_link}")
-            user_url_token = user_link.split("/")[-1]
-            # get creator detail info from web html content
-            createor_info: ZhihuCreator = await self.zhihu_client.get_creator_info(url_token=user_url_token)
-            if not createor_info:
-                utils.logger.info(f"[ZhihuCrawler.get_creators_and_notes] Creator {user_url_token} not found")
-                continue
+        creator_scheduler = CreatorScheduler(config.CREATOR_CONCURRENCY_NUM, stage_concurrency())
+        await creator_scheduler.run(config.ZHIHU_CREATOR_URL_LIST, self.get_creator_and_notes)
 
-            utils.logger.info(f"[ZhihuCrawler.get_creators_and_notes] Creator info: {createor_info}")
-            await zhihu_store.save_creator(creator=createor_info)
+    async def get_creator_and_notes(self, user_link: str) -> None:
+        """
+        Get one creator's information and their notes and comments
+        Args:
+            user_link: creator url
 
-            # 默认只提取回答信息，如果需要文章和视频，把下面的注释打开即可
+        Returns:
 
-            # Get all anwser information of the creator
-            all_content_list = await self.zhihu_client.get_all_anwser_by_creator(
-                creator=createor_info,
-                crawl_interval=random.random(),
-                callback=zhihu_store.batch_update_zhihu_contents
-            )
+        """
+        utils.logger.info(f"[ZhihuCrawler.get_creator_and_notes] Begin get creator {user_link}")
+        user_url_token = user_link.split("/")[-1]
+        # get creator detail info from web html content
+        createor_info: ZhihuCreator = await self.zhihu_client.get_creator_info(url_token=user_url_token)
+        if not createor_info:
+            utils.logger.info(f"[ZhihuCrawler.get_creator_and_notes] Creator {user_url_token} not found")
+            return
+
+        utils.logger.info("[ZhihuCrawler.get_creator_and_notes] Creator info: %s", utils.truncate(createor_info))
+        await zhihu_store.save_creator(creator=createor_info)
+
+        # 默认只提取回答信息，如果需要文章和视频，把下面的注释打开即可
+
+        # Get all anwser information of the creator
+        watermark = get_creator_watermark(user_url_token)
+        all_content_list = await self.zhihu_client.get_all_anwser_by_creator(
+            creator=createor_info,
+            crawl_interval=random.random(),
+            callback=track_creator_pages(zhihu_store.batch_update_zhihu_contents),
+            watermark=watermark
+        )
 
 
-            # Get all articles of the creator's contents
-            # all_content_list = await self.zhihu_client.get_all_articles_by_creator(
-            #     creator=createor_info,
-            #     crawl_interval=random.random(),
-            #     callback=zhihu_store.batch_update_zhihu_contents
-            # )
+        # Get all articles of the creator's contents
+        # all_content_list = await self.zhihu_client.get_all_articles_by_creator(
+        #     creator=createor_info,
+        #     crawl_interval=random.random(),
+        #     callback=track_creator_pages(zhihu_store.batch_update_zhihu_contents),
+        #     watermark=watermark
+        # )
 
-            # Get all videos of the creator's contents
-            # all_content_list = await self.zhihu_client.get_all_videos_by_creator(
-            #     creator=createor_info,
-            #     crawl_interval=random.random(),
-            #     callback=zhihu_store.batch_update_zhihu_contents
-            # )
+        # Get all videos of the creator's contents
+        # all_content_list = await self.zhihu_client.get_all_videos_by_creator(
+        #     creator=createor_info,
+        #     crawl_interval=random.random(),
+        #     callback=track_creator_pages(zhihu_store.batch_update_zhihu_contents),
+        #     watermark=watermark
+        # )
 
-            # Get all comments of the creator's contents
-            await self.batch_get_content_comments(all_content_list)
+        # Get all comments of the creator's contents
+        await self.batch_get_content_comments(all_content_list)
+        if watermark:
+            watermark.commit()
 
     async def get_note_detail(
         self, full_note_url: str, semaphore: asyncio.Semaphore
@@ -279,7 +302,7 @@ class ZhihuCrawler(AbstractCrawler):
             full_note_url = full_note_url.split("?")[0]
             crawler_task = self.get_note_detail(
                 full_note_url=full_note_url,
-                semaphore=asyncio.Semaphore(config.MAX_CONCURRENCY_NUM),
+                semaphore=crawl_semaphore(),
             )
             get_note_detail_task_list.append(crawler_task)
 
@@ -311,12 +334,13 @@ class ZhihuCrawler(AbstractCrawler):
         }
         return playwright_proxy, httpx_proxy
 
-    async def create_zhihu_client(self, httpx_proxy: Optional[str]) -> ZhiHuClient:
+    async def create_zhihu_client(self, httpx_proxy: Optional[str], ip_pool: Optional[ProxyIpPool] = None) -> ZhiHuClient:
         """Create zhihu client"""
         utils.logger.info("[ZhihuCrawler.create_zhihu_client] Begin create zhihu API client ...")
         cookie_str, cookie_dict = utils.convert_cookies(await self.browser_context.cookies())
         zhihu_client_obj = ZhiHuClient(
             proxies=httpx_proxy,
+            ip_pool=ip_pool,
             headers={
                 'accept': '*/*',
                 'accept-language': 'zh-CN,zh;q=0.9',
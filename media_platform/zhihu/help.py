@@ -14,16 +14,17 @@ import json
 from typing import Dict, List, Optional
 from urllib.parse import parse_qs, urlparse
 
-import execjs
 from parsel import Selector
 
 from constant import zhihu as zhihu_constant
 from model.m_zhihu import ZhihuComment, ZhihuContent, ZhihuCreator
 from tools.crawler_util import extract_text_from_html
+from tools.metrics import metrics_registry
 
 ZHIHU_SGIN_JS = None
 
 
+@metrics_registry.timed("mediacrawler_sign_seconds", platform="zhihu")
 def sign(url: str, cookies: str) -> Dict:
     """
     zhihu sign algorithm
@@ -36,6 +37,7 @@ def sign(url: str, cookies: str) -> Dict:
     """
     global ZHIHU_SGIN_JS
     if not ZHIHU_SGIN_JS:
+        import execjs
         with open("libs/zhihu.js", mode="r", encoding="utf-8-sig") as f:
             ZHIHU_SGIN_JS = execjs.compile(f.read())
 
@@ -46,6 +48,7 @@ class ZhihuExtractor:
     def __init__(self):
         pass
 
+    @metrics_registry.timed("mediacrawler_extract_seconds", platform="zhihu")
     def extract_contents_from_search(self, json_data: Dict) -> List[ZhihuContent]:
         """
         extract zhihu contents
@@ -209,6 +212,7 @@ class ZhihuExtractor:
             )
         return res
 
+    @metrics_registry.timed("mediacrawler_extract_seconds", platform="zhihu")
     def extract_comments(self, page_content: ZhihuContent, comments: List[Dict]) -> List[ZhihuComment]:
         """
         extract zhihu comments
@@ -315,6 +319,7 @@ class ZhihuExtractor:
             return "未知"
 
 
+    @metrics_registry.timed("mediacrawler_extract_seconds", platform="zhihu")
     def extract_creator(self, user_url_token: str, html_content: str) -> Optional[ZhihuCreator]:
         """
         extract zhihu creator
@@ -360,6 +365,7 @@ class ZhihuExtractor:
         return res
 
 
+    @metrics_registry.timed("mediacrawler_extract_seconds", platform="zhihu")
     def extract_content_list_from_creator(self, anwser_list: List[Dict]) -> List[ZhihuContent]:
         """
         extract content list from creator
@@ -377,6 +383,7 @@ class ZhihuExtractor:
 
 
 
+    @metrics_registry.timed("mediacrawler_extract_seconds", platform="zhihu")
     def extract_answer_content_from_html(self, html_content: str) -> Optional[ZhihuContent]:
         """
         extract zhihu answer content from html
@@ -396,6 +403,7 @@ class ZhihuExtractor:
 
         return self._extract_answer_content(answer_info.get(list(answer_info.keys())[0]))
 
+    @metrics_registry.timed("mediacrawler_extract_seconds", platform="zhihu")
     def extract_article_content_from_html(self, html_content: str) -> Optional[ZhihuContent]:
         """
         extract zhihu article content from html
@@ -415,6 +423,7 @@ class ZhihuExtractor:
 
         return self._extract_article_content(article_info.get(list(article_info.keys())[0]))
 
+    @metrics_registry.timed("mediacrawler_extract_seconds", platform="zhihu")
     def extract_zvideo_content_from_html(self, html_content: str) -> Optional[ZhihuContent]:
         """
         extract zhihu zvideo content from html
@@ -17,11 +17,11 @@ import random
 from typing import Dict, List
 
 import httpx
-from tenacity import retry, stop_after_attempt, wait_fixed
 
 import config
 from proxy.providers import new_jisu_http_proxy, new_kuai_daili_proxy
 from tools import utils
+from tools.retry_policy import retry_policy
 
 from .base_proxy import ProxyProvider
 from .types import IpInfoModel, ProviderNameEnum
@@ -71,7 +71,7 @@ class ProxyIpPool:
             utils.logger.info(f"[ProxyIpPool._is_valid_proxy] testing {proxy.ip} err: {e}")
             raise e
 
-    @retry(stop=stop_after_attempt(3), wait=wait_fixed(1))
+    @retry_policy()
     async def get_proxy(self) -> IpInfoModel:
         """
         从代理池中随机提取一个代理IP
@@ -84,7 +84,8 @@ class ProxyIpPool:
         self.proxy_list.remove(proxy) # 取出来一个IP就应该移出掉
         if self.enable_validate_ip:
             if not await self._is_valid_proxy(proxy):
-                raise Exception("[ProxyIpPool.get_proxy] current ip invalid and again get it")
+                # 代理错误可以重试，下一次重试会换一个代理IP
+                raise httpx.ProxyError("[ProxyIpPool.get_proxy] current ip invalid and again get it")
         return proxy
 
     async def _reload_proxies(self):
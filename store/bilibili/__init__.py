@@ -14,13 +14,14 @@
 # @Time    : 2024/1/14 19:34
 # @Desc    :
 
-from typing import List
+from typing import Dict, List
 
 import config
 from var import source_keyword_var
 
 from .bilibili_store_impl import *
 from .bilibilli_store_video import *
+from .bilibili_store_record import BilibiliUpInfoRecord, BilibiliVideoCommentRecord, BilibiliVideoRecord
 
 
 class BiliStoreFactory:
@@ -29,108 +30,138 @@ class BiliStoreFactory:
         "db": BiliDbStoreImplement,
         "json": BiliJsonStoreImplement
     }
+    STORE_INSTANCES: Dict[str, AbstractStore] = {}
 
     @staticmethod
     def create_store() -> AbstractStore:
+        # 存储实现没有状态，同一种存储方式复用一个实例，不用每条数据都新建
+        store = BiliStoreFactory.STORE_INSTANCES.get(config.SAVE_DATA_OPTION)
+        if store:
+            return store
         store_class = BiliStoreFactory.STORES.get(config.SAVE_DATA_OPTION)
         if not store_class:
             raise ValueError(
                 "[BiliStoreFactory.create_store] Invalid save option only supported csv or db or json ...")
-        return store_class()
+        store = store_class()
+        BiliStoreFactory.STORE_INSTANCES[config.SAVE_DATA_OPTION] = store
+        return store
 
 
-async def update_bilibili_video(video_item: Dict):
+async def batch_update_bilibili_videos(video_items: List[Dict]):
+    if not video_items:
+        return
+    save_content_items = [_build_bilibili_video(video_item) for video_item in video_items]
+    utils.logger.info("[store.bilibili.batch_update_bilibili_videos] bilibili videos count: %s", len(save_content_items))
+    await BiliStoreFactory.create_store().store_contents_bulk(save_content_items)
+
+
+def _build_bilibili_video(video_item: Dict) -> BilibiliVideoRecord:
     video_item_view: Dict = video_item.get("View")
     video_user_info: Dict = video_item_view.get("owner")
     video_item_stat: Dict = video_item_view.get("stat")
     video_id = str(video_item_view.get("aid"))
-    save_content_item = {
-        "video_id": video_id,
-        "video_type": "video",
-        "title": video_item_view.get("title", "")[:500],
-        "desc": video_item_view.get("desc", "")[:500],
-        "create_time": video_item_view.get("pubdate"),
-        "user_id": str(video_user_info.get("mid")),
-        "nickname": video_user_info.get("name"),
-        "avatar": video_user_info.get("face", ""),
-        "liked_count": str(video_item_stat.get("like", "")),
-        "disliked_count": str(video_item_stat.get("dislike", "")),
-        "video_play_count": str(video_item_stat.get("view", "")),
-        "video_favorite_count": str(video_item_stat.get("favorite", "")),
-        "video_share_count": str(video_item_stat.get("share", "")),
-        "video_coin_count": str(video_item_stat.get("coin", "")),
-        "video_danmaku": str(video_item_stat.get("danmaku", "")),
-        "video_comment": str(video_item_stat.get("reply", "")),
-        "last_modify_ts": utils.get_current_timestamp(),
-        "video_url": f"https://www.bilibili.com/video/av{video_id}",
-        "video_cover_url": video_item_view.get("pic", ""),
-        "source_keyword": source_keyword_var.get(),
-    }
+    save_content_item = BilibiliVideoRecord(
+        video_id=video_id,
+        video_type="video",
+        title=video_item_view.get("title", "")[:500],
+        desc=video_item_view.get("desc", "")[:500],
+        create_time=video_item_view.get("pubdate"),
+        user_id=str(video_user_info.get("mid")),
+        nickname=video_user_info.get("name"),
+        avatar=video_user_info.get("face", ""),
+        liked_count=str(video_item_stat.get("like", "")),
+        disliked_count=str(video_item_stat.get("dislike", "")),
+        video_play_count=str(video_item_stat.get("view", "")),
+        video_favorite_count=str(video_item_stat.get("favorite", "")),
+        video_share_count=str(video_item_stat.get("share", "")),
+        video_coin_count=str(video_item_stat.get("coin", "")),
+        video_danmaku=str(video_item_stat.get("danmaku", "")),
+        video_comment=str(video_item_stat.get("reply", "")),
+        last_modify_ts=utils.get_current_timestamp(),
+        video_url=f"https://www.bilibili.com/video/av{video_id}",
+        video_cover_url=video_item_view.get("pic", ""),
+        source_keyword=source_keyword_var.get(),
+    )
+    return save_content_item
+
+
+async def update_bilibili_video(video_item: Dict):
+    save_content_item = _build_bilibili_video(video_item)
     utils.logger.info(
-        f"[store.bilibili.update_bilibili_video] bilibili video id:{video_id}, title:{save_content_item.get('title')}")
+        "[store.bilibili.update_bilibili_video] bilibili video id:%s, title:%s",
+        save_content_item.video_id, utils.truncate(save_content_item.get('title'))
+    )
     await BiliStoreFactory.create_store().store_content(content_item=save_content_item)
 
 
 async def update_up_info(video_item: Dict):  
     video_item_card_list: Dict = video_item.get("Card")
     video_item_card: Dict = video_item_card_list.get("card") 
-    saver_up_info = {
-        "user_id": str(video_item_card.get("mid")), 
-        "nickname": video_item_card.get("name"),  
-        "sex": video_item_card.get("sex"),
-        "sign": video_item_card.get("sign"),
-        "avatar": video_item_card.get("face"), 
-        "last_modify_ts": utils.get_current_timestamp(),  
-        "last_modify_datetime":datetime.now().strftime('%Y-%m-%d %H:%M:%S'),# 插入到数据库的时候，目前是时间戳的形式，补充为时间 [ Mia edited @ 2025.06.08 ]
-        "total_fans": video_item_card.get("fans"), 
-        "total_liked": video_item_card_list.get("like_num"), 
-        "user_rank": video_item_card.get("level_info").get("current_level"),  
-        "is_official": video_item_card.get("official_verify").get("type"), 
-        "video_count": video_item_card.get("video_count"), 
-    }
-    utils.logger.info(
-        f"[store.bilibili.update_up_info] bilibili user_id:{video_item_card.get('mid')}")
+    saver_up_info = BilibiliUpInfoRecord(
+        user_id=str(video_item_card.get("mid")), 
+        nickname=video_item_card.get("name"),  
+        sex=video_item_card.get("sex"),
+        sign=video_item_card.get("sign"),
+        avatar=video_item_card.get("face"), 
+        last_modify_ts=utils.get_current_timestamp(),  
+        last_modify_datetime=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),# 插入到数据库的时候，目前是时间戳的形式，补充为时间 [ Mia edited @ 2025.06.08 ]
+        total_fans=video_item_card.get("fans"), 
+        total_liked=video_item_card_list.get("like_num"), 
+        user_rank=video_item_card.get("level_info").get("current_level"),  
+        is_official=video_item_card.get("official_verify").get("type"), 
+        video_count=video_item_card.get("video_count"), 
+    )
+    utils.logger.info("[store.bilibili.update_up_info] bilibili user_id:%s", video_item_card.get('mid'))
     await BiliStoreFactory.create_store().store_creator(creator=saver_up_info)
     
 
 async def batch_update_bilibili_video_comments(video_id: str, comments: List[Dict]):
     if not comments:
         return
-    for comment_item in comments:
-        await update_bilibili_video_comment(video_id, comment_item)
+    save_comment_items = [_build_bilibili_video_comment(video_id, comment_item) for comment_item in comments]
+    utils.logger.info(
+        "[store.bilibili.batch_update_bilibili_video_comments] Bilibili video: %s, comments count: %s",
+        video_id, len(save_comment_items)
+    )
+    await BiliStoreFactory.create_store().store_comments_bulk(save_comment_items)
 
 
-async def update_bilibili_video_comment(video_id: str, comment_item: Dict):
+def _build_bilibili_video_comment(video_id: str, comment_item: Dict) -> BilibiliVideoCommentRecord:
     comment_id = str(comment_item.get("rpid"))
     parent_comment_id = str(comment_item.get("parent", 0))
     content: Dict = comment_item.get("content")
     user_info: Dict = comment_item.get("member")
-    save_comment_item = {
-        "comment_id": comment_id,
-        "parent_comment_id": parent_comment_id,
-        "create_time": comment_item.get("ctime"),
-        "video_id": str(video_id),
-        "content": content.get("message"),
-        "user_id": user_info.get("mid"),
-        "nickname": user_info.get("uname"),
-        "sex": user_info.get("sex"),
-        "sign": user_info.get("sign"),
-        "avatar": user_info.get("avatar"),
-        "sub_comment_count": str(comment_item.get("rcount", 0)),
-        "last_modify_ts": utils.get_current_timestamp(),
-    }
+    save_comment_item = BilibiliVideoCommentRecord(
+        comment_id=comment_id,
+        parent_comment_id=parent_comment_id,
+        create_time=comment_item.get("ctime"),
+        video_id=str(video_id),
+        content=content.get("message"),
+        user_id=user_info.get("mid"),
+        nickname=user_info.get("uname"),
+        sex=user_info.get("sex"),
+        sign=user_info.get("sign"),
+        avatar=user_info.get("avatar"),
+        sub_comment_count=str(comment_item.get("rcount", 0)),
+        last_modify_ts=utils.get_current_timestamp(),
+    )
+    return save_comment_item
+
+
+async def update_bilibili_video_comment(video_id: str, comment_item: Dict):
+    save_comment_item = _build_bilibili_video_comment(video_id, comment_item)
     utils.logger.info(
-        f"[store.bilibili.update_bilibili_video_comment] Bilibili video comment: {comment_id}, content: {save_comment_item.get('content')}")
+        "[store.bilibili.update_bilibili_video_comment] Bilibili video comment: %s, content: %s",
+        save_comment_item.comment_id, utils.truncate(save_comment_item.get('content'))
+    )
     await BiliStoreFactory.create_store().store_comment(comment_item=save_comment_item)
 
 
-async def store_video(aid, video_content, extension_file_name):
+def get_video_file_name(aid, extension_file_name: str) -> str:
     """
-    video video storage implementation
+    获取视频的本地保存路径，供流式下载器直接写入
     Args:
         aid:
-        video_content:
         extension_file_name:
     """
-    await BilibiliVideo().store_video(
-        {"aid": aid, "video_content": video_content, "extension_file_name": extension_file_name})
+    return BilibiliVideo().make_save_file_name(str(aid), extension_file_name)
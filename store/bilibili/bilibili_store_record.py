@@ -0,0 +1,81 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/6/28 10:30
+# @Desc    : B站存储记录，字段顺序与原来的字典一致(即 CSV 表头顺序)
+from store.record import StoreRecord, store_record
+
+
+@store_record
+class BilibiliVideoRecord(StoreRecord):
+    """
+    B站视频，对应数据库表 bilibili_video
+    """
+    video_id: str  # 视频ID
+    video_type: str  # 视频类型
+    title: str  # 视频标题
+    desc: str  # 视频描述
+    create_time: int  # 视频发布时间戳
+    user_id: str  # 用户ID
+    nickname: str  # 用户昵称
+    avatar: str  # 用户头像地址
+    liked_count: str  # 视频点赞数
+    disliked_count: str  # 视频点踩数
+    video_play_count: str  # 视频播放数量
+    video_favorite_count: str  # 视频收藏数量
+    video_share_count: str  # 视频分享数量
+    video_coin_count: str  # 视频投币数量
+    video_danmaku: str  # 视频弹幕数量
+    video_comment: str  # 视频评论数量
+    last_modify_ts: int  # 记录最后修改时间戳
+    video_url: str  # 视频详情URL
+    video_cover_url: str  # 视频封面图 URL
+    source_keyword: str
+
+
+@store_record
+class BilibiliUpInfoRecord(StoreRecord):
+    """
+    B站UP主，对应数据库表 bilibili_up_info
+    """
+    user_id: str  # 用户ID
+    nickname: str  # 用户昵称
+    sex: str  # 用户性别
+    sign: str  # 用户签名
+    avatar: str  # 用户头像地址
+    last_modify_ts: int  # 记录最后修改时间戳
+    last_modify_datetime: str  # 插入到数据库的时候，目前是时间戳的形式，补充为时间 [ Mia edited @ 2025.06.08 ]
+    total_fans: int  # 粉丝数
+    total_liked: int  # 总获赞数
+    user_rank: int  # 用户等级
+    is_official: int  # 是否官号
+    video_count: str  # 用户头像地址
+
+
+@store_record
+class BilibiliVideoCommentRecord(StoreRecord):
+    """
+    B站视频评论，对应数据库表 bilibili_video_comment
+    """
+    comment_id: str  # 评论ID
+    parent_comment_id: str  # 父评论ID
+    create_time: int  # 评论时间戳
+    video_id: str  # 视频ID
+    content: str  # 评论内容
+    user_id: str  # 用户ID
+    nickname: str  # 用户昵称
+    sex: str  # 用户性别
+    sign: str  # 用户签名
+    avatar: str  # 用户头像地址
+    sub_comment_count: str  # 评论回复数
+    last_modify_ts: int  # 记录最后修改时间戳
@@ -15,15 +15,17 @@
 # @Desc    : 抖音存储实现类
 import asyncio
 import csv
+import io
 import json
 import os
 import pathlib
-from typing import Dict
+from typing import Dict, List
 
 import aiofiles
 
 import config
 from base.base_crawler import AbstractStore
+from store.record import items_to_rows
 from tools import utils, words
 from var import crawler_type_var
 
@@ -68,13 +70,30 @@ class DouyinCsvStoreImplement(AbstractStore):
         Returns: no returns
 
         """
+        await self.save_data_list_to_csv(save_items=[save_item], store_type=store_type)
+
+    async def save_data_list_to_csv(self, save_items: List[Dict], store_type: str):
+        """
+        Save a page of items in CSV format, the file is opened and written once per page.
+        Args:
+            save_items: save content dict list
+            store_type: Save type contains content and comments（contents | comments）
+
+        Returns: no returns
+
+        """
+        if not save_items:
+            return
         pathlib.Path(self.csv_store_path).mkdir(parents=True, exist_ok=True)
         save_file_name = self.make_save_file_name(store_type=store_type)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
         async with aiofiles.open(save_file_name, mode='a+', encoding="utf-8-sig", newline="") as f:
-            writer = csv.writer(f)
+            fields = list(save_items[0].keys())
             if await f.tell() == 0:
-                await writer.writerow(save_item.keys())
-            await writer.writerow(save_item.values())
+                writer.writerow(fields)
+            writer.writerows(items_to_rows(save_items, fields))
+            await f.write(buffer.getvalue())
 
     async def store_content(self, content_item: Dict):
         """
@@ -98,6 +117,28 @@ class DouyinCsvStoreImplement(AbstractStore):
         """
         await self.save_data_to_csv(save_item=comment_item, store_type="comments")
 
+    async def store_contents_bulk(self, content_items: List[Dict]):
+        """
+        Douyin contents CSV storage implementation, one write per page
+        Args:
+            content_items: content item dict list
+
+        Returns:
+
+        """
+        await self.save_data_list_to_csv(save_items=content_items, store_type="contents")
+
+    async def store_comments_bulk(self, comment_items: List[Dict]):
+        """
+        Douyin comments CSV storage implementation, one write per page
+        Args:
+            comment_items: comment item dict list
+
+        Returns:
+
+        """
+        await self.save_data_list_to_csv(save_items=comment_items, store_type="comments")
+
     async def store_creator(self, creator: Dict):
         """
         Douyin creator CSV storage implementation
@@ -153,6 +194,18 @@ class DouyinDbStoreImplement(AbstractStore):
         else:
             await update_comment_by_comment_id(comment_id, comment_item=comment_item)
 
+    async def store_comments_bulk(self, comment_items: List[Dict]):
+        """
+        Douyin comments DB storage implementation, one query and one insert per page
+        Args:
+            comment_items: comment item dict list
+
+        Returns:
+
+        """
+        from .douyin_store_sql import batch_add_or_update_comments
+        await batch_add_or_update_comments(comment_items, add_ts=utils.get_current_timestamp())
+
     async def store_creator(self, creator: Dict):
         """
         Douyin content DB storage implementation
@@ -205,9 +258,23 @@ class DouyinJsonStoreImplement(AbstractStore):
         Returns:
 
         """
+        await self.save_data_list_to_json(save_items=[save_item], store_type=store_type)
+
+    async def save_data_list_to_json(self, save_items: List[Dict], store_type: str):
+        """
+        Save a page of items in json format, the file is read, written and the word cloud generated once per page.
+        Args:
+            save_items: save content dict list
+            store_type: Save type contains content and comments（contents | comments）
+
+        Returns:
+
+        """
+        if not save_items:
+            return
         pathlib.Path(self.json_store_path).mkdir(parents=True, exist_ok=True)
         pathlib.Path(self.words_store_path).mkdir(parents=True, exist_ok=True)
-        save_file_name,words_file_name_prefix = self.make_save_file_name(store_type=store_type)
+        save_file_name, words_file_name_prefix = self.make_save_file_name(store_type=store_type)
         save_data = []
 
         async with self.lock:
@@ -215,7 +282,7 @@ class DouyinJsonStoreImplement(AbstractStore):
                 async with aiofiles.open(save_file_name, 'r', encoding='utf-8') as file:
                     save_data = json.loads(await file.read())
 
-            save_data.append(save_item)
+            save_data.extend(dict(save_item) for save_item in save_items)
             async with aiofiles.open(save_file_name, 'w', encoding='utf-8') as file:
                 await file.write(json.dumps(save_data, ensure_ascii=False))
 
@@ -247,6 +314,27 @@ class DouyinJsonStoreImplement(AbstractStore):
         """
         await self.save_data_to_json(comment_item, "comments")
 
+    async def store_contents_bulk(self, content_items: List[Dict]):
+        """
+        Douyin contents JSON storage implementation, one write per page
+        Args:
+            content_items: content item dict list
+
+        Returns:
+
+        """
+        await self.save_data_list_to_json(content_items, "contents")
+
+    async def store_comments_bulk(self, comment_items: List[Dict]):
+        """
+        Douyin comments JSON storage implementation, one write per page
+        Args:
+            comment_items: comment item dict list
+
+        Returns:
+
+        """
+        await self.save_data_list_to_json(comment_items, "comments")
 
     async def store_creator(self, creator: Dict):
         """
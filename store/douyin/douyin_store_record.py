@@ -0,0 +1,85 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/6/28 10:30
+# @Desc    : 抖音存储记录，字段顺序与原来的字典一致(即 CSV 表头顺序)
+from store.record import StoreRecord, store_record
+
+
+@store_record
+class DouyinAwemeRecord(StoreRecord):
+    """
+    抖音视频，对应数据库表 douyin_aweme
+    """
+    aweme_id: str  # 视频ID
+    aweme_type: str  # 视频类型
+    title: str  # 视频标题
+    desc: str  # 视频描述
+    create_time: int  # 视频发布时间戳
+    user_id: str  # 用户ID
+    sec_uid: str  # 用户sec_uid
+    short_user_id: str  # 用户短ID
+    user_unique_id: str  # 用户唯一ID
+    user_signature: str  # 用户签名
+    nickname: str  # 用户昵称
+    avatar: str  # 用户头像地址
+    liked_count: str  # 视频点赞数
+    collected_count: str  # 视频收藏数
+    comment_count: str  # 视频评论数
+    share_count: str  # 视频分享数
+    ip_location: str  # 评论时的IP地址
+    last_modify_ts: int  # 记录最后修改时间戳
+    aweme_url: str  # 视频详情页URL
+    source_keyword: str
+
+
+@store_record
+class DouyinAwemeCommentRecord(StoreRecord):
+    """
+    抖音视频评论，对应数据库表 douyin_aweme_comment
+    """
+    comment_id: str  # 评论ID
+    create_time: int  # 评论时间戳
+    ip_location: str  # 评论时的IP地址
+    aweme_id: str  # 视频ID
+    content: str  # 评论内容
+    user_id: str  # 用户ID
+    sec_uid: str  # 用户sec_uid
+    short_user_id: str  # 用户短ID
+    user_unique_id: str  # 用户唯一ID
+    user_signature: str  # 用户签名
+    nickname: str  # 用户昵称
+    avatar: str  # 用户头像地址
+    sub_comment_count: str  # 评论回复数
+    like_count: str
+    last_modify_ts: int  # 记录最后修改时间戳
+    parent_comment_id: str  # 父评论ID
+    pictures: str
+
+
+@store_record
+class DouyinCreatorRecord(StoreRecord):
+    """
+    抖音创作者，对应数据库表 dy_creator
+    """
+    user_id: str  # 用户ID
+    nickname: str  # 用户昵称
+    gender: str  # 性别
+    avatar: str  # 用户头像地址
+    desc: str  # 用户描述
+    ip_location: str  # 评论时的IP地址
+    follows: str  # 关注数
+    fans: str  # 粉丝数
+    interaction: str  # 获赞数
+    videos_count: str  # 作品数
+    last_modify_ts: int  # 记录最后修改时间戳
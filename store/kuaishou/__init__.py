@@ -13,12 +13,13 @@
 # @Author  : relakkes@gmail.com
 # @Time    : 2024/1/14 20:03
 # @Desc    :
-from typing import List
+from typing import Dict, List
 
 import config
 from var import source_keyword_var
 
 from .kuaishou_store_impl import *
+from .kuaishou_store_record import KuaishouCreatorRecord, KuaishouVideoCommentRecord, KuaishouVideoRecord
 
 
 class KuaishouStoreFactory:
@@ -27,14 +28,21 @@ class KuaishouStoreFactory:
         "db": KuaishouDbStoreImplement,
         "json": KuaishouJsonStoreImplement
     }
+    STORE_INSTANCES: Dict[str, AbstractStore] = {}
 
     @staticmethod
     def create_store() -> AbstractStore:
+        # 存储实现没有状态，同一种存储方式复用一个实例，不用每条数据都新建
+        store = KuaishouStoreFactory.STORE_INSTANCES.get(config.SAVE_DATA_OPTION)
+        if store:
+            return store
         store_class = KuaishouStoreFactory.STORES.get(config.SAVE_DATA_OPTION)
         if not store_class:
             raise ValueError(
                 "[KuaishouStoreFactory.create_store] Invalid save option only supported csv or db or json ...")
-        return store_class()
+        store = store_class()
+        KuaishouStoreFactory.STORE_INSTANCES[config.SAVE_DATA_OPTION] = store
+        return store
 
 
 async def update_kuaishou_video(video_item: Dict):
@@ -43,68 +51,80 @@ async def update_kuaishou_video(video_item: Dict):
     if not video_id:
         return
     user_info = video_item.get("author", {})
-    save_content_item = {
-        "video_id": video_id,
-        "video_type": str(video_item.get("type")),
-        "title": photo_info.get("caption", "")[:500],
-        "desc": photo_info.get("caption", "")[:500],
-        "create_time": photo_info.get("timestamp"),
-        "user_id": user_info.get("id"),
-        "nickname": user_info.get("name"),
-        "avatar": user_info.get("headerUrl", ""),
-        "liked_count": str(photo_info.get("realLikeCount")),
-        "viewd_count": str(photo_info.get("viewCount")),
-        "last_modify_ts": utils.get_current_timestamp(),
-        "video_url": f"https://www.kuaishou.com/short-video/{video_id}",
-        "video_cover_url": photo_info.get("coverUrl", ""),
-        "video_play_url": photo_info.get("photoUrl", ""),
-        "source_keyword": source_keyword_var.get(),
-    }
+    save_content_item = KuaishouVideoRecord(
+        video_id=video_id,
+        video_type=str(video_item.get("type")),
+        title=photo_info.get("caption", "")[:500],
+        desc=photo_info.get("caption", "")[:500],
+        create_time=photo_info.get("timestamp"),
+        user_id=user_info.get("id"),
+        nickname=user_info.get("name"),
+        avatar=user_info.get("headerUrl", ""),
+        liked_count=str(photo_info.get("realLikeCount")),
+        viewd_count=str(photo_info.get("viewCount")),
+        last_modify_ts=utils.get_current_timestamp(),
+        video_url=f"https://www.kuaishou.com/short-video/{video_id}",
+        video_cover_url=photo_info.get("coverUrl", ""),
+        video_play_url=photo_info.get("photoUrl", ""),
+        source_keyword=source_keyword_var.get(),
+    )
     utils.logger.info(
-        f"[store.kuaishou.update_kuaishou_video] Kuaishou video id:{video_id}, title:{save_content_item.get('title')}")
+        "[store.kuaishou.update_kuaishou_video] Kuaishou video id:%s, title:%s",
+        video_id, utils.truncate(save_content_item.get('title'))
+    )
     await KuaishouStoreFactory.create_store().store_content(content_item=save_content_item)
 
 
 async def batch_update_ks_video_comments(video_id: str, comments: List[Dict]):
-    utils.logger.info(f"[store.kuaishou.batch_update_ks_video_comments] video_id:{video_id}, comments:{comments}")
+    utils.logger.info(
+        "[store.kuaishou.batch_update_ks_video_comments] video_id:%s, comments:%s",
+        video_id, utils.truncate(comments)
+    )
     if not comments:
         return
-    for comment_item in comments:
-        await update_ks_video_comment(video_id, comment_item)
+    save_comment_items = [_build_ks_video_comment(video_id, comment_item) for comment_item in comments]
+    await KuaishouStoreFactory.create_store().store_comments_bulk(save_comment_items)
 
 
-async def update_ks_video_comment(video_id: str, comment_item: Dict):
+def _build_ks_video_comment(video_id: str, comment_item: Dict) -> KuaishouVideoCommentRecord:
     comment_id = comment_item.get("commentId")
-    save_comment_item = {
-        "comment_id": comment_id,
-        "create_time": comment_item.get("timestamp"),
-        "video_id": video_id,
-        "content": comment_item.get("content"),
-        "user_id": comment_item.get("authorId"),
-        "nickname": comment_item.get("authorName"),
-        "avatar": comment_item.get("headurl"),
-        "sub_comment_count": str(comment_item.get("subCommentCount", 0)),
-        "last_modify_ts": utils.get_current_timestamp(),
-    }
+    save_comment_item = KuaishouVideoCommentRecord(
+        comment_id=comment_id,
+        create_time=comment_item.get("timestamp"),
+        video_id=video_id,
+        content=comment_item.get("content"),
+        user_id=comment_item.get("authorId"),
+        nickname=comment_item.get("authorName"),
+        avatar=comment_item.get("headurl"),
+        sub_comment_count=str(comment_item.get("subCommentCount", 0)),
+        last_modify_ts=utils.get_current_timestamp(),
+    )
+    return save_comment_item
+
+
+async def update_ks_video_comment(video_id: str, comment_item: Dict):
+    save_comment_item = _build_ks_video_comment(video_id, comment_item)
     utils.logger.info(
-        f"[store.kuaishou.update_ks_video_comment] Kuaishou video comment: {comment_id}, content: {save_comment_item.get('content')}")
+        "[store.kuaishou.update_ks_video_comment] Kuaishou video comment: %s, content: %s",
+        save_comment_item.comment_id, utils.truncate(save_comment_item.get('content'))
+    )
     await KuaishouStoreFactory.create_store().store_comment(comment_item=save_comment_item)
 
 async def save_creator(user_id: str, creator: Dict):
     ownerCount = creator.get('ownerCount', {})
     profile = creator.get('profile', {})
 
-    local_db_item = {
-        'user_id': user_id,
-        'nickname': profile.get('user_name'),
-        'gender': '女' if profile.get('gender') == "F" else '男',
-        'avatar': profile.get('headurl'),
-        'desc': profile.get('user_text'),
-        'ip_location': "",
-        'follows': ownerCount.get("follow"),
-        'fans': ownerCount.get("fan"),
-        'interaction': ownerCount.get("photo_public"),
-        "last_modify_ts": utils.get_current_timestamp(),
-    }
-    utils.logger.info(f"[store.kuaishou.save_creator] creator:{local_db_item}")
+    local_db_item = KuaishouCreatorRecord(
+        user_id=user_id,
+        nickname=profile.get('user_name'),
+        gender='女' if profile.get('gender') == "F" else '男',
+        avatar=profile.get('headurl'),
+        desc=profile.get('user_text'),
+        ip_location="",
+        follows=ownerCount.get("follow"),
+        fans=ownerCount.get("fan"),
+        interaction=ownerCount.get("photo_public"),
+        last_modify_ts=utils.get_current_timestamp(),
+    )
+    utils.logger.info("[store.kuaishou.save_creator] creator:%s", utils.truncate(local_db_item))
     await KuaishouStoreFactory.create_store().store_creator(local_db_item)
\ No newline at end of file
@@ -0,0 +1,160 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/6/28 10:00
+# @Desc    : 存储记录：带 __slots__ 的定长记录，替代存储流程中每条数据新建的字典
+import operator
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence, Tuple, Type, TypeVar
+
+from typing_extensions import dataclass_transform
+
+RecordType = TypeVar("RecordType", bound="StoreRecord")
+
+
+class StoreRecord:
+    """
+    存储记录基类，字段顺序即 CSV/数据库的列顺序，由 @store_record 生成
+    兼容存储实现中按字典使用的方式(keys/values/items/get/[]), DB 存储补充的 add_ts 等额外字段放在 _extra 中
+    """
+    __slots__ = ("_extra",)
+    FIELDS: Tuple[str, ...] = ()
+    # 按列顺序一次取出所有字段值，由 @store_record 生成
+    _values_getter: Callable[[Any], Tuple]
+    _extra: Dict[str, Any]
+
+    def values(self) -> Tuple:
+        """
+        按列顺序返回字段值，可以直接作为 SQL 参数和 CSV 行
+        """
+        values = self._values_getter(self)
+        extra = self._get_extra()
+        return values + tuple(extra.values()) if extra else values
+
+    def keys(self) -> Tuple[str, ...]:
+        extra = self._get_extra()
+        return self.FIELDS + tuple(extra.keys()) if extra else self.FIELDS
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        return zip(self.keys(), self.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def _get_extra(self) -> Dict[str, Any]:
+        try:
+            return self._extra
+        except AttributeError:
+            return {}
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.FIELDS:
+            return getattr(self, key)
+        return self._get_extra()[key]
+
+    def __setitem__(self, key: str, value: Any):
+        if key in self.FIELDS:
+            setattr(self, key, value)
+        else:
+            try:
+                self._extra[key] = value
+            except AttributeError:
+                self._extra = {key: value}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.FIELDS or key in self._get_extra()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.FIELDS) + len(self._get_extra())
+
+    def __repr__(self) -> str:
+        return repr(self.to_dict())
+
+    @classmethod
+    def to_rows(cls: Type[RecordType], records: Iterable[RecordType]) -> List[Tuple]:
+        """
+        批量转换成按列顺序的元组列表，只包含 FIELDS 中的字段，不包含 _extra
+        """
+        return list(map(cls._values_getter, records))
+
+
+def items_to_rows(items: Sequence[Any], fields: Sequence[str]) -> List[Tuple]:
+    """
+    把一批存储数据按 fields 的列顺序转换成元组列表，用于 csv writerows 和 executemany
+    StoreRecord 用 to_rows 一次取出所有字段，再补上 add_ts 等额外字段；字典按 fields 逐个取值
+    Args:
+        items: 同一种 StoreRecord 或者字典的列表
+        fields: 列名，一般是第一条数据的 keys()，StoreRecord 的列名以 FIELDS 开头
+
+    Returns:
+
+    """
+    if not items:
+        return []
+    record_cls = type(items[0])
+    if not issubclass(record_cls, StoreRecord):
+        return [tuple(item.get(field) for field in fields) for item in items]
+    rows = record_cls.to_rows(items)
+    extra_fields = fields[len(record_cls.FIELDS):]
+    if not extra_fields:
+        return rows
+    return [row + tuple(item.get(field) for field in extra_fields) for row, item in zip(rows, items)]
+
+
+def items_to_columns(items: Sequence[Any]) -> Tuple[List[str], List[Tuple]]:
+    """
+    把一批存储数据转换成列名和按列顺序的元组列表，用于 AsyncMysqlDB 的批量写入
+    Args:
+        items: 同一种 StoreRecord 或者字典的列表
+
+    Returns:
+        (列名, 元组列表)，列名是第一条数据的 keys()
+
+    """
+    if not items:
+        return [], []
+    fields = list(items[0].keys())
+    return fields, items_to_rows(items, fields)
+
+
+@dataclass_transform()
+def store_record(cls: Type[RecordType]) -> Type[RecordType]:
+    """
+    类装饰器，按字段注解的顺序生成带 __slots__ 的 dataclass:
+        @store_record
+        class XhsNoteComment(StoreRecord):
+            comment_id: str
+            ...
+    Args:
+        cls: 只有字段注解的 StoreRecord 子类
+
+    Returns:
+
+    """
+    fields = tuple(cls.__dict__.get("__annotations__", {}))
+    namespace = {key: value for key, value in cls.__dict__.items() if key not in ("__dict__", "__weakref__")}
+    namespace["__slots__"] = fields
+    namespace["FIELDS"] = fields
+    namespace["_values_getter"] = staticmethod(operator.attrgetter(*fields)) if len(fields) > 1 else \
+        staticmethod(lambda record: (getattr(record, fields[0]),))
+    record_cls = type(cls.__name__, cls.__bases__, namespace)
+    return dataclass(repr=False)(record_cls)
@@ -10,7 +10,7 @@
 
 
 # -*- coding: utf-8 -*-
-from typing import List
+from typing import Dict, List
 
 from model.m_baidu_tieba import TiebaComment, TiebaCreator, TiebaNote
 from var import source_keyword_var
@@ -25,14 +25,21 @@ class TieBaStoreFactory:
         "db": TieBaDbStoreImplement,
         "json": TieBaJsonStoreImplement
     }
+    STORE_INSTANCES: Dict[str, AbstractStore] = {}
 
     @staticmethod
     def create_store() -> AbstractStore:
+        # 存储实现没有状态，同一种存储方式复用一个实例，不用每条数据都新建
+        store = TieBaStoreFactory.STORE_INSTANCES.get(config.SAVE_DATA_OPTION)
+        if store:
+            return store
         store_class = TieBaStoreFactory.STORES.get(config.SAVE_DATA_OPTION)
         if not store_class:
             raise ValueError(
                 "[TieBaStoreFactory.create_store] Invalid save option only supported csv or db or json ...")
-        return store_class()
+        store = store_class()
+        TieBaStoreFactory.STORE_INSTANCES[config.SAVE_DATA_OPTION] = store
+        return store
 
 
 async def batch_update_tieba_notes(note_list: List[TiebaNote]):
@@ -46,8 +53,16 @@ async def batch_update_tieba_notes(note_list: List[TiebaNote]):
     """
     if not note_list:
         return
-    for note_item in note_list:
-        await update_tieba_note(note_item)
+    save_note_items = [_build_tieba_note(note_item) for note_item in note_list]
+    utils.logger.info("[store.tieba.batch_update_tieba_notes] tieba notes count: %s", len(save_note_items))
+    await TieBaStoreFactory.create_store().store_contents_bulk(save_note_items)
+
+
+def _build_tieba_note(note_item: TiebaNote) -> Dict:
+    note_item.source_keyword = source_keyword_var.get()
+    save_note_item = note_item.model_dump()
+    save_note_item.update({"last_modify_ts": utils.get_current_timestamp()})
+    return save_note_item
 
 
 async def update_tieba_note(note_item: TiebaNote):
@@ -59,10 +74,8 @@ async def update_tieba_note(note_item: TiebaNote):
     Returns:
 
     """
-    note_item.source_keyword = source_keyword_var.get()
-    save_note_item = note_item.model_dump()
-    save_note_item.update({"last_modify_ts": utils.get_current_timestamp()})
-    utils.logger.info(f"[store.tieba.update_tieba_note] tieba note: {save_note_item}")
+    save_note_item = _build_tieba_note(note_item)
+    utils.logger.info("[store.tieba.update_tieba_note] tieba note: %s", utils.truncate(save_note_item))
 
     await TieBaStoreFactory.create_store().store_content(save_note_item)
 
@@ -79,8 +92,18 @@ async def batch_update_tieba_note_comments(note_id: str, comments: List[TiebaCom
     """
     if not comments:
         return
-    for comment_item in comments:
-        await update_tieba_note_comment(note_id, comment_item)
+    save_comment_items = [_build_tieba_note_comment(comment_item) for comment_item in comments]
+    utils.logger.info(
+        "[store.tieba.batch_update_tieba_note_comments] tieba note id: %s comments count: %s",
+        note_id, len(save_comment_items)
+    )
+    await TieBaStoreFactory.create_store().store_comments_bulk(save_comment_items)
+
+
+def _build_tieba_note_comment(comment_item: TiebaComment) -> Dict:
+    save_comment_item = comment_item.model_dump()
+    save_comment_item.update({"last_modify_ts": utils.get_current_timestamp()})
+    return save_comment_item
 
 
 async def update_tieba_note_comment(note_id: str, comment_item: TiebaComment):
@@ -93,9 +116,11 @@ async def update_tieba_note_comment(note_id: str, comment_item: TiebaComment):
     Returns:
 
     """
-    save_comment_item = comment_item.model_dump()
-    save_comment_item.update({"last_modify_ts": utils.get_current_timestamp()})
-    utils.logger.info(f"[store.tieba.update_tieba_note_comment] tieba note id: {note_id} comment:{save_comment_item}")
+    save_comment_item = _build_tieba_note_comment(comment_item)
+    utils.logger.info(
+        "[store.tieba.update_tieba_note_comment] tieba note id: %s comment:%s",
+        note_id, utils.truncate(save_comment_item)
+    )
     await TieBaStoreFactory.create_store().store_comment(save_comment_item)
 
 
@@ -110,5 +135,5 @@ async def save_creator(user_info: TiebaCreator):
     """
     local_db_item = user_info.model_dump()
     local_db_item["last_modify_ts"] = utils.get_current_timestamp()
-    utils.logger.info(f"[store.tieba.save_creator] creator:{local_db_item}")
+    utils.logger.info("[store.tieba.save_creator] creator:%s", utils.truncate(local_db_item))
     await TieBaStoreFactory.create_store().store_creator(local_db_item)
@@ -15,12 +15,13 @@
 # @Desc    :
 
 import re
-from typing import List
+from typing import Dict, List, Optional
 
 from var import source_keyword_var
 
 from .weibo_store_image import *
 from .weibo_store_impl import *
+from .weibo_store_record import WeiboCreatorRecord, WeiboNoteCommentRecord, WeiboNoteRecord
 
 
 class WeibostoreFactory:
@@ -29,14 +30,21 @@ class WeibostoreFactory:
         "db": WeiboDbStoreImplement,
         "json": WeiboJsonStoreImplement,
     }
+    STORE_INSTANCES: Dict[str, AbstractStore] = {}
 
     @staticmethod
     def create_store() -> AbstractStore:
+        # 存储实现没有状态，同一种存储方式复用一个实例，不用每条数据都新建
+        store = WeibostoreFactory.STORE_INSTANCES.get(config.SAVE_DATA_OPTION)
+        if store:
+            return store
         store_class = WeibostoreFactory.STORES.get(config.SAVE_DATA_OPTION)
         if not store_class:
             raise ValueError(
                 "[WeibotoreFactory.create_store] Invalid save option only supported csv or db or json ...")
-        return store_class()
+        store = store_class()
+        WeibostoreFactory.STORE_INSTANCES[config.SAVE_DATA_OPTION] = store
+        return store
 
 
 async def batch_update_weibo_notes(note_list: List[Dict]):
@@ -50,19 +58,14 @@ async def batch_update_weibo_notes(note_list: List[Dict]):
     """
     if not note_list:
         return
-    for note_item in note_list:
-        await update_weibo_note(note_item)
+    save_content_items = [
+        save_content_item for save_content_item in map(_build_weibo_note, note_list) if save_content_item
+    ]
+    utils.logger.info("[store.weibo.batch_update_weibo_notes] weibo notes count: %s", len(save_content_items))
+    await WeibostoreFactory.create_store().store_contents_bulk(save_content_items)
 
 
-async def update_weibo_note(note_item: Dict):
-    """
-    Update weibo note
-    Args:
-        note_item:
-
-    Returns:
-
-    """
+def _build_weibo_note(note_item: Dict) -> Optional[WeiboNoteRecord]:
     if not note_item:
         return
 
@@ -71,30 +74,47 @@ async def update_weibo_note(note_item: Dict):
     note_id = mblog.get("id")
     content_text = mblog.get("text")
     clean_text = re.sub(r"<.*?>", "", content_text)
-    save_content_item = {
+    save_content_item = WeiboNoteRecord(
         # 微博信息
-        "note_id": note_id,
-        "content": clean_text,
-        "create_time": utils.rfc2822_to_timestamp(mblog.get("created_at")),
-        "create_date_time": str(utils.rfc2822_to_china_datetime(mblog.get("created_at"))),
-        "liked_count": str(mblog.get("attitudes_count", 0)),
-        "comments_count": str(mblog.get("comments_count", 0)),
-        "shared_count": str(mblog.get("reposts_count", 0)),
-        "last_modify_ts": utils.get_current_timestamp(),
-        "note_url": f"https://m.weibo.cn/detail/{note_id}",
-        "ip_location": mblog.get("region_name", "").replace("发布于 ", ""),
+        note_id=note_id,
+        content=clean_text,
+        create_time=utils.rfc2822_to_timestamp(mblog.get("created_at")),
+        create_date_time=str(utils.rfc2822_to_china_datetime(mblog.get("created_at"))),
+        liked_count=str(mblog.get("attitudes_count", 0)),
+        comments_count=str(mblog.get("comments_count", 0)),
+        shared_count=str(mblog.get("reposts_count", 0)),
+        last_modify_ts=utils.get_current_timestamp(),
+        note_url=f"https://m.weibo.cn/detail/{note_id}",
+        ip_location=mblog.get("region_name", "").replace("发布于 ", ""),
 
         # 用户信息
-        "user_id": str(user_info.get("id")),
-        "nickname": user_info.get("screen_name", ""),
-        "gender": user_info.get("gender", ""),
-        "profile_url": user_info.get("profile_url", ""),
-        "avatar": user_info.get("profile_image_url", ""),
+        user_id=str(user_info.get("id")),
+        nickname=user_info.get("screen_name", ""),
+        gender=user_info.get("gender", ""),
+        profile_url=user_info.get("profile_url", ""),
+        avatar=user_info.get("profile_image_url", ""),
 
-        "source_keyword": source_keyword_var.get(),
-    }
+        source_keyword=source_keyword_var.get(),
+    )
+    return save_content_item
+
+
+async def update_weibo_note(note_item: Dict):
+    """
+    Update weibo note
+    Args:
+        note_item:
+
+    Returns:
+
+    """
+    save_content_item = _build_weibo_note(note_item)
+    if not save_content_item:
+        return
     utils.logger.info(
-        f"[store.weibo.update_weibo_note] weibo note id:{note_id}, title:{save_content_item.get('content')[:24]} ...")
+        "[store.weibo.update_weibo_note] weibo note id:%s, title:%s ...",
+        save_content_item.note_id, utils.truncate(save_content_item.get('content'), 24)
+    )
     await WeibostoreFactory.create_store().store_content(content_item=save_content_item)
 
 
@@ -110,8 +130,44 @@ async def batch_update_weibo_note_comments(note_id: str, comments: List[Dict]):
     """
     if not comments:
         return
-    for comment_item in comments:
-        await update_weibo_note_comment(note_id, comment_item)
+    save_comment_items = [
+        save_comment_item for save_comment_item in
+        (_build_weibo_note_comment(note_id, comment_item) for comment_item in comments) if save_comment_item
+    ]
+    utils.logger.info(
+        "[store.weibo.batch_update_weibo_note_comments] Weibo note: %s, comments count: %s",
+        note_id, len(save_comment_items)
+    )
+    await WeibostoreFactory.create_store().store_comments_bulk(save_comment_items)
+
+
+def _build_weibo_note_comment(note_id: str, comment_item: Dict) -> Optional[WeiboNoteCommentRecord]:
+    if not comment_item or not note_id:
+        return
+    comment_id = str(comment_item.get("id"))
+    user_info: Dict = comment_item.get("user")
+    content_text = comment_item.get("text")
+    clean_text = re.sub(r"<.*?>", "", content_text)
+    save_comment_item = WeiboNoteCommentRecord(
+        comment_id=comment_id,
+        create_time=utils.rfc2822_to_timestamp(comment_item.get("created_at")),
+        create_date_time=str(utils.rfc2822_to_china_datetime(comment_item.get("created_at"))),
+        note_id=note_id,
+        content=clean_text,
+        sub_comment_count=str(comment_item.get("total_number", 0)),
+        comment_like_count=str(comment_item.get("like_count", 0)),
+        last_modify_ts=utils.get_current_timestamp(),
+        ip_location=comment_item.get("source", "").replace("来自", ""),
+        parent_comment_id=comment_item.get("rootid", ""),
+
+        # 用户信息
+        user_id=str(user_info.get("id")),
+        nickname=user_info.get("screen_name", ""),
+        gender=user_info.get("gender", ""),
+        profile_url=user_info.get("profile_url", ""),
+        avatar=user_info.get("profile_image_url", ""),
+    )
+    return save_comment_item
 
 
 async def update_weibo_note_comment(note_id: str, comment_item: Dict):
@@ -124,33 +180,13 @@ async def update_weibo_note_comment(note_id: str, comment_item: Dict):
     Returns:
 
     """
-    if not comment_item or not note_id:
+    save_comment_item = _build_weibo_note_comment(note_id, comment_item)
+    if not save_comment_item:
         return
-    comment_id = str(comment_item.get("id"))
-    user_info: Dict = comment_item.get("user")
-    content_text = comment_item.get("text")
-    clean_text = re.sub(r"<.*?>", "", content_text)
-    save_comment_item = {
-        "comment_id": comment_id,
-        "create_time": utils.rfc2822_to_timestamp(comment_item.get("created_at")),
-        "create_date_time": str(utils.rfc2822_to_china_datetime(comment_item.get("created_at"))),
-        "note_id": note_id,
-        "content": clean_text,
-        "sub_comment_count": str(comment_item.get("total_number", 0)),
-        "comment_like_count": str(comment_item.get("like_count", 0)),
-        "last_modify_ts": utils.get_current_timestamp(),
-        "ip_location": comment_item.get("source", "").replace("来自", ""),
-        "parent_comment_id": comment_item.get("rootid", ""),
-
-        # 用户信息
-        "user_id": str(user_info.get("id")),
-        "nickname": user_info.get("screen_name", ""),
-        "gender": user_info.get("gender", ""),
-        "profile_url": user_info.get("profile_url", ""),
-        "avatar": user_info.get("profile_image_url", ""),
-    }
     utils.logger.info(
-        f"[store.weibo.update_weibo_note_comment] Weibo note comment: {comment_id}, content: {save_comment_item.get('content', '')[:24]} ...")
+        "[store.weibo.update_weibo_note_comment] Weibo note comment: %s, content: %s ...",
+        save_comment_item.comment_id, utils.truncate(save_comment_item.get('content', ''), 24)
+    )
     await WeibostoreFactory.create_store().store_comment(comment_item=save_comment_item)
 
 
@@ -179,17 +215,17 @@ async def save_creator(user_id: str, user_info: Dict):
     Returns:
 
     """
-    local_db_item = {
-        'user_id': user_id,
-        'nickname': user_info.get('screen_name'),
-        'gender': '女' if user_info.get('gender') == "f" else '男',
-        'avatar': user_info.get('avatar_hd'),
-        'desc': user_info.get('description'),
-        'ip_location': user_info.get("source", "").replace("来自", ""),
-        'follows': user_info.get('follow_count', ''),
-        'fans': user_info.get('followers_count', ''),
-        'tag_list': '',
-        "last_modify_ts": utils.get_current_timestamp(),
-    }
-    utils.logger.info(f"[store.weibo.save_creator] creator:{local_db_item}")
+    local_db_item = WeiboCreatorRecord(
+        user_id=user_id,
+        nickname=user_info.get('screen_name'),
+        gender='女' if user_info.get('gender') == "f" else '男',
+        avatar=user_info.get('avatar_hd'),
+        desc=user_info.get('description'),
+        ip_location=user_info.get("source", "").replace("来自", ""),
+        follows=user_info.get('follow_count', ''),
+        fans=user_info.get('followers_count', ''),
+        tag_list='',
+        last_modify_ts=utils.get_current_timestamp(),
+    )
+    utils.logger.info("[store.weibo.save_creator] creator:%s", utils.truncate(local_db_item))
     await WeibostoreFactory.create_store().store_creator(local_db_item)
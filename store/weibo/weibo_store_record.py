@@ -0,0 +1,78 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/6/28 10:30
+# @Desc    : 微博存储记录，字段顺序与原来的字典一致(即 CSV 表头顺序)
+from store.record import StoreRecord, store_record
+
+
+@store_record
+class WeiboNoteRecord(StoreRecord):
+    """
+    微博帖子，对应数据库表 weibo_note
+    """
+    note_id: str  # 帖子ID
+    content: str  # 帖子正文内容
+    create_time: int  # 帖子发布时间戳
+    create_date_time: str  # 帖子发布日期时间
+    liked_count: str  # 帖子点赞数
+    comments_count: str  # 帖子评论数量
+    shared_count: str  # 帖子转发数量
+    last_modify_ts: int  # 记录最后修改时间戳
+    note_url: str  # 帖子详情URL
+    ip_location: str
+    user_id: str  # 用户ID
+    nickname: str  # 用户昵称
+    gender: str  # 用户性别
+    profile_url: str  # 用户主页地址
+    avatar: str  # 用户头像地址
+    source_keyword: str
+
+
+@store_record
+class WeiboNoteCommentRecord(StoreRecord):
+    """
+    微博帖子评论，对应数据库表 weibo_note_comment
+    """
+    comment_id: str  # 评论ID
+    create_time: int  # 评论时间戳
+    create_date_time: str  # 评论日期时间
+    note_id: str  # 帖子ID
+    content: str  # 评论内容
+    sub_comment_count: str  # 评论回复数
+    comment_like_count: str  # 评论点赞数量
+    last_modify_ts: int  # 记录最后修改时间戳
+    ip_location: str
+    parent_comment_id: str  # 父评论ID
+    user_id: str  # 用户ID
+    nickname: str  # 用户昵称
+    gender: str  # 用户性别
+    profile_url: str  # 用户主页地址
+    avatar: str  # 用户头像地址
+
+
+@store_record
+class WeiboCreatorRecord(StoreRecord):
+    """
+    微博创作者，对应数据库表 weibo_creator
+    """
+    user_id: str  # 用户ID
+    nickname: str  # 用户昵称
+    gender: str  # 性别
+    avatar: str  # 用户头像地址
+    desc: str  # 用户描述
+    ip_location: str  # 评论时的IP地址
+    follows: str  # 关注数
+    fans: str  # 粉丝数
+    tag_list: str  # 标签列表
+    last_modify_ts: int  # 记录最后修改时间戳
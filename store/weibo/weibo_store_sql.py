@@ -17,6 +17,7 @@
 from typing import Dict, List
 
 from db import AsyncMysqlDB
+from store.record import items_to_columns
 from var import media_crawler_db_var
 
 
@@ -66,6 +67,23 @@ async def update_content_by_content_id(content_id: str, content_item: Dict) -> i
     return effect_row
 
 
+async def batch_add_or_update_contents(content_items: List[Dict], add_ts: int) -> int:
+    """
+    批量新增或更新一页内容记录（xhs的帖子 ｜ 抖音的视频 ｜ 微博 ｜ 快手视频 ...）
+    Args:
+        content_items:
+        add_ts: 新增记录的 add_ts
+
+    Returns:
+
+    """
+    async_db_conn: AsyncMysqlDB = media_crawler_db_var.get()
+    fields, rows = items_to_columns(content_items)
+    effect_row: int = await async_db_conn.batch_insert_or_update("weibo_note", rows, "note_id",
+                                                                 insert_only={"add_ts": add_ts}, fields=fields)
+    return effect_row
+
+
 
 async def query_comment_by_comment_id(comment_id: str) -> Dict:
     """
@@ -113,6 +131,23 @@ async def update_comment_by_comment_id(comment_id: str, comment_item: Dict) -> i
     return effect_row
 
 
+async def batch_add_or_update_comments(comment_items: List[Dict], add_ts: int) -> int:
+    """
+    批量新增或更新一页评论记录
+    Args:
+        comment_items:
+        add_ts: 新增记录的 add_ts
+
+    Returns:
+
+    """
+    async_db_conn: AsyncMysqlDB = media_crawler_db_var.get()
+    fields, rows = items_to_columns(comment_items)
+    effect_row: int = await async_db_conn.batch_insert_or_update("weibo_note_comment", rows, "comment_id",
+                                                                 insert_only={"add_ts": add_ts}, fields=fields)
+    return effect_row
+
+
 async def query_creator_by_user_id(user_id: str) -> Dict:
     """
     查询一条创作者记录
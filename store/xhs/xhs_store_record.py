@@ -0,0 +1,82 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/6/28 10:30
+# @Desc    : 小红书存储记录，字段顺序与原来的字典一致(即 CSV 表头顺序)
+from store.record import StoreRecord, store_record
+
+
+@store_record
+class XhsNoteRecord(StoreRecord):
+    """
+    小红书笔记，对应数据库表 xhs_note
+    """
+    note_id: str  # 帖子id
+    type: str  # 帖子类型
+    title: str  # 帖子标题
+    desc: str  # 帖子描述
+    video_url: str  # 帖子视频url
+    time: int  # 帖子发布时间
+    last_update_time: int  # 帖子最后更新时间
+    user_id: str  # 用户id
+    nickname: str  # 用户昵称
+    avatar: str  # 用户头像
+    liked_count: str  # 点赞数
+    collected_count: str  # 收藏数
+    comment_count: str  # 评论数
+    share_count: str  # 分享数
+    ip_location: str  # ip地址
+    image_list: str  # 图片url
+    tag_list: str  # 标签
+    last_modify_ts: int  # 最后更新时间戳（MediaCrawler程序生成的，主要用途在db存储的时候记录一条记录最新更新时间）
+    note_url: str  # 帖子url
+    source_keyword: str  # 搜索关键词
+    xsec_token: str  # xsec_token
+
+
+@store_record
+class XhsNoteCommentRecord(StoreRecord):
+    """
+    小红书笔记评论，对应数据库表 xhs_note_comment
+    """
+    comment_id: str  # 评论id
+    create_time: int  # 评论时间
+    ip_location: str  # ip地址
+    note_id: str  # 帖子id
+    content: str  # 评论内容
+    user_id: str  # 用户id
+    nickname: str  # 用户昵称
+    avatar: str  # 用户头像
+    sub_comment_count: int  # 子评论数
+    pictures: str  # 评论图片
+    parent_comment_id: str  # 父评论id
+    last_modify_ts: int  # 最后更新时间戳（MediaCrawler程序生成的，主要用途在db存储的时候记录一条记录最新更新时间）
+    like_count: str  # 评论点赞数量
+
+
+@store_record
+class XhsCreatorRecord(StoreRecord):
+    """
+    小红书创作者，对应数据库表 xhs_creator
+    """
+    user_id: str  # 用户id
+    nickname: str  # 昵称
+    gender: str  # 性别
+    avatar: str  # 头像
+    desc: str  # 个人描述
+    ip_location: str  # ip地址
+    follows: str  # 关注数
+    fans: str  # 粉丝数
+    interaction: str  # 互动数
+    tag_list: str  # 标签列表
+    last_modify_ts: int  # 最后更新时间戳（MediaCrawler程序生成的，主要用途在db存储的时候记录一条记录最新更新时间）
@@ -10,7 +10,7 @@
 
 
 # -*- coding: utf-8 -*-
-from typing import List
+from typing import Dict, List
 
 import config
 from base.base_crawler import AbstractStore
@@ -28,13 +28,20 @@ class ZhihuStoreFactory:
         "db": ZhihuDbStoreImplement,
         "json": ZhihuJsonStoreImplement
     }
+    STORE_INSTANCES: Dict[str, AbstractStore] = {}
 
     @staticmethod
     def create_store() -> AbstractStore:
+        # 存储实现没有状态，同一种存储方式复用一个实例，不用每条数据都新建
+        store = ZhihuStoreFactory.STORE_INSTANCES.get(config.SAVE_DATA_OPTION)
+        if store:
+            return store
         store_class = ZhihuStoreFactory.STORES.get(config.SAVE_DATA_OPTION)
         if not store_class:
             raise ValueError("[ZhihuStoreFactory.create_store] Invalid save option only supported csv or db or json ...")
-        return store_class()
+        store = store_class()
+        ZhihuStoreFactory.STORE_INSTANCES[config.SAVE_DATA_OPTION] = store
+        return store
 
 async def batch_update_zhihu_contents(contents: List[ZhihuContent]):
     """
@@ -47,9 +54,17 @@ async def batch_update_zhihu_contents(contents: List[ZhihuContent]):
     """
     if not contents:
         return
+    local_db_items = [_build_zhihu_content(content_item) for content_item in contents]
+    utils.logger.info("[store.zhihu.batch_update_zhihu_contents] zhihu contents count: %s", len(local_db_items))
+    await ZhihuStoreFactory.create_store().store_contents_bulk(local_db_items)
+
+
+def _build_zhihu_content(content_item: ZhihuContent) -> Dict:
+    content_item.source_keyword = source_keyword_var.get()
+    local_db_item = content_item.model_dump()
+    local_db_item.update({"last_modify_ts": utils.get_current_timestamp()})
+    return local_db_item
 
-    for content_item in contents:
-        await update_zhihu_content(content_item)
 
 async def update_zhihu_content(content_item: ZhihuContent):
     """
@@ -60,10 +75,8 @@ async def update_zhihu_content(content_item: ZhihuContent):
     Returns:
 
     """
-    content_item.source_keyword = source_keyword_var.get()
-    local_db_item = content_item.model_dump()
-    local_db_item.update({"last_modify_ts": utils.get_current_timestamp()})
-    utils.logger.info(f"[store.zhihu.update_zhihu_content] zhihu content: {local_db_item}")
+    local_db_item = _build_zhihu_content(content_item)
+    utils.logger.info("[store.zhihu.update_zhihu_content] zhihu content: %s", utils.truncate(local_db_item))
     await ZhihuStoreFactory.create_store().store_content(local_db_item)
 
 
@@ -79,9 +92,15 @@ async def batch_update_zhihu_note_comments(comments: List[ZhihuComment]):
     """
     if not comments:
         return
-    
-    for comment_item in comments:
-        await update_zhihu_content_comment(comment_item)
+    local_db_items = [_build_zhihu_content_comment(comment_item) for comment_item in comments]
+    utils.logger.info("[store.zhihu.batch_update_zhihu_note_comments] zhihu comments count: %s", len(local_db_items))
+    await ZhihuStoreFactory.create_store().store_comments_bulk(local_db_items)
+
+
+def _build_zhihu_content_comment(comment_item: ZhihuComment) -> Dict:
+    local_db_item = comment_item.model_dump()
+    local_db_item.update({"last_modify_ts": utils.get_current_timestamp()})
+    return local_db_item
 
 
 async def update_zhihu_content_comment(comment_item: ZhihuComment):
@@ -93,9 +112,8 @@ async def update_zhihu_content_comment(comment_item: ZhihuComment):
     Returns:
 
     """
-    local_db_item = comment_item.model_dump()
-    local_db_item.update({"last_modify_ts": utils.get_current_timestamp()})
-    utils.logger.info(f"[store.zhihu.update_zhihu_note_comment] zhihu content comment:{local_db_item}")
+    local_db_item = _build_zhihu_content_comment(comment_item)
+    utils.logger.info("[store.zhihu.update_zhihu_note_comment] zhihu content comment:%s", utils.truncate(local_db_item))
     await ZhihuStoreFactory.create_store().store_comment(local_db_item)
 
 
@@ -0,0 +1,95 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/7/3 11:00
+# @Desc    : 客户端请求包装测试共用的假客户端和 config 覆盖
+import asyncio
+import unittest
+from typing import Any, Dict, List, Optional
+
+import config
+from base.base_crawler import AbstractApiClient
+from tools.concurrency_governor import mark_request_blocked
+from tools.metrics import module_platform, record_response_status
+
+def client_platform(client: AbstractApiClient) -> str:
+    """
+    客户端的请求按所在模块的平台名称统计、熔断和限制并发，测试模块中定义的子类使用测试模块的名称
+    Args:
+        client: 测试使用的客户端
+
+    Returns:
+
+    """
+    return module_platform(type(client).__module__)
+
+
+def override_config(test_case: unittest.TestCase, **values: Any):
+    """
+    临时修改 config 中的配置，测试用例结束后恢复原来的值，在 setUp 和测试方法中都可以使用
+    Args:
+        test_case: 当前测试用例
+        **values: 配置名和测试使用的值，例如 ENABLE_CIRCUIT_BREAKER=True
+
+    Returns:
+
+    """
+    for name, value in values.items():
+        test_case.addCleanup(setattr, config, name, getattr(config, name))
+        setattr(config, name, value)
+
+
+class FakeApiClient(AbstractApiClient):
+    """
+    不发出网络请求的客户端:
+        - 每个请求耗时 delay 秒，返回 HTTP 状态码 status_code，记录请求的 url 和同时进行的请求数量
+        - blocked 为 True 时请求被风控，url 中包含 error 时请求出错
+        - pong 返回 pong_ok
+    """
+
+    def __init__(self, proxies: Optional[Dict[str, str]] = None, cookie_dict: Optional[Dict[str, str]] = None,
+                 delay: float = 0):
+        self.proxies = proxies
+        self.cookie_dict = cookie_dict or {}
+        self.delay = delay
+        self.status_code = 200
+        self.blocked = False
+        self.pong_ok = True
+        self.requests: List[str] = []
+        self.pong_count = 0
+        self.running = 0
+        self.max_running = 0
+
+    async def request(self, method, url, **kwargs):
+        self.requests.append(url)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+        finally:
+            self.running -= 1
+        record_response_status(self.status_code)
+        if self.blocked:
+            mark_request_blocked()
+            raise Exception("account blocked")
+        if "error" in url:
+            raise Exception("request error")
+        return {"url": url.split("?")[0], "items": [len(self.requests)]}
+
+    async def pong(self) -> bool:
+        self.pong_count += 1
+        return self.pong_ok
+
+    async def update_cookies(self, browser_context):
+        pass
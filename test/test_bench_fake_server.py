@@ -0,0 +1,56 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/6/20 17:20
+# @Desc    :
+import json
+import unittest
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from bench.fake_server import HITS_PATH, FakePlatformServer, FakeServerConfig
+
+
+class TestFakePlatformServer(unittest.TestCase):
+
+    def _start(self, **kwargs) -> FakePlatformServer:
+        server = FakePlatformServer(FakeServerConfig(seed=1, **kwargs)).start()
+        self.addCleanup(server.stop)
+        return server
+
+    def test_route_by_path(self):
+        server = self._start(platform="bili")
+        with urlopen(f"{server.base_url}/x/v2/reply/wbi/main?oid=1&next=1") as response:
+            data = json.loads(response.read())
+        self.assertEqual(data["code"], 0)
+        self.assertTrue(data["data"]["replies"])
+
+    def test_route_by_graphql_operation(self):
+        server = self._start(platform="ks")
+        body = json.dumps({"operationName": "commentListQuery", "variables": {}}, separators=(",", ":"))
+        with urlopen(Request(f"{server.base_url}/graphql", data=body.encode("utf-8"))) as response:
+            data = json.loads(response.read())
+        self.assertIn("visionCommentList", data["data"])
+
+    def test_captcha_response(self):
+        server = self._start(platform="xhs", captcha_rate=1)
+        with self.assertRaises(HTTPError) as context:
+            urlopen(f"{server.base_url}/api/sns/web/v2/comment/page")
+        self.assertIn(context.exception.code, (461, 471))
+        self.assertEqual(context.exception.headers["Verifyuuid"], "bench-uuid")
+        with urlopen(f"{server.base_url}{HITS_PATH}") as response:
+            self.assertEqual(json.loads(response.read()), {"captcha": 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/6/25 15:30
+# @Desc    :
+import asyncio
+import unittest
+from typing import Dict, List, Optional
+
+from media_platform.bilibili.client import BilibiliClient
+from media_platform.bilibili.field import CommentOrderType
+from tools.watermark import COMMENT_WATERMARK_NAMESPACE, Watermark
+
+PAGE_SIZE = 20
+NEWEST_CTIME = 1700000000
+
+
+class FakeBilibiliClient(BilibiliClient):
+    """
+    一共 3 页一级评论，每条一级评论有 15 条二级评论
+    """
+
+    def __init__(self):
+        super().__init__(headers={}, playwright_page=None, cookie_dict={})
+        self.root_requests: List[str] = []
+        self.order_modes: List[CommentOrderType] = []
+        self.sub_requests: List[int] = []
+
+    async def get_video_comments(self, video_id: str, order_mode: CommentOrderType = CommentOrderType.DEFAULT,
+                                 next: int = 0, pagination_offset: Optional[str] = None) -> Dict:
+        self.root_requests.append(pagination_offset)
+        self.order_modes.append(order_mode)
+        page = int(pagination_offset or 0)
+        # rpid 越小的评论越新
+        return {
+            "cursor": {"is_end": page == 2, "pagination_reply": {"next_offset": str(page + 1)}},
+            "replies": [{"rpid": page * PAGE_SIZE + i, "rcount": 15, "ctime": NEWEST_CTIME - page * PAGE_SIZE - i}
+                        for i in range(PAGE_SIZE)],
+        }
+
+    async def get_video_level_two_comments(self, video_id: str, level_one_comment_id: int, pn: int, ps: int,
+                                           order_mode: CommentOrderType) -> Dict:
+        self.sub_requests.append(level_one_comment_id)
+        start = (pn - 1) * ps
+        return {
+            "page": {"count": 15},
+            "replies": [{"rpid": f"{level_one_comment_id}-{i}", "parent": level_one_comment_id}
+                        for i in range(start, min(start + ps, 15))],
+        }
+
+
+class TestBilibiliComments(unittest.TestCase):
+
+    def crawl(self, client: BilibiliClient, **kwargs) -> List[Dict]:
+        stored: List[Dict] = []
+
+        async def callback(video_id: str, comments: List[Dict]):
+            stored.extend(comments)
+
+        asyncio.run(client.get_video_all_comments("1", crawl_interval=0, callback=callback, **kwargs))
+        return stored
+
+    def test_root_budget(self):
+        client = FakeBilibiliClient()
+        stored = self.crawl(client, max_count=25)
+        self.assertEqual(len(stored), 25)
+        self.assertEqual(client.root_requests, ["", "1"])
+
+        client = FakeBilibiliClient()
+        self.assertEqual(len(self.crawl(client, max_count=1000)), 3 * PAGE_SIZE)
+        self.assertEqual(client.root_requests, ["", "1", "2"])
+
+    def test_sub_comment_budget(self):
+        client = FakeBilibiliClient()
+        stored = self.crawl(client, is_fetch_sub_comments=True, max_count=5, max_sub_count=40)
+        self.assertEqual(len([c for c in stored if "parent" not in c]), 5)
+        sub_comments = [c for c in stored if "parent" in c]
+        self.assertEqual(len(sub_comments), 40)
+        # 5 条一级评论的 rcount 相同，每条分到 8 条二级评论
+        self.assertEqual(sorted(set(client.sub_requests)), [0, 1, 2, 3, 4])
+        for rpid in range(5):
+            self.assertEqual(len([c for c in sub_comments if c["parent"] == rpid]), 8)
+        self.assertEqual(client.root_requests, [""])
+
+    def test_split_sub_comment_budget(self):
+        split = BilibiliClient._split_sub_comment_budget
+        self.assertEqual(split(40, [10, 0, 5]), [10, 0, 5])
+        self.assertEqual(split(10, [30, 10, 0]), [8, 2, 0])
+        self.assertEqual(split(10, [1, 1, 1]), [1, 1, 1])
+        shares = split(10, [7, 7, 7])
+        self.assertEqual(sum(shares), 10)
+        self.assertTrue(all(3 <= share <= 4 for share in shares))
+
+    def test_resume_cursor(self):
+        cursors = []
+
+        async def cursor_callback(video_id: str, next_cursor: Optional[str], fetched_count: int,
+                                  fetched_sub_count: int):
+            cursors.append((next_cursor, fetched_count, fetched_sub_count))
+
+        client = FakeBilibiliClient()
+        stored = self.crawl(client, max_count=1000, cursor="1", cursor_callback=cursor_callback)
+        self.assertEqual(len(stored), 2 * PAGE_SIZE)
+        self.assertEqual(client.root_requests, ["1", "2"])
+        self.assertEqual(cursors, [("2", PAGE_SIZE, 0), (None, 2 * PAGE_SIZE, 0)])
+
+    def test_resume_budget(self):
+        cursors = []
+
+        async def cursor_callback(video_id: str, next_cursor: Optional[str], fetched_count: int,
+                                  fetched_sub_count: int):
+            cursors.append((next_cursor, fetched_count, fetched_sub_count))
+
+        # 上一次运行已经爬取了 20 条一级评论和 30 条二级评论
+        client = FakeBilibiliClient()
+        stored = self.crawl(client, is_fetch_sub_comments=True, max_count=25, max_sub_count=40, cursor="1",
+                            cursor_callback=cursor_callback, fetched_count=PAGE_SIZE, fetched_sub_count=30)
+        self.assertEqual(len([c for c in stored if "parent" not in c]), 5)
+        self.assertEqual(len([c for c in stored if "parent" in c]), 10)
+        self.assertEqual(client.root_requests, ["1"])
+        self.assertEqual(cursors, [(None, 25, 40)])
+
+    def test_comment_watermark(self):
+        client = FakeBilibiliClient()
+        watermark = Watermark(COMMENT_WATERMARK_NAMESPACE, "1", enabled=False)
+        # rpid 30 之前的评论已经爬取过
+        watermark.position = NEWEST_CTIME - 30
+        stored = self.crawl(client, max_count=1000, watermark=watermark)
+        self.assertEqual([c["rpid"] for c in stored], list(range(30)))
+        self.assertEqual(client.root_requests, ["", "1"])
+        self.assertEqual(set(client.order_modes), {CommentOrderType.TIME})
+        self.assertEqual(watermark.newest_position, NEWEST_CTIME)
+
+
+if __name__ == '__main__':
+    unittest.main()
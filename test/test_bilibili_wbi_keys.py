@@ -0,0 +1,67 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/7/6 10:00
+# @Desc    :
+import asyncio
+import unittest
+from typing import List
+
+from media_platform.bilibili import client as bilibili_client
+from media_platform.bilibili.client import BilibiliClient
+
+
+class FakeBilibiliClient(BilibiliClient):
+
+    def __init__(self):
+        super().__init__(headers={}, playwright_page=None, cookie_dict={})
+        self.requests: List[str] = []
+
+    async def request(self, method, url, **kwargs):
+        self.requests.append(url)
+        key = len(self.requests)
+        return {
+            "isLogin": True,
+            "wbi_img": {
+                "img_url": f"https://i0.hdslb.com/bfs/wbi/img{key}.png",
+                "sub_url": f"https://i0.hdslb.com/bfs/wbi/sub{key}.png",
+            },
+        }
+
+
+class TestBilibiliWbiKeys(unittest.TestCase):
+
+    def test_keys_from_pong(self):
+        client = FakeBilibiliClient()
+
+        async def run():
+            self.assertTrue(await client.pong())
+            return await client.get_wbi_keys()
+
+        self.assertEqual(asyncio.run(run()), ("img1", "sub1"))
+        self.assertEqual(len(client.requests), 1)
+
+    def test_refresh_expired_keys(self):
+        client = FakeBilibiliClient()
+
+        async def run():
+            first = await client.get_wbi_keys()
+            client._wbi_keys_updated_at -= bilibili_client.WBI_KEYS_TTL_SEC + 1
+            return first, await client.get_wbi_keys(), await client.get_wbi_keys()
+
+        self.assertEqual(asyncio.run(run()), (("img1", "sub1"), ("img2", "sub2"), ("img2", "sub2")))
+        self.assertEqual(len(client.requests), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,187 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/6/17 15:00
+# @Desc    :
+import asyncio
+import unittest
+from typing import List
+
+from tools.browser_pool import BrowserPagePool
+
+INDEX_URL = "https://www.example.com"
+
+
+class FakePage:
+
+    def __init__(self):
+        self.url = ""
+        self.closed = False
+        self.goto_count = 0
+
+    def is_closed(self) -> bool:
+        return self.closed
+
+    async def close(self):
+        self.closed = True
+
+    async def goto(self, url: str):
+        self.goto_count += 1
+        self.url = url
+
+    async def evaluate(self, expression: str):
+        await asyncio.sleep(0.01)
+        if expression == "error":
+            raise Exception("sign js error")
+        return expression
+
+
+class FakeBrowserContext:
+    """
+    new_page 耗时 new_page_delay 秒
+    """
+
+    def __init__(self, new_page_delay: float = 0):
+        self.new_page_delay = new_page_delay
+        self.pages: List[FakePage] = []
+
+    async def new_page(self) -> FakePage:
+        await asyncio.sleep(self.new_page_delay)
+        page = FakePage()
+        self.pages.append(page)
+        return page
+
+
+class TestBrowserPagePool(unittest.TestCase):
+
+    def test_lease(self):
+        seed_page = FakePage()
+        browser_context = FakeBrowserContext()
+        pool = BrowserPagePool(browser_context, INDEX_URL, size=2)
+
+        async def run():
+            await pool.start(seed_page)
+            async with pool.lease() as page:
+                self.assertIs(page, seed_page)
+                self.assertEqual(await page.evaluate("sign"), "sign")
+            async with pool.lease() as page:
+                self.assertIs(page, browser_context.pages[0])
+            await pool.close()
+
+        asyncio.run(run())
+        self.assertEqual(len(browser_context.pages), 1)
+        self.assertEqual(browser_context.pages[0].url, INDEX_URL)
+        # seed_page 由爬虫自己关闭
+        self.assertFalse(seed_page.closed)
+        self.assertTrue(browser_context.pages[0].closed)
+
+    def test_concurrency(self):
+        pool = BrowserPagePool(FakeBrowserContext(), INDEX_URL, size=2)
+        leased_pages: List[FakePage] = []
+        running = 0
+        max_running = 0
+
+        async def sign():
+            nonlocal running, max_running
+            async with pool.lease() as page:
+                running += 1
+                max_running = max(max_running, running)
+                leased_pages.append(page)
+                await page.evaluate("sign")
+                running -= 1
+
+        async def run():
+            await pool.start()
+            await asyncio.gather(*[sign() for _ in range(6)])
+
+        asyncio.run(run())
+        self.assertEqual(max_running, 2)
+        self.assertEqual(len(set(map(id, leased_pages))), 2)
+
+    def test_recycle_unhealthy_page(self):
+        browser_context = FakeBrowserContext()
+        pool = BrowserPagePool(browser_context, INDEX_URL, size=1)
+
+        async def run():
+            await pool.start()
+            async with pool.lease() as page:
+                page.url = "https://www.example.com/website-login/captcha"
+            async with pool.lease() as new_page:
+                return page, new_page
+
+        page, new_page = asyncio.run(run())
+        self.assertTrue(page.closed)
+        self.assertIsNot(new_page, page)
+        self.assertEqual(new_page.url, INDEX_URL)
+
+    def test_recycle_seed_page(self):
+        seed_page = FakePage()
+        pool = BrowserPagePool(FakeBrowserContext(), INDEX_URL, size=1)
+
+        async def run():
+            await pool.start(seed_page)
+            async with pool.lease() as page:
+                page.url = "https://www.example.com/captcha"
+            async with pool.lease() as page:
+                return page
+
+        # 爬虫还在使用 seed_page，只重新跳转到首页
+        self.assertIs(asyncio.run(run()), seed_page)
+        self.assertFalse(seed_page.closed)
+        self.assertEqual(seed_page.url, INDEX_URL)
+
+    def test_error_does_not_recycle(self):
+        browser_context = FakeBrowserContext()
+        pool = BrowserPagePool(browser_context, INDEX_URL, size=1)
+
+        async def run():
+            await pool.start()
+            with self.assertRaises(Exception):
+                async with pool.lease() as page:
+                    await page.evaluate("error")
+            async with pool.lease() as same_page:
+                return page, same_page
+
+        page, same_page = asyncio.run(run())
+        self.assertIs(same_page, page)
+        self.assertFalse(page.closed)
+        self.assertEqual(len(browser_context.pages), 1)
+
+    def test_cancel_while_recycling(self):
+        browser_context = FakeBrowserContext()
+        pool = BrowserPagePool(browser_context, INDEX_URL, size=1)
+
+        async def lease_captcha_page():
+            async with pool.lease() as page:
+                page.url = "https://www.example.com/captcha"
+
+        async def run():
+            await pool.start()
+            # 回收时打开新页面很慢，租用页面的任务在回收过程中被取消
+            browser_context.new_page_delay = 10
+            task = asyncio.ensure_future(lease_captcha_page())
+            await asyncio.sleep(0.01)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+            browser_context.new_page_delay = 0
+            async with pool.lease() as page:
+                return page
+
+        page = asyncio.run(asyncio.wait_for(run(), timeout=5))
+        self.assertFalse(page.closed)
+        self.assertEqual(page.url, INDEX_URL)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/7/3 11:00
+# @Desc    :
+import asyncio
+import unittest
+
+from test.fake_api_client import FakeApiClient, client_platform, override_config
+from tools import concurrency_governor
+from tools.concurrency_governor import ConcurrencyGovernor, get_concurrency_governor
+
+
+class TestConcurrencyGovernor(unittest.TestCase):
+
+    def setUp(self):
+        override_config(self, ENABLE_ADAPTIVE_CONCURRENCY=True, ENABLE_REQUEST_COALESCING=False,
+                        MAX_CONCURRENCY_NUM=1, ADAPTIVE_CONCURRENCY_MAX=4)
+        concurrency_governor._concurrency_governors.clear()
+
+    def tearDown(self):
+        concurrency_governor._concurrency_governors.clear()
+
+    @staticmethod
+    async def request_many(client: FakeApiClient, count: int):
+        async def request():
+            try:
+                await client.request("GET", "/api")
+            except Exception:
+                pass
+
+        await asyncio.gather(*[request() for _ in range(count)])
+
+    def test_increase_and_decrease(self):
+        client = FakeApiClient(delay=0.01)
+        governor = get_concurrency_governor(client_platform(client))
+
+        async def run():
+            await self.request_many(client, 20)
+            self.assertEqual(governor.concurrency, 4)
+            self.assertEqual(client.max_running, 4)
+
+            # 同一批被风控的请求只减少一次
+            client.blocked = True
+            await self.request_many(client, 4)
+            self.assertEqual(governor.concurrency, 2)
+
+            client.max_running = 0
+            await self.request_many(client, 4)
+            self.assertEqual(governor.concurrency, 1)
+            self.assertLessEqual(client.max_running, 2)
+
+        asyncio.run(run())
+
+    def test_unhealthy_latency(self):
+        governor = ConcurrencyGovernor("test", initial_concurrency=2, max_concurrency=8)
+
+        async def run():
+            for delay in (0.01, 0.05, 0.05, 0.05, 0.05):
+                async with governor.request():
+                    await asyncio.sleep(delay)
+
+        asyncio.run(run())
+        # 耗时变长之后不再增加并发
+        self.assertEqual(governor.concurrency, 2)
+
+    def test_disabled(self):
+        override_config(self, ENABLE_ADAPTIVE_CONCURRENCY=False)
+        client = FakeApiClient(delay=0.01)
+        asyncio.run(self.request_many(client, 5))
+        self.assertEqual(client.max_running, 5)
+        self.assertEqual(concurrency_governor._concurrency_governors, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/7/2 10:30
+# @Desc    :
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from typing import List, Optional
+
+import config
+from tools import crawl_state, utils
+from tools.creator_id_cache import CREATOR_ID_NAMESPACE, CreatorIdCache
+
+
+class TestCreatorIdCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp_dir.name)
+        crawl_state._crawl_state_stores.clear()
+        self.searched: List[str] = []
+
+    def tearDown(self):
+        crawl_state._crawl_state_stores.clear()
+        os.chdir(self.cwd)
+        self.tmp_dir.cleanup()
+
+    async def search(self, name: str) -> Optional[str]:
+        self.searched.append(name)
+        return None if name == "unknown" else f"mid-{name}"
+
+    def resolve(self, names: List[str]):
+        return asyncio.run(CreatorIdCache("bili").resolve_many(names, self.search, concurrency=2))
+
+    def test_resolve_many(self):
+        os.makedirs("data/bili")
+        with open(config.CREATOR_ID_OVERRIDE_FILE % "bili", "w", encoding="utf-8") as f:
+            json.dump({"c": 42}, f)
+
+        self.assertEqual(self.resolve(["a", "b", "c", "unknown"]),
+                         {"a": "mid-a", "b": "mid-b", "c": "42", "unknown": None})
+        self.assertEqual(sorted(self.searched), ["a", "b", "unknown"])
+
+        # 第二次运行只搜索没有找到的创作者
+        self.searched.clear()
+        crawl_state._crawl_state_stores.clear()
+        self.assertEqual(self.resolve(["a", "b", "c", "unknown"])["a"], "mid-a")
+        self.assertEqual(self.searched, ["unknown"])
+
+    def test_expired(self):
+        expired_at = utils.get_unix_timestamp() - config.CREATOR_ID_CACHE_TTL_HOURS * 60 * 60 - 1
+        crawl_state.get_crawl_state_store("bili").set(CREATOR_ID_NAMESPACE, "a", {"id": "old", "updated_at": expired_at})
+        self.assertEqual(self.resolve(["a"]), {"a": "mid-a"})
+        self.assertEqual(self.searched, ["a"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/6/30 10:30
+# @Desc    :
+import asyncio
+import unittest
+from typing import List
+
+from tools.creator_scheduler import (CreatorScheduler, FairSemaphore, crawl_semaphore,
+                                     track_creator_pages)
+
+
+class TestFairSemaphore(unittest.TestCase):
+
+    def test_round_robin_between_keys(self):
+        order: List[str] = []
+
+        async def request(semaphore: FairSemaphore, key: str):
+            async with semaphore.for_key(key):
+                order.append(key)
+                await asyncio.sleep(0)
+
+        async def run():
+            semaphore = FairSemaphore(1)
+            # a 先排了 4 个请求，b 后面才来，b 不需要等 a 全部完成
+            await asyncio.gather(*([request(semaphore, "a") for _ in range(4)] +
+                                   [request(semaphore, "b") for _ in range(2)]))
+
+        asyncio.run(run())
+        self.assertEqual(order, ["a", "a", "b", "a", "b", "a"])
+
+    def test_cancelled_waiter(self):
+        async def run():
+            semaphore = FairSemaphore(1)
+            await semaphore.acquire("a")
+            waiter = asyncio.ensure_future(semaphore.acquire("b"))
+            await asyncio.sleep(0)
+            waiter.cancel()
+            await asyncio.sleep(0)
+            semaphore.release()
+            # 被取消的等待任务不会占用名额
+            await asyncio.wait_for(semaphore.acquire("c"), timeout=1)
+
+        asyncio.run(run())
+
+
+class TestCreatorScheduler(unittest.TestCase):
+
+    def test_run_creators(self):
+        running: List[int] = [0, 0]
+
+        @track_creator_pages
+        async def save_page(note_list: List[str]):
+            async with crawl_semaphore():
+                running[0] += 1
+                running[1] = max(running[1], running[0])
+                await asyncio.sleep(0.01)
+                running[0] -= 1
+
+        async def crawl_creator(creator_id: str):
+            if creator_id == "bad":
+                raise Exception("creator not found")
+            for _ in range(3):
+                await save_page([creator_id] * 2)
+
+        scheduler = CreatorScheduler(concurrency=3, request_concurrency=2)
+        asyncio.run(scheduler.run(["c1", "bad", "c2", "c3"], crawl_creator))
+
+        self.assertEqual(scheduler.progress["bad"].status, "failed")
+        for creator_id in ("c1", "c2", "c3"):
+            self.assertEqual(scheduler.progress[creator_id].status, "done")
+            self.assertEqual(scheduler.progress[creator_id].pages, 3)
+            self.assertEqual(scheduler.progress[creator_id].notes, 6)
+        self.assertEqual(running[1], 2)
+        self.assertIsNone(scheduler.first_unfinished())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/7/1 10:30
+# @Desc    :
+import asyncio
+import os
+import tempfile
+import unittest
+from typing import Dict, List
+
+import config
+from media_platform.douyin.client import DOUYINClient
+from tools import crawl_state, utils
+from tools.watermark import get_creator_watermark
+
+PAGE_SIZE = 18
+# 第 i 个视频在 2024-01-01 00:00:00 之后 i 小时发布
+BASE_TS = utils.get_unix_time_from_time_str("2024-01-01 00:00:00")
+# 第一页最前面是一条置顶的旧视频
+PINNED_AWEME = {"aweme_id": "pinned", "create_time": BASE_TS - 86400}
+
+
+class FakeDouYinClient(DOUYINClient):
+    """
+    一共 5 页视频，按发布时间从新到旧排列，publish_count 越大发布时间越新
+    """
+
+    def __init__(self, publish_count: int):
+        super().__init__(headers={}, playwright_page=None, cookie_dict={})
+        self.publish_count = publish_count
+        self.requests: List[str] = []
+
+    async def get_user_aweme_posts(self, sec_user_id: str, max_cursor: str = "") -> Dict:
+        self.requests.append(max_cursor)
+        page = int(max_cursor or 0)
+        newest = self.publish_count - page * PAGE_SIZE
+        aweme_list = [{"aweme_id": str(i), "create_time": BASE_TS + i * 3600} for i in range(newest, newest - PAGE_SIZE, -1)]
+        if page == 0:
+            aweme_list.insert(0, PINNED_AWEME)
+        return {"aweme_list": aweme_list, "has_more": int(page < 4), "max_cursor": str(page + 1)}
+
+
+class TestCreatorWatermark(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp_dir.name)
+        crawl_state._crawl_state_stores.clear()
+        self.origin_config = (config.ENABLE_CREATOR_INCREMENTAL, config.ENABLE_CREATOR_DAY_RANGE,
+                              config.START_DAY, config.END_DAY)
+        config.ENABLE_CREATOR_INCREMENTAL = True
+        config.ENABLE_CREATOR_DAY_RANGE = False
+
+    def tearDown(self):
+        (config.ENABLE_CREATOR_INCREMENTAL, config.ENABLE_CREATOR_DAY_RANGE,
+         config.START_DAY, config.END_DAY) = self.origin_config
+        crawl_state._crawl_state_stores.clear()
+        os.chdir(self.cwd)
+        self.tmp_dir.cleanup()
+
+    def crawl(self, client: FakeDouYinClient) -> List[Dict]:
+        async def run():
+            watermark = get_creator_watermark("creator", platform="dy")
+            aweme_list = await client.get_all_user_aweme_posts("creator", watermark=watermark)
+            watermark.commit()
+            return aweme_list
+
+        return asyncio.run(run())
+
+    def test_incremental(self):
+        first_client = FakeDouYinClient(publish_count=100)
+        self.assertEqual(len(self.crawl(first_client)), 5 * PAGE_SIZE + 1)
+        self.assertEqual(len(first_client.requests), 5)
+
+        # 新发布了 20 个视频，只需要翻两页
+        second_client = FakeDouYinClient(publish_count=120)
+        aweme_list = self.crawl(second_client)
+        self.assertEqual([aweme["aweme_id"] for aweme in aweme_list], [str(i) for i in range(120, 100, -1)])
+        self.assertEqual(second_client.requests, ["", "1"])
+
+        # 没有新视频时只请求第一页
+        third_client = FakeDouYinClient(publish_count=120)
+        self.assertEqual(self.crawl(third_client), [])
+        self.assertEqual(third_client.requests, [""])
+
+    def test_day_range(self):
+        config.ENABLE_CREATOR_INCREMENTAL = False
+        config.ENABLE_CREATOR_DAY_RANGE = True
+        config.START_DAY = "2024-01-03"
+        config.END_DAY = "2024-01-03"
+
+        client = FakeDouYinClient(publish_count=100)
+        aweme_list = self.crawl(client)
+        self.assertEqual([aweme["aweme_id"] for aweme in aweme_list], [str(i) for i in range(71, 47, -1)])
+        # 第三页最后一个视频在 START_DAY 之前，不再继续翻页
+        self.assertEqual(client.requests, ["", "1", "2"])
+
+
+if __name__ == '__main__':
+    unittest.main()
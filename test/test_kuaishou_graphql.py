@@ -0,0 +1,126 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/6/27 11:00
+# @Desc    :
+import asyncio
+import json
+import unittest
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+import config
+from media_platform.kuaishou.client import KuaiShouClient
+from media_platform.kuaishou.exception import DataFetchError
+from media_platform.kuaishou.graphql import KuaiShouGraphQL, minify_graphql
+
+
+class FakeKuaiShouClient(KuaiShouClient):
+
+    def __init__(self, batch_supported: bool):
+        super().__init__(headers={}, playwright_page=None, cookie_dict={})
+        self.batch_supported = batch_supported
+        self.batch_requests: List[int] = []
+        self.single_requests = 0
+
+    @staticmethod
+    def video_detail(operation: Dict) -> Dict:
+        return {"visionVideoDetail": {"photo": {"id": operation["variables"]["photoId"]}}}
+
+    async def _post_batch_chunk(self, chunk: List[Dict]) -> Optional[List[Optional[Dict]]]:
+        self.batch_requests.append(len(chunk))
+        if not self.batch_supported:
+            self._batch_supported = False
+            return None
+        return [self.video_detail(operation) for operation in chunk]
+
+    async def post(self, uri: str, data: dict) -> Dict:
+        self.single_requests += 1
+        return self.video_detail(data)
+
+
+class FakeRequestKuaiShouClient(KuaiShouClient):
+    """
+    替换 request，批量请求和逐个请求都经过 request，photoId 为 3x1 的请求出现网络错误
+    """
+
+    def __init__(self, batch_supported: bool):
+        super().__init__(headers={}, playwright_page=None, cookie_dict={})
+        self.batch_supported = batch_supported
+        self.requests: List[Any] = []
+
+    async def request(self, method, url, **kwargs) -> Any:
+        body = json.loads(kwargs["data"])
+        self.requests.append(body)
+        if isinstance(body, list):
+            if not self.batch_supported:
+                raise DataFetchError([{"message": "batch is not supported"}])
+            return [{"data": FakeKuaiShouClient.video_detail(operation)} for operation in body]
+        if body["variables"]["photoId"] == "3x1":
+            raise httpx.ConnectError("connection reset")
+        return FakeKuaiShouClient.video_detail(body)
+
+
+class TestKuaiShouGraphQL(unittest.TestCase):
+
+    def setUp(self):
+        self.origin_batch_size = config.KS_GRAPHQL_BATCH_SIZE
+        config.KS_GRAPHQL_BATCH_SIZE = 10
+
+    def tearDown(self):
+        config.KS_GRAPHQL_BATCH_SIZE = self.origin_batch_size
+
+    def test_minify_graphql(self):
+        self.assertEqual(minify_graphql("query q($id: String, $n: Int) {\n  # comment\n  a(id: $id) {\n    b\n    c\n  }\n}\n"),
+                         "query q($id:String$n:Int){a(id:$id){b c}}")
+        query = KuaiShouGraphQL().get("video_detail")
+        self.assertTrue(query.startswith("query visionVideoDetail($photoId:String"))
+        self.assertNotIn("\n", query)
+
+    def test_get_video_infos_batch(self):
+        client = FakeKuaiShouClient(batch_supported=True)
+        photo_ids = [f"3x{i}" for i in range(25)]
+        video_details = asyncio.run(client.get_video_infos(photo_ids))
+        self.assertEqual([video_detail["photo"]["id"] for video_detail in video_details], photo_ids)
+        # 最后剩下一个操作时不需要批量请求
+        self.assertEqual(client.batch_requests, [10, 10, 5])
+        self.assertEqual(client.single_requests, 0)
+
+    def test_get_video_infos_fallback(self):
+        client = FakeKuaiShouClient(batch_supported=False)
+        photo_ids = [f"3x{i}" for i in range(25)]
+        video_details = asyncio.run(client.get_video_infos(photo_ids))
+        self.assertEqual([video_detail["photo"]["id"] for video_detail in video_details], photo_ids)
+        asyncio.run(client.get_video_infos(photo_ids))
+        # 只探测一次，之后都逐个请求
+        self.assertEqual(client.batch_requests, [10])
+        self.assertEqual(client.single_requests, 50)
+
+    def test_post_batch_request(self):
+        photo_ids = [f"3x{i}" for i in range(3)]
+        client = FakeRequestKuaiShouClient(batch_supported=True)
+        video_details = asyncio.run(client.get_video_infos(photo_ids))
+        self.assertEqual([video_detail["photo"]["id"] for video_detail in video_details], photo_ids)
+        self.assertEqual(len(client.requests), 1)
+
+        # 不支持批量请求时逐个请求，一个操作的网络错误只让这个操作返回 None
+        client = FakeRequestKuaiShouClient(batch_supported=False)
+        video_details = asyncio.run(client.get_video_infos(photo_ids))
+        self.assertEqual([video_detail and video_detail["photo"]["id"] for video_detail in video_details],
+                         ["3x0", None, "3x2"])
+        self.assertEqual(len(client.requests), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
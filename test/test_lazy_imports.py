@@ -0,0 +1,46 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/6/19 15:10
+# @Desc    :
+
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ["pandas", "matplotlib", "wordcloud", "jieba", "cv2", "execjs"]
+
+CHECK_SCRIPT = """
+import json, sys
+sys.argv = ["main.py", "--platform", "tieba"]
+import main
+main.CrawlerFactory.create_crawler("tieba")
+print(json.dumps(sorted(m for m in sys.modules if m.split(".")[0] in %r)))
+""" % (HEAVY_MODULES,)
+
+
+class TestLazyImports(unittest.TestCase):
+
+    def test_tieba_does_not_import_heavy_modules(self):
+        # 在独立的解释器中执行，避免其他测试已经导入的模块干扰结果
+        output = subprocess.check_output([sys.executable, "-c", CHECK_SCRIPT], cwd=PROJECT_ROOT)
+        imported_modules = json.loads(output.decode().strip().splitlines()[-1])
+        self.assertEqual(imported_modules, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
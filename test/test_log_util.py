@@ -0,0 +1,66 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/6/22 16:10
+# @Desc    :
+import json
+import logging
+import os
+import unittest
+
+from tools.log_util import (PROJECT_ROOT, JsonLogFormatter, ModuleLevelFilter, PayloadSampleFilter,
+                            parse_module_levels, truncate)
+
+
+def make_record(relative_path: str, level: int = logging.INFO, msg: str = "message", args=None) -> logging.LogRecord:
+    return logging.LogRecord("MediaCrawler", level, os.path.join(PROJECT_ROOT, relative_path), 10, msg, args, None)
+
+
+class TestLogUtil(unittest.TestCase):
+
+    def test_truncate(self):
+        self.assertEqual(str(truncate("a" * 10, 4)), "aaaa...")
+        self.assertEqual(str(truncate({"id": 1}, 100)), "{'id': 1}")
+        page = {"cursor": "1", "comments": [{"content": "x" * 50} for _ in range(100)]}
+        text = str(truncate(page, 200))
+        self.assertEqual(text, str(page)[:200] + "...")
+        self.assertEqual(str(truncate(page, 0)), str(page))
+
+    def test_module_level_filter(self):
+        log_filter = ModuleLevelFilter(logging.INFO, {"store": logging.WARNING, "store.xhs": logging.DEBUG})
+        self.assertFalse(log_filter.filter(make_record("store/douyin/__init__.py")))
+        self.assertTrue(log_filter.filter(make_record("store/xhs/__init__.py", logging.DEBUG)))
+        self.assertTrue(log_filter.filter(make_record("media_platform/xhs/core.py")))
+        self.assertFalse(log_filter.filter(make_record("media_platform/xhs/core.py", logging.DEBUG)))
+        self.assertEqual(parse_module_levels("store=warning, media_platform.xhs=DEBUG"),
+                         {"store": "WARNING", "media_platform.xhs": "DEBUG"})
+        with self.assertRaises(ValueError):
+            parse_module_levels("store=LOUD")
+
+    def test_payload_sample_filter(self):
+        log_filter = PayloadSampleFilter(0.25)
+        records = [make_record("store/xhs/__init__.py", msg="%s", args=(truncate({}),)) for _ in range(8)]
+        self.assertEqual(sum(log_filter.filter(record) for record in records), 2)
+        self.assertTrue(log_filter.filter(make_record("store/xhs/__init__.py", logging.ERROR, "%s", (truncate({}),))))
+        self.assertTrue(log_filter.filter(make_record("store/xhs/__init__.py")))
+
+    def test_json_formatter(self):
+        record = make_record("media_platform/tieba/core.py", msg="note: %s", args=(truncate("中文", 10),))
+        log_item = json.loads(JsonLogFormatter().format(record))
+        self.assertEqual(log_item["message"], "note: 中文")
+        self.assertEqual(log_item["module"], "media_platform.tieba.core")
+        self.assertEqual(log_item["level"], "INFO")
+
+
+if __name__ == '__main__':
+    unittest.main()
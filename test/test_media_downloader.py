@@ -0,0 +1,285 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/6/16 15:20
+# @Desc    :
+
+import asyncio
+import hashlib
+import os
+import tempfile
+import unittest
+from typing import List, Optional
+
+import httpx
+
+from media_platform.xhs.help import get_img_mirror_urls
+from tools.media_downloader import PART_FILE_SUFFIX, MediaDownloader, MediaHashIndex, link_or_copy
+
+MEDIA_CONTENT = b"0123456789abcdefghij"
+
+
+class TestMediaHashIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.index_file = os.path.join(self.tmp_dir.name, "index.json")
+        self.media_file = os.path.join(self.tmp_dir.name, "1", "0.jpg")
+        os.makedirs(os.path.dirname(self.media_file))
+        with open(self.media_file, "wb") as f:
+            f.write(b"image")
+
+    def test_add_and_persist(self):
+        index = MediaHashIndex(self.index_file)
+        index.add("https://a.com/0.jpg", "hash0", self.media_file)
+        index.save()
+
+        index = MediaHashIndex(self.index_file)
+        self.assertEqual(index.get_by_url("https://a.com/0.jpg"), self.media_file)
+        self.assertEqual(index.get_by_hash("hash0"), self.media_file)
+
+    def test_save_only_when_changed(self):
+        MediaHashIndex(self.index_file).save()
+        self.assertFalse(os.path.exists(self.index_file))
+
+        index = MediaHashIndex(self.index_file)
+        index.add("https://a.com/0.jpg", "hash0", self.media_file)
+        index.save()
+        mtime = os.path.getmtime(self.index_file)
+        os.utime(self.index_file, (mtime - 10, mtime - 10))
+
+        index = MediaHashIndex(self.index_file)
+        index.add("https://a.com/0.jpg", "hash0", self.media_file)
+        index.save()
+        self.assertEqual(os.path.getmtime(self.index_file), mtime - 10)
+
+    def test_missing_file_is_ignored(self):
+        index = MediaHashIndex(self.index_file)
+        index.add("https://a.com/0.jpg", "hash0", self.media_file)
+        os.remove(self.media_file)
+        self.assertIsNone(index.get_by_url("https://a.com/0.jpg"))
+        self.assertIsNone(index.get_by_hash("hash0"))
+
+    def test_link_or_copy(self):
+        dst = os.path.join(self.tmp_dir.name, "2", "0.jpg")
+        link_or_copy(self.media_file, dst)
+        with open(dst, "rb") as f:
+            self.assertEqual(f.read(), b"image")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+
+class FailingMediaDownloader(MediaDownloader):
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.requested_urls: List[str] = []
+
+    async def _stream_to_file(self, url, save_file_name, headers, part_file=""):
+        self.requested_urls.append(url)
+        raise httpx.ConnectError("connect error")
+
+
+class PartialMediaDownloader(MediaDownloader):
+    """
+    每个镜像写入不同长度的内容之后连接断开
+    """
+
+    async def _stream_to_file(self, url, save_file_name, headers, part_file=""):
+        with open(part_file, "ab") as f:
+            f.write(url.encode()[-1:] * (int(url[-1]) + 1))
+        raise httpx.ConnectError("connect error")
+
+
+class TestMediaDownloader(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def test_hedged_download_retry_when_all_mirrors_failed(self):
+        downloader = FailingMediaDownloader(max_retries=2, index_file="", hedge_delay=0)
+        mirror_urls = get_img_mirror_urls("https://sns-webpic-qc.xhscdn.com/202407/abc/trace!nd_dft_wlteh_webp_3")
+        self.assertEqual(len(mirror_urls), 3)
+        self.assertTrue(all(url.endswith("/202407/abc/trace!nd_dft_wlteh_webp_3") for url in mirror_urls))
+
+        save_file_name = os.path.join(self.tmp_dir.name, "0.jpg")
+        result = asyncio.run(downloader.download(
+            "https://sns-webpic-qc.xhscdn.com/202407/abc/trace!nd_dft_wlteh_webp_3", save_file_name,
+            mirror_urls=mirror_urls,
+        ))
+        self.assertIsNone(result)
+        # 每次重试都请求了全部 4 个镜像
+        self.assertEqual(len(downloader.requested_urls), 8)
+
+    def test_hedged_download_keep_longest_part_file(self):
+        downloader = PartialMediaDownloader(max_retries=1, index_file="", hedge_delay=0)
+        save_file_name = os.path.join(self.tmp_dir.name, "0.jpg")
+        result = asyncio.run(downloader.download(
+            "https://a.com/0.jpg/1", save_file_name, mirror_urls=["https://b.com/0.jpg/3", "https://c.com/0.jpg/2"],
+        ))
+        self.assertIsNone(result)
+        # 只保留最长的临时文件，下次从这里续传
+        self.assertEqual(os.listdir(self.tmp_dir.name), ["0.jpg" + PART_FILE_SUFFIX])
+        with open(save_file_name + PART_FILE_SUFFIX, "rb") as f:
+            self.assertEqual(f.read(), b"3333")
+
+    def test_hedge_loser_is_not_success(self):
+        async def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.host == "slow.com":
+                await asyncio.sleep(1)
+            return httpx.Response(200, content=MEDIA_CONTENT)
+
+        downloader = MediaDownloader(index_file="", hedge_delay=0.01)
+        downloader._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        save_file_name = os.path.join(self.tmp_dir.name, "0.jpg")
+        result = asyncio.run(downloader.download(
+            "https://slow.com/0.jpg", save_file_name, mirror_urls=["https://fast.com/0.jpg"],
+        ))
+        self.assertEqual(result, save_file_name)
+        self.assertEqual(os.listdir(self.tmp_dir.name), ["0.jpg"])
+        stats = {host: (success_count, error_count)
+                 for host, _, success_count, error_count in downloader.mirror_stats.summary()}
+        self.assertEqual(stats, {"slow.com": (0, 0), "fast.com": (1, 0)})
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+
+class MockMediaServer:
+    """
+    支持 Range 请求的假媒体服务器，status_codes 为前几次请求依次返回的状态码
+    """
+
+    def __init__(self, status_codes: Optional[List[int]] = None, delay: float = 0):
+        self.status_codes = status_codes or []
+        self.delay = delay
+        self.range_headers: List[Optional[str]] = []
+        self.running = 0
+        self.max_running = 0
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.range_headers.append(request.headers.get("Range"))
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.running -= 1
+        if self.status_codes:
+            status_code = self.status_codes.pop(0)
+            if status_code == 416:
+                return httpx.Response(416, headers={"Content-Range": f"bytes */{len(MEDIA_CONTENT)}"})
+            if status_code == 206:
+                # 不管请求的 Range，总是从头返回
+                return httpx.Response(206, content=MEDIA_CONTENT, headers={
+                    "Content-Range": f"bytes 0-{len(MEDIA_CONTENT) - 1}/{len(MEDIA_CONTENT)}"
+                })
+            return httpx.Response(status_code)
+        range_header = request.headers.get("Range")
+        if range_header:
+            start = int(range_header[len("bytes="):].rstrip("-"))
+            return httpx.Response(206, content=MEDIA_CONTENT[start:], headers={
+                "Content-Range": f"bytes {start}-{len(MEDIA_CONTENT) - 1}/{len(MEDIA_CONTENT)}"
+            })
+        return httpx.Response(200, content=MEDIA_CONTENT)
+
+
+class TestMediaStreamDownload(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.save_file_name = os.path.join(self.tmp_dir.name, "1", "0.jpg")
+        self.part_file = self.save_file_name + PART_FILE_SUFFIX
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def download(self, server: MockMediaServer, part_content: bytes = b"") -> Optional[str]:
+        if part_content:
+            os.makedirs(os.path.dirname(self.part_file), exist_ok=True)
+            with open(self.part_file, "wb") as f:
+                f.write(part_content)
+        downloader = MediaDownloader(index_file="", chunk_size=4, max_retries=2)
+        downloader._client = httpx.AsyncClient(transport=httpx.MockTransport(server.handler))
+        return asyncio.run(downloader.download("https://a.com/0.jpg", self.save_file_name))
+
+    def assert_downloaded(self, result: Optional[str]):
+        self.assertEqual(result, self.save_file_name)
+        self.assertFalse(os.path.exists(self.part_file))
+        with open(self.save_file_name, "rb") as f:
+            self.assertEqual(f.read(), MEDIA_CONTENT)
+
+    def test_download(self):
+        server = MockMediaServer()
+        self.assert_downloaded(self.download(server))
+        self.assertEqual(server.range_headers, [None])
+
+    def test_resume(self):
+        server = MockMediaServer()
+        downloader = MediaDownloader(index_file="", chunk_size=4)
+        downloader._client = httpx.AsyncClient(transport=httpx.MockTransport(server.handler))
+        os.makedirs(os.path.dirname(self.part_file))
+        with open(self.part_file, "wb") as f:
+            f.write(MEDIA_CONTENT[:8])
+        content_hash = asyncio.run(downloader._stream_to_file("https://a.com/0.jpg", self.save_file_name, None))
+        self.assertEqual(server.range_headers, ["bytes=8-"])
+        self.assertEqual(content_hash, hashlib.sha256(MEDIA_CONTENT).hexdigest())
+        self.assert_downloaded(self.save_file_name)
+
+    def test_resume_from_wrong_position(self):
+        # 服务端忽略了 Range 的起始位置，删除临时文件后从头下载
+        server = MockMediaServer(status_codes=[206])
+        self.assert_downloaded(self.download(server, MEDIA_CONTENT[:8]))
+        self.assertEqual(server.range_headers, ["bytes=8-", None])
+
+    def test_range_not_satisfiable(self):
+        server = MockMediaServer(status_codes=[416])
+        self.assert_downloaded(self.download(server, MEDIA_CONTENT))
+        self.assertEqual(server.range_headers, [f"bytes={len(MEDIA_CONTENT)}-"])
+
+    def test_range_not_satisfiable_with_stale_part_file(self):
+        # 临时文件比完整文件更大，不能当成完整内容
+        server = MockMediaServer(status_codes=[416])
+        self.assert_downloaded(self.download(server, MEDIA_CONTENT + b"stale"))
+        self.assertEqual(server.range_headers, [f"bytes={len(MEDIA_CONTENT) + 5}-", None])
+
+    def test_retry_server_error(self):
+        server = MockMediaServer(status_codes=[503])
+        self.assert_downloaded(self.download(server))
+        self.assertEqual(len(server.range_headers), 2)
+
+    def test_client_error(self):
+        server = MockMediaServer(status_codes=[404])
+        self.assertIsNone(self.download(server))
+        self.assertEqual(len(server.range_headers), 1)
+        self.assertFalse(os.path.exists(self.save_file_name))
+
+    def test_bounded_pool(self):
+        server = MockMediaServer(delay=0.02)
+        downloader = MediaDownloader(index_file="", max_workers=2)
+        downloader._client = httpx.AsyncClient(transport=httpx.MockTransport(server.handler))
+
+        async def run():
+            for i in range(6):
+                await downloader.submit(f"https://a.com/{i}.jpg", os.path.join(self.tmp_dir.name, f"{i}.jpg"))
+            await downloader.join()
+
+        asyncio.run(run())
+        self.assertEqual(server.max_running, 2)
+        self.assertEqual(len(server.range_headers), 6)
+        self.assertTrue(all(os.path.exists(os.path.join(self.tmp_dir.name, f"{i}.jpg")) for i in range(6)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/6/24 14:00
+# @Desc    :
+import asyncio
+import threading
+import unittest
+
+import config
+from tools.metrics import metrics_registry
+from tools.parse_executor import ParseExecutor
+
+
+def parse_thread_name(content: str) -> str:
+    return threading.current_thread().name
+
+
+@metrics_registry.timed("mediacrawler_extract_seconds", platform="test")
+def parse_with_config(content: str) -> str:
+    return f"{content}:{config.PARSE_OFFLOAD_MIN_SIZE}"
+
+
+class TestParseExecutor(unittest.TestCase):
+
+    def setUp(self):
+        self.origin_config = (config.PARSE_EXECUTOR, config.PARSE_OFFLOAD_MIN_SIZE, config.ENABLE_METRICS)
+        self.executor = ParseExecutor()
+
+    def tearDown(self):
+        self.executor.shutdown()
+        config.PARSE_EXECUTOR, config.PARSE_OFFLOAD_MIN_SIZE, config.ENABLE_METRICS = self.origin_config
+        metrics_registry.reset()
+
+    def test_offload_by_size(self):
+        config.PARSE_EXECUTOR = "thread"
+        config.PARSE_OFFLOAD_MIN_SIZE = 10
+        small_page = asyncio.run(self.executor.parse(parse_thread_name, "a" * 9))
+        self.assertEqual(small_page, threading.current_thread().name)
+        large_page = asyncio.run(self.executor.parse(parse_thread_name, "a" * 10))
+        self.assertTrue(large_page.startswith("parse"))
+
+        config.PARSE_EXECUTOR = "none"
+        self.assertEqual(asyncio.run(self.executor.parse(parse_thread_name, "a" * 10)),
+                         threading.current_thread().name)
+
+    def test_process_fallback_for_unpicklable(self):
+        config.PARSE_EXECUTOR = "process"
+        config.PARSE_OFFLOAD_MIN_SIZE = 0
+        self.assertEqual(asyncio.run(self.executor.parse(lambda content, suffix: content + suffix, "a", "b")), "ab")
+
+    def test_process_config_and_metrics(self):
+        config.PARSE_EXECUTOR = "process"
+        config.PARSE_OFFLOAD_MIN_SIZE = 1
+        config.ENABLE_METRICS = True
+        metrics_registry.reset()
+        # 子进程使用主进程修改之后的配置，子进程中统计的耗时合并到主进程
+        self.assertEqual(asyncio.run(self.executor.parse(parse_with_config, "a")), "a:1")
+        counts = {dict(label_key)["platform"]: histogram.count for name, label_key, histogram in metrics_registry.collect()
+                  if name == "mediacrawler_extract_seconds"}
+        self.assertEqual(counts, {"test": 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
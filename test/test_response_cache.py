@@ -0,0 +1,164 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/7/5 14:00
+# @Desc    :
+import asyncio
+import os
+import tempfile
+import unittest
+from typing import Dict, Optional
+
+from pydantic import BaseModel
+
+from cache.disk_cache import ExpiringDiskCache
+from test.fake_api_client import FakeApiClient, override_config
+from tools import response_cache
+from tools.response_cache import cache_response
+
+
+class DemoCreator(BaseModel):
+    user_id: str
+    nickname: str = ""
+
+
+class CachedApiClient(FakeApiClient):
+
+    @cache_response("creator_info")
+    async def get_creator_info(self, creator_id: str) -> Dict:
+        wts = len(self.requests)
+        return await self.request("GET", f"/x/space/acc/info?mid={creator_id}&wts={wts}&w_rid={wts}")
+
+    @cache_response("content_detail")
+    async def get_note_by_id_from_html(self, note_id: str, enable_cookie: bool = False) -> Dict:
+        return await self.request("GET", f"/explore/{note_id}?cookie={enable_cookie}")
+
+    @cache_response("creator_info")
+    async def get_creator_model(self, creator_id: str) -> Optional[DemoCreator]:
+        result = await self.request("GET", f"/user/{creator_id}")
+        return DemoCreator(user_id=creator_id, nickname=str(result["items"][0]))
+
+    async def get_comments(self, note_id: str) -> Dict:
+        return await self.request("GET", f"/x/v2/reply?oid={note_id}")
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        override_config(self, ENABLE_RESPONSE_CACHE=True, RESPONSE_CACHE_TYPE="disk",
+                        RESPONSE_CACHE_DIR=os.path.join(self.tmp_dir.name, "%s", "response_cache"))
+        response_cache._response_caches.clear()
+
+    def tearDown(self):
+        response_cache._response_caches.clear()
+        self.tmp_dir.cleanup()
+
+    def test_cache_hit(self):
+        client = CachedApiClient()
+
+        async def run():
+            first = await client.get_creator_info("1")
+            first["items"].append("changed")
+            return first, await client.get_creator_info("1"), await client.get_creator_info("2")
+
+        first, second, other = asyncio.run(run())
+        self.assertEqual(len(client.requests), 2)
+        # 按方法参数缓存，返回的是缓存的副本
+        self.assertEqual(second, {"url": "/x/space/acc/info", "items": [1]})
+        self.assertEqual(other["items"], [2])
+
+    def test_only_cache_ok_response(self):
+        client = CachedApiClient()
+        client.status_code = 461
+
+        async def run():
+            await client.get_creator_info("1")
+            client.status_code = 200
+            await client.get_creator_info("1")
+            await client.get_creator_info("1")
+
+        asyncio.run(run())
+        # 验证码页面不缓存，之后 200 的结果才缓存
+        self.assertEqual(len(client.requests), 2)
+
+    def test_cookie_in_key(self):
+        async def run(client: CachedApiClient):
+            await client.get_note_by_id_from_html("1")
+            await client.get_note_by_id_from_html("1", enable_cookie=True)
+            await client.get_note_by_id_from_html("1", False)
+            await client.get_note_by_id_from_html("1", enable_cookie=True)
+
+        client = CachedApiClient()
+        asyncio.run(run(client))
+        self.assertEqual(client.requests, ["/explore/1?cookie=False", "/explore/1?cookie=True"])
+
+        # 带 cookie 的客户端不使用没有 cookie 时缓存的结果
+        client = CachedApiClient(cookie_dict={"web_session": "1"})
+        asyncio.run(run(client))
+        self.assertEqual(len(client.requests), 2)
+
+    def test_model_result(self):
+        client = CachedApiClient()
+
+        async def run():
+            return await client.get_creator_model("1"), await client.get_creator_model("1")
+
+        first, second = asyncio.run(run())
+        self.assertEqual(len(client.requests), 1)
+        self.assertIsInstance(second, DemoCreator)
+        self.assertEqual(second, first)
+
+    def test_uncached_method(self):
+        client = CachedApiClient()
+
+        async def run():
+            await client.get_comments("1")
+            await client.get_comments("1")
+
+        asyncio.run(run())
+        self.assertEqual(len(client.requests), 2)
+
+    def test_disk_cache_after_restart(self):
+        asyncio.run(CachedApiClient().get_creator_info("1"))
+        response_cache._response_caches.clear()
+
+        client = CachedApiClient()
+        result = asyncio.run(client.get_creator_info("1"))
+        self.assertEqual(client.requests, [])
+        self.assertEqual(result["items"], [1])
+
+    def test_disabled(self):
+        override_config(self, ENABLE_RESPONSE_CACHE=False)
+        client = CachedApiClient()
+
+        async def run():
+            await client.get_creator_info("1")
+            await client.get_creator_info("1")
+
+        asyncio.run(run())
+        self.assertEqual(len(client.requests), 2)
+
+    def test_disk_cache_max_size(self):
+        cache = ExpiringDiskCache(os.path.join(self.tmp_dir.name, "disk_cache"), max_size=10)
+        for i in range(25):
+            cache.set(f"key_{i}", {"value": i}, 60)
+        self.assertLessEqual(len(cache.keys("*")), 10)
+        self.assertEqual(cache.get("key_24"), {"value": 24})
+        self.assertIsNone(cache.get("key_0"))
+        cache.set("expired", 1, -1)
+        self.assertIsNone(cache.get("expired"))
+
+
+if __name__ == '__main__':
+    unittest.main()
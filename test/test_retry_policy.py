@@ -0,0 +1,162 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/7/3 16:00
+# @Desc    :
+import asyncio
+import unittest
+from typing import List
+
+import httpx
+from tenacity import RetryError
+
+import config
+from base.base_crawler import AbstractApiClient
+from media_platform.xhs.exception import DataFetchError, IPBlockError
+from tools import concurrency_governor, retry_policy
+from tools.retry_policy import ErrorKind, backoff_seconds, classify_error
+
+
+def status_error(status_code: int, headers=None) -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", "https://example.com")
+    response = httpx.Response(status_code, headers=headers, request=request)
+    return httpx.HTTPStatusError("error", request=request, response=response)
+
+
+class FakeClient:
+
+    def __init__(self, errors: List[Exception]):
+        self.errors = errors
+        self.requests = 0
+
+    @retry_policy.retry_policy()
+    async def request(self):
+        self.requests += 1
+        if self.requests <= len(self.errors):
+            raise self.errors[self.requests - 1]
+        return "ok"
+
+    @retry_policy.retry_policy()
+    async def get_note_detail(self):
+        return await self.request()
+
+
+class RetryingApiClient(AbstractApiClient):
+    """
+    url 为 /fail 的请求第一次出现网络错误
+    """
+
+    def __init__(self):
+        self.requests: List[str] = []
+        self.finished: List[str] = []
+
+    @retry_policy.retry_policy()
+    async def request(self, method, url, **kwargs):
+        self.requests.append(url)
+        await asyncio.sleep(0.01)
+        if url == "/fail" and self.requests.count(url) == 1:
+            raise httpx.ReadError("reset")
+        return {}
+
+    async def get(self, url: str):
+        await self.request("GET", url)
+        self.finished.append(url)
+
+    async def update_cookies(self, browser_context):
+        pass
+
+
+class TestRetryPolicy(unittest.TestCase):
+
+    def setUp(self):
+        self.origin_config = (config.RETRY_MAX_ATTEMPTS, config.RETRY_BACKOFF_BASE_SEC, config.RETRY_BUDGET)
+        config.RETRY_MAX_ATTEMPTS = 3
+        config.RETRY_BACKOFF_BASE_SEC = 0
+        config.RETRY_BUDGET = 0
+        retry_policy._retry_budget = None
+
+    def tearDown(self):
+        config.RETRY_MAX_ATTEMPTS, config.RETRY_BACKOFF_BASE_SEC, config.RETRY_BUDGET = self.origin_config
+        retry_policy._retry_budget = None
+
+    def test_classify_error(self):
+        self.assertEqual(classify_error(httpx.ConnectTimeout("timeout")), ErrorKind.RETRYABLE)
+        self.assertEqual(classify_error(status_error(502)), ErrorKind.RETRYABLE)
+        self.assertEqual(classify_error(status_error(429)), ErrorKind.RATE_LIMITED)
+        self.assertEqual(classify_error(status_error(404)), ErrorKind.PERMANENT)
+        self.assertEqual(classify_error(IPBlockError("ip block")), ErrorKind.BLOCKED)
+        self.assertEqual(classify_error(Exception("出现验证码，请求失败")), ErrorKind.BLOCKED)
+        self.assertEqual(classify_error(DataFetchError("note not found")), ErrorKind.PERMANENT)
+        self.assertEqual(classify_error(KeyError("data")), ErrorKind.PERMANENT)
+
+    def test_retry_after(self):
+        config.RETRY_BACKOFF_BASE_SEC = 1
+        self.assertEqual(backoff_seconds(1, status_error(429, headers={"Retry-After": "12"})), 12)
+        for attempt_number in range(1, 5):
+            backoff = min(2 ** (attempt_number - 1), config.RETRY_BACKOFF_MAX_SEC)
+            wait = backoff_seconds(attempt_number, status_error(503))
+            self.assertTrue(backoff / 2 <= wait <= backoff)
+
+    def test_retry_by_error_kind(self):
+        client = FakeClient([httpx.ReadError("reset"), status_error(503)])
+        self.assertEqual(asyncio.run(client.request()), "ok")
+        self.assertEqual(client.requests, 3)
+
+        client = FakeClient([Exception("出现验证码，请求失败")])
+        with self.assertRaises(Exception):
+            asyncio.run(client.request())
+        self.assertEqual(client.requests, 1)
+
+    def test_nested_retry(self):
+        client = FakeClient([httpx.ReadError("reset")] * 10)
+        with self.assertRaises(RetryError):
+            asyncio.run(client.get_note_detail())
+        # 只有最外层重试
+        self.assertEqual(client.requests, 3)
+
+    def test_retry_budget(self):
+        config.RETRY_BUDGET = 3
+        client = FakeClient([httpx.ReadError("reset")] * 10)
+        with self.assertRaises(RetryError):
+            asyncio.run(client.request())
+        with self.assertRaises(httpx.ReadError):
+            asyncio.run(client.request())
+        self.assertEqual(client.requests, 5)
+
+    def test_retry_outside_governor(self):
+        origin_config = (config.ENABLE_ADAPTIVE_CONCURRENCY, config.MAX_CONCURRENCY_NUM,
+                         config.ADAPTIVE_CONCURRENCY_MAX, config.ENABLE_REQUEST_COALESCING)
+        config.ENABLE_ADAPTIVE_CONCURRENCY = True
+        config.MAX_CONCURRENCY_NUM = 1
+        config.ADAPTIVE_CONCURRENCY_MAX = 1
+        config.ENABLE_REQUEST_COALESCING = False
+        config.RETRY_BACKOFF_BASE_SEC = 0.2
+        concurrency_governor._concurrency_governors.clear()
+        try:
+            client = RetryingApiClient()
+
+            async def run():
+                await asyncio.gather(client.get("/fail"), client.get("/ok"))
+
+            asyncio.run(run())
+            # 只有一个请求名额，/fail 重试等待时 /ok 已经拿到名额完成请求
+            self.assertEqual(client.requests, ["/fail", "/ok", "/fail"])
+            self.assertEqual(client.finished, ["/ok", "/fail"])
+        finally:
+            (config.ENABLE_ADAPTIVE_CONCURRENCY, config.MAX_CONCURRENCY_NUM,
+             config.ADAPTIVE_CONCURRENCY_MAX, config.ENABLE_REQUEST_COALESCING) = origin_config
+            concurrency_governor._concurrency_governors.clear()
+
+
+if __name__ == '__main__':
+    unittest.main()
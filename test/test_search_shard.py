@@ -0,0 +1,73 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/6/26 15:00
+# @Desc    :
+import asyncio
+import unittest
+from typing import List
+
+from tools.search_shard import SearchShardPlanner, TimeWindow
+
+DAY = 24 * 3600
+
+
+class TestSearchShardPlanner(unittest.TestCase):
+
+    def test_plan(self):
+        # 第 0 天 2500 条结果，第 5 天 30 条，其余时间没有结果
+        publish_times: List[int] = [i * DAY // 2500 for i in range(2500)] + [5 * DAY + i for i in range(30)]
+        probed: List[TimeWindow] = []
+
+        async def count_window(window: TimeWindow) -> int:
+            probed.append(window)
+            return min(sum(window.start <= t <= window.end for t in publish_times), 1000)
+
+        planner = SearchShardPlanner(result_cap=1000, min_window_seconds=3600, concurrency=4)
+        windows = asyncio.run(planner.plan(0, 10 * DAY - 1, count_window))
+
+        self.assertEqual(windows, sorted(windows))
+        for window in windows:
+            self.assertLess(sum(window.start <= t <= window.end for t in publish_times), 1000)
+        # 所有结果都被覆盖，窗口之间没有重叠
+        self.assertEqual(sum(sum(w.start <= t <= w.end for t in publish_times) for w in windows), len(publish_times))
+        # 第 5 天的 30 条结果和周围没有结果的时间在同一个窗口里，不会按天拆分
+        self.assertLessEqual(len(windows), 6)
+        self.assertLess(len(probed), 20)
+        # 相邻窗口的结果数量之和都达到上限，不能再合并
+        counts = [sum(w.start <= t <= w.end for t in publish_times) for w in windows]
+        for count, next_count in zip(counts, counts[1:]):
+            self.assertGreaterEqual(count + next_count, 1000)
+
+    def test_merge(self):
+        # 按天拆分后每个窗口只有 300 条结果，每 3 天合并成一个窗口
+        async def count_window(window: TimeWindow) -> int:
+            days = (window.end - window.start + 1) / DAY
+            return 1000 if days > 1 else 300
+
+        planner = SearchShardPlanner(result_cap=1000, min_window_seconds=3600)
+        windows = asyncio.run(planner.plan(0, 8 * DAY - 1, count_window))
+        self.assertEqual(windows, [TimeWindow(0, 3 * DAY - 1), TimeWindow(3 * DAY, 6 * DAY - 1),
+                                   TimeWindow(6 * DAY, 8 * DAY - 1)])
+
+    def test_min_window(self):
+        async def count_window(window: TimeWindow) -> int:
+            return 1000
+
+        planner = SearchShardPlanner(result_cap=1000, min_window_seconds=DAY)
+        windows = asyncio.run(planner.plan(0, 4 * DAY - 1, count_window))
+        self.assertEqual(windows, [TimeWindow(i * DAY, (i + 1) * DAY - 1) for i in range(4)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/7/4 16:00
+# @Desc    :
+import asyncio
+import unittest
+
+from test.fake_api_client import FakeApiClient, override_config
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def setUp(self):
+        override_config(self, ENABLE_REQUEST_COALESCING=True)
+
+    def test_coalesce(self):
+        client = FakeApiClient(delay=0.01)
+
+        async def run():
+            return await asyncio.gather(
+                client.request("GET", "/x/web-interface/nav?wts=1&w_rid=a"),
+                client.request("GET", "/x/web-interface/nav?wts=2&w_rid=b"),
+                client.request(method="GET", url="/x/web-interface/nav"),
+                client.request("GET", "/x/space/acc/info?mid=1"),
+                client.request("POST", "/x/web-interface/nav"),
+            )
+
+        results = asyncio.run(run())
+        self.assertEqual(sorted(client.requests), [
+            "/x/space/acc/info?mid=1", "/x/web-interface/nav", "/x/web-interface/nav?wts=1&w_rid=a"
+        ])
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[0], results[2])
+        # 共用的结果互不影响
+        results[1]["items"].append("changed")
+        self.assertNotIn("changed", results[0]["items"])
+
+        # 请求结束之后再发出的相同请求重新请求
+        asyncio.run(client.request("GET", "/x/space/acc/info?mid=1"))
+        self.assertEqual(len(client.requests), 4)
+
+    def test_shared_error(self):
+        client = FakeApiClient(delay=0.01)
+
+        async def run():
+            return await asyncio.gather(
+                client.request("GET", "/error"), client.request("GET", "/error"), return_exceptions=True
+            )
+
+        results = asyncio.run(run())
+        self.assertEqual(len(client.requests), 1)
+        self.assertTrue(all(isinstance(result, Exception) for result in results))
+
+    def test_disabled(self):
+        override_config(self, ENABLE_REQUEST_COALESCING=False)
+        client = FakeApiClient(delay=0.01)
+
+        async def run():
+            await asyncio.gather(client.request("GET", "/nav"), client.request("GET", "/nav"))
+
+        asyncio.run(run())
+        self.assertEqual(len(client.requests), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/6/29 10:30
+# @Desc    :
+import asyncio
+import os
+import tempfile
+import unittest
+from typing import Any, Dict, List, Optional
+
+from async_db import AsyncMysqlDB
+from store.record import items_to_columns
+from store.xhs.xhs_store_impl import XhsCsvStoreImplement, XhsJsonStoreImplement
+from store.xhs.xhs_store_record import XhsNoteCommentRecord
+
+
+def make_comments(start: int, count: int) -> List[XhsNoteCommentRecord]:
+    return [XhsNoteCommentRecord(*([str(i)] + ["v"] * (len(XhsNoteCommentRecord.FIELDS) - 1)))
+            for i in range(start, start + count)]
+
+
+class FakeAsyncMysqlDB(AsyncMysqlDB):
+
+    def __init__(self, exist_ids: List[str]):
+        super().__init__(pool=None)
+        self.exist_ids = exist_ids
+        self.inserted: List[Dict] = []
+        self.updated: List[Dict] = []
+
+    async def query(self, sql: str, *args: Any) -> List[Dict[str, Any]]:
+        return [{"comment_id": arg} for arg in args if arg in self.exist_ids]
+
+    async def items_to_table(self, table_name: str, items: List[Any], fields: Optional[List[str]] = None) -> int:
+        fields, rows = self._to_rows(items, fields)
+        self.inserted.extend(dict(zip(fields, row)) for row in rows)
+        return len(items)
+
+    async def update_table_many(self, table_name: str, items: List[Any], field_where: str,
+                                fields: Optional[List[str]] = None) -> int:
+        fields, rows = self._to_rows(items, fields)
+        self.updated.extend(dict(zip(fields, row)) for row in rows)
+        return len(items)
+
+
+class TestStoreBulk(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp_dir.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp_dir.cleanup()
+
+    def read_files(self, path: str) -> List[str]:
+        contents = []
+        for file_name in sorted(os.listdir(path)):
+            if os.path.isfile(os.path.join(path, file_name)):
+                with open(os.path.join(path, file_name), encoding="utf-8-sig") as f:
+                    contents.append(f.read())
+        return contents
+
+    def test_bulk_same_as_single(self):
+        async def store(bulk: bool):
+            for store_impl in (XhsCsvStoreImplement(), XhsJsonStoreImplement()):
+                for page in (make_comments(0, 3), make_comments(3, 2)):
+                    if bulk:
+                        await store_impl.store_comments_bulk(page)
+                    else:
+                        for comment_item in page:
+                            await store_impl.store_comment(comment_item)
+
+        asyncio.run(store(bulk=False))
+        single_contents = self.read_files("data/xhs") + self.read_files("data/xhs/json")
+        for file_name in os.listdir("data/xhs/json"):
+            os.remove(os.path.join("data/xhs/json", file_name))
+        for file_name in os.listdir("data/xhs"):
+            if os.path.isfile(os.path.join("data/xhs", file_name)):
+                os.remove(os.path.join("data/xhs", file_name))
+
+        asyncio.run(store(bulk=True))
+        bulk_contents = self.read_files("data/xhs") + self.read_files("data/xhs/json")
+        self.assertEqual(bulk_contents, single_contents)
+        self.assertEqual(bulk_contents[0].count("\n"), 6)
+
+    def test_batch_insert_or_update(self):
+        comments = make_comments(0, 4) + make_comments(1, 1)
+        fields, comment_rows = items_to_columns(comments)
+        # 按列顺序的元组和字典写入的结果相同
+        for items, items_fields in ((comment_rows, fields), ([comment.to_dict() for comment in comments], None)):
+            db = FakeAsyncMysqlDB(exist_ids=["1", "3"])
+            rows = asyncio.run(db.batch_insert_or_update("xhs_note_comment", items, "comment_id",
+                                                         insert_only={"add_ts": 100}, fields=items_fields))
+            self.assertEqual(rows, 4)
+            self.assertEqual([item["comment_id"] for item in db.inserted], ["0", "2"])
+            self.assertEqual([item["add_ts"] for item in db.inserted], [100, 100])
+            self.assertEqual([item["comment_id"] for item in db.updated], ["1", "3"])
+            self.assertNotIn("add_ts", db.updated[0])
+            self.assertEqual(db.updated[0], comments[1].to_dict())
@@ -0,0 +1,60 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/6/28 11:40
+# @Desc    :
+import json
+import unittest
+
+from store.record import StoreRecord, items_to_rows, store_record
+
+
+@store_record
+class DemoRecord(StoreRecord):
+    comment_id: str
+    content: str
+    like_count: int
+
+
+class TestStoreRecord(unittest.TestCase):
+
+    def test_mapping_compatible(self):
+        record = DemoRecord(comment_id="1", content="hi", like_count=3)
+        self.assertFalse(hasattr(record, "__dict__"))
+        self.assertEqual(list(record.keys()), ["comment_id", "content", "like_count"])
+        self.assertEqual(record.values(), ("1", "hi", 3))
+        self.assertEqual(record["content"], "hi")
+        self.assertEqual(record.get("missing", 0), 0)
+        self.assertEqual(json.dumps(dict(record)), '{"comment_id": "1", "content": "hi", "like_count": 3}')
+
+    def test_extra_fields(self):
+        record = DemoRecord(comment_id="1", content="hi", like_count=3)
+        record["like_count"] = 4
+        record["add_ts"] = 100
+        self.assertEqual(len(record), 4)
+        self.assertIn("add_ts", record)
+        self.assertEqual(list(record.items())[-2:], [("like_count", 4), ("add_ts", 100)])
+        self.assertEqual(DemoRecord.to_rows([record]), [("1", "hi", 4)])
+
+    def test_items_to_rows(self):
+        records = [DemoRecord(comment_id=str(i), content="hi", like_count=i) for i in range(2)]
+        fields = list(records[0].keys())
+        self.assertEqual(items_to_rows(records, fields), [("0", "hi", 0), ("1", "hi", 1)])
+        for record in records:
+            record["add_ts"] = 100
+        fields = list(records[0].keys())
+        self.assertEqual(items_to_rows(records, fields), [("0", "hi", 0, 100), ("1", "hi", 1, 100)])
+        # 字典按列名取值，和 key 的插入顺序无关
+        items = [{"comment_id": "0", "content": "hi"}, {"content": "ok", "comment_id": "1"}]
+        self.assertEqual(items_to_rows(items, ["comment_id", "content"]), [("0", "hi"), ("1", "ok")])
+        self.assertEqual(items_to_rows([], fields), [])
@@ -0,0 +1,120 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/7/2 15:30
+# @Desc    :
+import asyncio
+import unittest
+from typing import List, Tuple
+
+import config
+from media_platform.tieba.client import BaiduTieBaClient
+from model.m_baidu_tieba import TiebaComment, TiebaNote
+
+PAGE_SIZE = 30
+TOTAL_PAGE = 10
+SUB_COMMENT_COUNT = 25
+
+
+class FakeBaiduTieBaClient(BaiduTieBaClient):
+    """
+    一共 10 页一级评论，每页 30 条，每条一级评论有 25 条楼中楼(3 页)，页码越大请求返回得越快
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.page_requests: List[int] = []
+        self.sub_page_requests: List[Tuple[str, int]] = []
+        self.running = 0
+        self.max_running = 0
+
+    async def _fake_request(self, delay: float):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(delay)
+        self.running -= 1
+
+    async def _get_note_comment_page(self, uri: str, note_id: str, page_number: int) -> List[TiebaComment]:
+        self.page_requests.append(page_number)
+        await self._fake_request(0.01 * (TOTAL_PAGE - page_number))
+        return [
+            TiebaComment(comment_id=f"{page_number}-{i}", content="", sub_comment_count=SUB_COMMENT_COUNT,
+                         note_id=note_id, note_url="", tieba_id="1", tieba_name="", tieba_link="")
+            for i in range(PAGE_SIZE)
+        ]
+
+    async def _get_sub_comment_page(self, parment_comment: TiebaComment, page_number: int) -> List[TiebaComment]:
+        self.sub_page_requests.append((parment_comment.comment_id, page_number))
+        await self._fake_request(0.001 * (3 - page_number))
+        count = min(SUB_COMMENT_COUNT - (page_number - 1) * 10, 10)
+        return [
+            TiebaComment(comment_id=f"{parment_comment.comment_id}-{page_number}-{i}", content="",
+                         parent_comment_id=parment_comment.comment_id, note_id=parment_comment.note_id,
+                         note_url="", tieba_id="1", tieba_name="", tieba_link="")
+            for i in range(count)
+        ]
+
+
+class TestTiebaComments(unittest.TestCase):
+
+    def setUp(self):
+        self.origin_config = (config.TIEBA_COMMENT_PAGE_CONCURRENCY, config.ENABLE_GET_SUB_COMMENTS)
+        config.TIEBA_COMMENT_PAGE_CONCURRENCY = 3
+        config.ENABLE_GET_SUB_COMMENTS = False
+        self.note = TiebaNote(note_id="100", title="", note_url="", tieba_name="", tieba_link="",
+                              total_replay_page=TOTAL_PAGE)
+
+    def tearDown(self):
+        config.TIEBA_COMMENT_PAGE_CONCURRENCY, config.ENABLE_GET_SUB_COMMENTS = self.origin_config
+
+    def get_comments(self, client: FakeBaiduTieBaClient, max_count: int) -> Tuple[List[TiebaComment], List[str]]:
+        callback_ids: List[str] = []
+
+        async def callback(note_id: str, comments: List[TiebaComment]):
+            callback_ids.extend(comment.comment_id for comment in comments)
+
+        comments = asyncio.run(client.get_note_all_comments(self.note, crawl_interval=0, callback=callback,
+                                                            max_count=max_count))
+        return comments, callback_ids
+
+    def test_comment_pages_in_order(self):
+        client = FakeBaiduTieBaClient()
+        comments, callback_ids = self.get_comments(client, max_count=1000)
+        expect_ids = [f"{page}-{i}" for page in range(1, TOTAL_PAGE + 1) for i in range(PAGE_SIZE)]
+        self.assertEqual([comment.comment_id for comment in comments], expect_ids)
+        self.assertEqual(callback_ids, expect_ids)
+        self.assertEqual(sorted(client.page_requests), list(range(1, TOTAL_PAGE + 1)))
+        self.assertEqual(client.max_running, 3)
+
+    def test_stop_at_max_count(self):
+        client = FakeBaiduTieBaClient()
+        comments, _ = self.get_comments(client, max_count=70)
+        self.assertEqual([comment.comment_id for comment in comments][-1], "3-9")
+        self.assertEqual(len(comments), 70)
+        # 第一页之后只需要再请求两页
+        self.assertEqual(sorted(client.page_requests), [1, 2, 3])
+
+    def test_sub_comment_pages(self):
+        config.ENABLE_GET_SUB_COMMENTS = True
+        client = FakeBaiduTieBaClient()
+        comments, callback_ids = self.get_comments(client, max_count=2)
+        self.assertEqual([comment.comment_id for comment in comments], ["1-0", "1-1"])
+        self.assertEqual(len(client.sub_page_requests), 2 * 3)
+        self.assertEqual(len(callback_ids), 2 + 2 * SUB_COMMENT_COUNT)
+        self.assertEqual(callback_ids[2:5], ["1-0-1-0", "1-0-1-1", "1-0-1-2"])
+        self.assertEqual(callback_ids[-1], "1-1-3-4")
+        self.assertLessEqual(client.max_running, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/6/23 11:30
+# @Desc    : 贴吧页面解析结果和 test_data/extract_result.json 比对，extract_result.json 由重写前的解析实现生成
+import json
+import os
+import unittest
+
+from media_platform.tieba.help import TieBaExtractor
+from model.m_baidu_tieba import TiebaComment
+
+TEST_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             "media_platform", "tieba", "test_data")
+
+
+def read_test_data(file_name: str) -> str:
+    with open(os.path.join(TEST_DATA_DIR, file_name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+class TestTieBaExtractor(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with open(os.path.join(TEST_DATA_DIR, "extract_result.json"), "r", encoding="utf-8") as f:
+            cls.expected = json.load(f)
+        cls.extractor = TieBaExtractor()
+
+    def test_extract_search_note_list(self):
+        notes = self.extractor.extract_search_note_list(read_test_data("search_keyword_notes.html"))
+        self.assertEqual([note.model_dump() for note in notes], self.expected["search_keyword_notes"])
+
+    def test_extract_tieba_note_list(self):
+        notes = self.extractor.extract_tieba_note_list(read_test_data("tieba_note_list.html"))
+        self.assertEqual([note.model_dump() for note in notes], self.expected["tieba_note_list"])
+
+    def test_extract_note_detail(self):
+        note = self.extractor.extract_note_detail(read_test_data("note_detail.html"))
+        self.assertEqual(note.model_dump(), self.expected["note_detail"])
+
+    def test_extract_tieba_note_parment_comments(self):
+        comments = self.extractor.extract_tieba_note_parment_comments(read_test_data("note_comments.html"),
+                                                                      note_id="9117888152")
+        self.assertEqual([comment.model_dump() for comment in comments], self.expected["note_comments"])
+
+    def test_extract_tieba_note_sub_comments(self):
+        parent_comment = TiebaComment(comment_id="123456", content="content", user_link="user_link",
+                                      user_nickname="user_nickname", user_avatar="user_avatar",
+                                      publish_time="publish_time", parent_comment_id="parent_comment_id",
+                                      note_id="note_id", note_url="note_url", tieba_id="tieba_id",
+                                      tieba_name="tieba_name", tieba_link="tieba_link")
+        comments = self.extractor.extract_tieba_note_sub_comments(read_test_data("note_sub_comments.html"),
+                                                                  parent_comment)
+        self.assertEqual([comment.model_dump() for comment in comments], self.expected["note_sub_comments"])
+
+
+if __name__ == '__main__':
+    unittest.main()
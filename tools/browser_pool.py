@@ -0,0 +1,160 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/6/17 11:05
+# @Desc    : 浏览器页面池，签名/页面渲染等依赖 playwright page 的操作从池中租用页面并发执行
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional
+
+from playwright.async_api import BrowserContext, Page
+
+import config
+from tools import utils
+
+# 页面跳转到这些地址时认为触发了验证码/登录拦截，需要回收页面
+CAPTCHA_URL_MARKERS = ("captcha", "verify", "website-login", "passport")
+
+
+class BrowserPagePool:
+    """
+    同一个 BrowserContext 下的 N 个预热页面，页面之间共享登录后的 cookie 与 localStorage
+    - lease(): 租用一个页面，用完自动归还，池中没有空闲页面时等待
+    - 页面崩溃/关闭或者跳转到验证码页面时会被回收：关闭后重新打开并跳转到首页，
+      租用期间的其他异常(例如签名 js 出错)不影响页面，不会回收
+    """
+
+    def __init__(
+        self,
+        browser_context: Optional[BrowserContext],
+        index_url: str,
+        size: int = config.BROWSER_PAGE_POOL_SIZE,
+    ):
+        self.browser_context = browser_context
+        self.index_url = index_url
+        self.size = max(1, size)
+        self._pages: List[Page] = []
+        self._idle_pages: Optional[asyncio.Queue] = None
+        self._seed_page: Optional[Page] = None
+
+    @classmethod
+    def from_page(cls, page: Page) -> "BrowserPagePool":
+        """
+        只包含一个页面的页面池，不做回收，兼容只传入单个 playwright page 的客户端
+        """
+        pool = cls(browser_context=None, index_url="", size=1)
+        pool._seed_page = page
+        pool._pages = [page]
+        return pool
+
+    def _get_idle_pages(self) -> asyncio.Queue:
+        if self._idle_pages is None:
+            self._idle_pages = asyncio.Queue()
+            for page in self._pages:
+                self._idle_pages.put_nowait(page)
+        return self._idle_pages
+
+    async def start(self, seed_page: Optional[Page] = None):
+        """
+        预热页面池，seed_page 一般是爬虫已经登录过的 context_page
+        Args:
+            seed_page:
+
+        Returns:
+
+        """
+        ready_pages = [seed_page] if seed_page else []
+        self._seed_page = seed_page
+        new_pages = await asyncio.gather(
+            *[self._new_page() for _ in range(self.size - len(self._pages) - len(ready_pages))],
+            return_exceptions=True
+        )
+        for page in new_pages:
+            if isinstance(page, Exception):
+                utils.logger.error(f"[BrowserPagePool.start] create page err: {page}")
+                continue
+            ready_pages.append(page)
+        self._pages.extend(ready_pages)
+        if self._idle_pages is not None:
+            for page in ready_pages:
+                self._idle_pages.put_nowait(page)
+        utils.logger.info(f"[BrowserPagePool.start] browser page pool ready, size: {len(self._pages)}")
+
+    async def _new_page(self) -> Page:
+        page = await self.browser_context.new_page()
+        await page.goto(self.index_url)
+        return page
+
+    def is_healthy(self, page: Page) -> bool:
+        if page.is_closed():
+            return False
+        return not any(marker in page.url for marker in CAPTCHA_URL_MARKERS)
+
+    async def _recycle(self, page: Page) -> Page:
+        """
+        回收页面：关闭异常页面并重新打开一个新页面，无法回收时返回原页面
+        seed_page 还被爬虫的登录等流程引用，未关闭时只重新跳转到首页
+        """
+        if self.browser_context is None:
+            return page
+        utils.logger.info(f"[BrowserPagePool._recycle] recycle unhealthy page, url: {page.url}")
+        try:
+            if page is self._seed_page and not page.is_closed():
+                await page.goto(self.index_url)
+                return page
+            if not page.is_closed():
+                await page.close()
+            new_page = await self._new_page()
+        except Exception as e:
+            utils.logger.error(f"[BrowserPagePool._recycle] recycle page err: {e}")
+            return page
+        self._pages = [new_page if p is page else p for p in self._pages]
+        if self._seed_page is page:
+            self._seed_page = new_page
+        return new_page
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[Page]:
+        """
+        租用一个页面
+        Usage:
+            async with page_pool.lease() as page:
+                await page.evaluate(...)
+        """
+        idle_pages = self._get_idle_pages()
+        page: Page = await idle_pages.get()
+        try:
+            if not self.is_healthy(page):
+                page = await self._recycle(page)
+            yield page
+        finally:
+            try:
+                if not self.is_healthy(page):
+                    page = await self._recycle(page)
+            finally:
+                # 回收页面时被取消也要归还，否则池中的页面越来越少，后续租用会一直等待
+                idle_pages.put_nowait(page)
+
+    async def close(self):
+        """
+        关闭页面池创建的页面，seed_page 由爬虫自己管理
+        """
+        for page in self._pages:
+            if page is self._seed_page or page.is_closed():
+                continue
+            try:
+                await page.close()
+            except Exception as e:
+                utils.logger.error(f"[BrowserPagePool.close] close page err: {e}")
+        self._pages = [self._seed_page] if self._seed_page else []
+        self._idle_pages = None
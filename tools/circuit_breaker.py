@@ -0,0 +1,221 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/7/4 10:00
+# @Desc    : 按平台 + 线路(代理IP)熔断，连续被风控时暂停该线路，探测恢复之后再继续请求
+import asyncio
+import functools
+import inspect
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
+
+from tenacity import RetryError
+
+import config
+from tools import utils
+from tools.concurrency_governor import request_slot
+from tools.metrics import module_platform, proxy_label
+from tools.retry_policy import ErrorKind, classify_error
+
+
+class CircuitState:
+    CLOSED = "closed"  # 正常请求
+    OPEN = "open"  # 暂停请求
+    HALF_OPEN = "half_open"  # 探测是否恢复
+
+
+class CircuitBreaker:
+    """
+    一条线路(平台 + 代理IP，一次运行只有一个账号)的熔断器:
+        - closed: 连续 failure_threshold 个请求被风控(验证码、IP 被封、风控错误码、重试次数用完)后进入 open
+        - open: 该线路的请求等待 open_seconds 秒，不再继续请求平台
+        - half_open: 到时间后用客户端的 pong() 探测，没有可用的 pong 时放行一个请求作为探测，
+          探测成功回到 closed，失败回到 open 并且暂停时间翻倍，最多 max_open_seconds 秒
+    """
+
+    def __init__(self, platform: str, lane: str, failure_threshold: int, open_seconds: float,
+                 max_open_seconds: float):
+        self.platform = platform
+        self.lane = lane
+        self.failure_threshold = max(failure_threshold, 1)
+        self.base_open_seconds = open_seconds
+        self.max_open_seconds = max(max_open_seconds, open_seconds)
+        self.state = CircuitState.CLOSED
+        self.open_seconds = open_seconds
+        self.open_until = 0.0
+        self._consecutive_failures = 0
+        self._waiters: List[asyncio.Future] = []
+
+    async def wait_ready(self, client=None) -> bool:
+        """
+        等待线路可以请求，open 到期之后由第一个等待的请求负责探测
+        Args:
+            client: 平台客户端，用于调用 pong() 探测
+
+        Returns:
+            当前请求是否作为探测请求，是的话请求结束后必须调用 record 或 abort_probe
+        """
+        while self.state != CircuitState.CLOSED:
+            now = time.monotonic()
+            if self.state == CircuitState.OPEN and now < self.open_until:
+                await asyncio.sleep(self.open_until - now)
+                continue
+            if self.state == CircuitState.HALF_OPEN:
+                # 其他请求正在探测，等待探测结果
+                future = asyncio.get_running_loop().create_future()
+                self._waiters.append(future)
+                await future
+                continue
+
+            self._set_state(CircuitState.HALF_OPEN)
+            try:
+                probe_ok = await self._probe(client)
+            except BaseException:
+                # 探测被取消，重新 open，不能让等待的请求一直停留在 half_open
+                self.abort_probe()
+                raise
+            if probe_ok is None:
+                # 没有可用的 pong，当前请求作为探测请求，请求结束后由 record 决定状态
+                return True
+            self.record(blocked=not probe_ok)
+        return False
+
+    def record(self, blocked: bool):
+        """
+        记录一个请求的结果
+        Args:
+            blocked: 是否被风控
+
+        Returns:
+
+        """
+        if self.state == CircuitState.HALF_OPEN:
+            if blocked:
+                self.open_seconds = min(self.open_seconds * 2, self.max_open_seconds)
+                self._open()
+            else:
+                self.open_seconds = self.base_open_seconds
+                self._consecutive_failures = 0
+                self._set_state(CircuitState.CLOSED)
+            return
+        if self.state == CircuitState.OPEN:
+            # 进入 open 之前已经发出的请求
+            return
+        if not blocked:
+            self._consecutive_failures = 0
+            return
+        self._consecutive_failures += 1
+        if self._consecutive_failures >= self.failure_threshold:
+            self._open()
+
+    def abort_probe(self):
+        """
+        探测没有得到结果(被取消)时重新 open，暂停时间不翻倍，到期后由下一个请求重新探测
+        """
+        if self.state == CircuitState.HALF_OPEN:
+            self._open()
+
+    def _open(self):
+        self.open_until = time.monotonic() + self.open_seconds
+        self._set_state(CircuitState.OPEN)
+        utils.logger.warning(
+            f"[CircuitBreaker] {self.platform} lane {self.lane} blocked, pause {self.open_seconds:.0f}s"
+        )
+
+    def _set_state(self, state: str):
+        if state == CircuitState.CLOSED and self.state != CircuitState.CLOSED:
+            utils.logger.info(f"[CircuitBreaker] {self.platform} lane {self.lane} recovered")
+        self.state = state
+        waiters, self._waiters = self._waiters, []
+        for future in waiters:
+            if not future.done():
+                future.set_result(None)
+
+    async def _probe(self, client) -> Optional[bool]:
+        pong = getattr(client, "pong", None)
+        if pong is None or any(
+                param.default is inspect.Parameter.empty for param in inspect.signature(pong).parameters.values()
+        ):
+            return None
+        token = _probing_var.set(True)
+        try:
+            return bool(await pong())
+        except Exception as e:
+            utils.logger.info(f"[CircuitBreaker] {self.platform} lane {self.lane} probe err: {e}")
+            return False
+        finally:
+            _probing_var.reset(token)
+
+
+_circuit_breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+_probing_var: ContextVar[bool] = ContextVar("probing_var", default=False)
+
+
+def get_circuit_breaker(platform: str, lane: str) -> CircuitBreaker:
+    key = (platform, lane)
+    if key not in _circuit_breakers:
+        _circuit_breakers[key] = CircuitBreaker(
+            platform, lane,
+            failure_threshold=config.CIRCUIT_BREAKER_THRESHOLD,
+            open_seconds=config.CIRCUIT_BREAKER_OPEN_SEC,
+            max_open_seconds=config.CIRCUIT_BREAKER_MAX_OPEN_SEC,
+        )
+    return _circuit_breakers[key]
+
+
+def is_block_signal(exc: Optional[BaseException], marked_blocked: bool) -> bool:
+    """
+    请求是否被风控: 客户端调用了 mark_request_blocked、异常是验证码/IP 被封，或者重试次数用完
+    """
+    if marked_blocked:
+        return True
+    return exc is not None and (isinstance(exc, RetryError) or classify_error(exc) == ErrorKind.BLOCKED)
+
+
+def client_lane(client, proxies=None) -> str:
+    return proxy_label(proxies or getattr(client, "proxies", None) or getattr(client, "default_ip_proxy", None))
+
+
+def guard_request(func: Callable) -> Callable:
+    """
+    包装 AbstractApiClient.request，开启熔断时请求之前等待所在线路可以请求，
+    线路被熔断并且客户端可以切换代理IP(switch_lane)时切换到新的线路继续请求
+    """
+
+    @functools.wraps(func)
+    async def wrapper(self, method, url, *args, **kwargs):
+        if not config.ENABLE_CIRCUIT_BREAKER or _probing_var.get():
+            return await func(self, method, url, *args, **kwargs)
+
+        platform = module_platform(type(self).__module__)
+        breaker = get_circuit_breaker(platform, client_lane(self, kwargs.get("proxies")))
+        if breaker.state != CircuitState.CLOSED and not kwargs.get("proxies") and await self.switch_lane():
+            breaker = get_circuit_breaker(platform, client_lane(self))
+        is_probe = await breaker.wait_ready(self)
+
+        with request_slot() as slot:
+            try:
+                result = await func(self, method, url, *args, **kwargs)
+            except Exception as e:
+                breaker.record(is_block_signal(e, slot.blocked))
+                raise
+            except BaseException:
+                # 请求被取消，探测请求没有结果时重新 open
+                if is_probe:
+                    breaker.abort_probe()
+                raise
+            breaker.record(is_block_signal(None, slot.blocked))
+            return result
+
+    return wrapper
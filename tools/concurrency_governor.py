@@ -0,0 +1,220 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/7/3 10:00
+# @Desc    : 按平台自适应调整请求并发(AIMD)，请求正常时逐步加并发，被风控时成倍减并发
+import asyncio
+import functools
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Deque, Dict, Iterator, Optional
+
+import config
+from tools import utils
+from tools.metrics import module_platform
+
+
+@dataclass
+class RequestSlot:
+    started_at: float
+    blocked: bool = False
+    governed: bool = False
+
+
+_request_slot_var: ContextVar[Optional[RequestSlot]] = ContextVar("request_slot_var", default=None)
+
+
+@contextmanager
+def request_slot() -> Iterator[RequestSlot]:
+    """
+    当前请求的状态，请求方法内部调用 mark_request_blocked 标记被风控，嵌套调用时沿用外层的 RequestSlot
+    """
+    slot = _request_slot_var.get()
+    if slot is not None:
+        yield slot
+        return
+    slot = RequestSlot(started_at=time.monotonic())
+    token = _request_slot_var.set(slot)
+    try:
+        yield slot
+    finally:
+        _request_slot_var.reset(token)
+
+
+class ConcurrencyGovernor:
+    """
+    单个平台所有请求共用的自适应并发控制:
+        - 请求成功、耗时和出错率正常时加性增加，每完成一轮(当前并发数个)请求并发数 +1，最多 max_concurrency
+        - 请求遇到验证码、IP 被封、风控时乘性减少，并发数乘以 decrease_factor，最少 1
+        - 同一批并发请求一起被风控只减少一次，在上一次减少之前发出的请求不再触发减少
+    """
+
+    EWMA_ALPHA = 0.2
+
+    def __init__(self, platform: str, initial_concurrency: int, max_concurrency: int,
+                 decrease_factor: float = 0.5, latency_factor: float = 2.0, error_rate_threshold: float = 0.2):
+        """
+        Args:
+            platform: 平台
+            initial_concurrency: 初始并发数
+            max_concurrency: 最大并发数
+            decrease_factor: 被风控时并发数乘以的系数
+            latency_factor: 平均耗时超过最快耗时的多少倍时不再增加并发
+            error_rate_threshold: 出错率超过多少时不再增加并发
+        """
+        self.platform = platform
+        self.max_concurrency = max(max_concurrency, 1)
+        self.limit: float = min(max(initial_concurrency, 1), self.max_concurrency)
+        self.decrease_factor = decrease_factor
+        self.latency_factor = latency_factor
+        self.error_rate_threshold = error_rate_threshold
+        self._running = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._last_decrease_at = 0.0
+        self._min_latency = 0.0
+        self._latency = 0.0
+        self._error_rate = 0.0
+
+    @property
+    def concurrency(self) -> int:
+        return max(int(self.limit), 1)
+
+    async def acquire(self):
+        if self._running < self.concurrency and not self._waiters:
+            self._running += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()
+            else:
+                self._waiters.remove(future)
+            raise
+
+    def release(self):
+        self._running -= 1
+        self._wake_up_next()
+
+    def _wake_up_next(self):
+        while self._running < self.concurrency and self._waiters:
+            future = self._waiters.popleft()
+            if future.done():
+                continue
+            self._running += 1
+            future.set_result(None)
+
+    @asynccontextmanager
+    async def request(self) -> AsyncIterator[RequestSlot]:
+        """
+        获取一个请求名额，请求结束后根据耗时、是否出错、是否被风控调整并发数
+        """
+        await self.acquire()
+        try:
+            with request_slot() as slot:
+                slot.started_at = time.monotonic()
+                slot.governed = True
+                try:
+                    yield slot
+                except Exception:
+                    self._on_request_done(slot, failed=True)
+                    raise
+                self._on_request_done(slot, failed=False)
+        finally:
+            self.release()
+
+    def _on_request_done(self, slot: RequestSlot, failed: bool):
+        latency = time.monotonic() - slot.started_at
+        self._error_rate += self.EWMA_ALPHA * (float(failed or slot.blocked) - self._error_rate)
+        if slot.blocked:
+            self._decrease(slot)
+            return
+        if failed:
+            return
+
+        self._min_latency = min(self._min_latency, latency) if self._min_latency else latency
+        self._latency = self._latency + self.EWMA_ALPHA * (latency - self._latency) if self._latency else latency
+        if self._latency > self._min_latency * self.latency_factor or self._error_rate > self.error_rate_threshold:
+            return
+        if self.limit >= self.max_concurrency:
+            return
+        old_concurrency = self.concurrency
+        self.limit = min(self.limit + 1 / self.limit, self.max_concurrency)
+        if self.concurrency > old_concurrency:
+            utils.logger.info(f"[ConcurrencyGovernor] {self.platform} concurrency increase to {self.concurrency}")
+            self._wake_up_next()
+
+    def _decrease(self, slot: RequestSlot):
+        if slot.started_at < self._last_decrease_at:
+            # 上一次减少之前发出的请求，同一批被风控的请求只减少一次
+            return
+        self._last_decrease_at = time.monotonic()
+        self.limit = max(self.limit * self.decrease_factor, 1)
+        utils.logger.warning(
+            f"[ConcurrencyGovernor] {self.platform} request blocked, concurrency decrease to {self.concurrency}"
+        )
+
+
+_concurrency_governors: Dict[str, ConcurrencyGovernor] = {}
+
+
+def get_concurrency_governor(platform: str) -> ConcurrencyGovernor:
+    if platform not in _concurrency_governors:
+        _concurrency_governors[platform] = ConcurrencyGovernor(
+            platform,
+            initial_concurrency=config.MAX_CONCURRENCY_NUM,
+            max_concurrency=config.ADAPTIVE_CONCURRENCY_MAX,
+            decrease_factor=config.ADAPTIVE_CONCURRENCY_DECREASE_FACTOR,
+        )
+    return _concurrency_governors[platform]
+
+
+def mark_request_blocked():
+    """
+    客户端在请求遇到验证码、IP 被封、风控时调用，当前请求结束后该平台减少并发、熔断器记录一次风控
+    """
+    slot = _request_slot_var.get()
+    if slot is not None:
+        slot.blocked = True
+
+
+def stage_concurrency() -> int:
+    """
+    帖子详情、评论、创作者等各阶段信号量的大小，开启自适应并发时实际请求数由 ConcurrencyGovernor 限制，阶段信号量放宽到最大并发数
+    """
+    if config.ENABLE_ADAPTIVE_CONCURRENCY:
+        return max(config.ADAPTIVE_CONCURRENCY_MAX, config.MAX_CONCURRENCY_NUM)
+    return config.MAX_CONCURRENCY_NUM
+
+
+def govern_request(func: Callable) -> Callable:
+    """
+    包装 AbstractApiClient.request，开启自适应并发时每个请求都从所在平台的 ConcurrencyGovernor 获取名额
+    """
+
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        slot = _request_slot_var.get()
+        if not config.ENABLE_ADAPTIVE_CONCURRENCY or (slot is not None and slot.governed):
+            # 请求方法内部再次调用 request 时沿用外层的名额，避免并发数为 1 时互相等待
+            with request_slot():
+                return await func(self, *args, **kwargs)
+        async with get_concurrency_governor(module_platform(type(self).__module__)).request():
+            return await func(self, *args, **kwargs)
+
+    return wrapper
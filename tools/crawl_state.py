@@ -0,0 +1,92 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/6/25 10:00
+# @Desc    : 爬取进度(评论翻页游标等)持久化，中断后重新运行时可以从上次的位置继续
+import json
+import os
+import pathlib
+from typing import Any, Dict
+
+import config
+from tools import utils
+
+
+class CrawlStateStore:
+    """
+    按 namespace 分组的 key-value 进度存储，保存在一个 json 文件中，例如:
+        {"comment_cursor": {"1000000": {"cursor": "{\"type\":1,...}", "count": 20, "sub_count": 45}}}
+    """
+
+    def __init__(self, state_file: str):
+        self.state_file = state_file
+        self._state: Dict[str, Dict[str, Any]] = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            utils.logger.error(f"[CrawlStateStore._load] load crawl state {self.state_file} err: {e}")
+            return {}
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        return self._state.get(namespace, {}).get(key, default)
+
+    def set(self, namespace: str, key: str, value: Any):
+        """
+        更新进度并立即写入文件，写入临时文件后再替换，进程中断也不会留下半个文件
+        """
+        self._state.setdefault(namespace, {})[key] = value
+        self.save()
+
+    def set_many(self, namespace: str, items: Dict[str, Any]):
+        """
+        批量更新进度，只写入一次文件
+        """
+        if not items:
+            return
+        self._state.setdefault(namespace, {}).update(items)
+        self.save()
+
+    def delete(self, namespace: str, key: str):
+        if self._state.get(namespace, {}).pop(key, None) is not None:
+            self.save()
+
+    def save(self):
+        pathlib.Path(self.state_file).parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.state_file + ".tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(self._state, f, ensure_ascii=False)
+        os.replace(tmp_file, self.state_file)
+
+
+_crawl_state_stores: Dict[str, CrawlStateStore] = {}
+
+
+def get_crawl_state_store(platform: str = "") -> CrawlStateStore:
+    """
+    获取平台的进度存储，同一个平台在进程内只加载一次
+    Args:
+        platform: 平台名称，默认为 config.PLATFORM
+
+    Returns:
+
+    """
+    platform = platform or config.PLATFORM
+    if platform not in _crawl_state_stores:
+        state_file = os.path.join(os.getcwd(), config.CRAWL_STATE_FILE % platform)
+        _crawl_state_stores[platform] = CrawlStateStore(state_file)
+    return _crawl_state_stores[platform]
@@ -0,0 +1,101 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/7/2 10:00
+# @Desc    : 创作者名字 -> 创作者ID 的解析缓存，按名字爬取创作者时不用每次运行都搜索一遍
+import asyncio
+import json
+import os
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import config
+from tools import utils
+from tools.crawl_state import get_crawl_state_store
+
+CREATOR_ID_NAMESPACE = "creator_id"
+
+
+class CreatorIdCache:
+    """
+    创作者名字 -> 创作者ID:
+        - 先查手动指定的对照文件(CREATOR_ID_OVERRIDE_FILE)，文件中的对照关系不会过期，用于修正搜索结果不对的创作者
+        - 再查保存在 CRAWL_STATE_FILE 中的搜索结果，超过 CREATOR_ID_CACHE_TTL_HOURS 之后重新搜索
+        - 都没有时调用 resolver 搜索，批量解析时所有结果只写入一次文件
+    """
+
+    def __init__(self, platform: str = ""):
+        self.platform = platform or config.PLATFORM
+        self.overrides: Dict[str, str] = self._load_overrides()
+
+    def _load_overrides(self) -> Dict[str, str]:
+        override_file = os.path.join(os.getcwd(), config.CREATOR_ID_OVERRIDE_FILE % self.platform)
+        if not os.path.exists(override_file):
+            return {}
+        try:
+            with open(override_file, "r", encoding="utf-8") as f:
+                return {name: str(creator_id) for name, creator_id in json.load(f).items()}
+        except (OSError, ValueError, AttributeError) as e:
+            utils.logger.error(f"[CreatorIdCache._load_overrides] load creator id override file {override_file} err: {e}")
+            return {}
+
+    def get(self, name: str) -> Optional[str]:
+        if name in self.overrides:
+            return self.overrides[name]
+        cached = get_crawl_state_store(self.platform).get(CREATOR_ID_NAMESPACE, name)
+        if not cached:
+            return None
+        if utils.get_unix_timestamp() - cached.get("updated_at", 0) > config.CREATOR_ID_CACHE_TTL_HOURS * 60 * 60:
+            return None
+        return cached.get("id")
+
+    async def resolve_many(self, names: List[str], resolver: Callable[[str], Awaitable[Optional[str]]],
+                           concurrency: int = 1) -> Dict[str, Optional[str]]:
+        """
+        批量解析创作者ID
+        Args:
+            names: 创作者名字列表
+            resolver: 没有缓存时根据名字搜索创作者ID的协程函数，找不到时返回 None
+            concurrency: 同时搜索的数量
+
+        Returns:
+            名字 -> 创作者ID，找不到的创作者为 None
+        """
+        result: Dict[str, Optional[str]] = {name: self.get(name) for name in names}
+        missing = [name for name, creator_id in result.items() if creator_id is None]
+        utils.logger.info(
+            f"[CreatorIdCache.resolve_many] {len(result) - len(missing)}/{len(result)} creator ids hit cache, "
+            f"search {len(missing)} creators"
+        )
+        if not missing:
+            return result
+
+        semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+        async def resolve(name: str) -> Optional[str]:
+            async with semaphore:
+                try:
+                    return await resolver(name)
+                except Exception as e:
+                    utils.logger.error(f"[CreatorIdCache.resolve_many] resolve creator {name} err: {e}")
+                    return None
+
+        resolved = await asyncio.gather(*[resolve(name) for name in missing])
+        now = utils.get_unix_timestamp()
+        cache_items = {}
+        for name, creator_id in zip(missing, resolved):
+            if creator_id is None:
+                continue
+            result[name] = str(creator_id)
+            cache_items[name] = {"id": str(creator_id), "updated_at": now}
+        get_crawl_state_store(self.platform).set_many(CREATOR_ID_NAMESPACE, cache_items)
+        return result
@@ -0,0 +1,228 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/6/30 10:00
+# @Desc    : creator 模式并发爬取多个创作者，请求名额在创作者之间公平分配
+import asyncio
+import functools
+import time
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Deque, Dict, List, NamedTuple, Optional, Union
+
+from tools import utils
+from tools.concurrency_governor import stage_concurrency
+
+
+class FairSemaphore:
+    """
+    按 key 轮流分配名额的信号量:
+        - 没有任务在等待时和 asyncio.Semaphore 一样直接获取
+        - 有多个 key 在等待时，释放的名额依次分给不同的 key，一个等待任务很多的 key(帖子很多的创作者)不会占满所有名额
+    """
+
+    def __init__(self, value: int):
+        self._value = max(value, 1)
+        self._running = 0
+        self._waiters: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+
+    async def acquire(self, key: str):
+        if self._running < self._value and not self._waiters:
+            self._running += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(key, deque()).append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # 已经分到名额之后被取消，把名额还回去
+                self.release()
+            else:
+                self._remove_waiter(key, future)
+            raise
+
+    def release(self):
+        self._running -= 1
+        self._wake_up_next()
+
+    def for_key(self, key: str) -> "KeyedSemaphore":
+        return KeyedSemaphore(self, key)
+
+    def _wake_up_next(self):
+        while self._running < self._value and self._waiters:
+            key, waiters = self._waiters.popitem(last=False)
+            future = waiters.popleft()
+            if waiters:
+                # 这个 key 还有任务在等待，排到队尾，下一个名额先分给其他 key
+                self._waiters[key] = waiters
+            if future.done():
+                continue
+            self._running += 1
+            future.set_result(None)
+
+    def _remove_waiter(self, key: str, future: asyncio.Future):
+        waiters = self._waiters.get(key)
+        if not waiters:
+            return
+        try:
+            waiters.remove(future)
+        except ValueError:
+            pass
+        if not waiters:
+            del self._waiters[key]
+
+
+class KeyedSemaphore:
+    """
+    FairSemaphore 上某个 key 的视图，用法和 asyncio.Semaphore 相同: async with semaphore: ...
+    """
+
+    def __init__(self, semaphore: FairSemaphore, key: str):
+        self._semaphore = semaphore
+        self._key = key
+
+    async def __aenter__(self):
+        await self._semaphore.acquire(self._key)
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self._semaphore.release()
+
+
+@dataclass
+class CreatorProgress:
+    creator_id: str
+    status: str = "pending"  # pending | running | done | failed
+    pages: int = 0
+    notes: int = 0
+    started_at: float = 0.0
+    finished_at: float = 0.0
+
+
+class _CreatorContext(NamedTuple):
+    scheduler: "CreatorScheduler"
+    creator_id: str
+
+
+_creator_context_var: ContextVar[Optional[_CreatorContext]] = ContextVar("creator_context_var", default=None)
+
+
+class CreatorScheduler:
+    """
+    同时爬取 concurrency 个创作者，每个创作者在自己的任务中完成帖子翻页和评论爬取:
+        - 所有创作者共用 request_concurrency 个请求名额(FairSemaphore)，并发的创作者再多也不会超过平台的请求并发
+        - 名额按创作者轮流分配，帖子很多的创作者不会让其他创作者一直等待
+        - 记录每个创作者的状态、页数和帖子数，单个创作者出错不影响其他创作者
+    """
+
+    def __init__(self, concurrency: int, request_concurrency: int):
+        """
+        Args:
+            concurrency: 同时爬取的创作者数量
+            request_concurrency: 所有创作者共用的请求并发数量
+        """
+        self.concurrency = max(concurrency, 1)
+        self.request_concurrency = max(request_concurrency, 1)
+        self.progress: Dict[str, CreatorProgress] = {}
+        self._semaphore = FairSemaphore(self.request_concurrency)
+
+    async def run(self, creator_ids: List[str], crawl_creator: Callable[[str], Awaitable[None]]):
+        """
+        按顺序启动创作者，最多 concurrency 个同时运行
+        Args:
+            creator_ids: 创作者列表
+            crawl_creator: 爬取一个创作者的协程函数
+
+        Returns:
+
+        """
+        self.progress = {creator_id: CreatorProgress(creator_id) for creator_id in creator_ids}
+        creator_semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def crawl_with_semaphore(progress: CreatorProgress):
+            async with creator_semaphore:
+                progress.status = "running"
+                progress.started_at = time.time()
+                _creator_context_var.set(_CreatorContext(self, progress.creator_id))
+                try:
+                    await crawl_creator(progress.creator_id)
+                    progress.status = "done"
+                except Exception as e:
+                    progress.status = "failed"
+                    utils.logger.error(f"[CreatorScheduler.run] crawl creator {progress.creator_id} error: {e}")
+                progress.finished_at = time.time()
+                self._log_progress(progress)
+
+        await asyncio.gather(*[crawl_with_semaphore(progress) for progress in self.progress.values()])
+
+    def semaphore(self, creator_id: str) -> KeyedSemaphore:
+        return self._semaphore.for_key(creator_id)
+
+    def add_progress(self, creator_id: str, notes: int, pages: int = 1):
+        progress = self.progress.get(creator_id)
+        if progress is None:
+            return
+        progress.pages += pages
+        progress.notes += notes
+        self._log_progress(progress)
+
+    def first_unfinished(self) -> Optional[str]:
+        """
+        按列表顺序第一个还没有完成的创作者，用于记录断点，重新运行时从这里开始不会漏掉正在爬取的创作者
+        """
+        for creator_id, progress in self.progress.items():
+            if progress.status in ("pending", "running"):
+                return creator_id
+        return None
+
+    def _log_progress(self, progress: CreatorProgress):
+        finished = sum(1 for item in self.progress.values() if item.status in ("done", "failed"))
+        running = sum(1 for item in self.progress.values() if item.status == "running")
+        utils.logger.info(
+            f"[CreatorScheduler] creator {progress.creator_id} {progress.status}: pages {progress.pages}, "
+            f"notes {progress.notes} | running {running}, finished {finished}/{len(self.progress)}"
+        )
+
+
+def crawl_semaphore() -> Union[asyncio.Semaphore, KeyedSemaphore]:
+    """
+    爬取帖子详情、评论时使用的信号量:
+        creator 模式下返回当前创作者在共用请求名额上的视图，其他情况返回新的 asyncio.Semaphore(stage_concurrency())
+    """
+    context = _creator_context_var.get()
+    if context is None:
+        return asyncio.Semaphore(stage_concurrency())
+    return context.scheduler.semaphore(context.creator_id)
+
+
+def add_creator_progress(notes: int, pages: int = 1):
+    """
+    记录当前创作者爬取了一页帖子，不在 creator 模式下时什么也不做
+    """
+    context = _creator_context_var.get()
+    if context is not None:
+        context.scheduler.add_progress(context.creator_id, notes, pages)
+
+
+def track_creator_pages(callback: Callable[..., Awaitable]) -> Callable[..., Awaitable]:
+    """
+    包装创作者帖子翻页的回调函数，每页帖子都记录到当前创作者的进度中
+    """
+
+    @functools.wraps(callback)
+    async def wrapper(note_list: List, *args, **kwargs):
+        add_creator_progress(len(note_list))
+        return await callback(note_list, *args, **kwargs)
+
+    return wrapper
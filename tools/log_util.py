@@ -0,0 +1,269 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/6/22 10:30
+# @Desc    : 日志配置：按模块设置级别、JSON 行格式、数据内容截断/采样、后台线程输出
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, List, Optional, Union
+
+import config
+
+LOG_FORMAT = "%(asctime)s %(name)s %(levelname)s (%(filename)s:%(lineno)d) - %(message)s"
+LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_module_name_cache: Dict[str, str] = {}
+
+
+def module_name_of(record: logging.LogRecord) -> str:
+    """
+    根据日志记录所在文件得到模块名，例如 media_platform/xhs/core.py -> media_platform.xhs.core
+    """
+    module_name = _module_name_cache.get(record.pathname)
+    if module_name is None:
+        relative_path = os.path.relpath(os.path.abspath(record.pathname), PROJECT_ROOT)
+        if relative_path.startswith(".."):
+            module_name = record.module
+        else:
+            module_name = os.path.splitext(relative_path)[0].replace(os.sep, ".")
+        _module_name_cache[record.pathname] = module_name
+    return module_name
+
+
+def to_log_level(level: Union[str, int]) -> int:
+    if isinstance(level, int):
+        return level
+    level_value = logging.getLevelName(str(level).upper())
+    if not isinstance(level_value, int):
+        raise ValueError(f"Invalid log level: {level}")
+    return level_value
+
+
+def parse_module_levels(value: str) -> Dict[str, str]:
+    """
+    解析命令行参数中的模块日志级别
+    Args:
+        value: store=WARNING,media_platform.xhs=DEBUG
+
+    Returns:
+        {"store": "WARNING", "media_platform.xhs": "DEBUG"}
+    """
+    module_levels: Dict[str, str] = {}
+    for item in (value or "").split(","):
+        if not item.strip():
+            continue
+        module_name, _, level = item.partition("=")
+        to_log_level(level.strip())
+        module_levels[module_name.strip()] = level.strip().upper()
+    return module_levels
+
+
+def _render_payload(payload: Any, max_length: int) -> str:
+    """
+    dict/list 逐项转字符串，超过最大长度后不再处理剩下的元素，接口响应这类大对象不需要完整转换一遍
+    """
+    if isinstance(payload, str):
+        return payload
+    if not max_length or not isinstance(payload, (dict, list)):
+        return str(payload)
+    value_types = set(map(type, payload.values() if isinstance(payload, dict) else payload))
+    if dict not in value_types and list not in value_types:
+        # 没有嵌套 dict/list 时直接用 str()，比逐项拼接快
+        return str(payload)
+    parts: List[str] = []
+    length = 0
+    if isinstance(payload, dict):
+        for key, value in payload.items():
+            item = f"{key!r}: {_render_payload(value, max_length - length) if isinstance(value, (dict, list)) else repr(value)}"
+            parts.append(item)
+            length += len(item) + 2
+            if length > max_length:
+                break
+        return "{" + ", ".join(parts) + "}"
+    for value in payload:
+        item = _render_payload(value, max_length - length) if isinstance(value, (dict, list)) else repr(value)
+        parts.append(item)
+        length += len(item) + 2
+        if length > max_length:
+            break
+    return "[" + ", ".join(parts) + "]"
+
+
+class LazyPayload:
+    """
+    日志中打印的数据内容，只有日志真正输出时才转成字符串并按长度截断
+    """
+    __slots__ = ("payload", "max_length")
+
+    def __init__(self, payload: Any, max_length: Optional[int] = None):
+        self.payload = payload
+        self.max_length = max_length
+
+    def __str__(self) -> str:
+        max_length = config.LOG_PAYLOAD_MAX_LENGTH if self.max_length is None else self.max_length
+        text = _render_payload(self.payload, max_length)
+        if max_length and len(text) > max_length:
+            return f"{text[:max_length]}..."
+        return text
+
+    __repr__ = __str__
+
+
+def truncate(payload: Any, max_length: Optional[int] = None) -> LazyPayload:
+    """
+    包装日志中要打印的数据内容，配合 %s 占位符使用：
+        utils.logger.info("[store.xhs.update_xhs_note] xhs note: %s", utils.truncate(local_db_item))
+    """
+    return LazyPayload(payload, max_length)
+
+
+class ModuleLevelFilter(logging.Filter):
+    """
+    按模块名前缀过滤日志，最长的前缀优先，没有匹配的模块使用全局级别
+    """
+
+    def __init__(self, level: int, module_levels: Dict[str, int]):
+        super().__init__()
+        self.level = level
+        self.module_levels = module_levels
+        self._level_cache: Dict[str, int] = {}
+
+    def level_of(self, module_name: str) -> int:
+        level = self._level_cache.get(module_name)
+        if level is None:
+            level = self.level
+            matched_length = -1
+            for prefix, prefix_level in self.module_levels.items():
+                if (module_name == prefix or module_name.startswith(prefix + ".")) and len(prefix) > matched_length:
+                    level, matched_length = prefix_level, len(prefix)
+            self._level_cache[module_name] = level
+        return level
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= self.level_of(module_name_of(record))
+
+
+class PayloadSampleFilter(logging.Filter):
+    """
+    按比例输出打印数据内容(参数中有 LazyPayload)的 INFO 及以下级别日志，警告和错误日志不受影响
+    """
+
+    def __init__(self, sample_rate: float):
+        super().__init__()
+        self.sample_rate = sample_rate
+        self._credit = 0.0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO or not isinstance(record.args, tuple):
+            return True
+        if not any(isinstance(arg, LazyPayload) for arg in record.args):
+            return True
+        self._credit += self.sample_rate
+        if self._credit >= 1:
+            self._credit -= 1
+            return True
+        return False
+
+
+class JsonLogFormatter(logging.Formatter):
+    """
+    每条日志输出一行 JSON
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        log_item = {
+            "time": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "module": module_name_of(record),
+            "line": record.lineno,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            log_item["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            log_item["exc_info"] = record.exc_text
+        return json.dumps(log_item, ensure_ascii=False)
+
+
+class LazyQueueHandler(QueueHandler):
+    """
+    标准库的 QueueHandler 会在调用线程中先格式化消息，这里保留 msg/args 原样入队，格式化放到输出线程中
+    数据内容在入队前先转成字符串，避免输出线程读取时调用方还在修改同一个 dict/list
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if isinstance(record.args, tuple) and any(isinstance(arg, LazyPayload) for arg in record.args):
+            record.args = tuple(str(arg) if isinstance(arg, LazyPayload) else arg for arg in record.args)
+        return record
+
+
+_queue_listener: Optional[QueueListener] = None
+
+
+def stop_queue_listener():
+    """
+    停止后台输出线程，停止前会输出队列中剩余的日志
+    """
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+
+
+atexit.register(stop_queue_listener)
+
+
+def apply_logging_config(logger: logging.Logger) -> logging.Logger:
+    """
+    按照 config 中的日志配置重新设置 logger，命令行参数覆盖 config 之后需要再调用一次
+    """
+    stop_queue_listener()
+    level = to_log_level(config.LOG_LEVEL)
+    module_levels = {module_name: to_log_level(module_level)
+                     for module_name, module_level in (config.LOG_MODULE_LEVELS or {}).items()}
+
+    # logger 的级别取所有级别中最低的，这样被全局级别过滤的调用在 isEnabledFor 时就直接返回，不会创建 LogRecord
+    logger.setLevel(min([level] + list(module_levels.values())))
+    for log_filter in list(logger.filters):
+        logger.removeFilter(log_filter)
+    if module_levels:
+        logger.addFilter(ModuleLevelFilter(level, module_levels))
+    if config.LOG_PAYLOAD_SAMPLE_RATE < 1:
+        logger.addFilter(PayloadSampleFilter(config.LOG_PAYLOAD_SAMPLE_RATE))
+
+    stream_handler = logging.StreamHandler(sys.stderr)
+    if config.LOG_FORMAT == "json":
+        stream_handler.setFormatter(JsonLogFormatter(datefmt=LOG_DATE_FORMAT))
+    else:
+        stream_handler.setFormatter(logging.Formatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT))
+
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    if config.ENABLE_ASYNC_LOG:
+        global _queue_listener
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        _queue_listener = QueueListener(log_queue, stream_handler)
+        _queue_listener.start()
+        logger.addHandler(LazyQueueHandler(log_queue))
+    else:
+        logger.addHandler(stream_handler)
+    logger.propagate = False
+    return logger
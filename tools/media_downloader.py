@@ -0,0 +1,500 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/6/16 10:12
+# @Desc    : 图片/视频流式下载器：分块写临时文件 + 原子重命名、HTTP Range 断点续传、有界下载池、内容哈希去重、多镜像对冲请求
+import asyncio
+import hashlib
+import json
+import os
+import pathlib
+import shutil
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import aiofiles
+import httpx
+
+import config
+from tools import utils
+
+PART_FILE_SUFFIX = ".part"
+
+
+class MediaHashIndex:
+    """
+    媒体文件内容哈希索引，记录 sha256 -> 文件路径 以及 url -> 文件路径 两个映射，
+    相同 url 的媒体不会重复下载，内容相同的媒体只保留一份数据(通过硬链接复用)
+    """
+
+    def __init__(self, index_file: str = ""):
+        self.index_file = index_file
+        self._hash_to_path: Dict[str, str] = {}
+        self._url_to_path: Dict[str, str] = {}
+        # 索引有变化时才需要写回文件
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        if not self.index_file or not os.path.exists(self.index_file):
+            return
+        try:
+            with open(self.index_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._hash_to_path = data.get("hash", {})
+            self._url_to_path = data.get("url", {})
+        except (OSError, ValueError) as e:
+            utils.logger.error(f"[MediaHashIndex._load] load index file {self.index_file} err: {e}")
+
+    def save(self):
+        """
+        索引有变化时原子写入索引文件
+        Returns:
+
+        """
+        if not self.index_file or not self._dirty:
+            return
+        pathlib.Path(self.index_file).parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.index_file + PART_FILE_SUFFIX
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump({"hash": self._hash_to_path, "url": self._url_to_path}, f, ensure_ascii=False)
+        os.replace(tmp_file, self.index_file)
+        self._dirty = False
+
+    def get_by_url(self, url: str) -> Optional[str]:
+        path = self._url_to_path.get(url)
+        if path and os.path.exists(path):
+            return path
+        return None
+
+    def get_by_hash(self, content_hash: str) -> Optional[str]:
+        path = self._hash_to_path.get(content_hash)
+        if path and os.path.exists(path):
+            return path
+        return None
+
+    def add(self, url: str, content_hash: str, path: str):
+        exist_path = self._hash_to_path.get(content_hash)
+        if not exist_path or not os.path.exists(exist_path):
+            self._hash_to_path[content_hash] = path
+            self._dirty = True
+        if self._url_to_path.get(url) != path:
+            self._url_to_path[url] = path
+            self._dirty = True
+
+
+class MirrorStats:
+    """
+    按域名统计镜像/CDN 的下载耗时(EWMA)与失败率，用于选择最快的镜像
+    """
+
+    def __init__(self, alpha: float = 0.3, error_penalty_sec: float = 5.0):
+        self.alpha = alpha
+        self.error_penalty_sec = error_penalty_sec
+        # host -> [ewma_latency, success_count, error_count]
+        self._stats: Dict[str, List[float]] = {}
+
+    @staticmethod
+    def get_host(url: str) -> str:
+        return urlparse(url).netloc
+
+    def record(self, url: str, elapsed: float, ok: bool):
+        stat = self._stats.setdefault(self.get_host(url), [elapsed, 0, 0])
+        stat[0] = self.alpha * elapsed + (1 - self.alpha) * stat[0]
+        if ok:
+            stat[1] += 1
+        else:
+            stat[2] += 1
+
+    def record_lost(self, url: str, elapsed: float):
+        """
+        对冲落败被取消的请求没有下载成功也没有出错，只计入耗时样本，让慢镜像的评分升高
+        """
+        stat = self._stats.setdefault(self.get_host(url), [elapsed, 0, 0])
+        stat[0] = self.alpha * elapsed + (1 - self.alpha) * stat[0]
+
+    def score(self, url: str) -> float:
+        """
+        分数越低越优先，未使用过的镜像分数为 0，保证每个镜像都有机会被探测到
+        """
+        stat = self._stats.get(self.get_host(url))
+        if not stat:
+            return 0.0
+        ewma_latency, success_count, error_count = stat
+        error_rate = error_count / (success_count + error_count) if success_count + error_count else 0.0
+        return ewma_latency + error_rate * self.error_penalty_sec
+
+    def rank(self, urls: List[str]) -> List[str]:
+        return sorted(urls, key=self.score)
+
+    def summary(self) -> List[Tuple[str, float, int, int]]:
+        return [(host, round(stat[0], 3), int(stat[1]), int(stat[2])) for host, stat in self._stats.items()]
+
+
+def link_or_copy(src: str, dst: str):
+    """
+    优先使用硬链接复用已有文件，跨设备或文件系统不支持时退化为复制
+    Args:
+        src: 已存在的文件
+        dst: 目标文件
+
+    Returns:
+
+    """
+    pathlib.Path(dst).parent.mkdir(parents=True, exist_ok=True)
+    if os.path.exists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+class MediaDownloader:
+    """
+    流式媒体下载器
+    1. 响应体按 chunk 写入 `<file>.part` 临时文件，完成后 os.replace 原子重命名，不会在内存中持有整个文件
+    2. 存在未完成的临时文件时通过 Range 请求续传，服务端不支持 Range 或者 Content-Range 和临时文件对不上时从头下载
+    3. 下载任务通过 submit 提交到有界下载池，和元数据爬取相互独立
+    4. 按 url 与内容 sha256 去重，相同媒体只下载/落盘一次
+    5. 传入 mirror_urls 时按镜像历史耗时/失败率排序，最快镜像超过 hedge_delay 未完成时并发请求下一个镜像，先完成者胜出
+    """
+
+    def __init__(
+        self,
+        proxies=None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: int = 60,
+        max_workers: int = config.MEDIA_DOWNLOAD_CONCURRENCY,
+        chunk_size: int = config.MEDIA_DOWNLOAD_CHUNK_SIZE,
+        max_retries: int = config.MEDIA_DOWNLOAD_MAX_RETRIES,
+        index_file: str = config.MEDIA_DEDUP_INDEX_FILE,
+        hedge_delay: float = config.MEDIA_DOWNLOAD_HEDGE_DELAY_SEC,
+    ):
+        self.proxies = proxies
+        self.headers = headers or {}
+        self.timeout = timeout
+        self.max_workers = max(1, max_workers)
+        self.chunk_size = chunk_size
+        self.max_retries = max(1, max_retries)
+        self.hash_index = MediaHashIndex(index_file)
+        self.hedge_delay = hedge_delay
+        self.mirror_stats = MirrorStats()
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._client: Optional[httpx.AsyncClient] = None
+        # 同一个目标文件同时只允许一个下载任务写入
+        self._path_locks: Dict[str, asyncio.Lock] = {}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(proxies=self.proxies, timeout=self.timeout, follow_redirects=True)
+        return self._client
+
+    async def download(
+        self,
+        url: str,
+        save_file_name: str,
+        headers: Optional[Dict[str, str]] = None,
+        mirror_urls: Optional[List[str]] = None,
+    ) -> Optional[str]:
+        """
+        下载媒体文件到 save_file_name，返回最终文件路径，失败返回 None
+        Args:
+            url: 媒体地址
+            save_file_name: 保存路径
+            headers: 额外的请求头，例如 bilibili 需要 Referer
+            mirror_urls: 同一媒体在其他镜像/CDN 上的地址
+
+        Returns:
+
+        """
+        lock = self._path_locks.setdefault(save_file_name, asyncio.Lock())
+        async with lock:
+            if os.path.exists(save_file_name):
+                return save_file_name
+
+            exist_path = self.hash_index.get_by_url(url)
+            if exist_path:
+                link_or_copy(exist_path, save_file_name)
+                utils.logger.info(f"[MediaDownloader.download] reuse {exist_path} for {save_file_name}")
+                return save_file_name
+
+            for attempt in range(1, self.max_retries + 1):
+                try:
+                    if mirror_urls:
+                        content_hash = await self._download_hedged(url, mirror_urls, save_file_name, headers)
+                    else:
+                        content_hash = await self._timed_stream_to_file(url, save_file_name, headers)
+                    break
+                except (httpx.HTTPError, OSError) as e:
+                    utils.logger.error(
+                        f"[MediaDownloader.download] download {url} err (attempt {attempt}/{self.max_retries}): {e}"
+                    )
+            else:
+                return None
+            if content_hash is None:
+                return None
+
+            self._dedup(url, content_hash, save_file_name)
+            utils.logger.info(f"[MediaDownloader.download] save media {save_file_name} success ...")
+            return save_file_name
+
+    async def _download_hedged(
+        self,
+        url: str,
+        mirror_urls: List[str],
+        save_file_name: str,
+        headers: Optional[Dict[str, str]],
+    ) -> Optional[str]:
+        """
+        对冲请求：按镜像评分依次发起请求，前一个请求 hedge_delay 秒内未完成或失败时再请求下一个镜像，
+        第一个成功的请求胜出，其余请求取消并清理临时文件；所有镜像都请求出错时抛出最后一个错误，由 download 重试。
+        镜像的内容完全相同，排在第一的镜像使用 `<file>.part` 续传，没有请求成功时保留最长的临时文件作为下次续传的起点
+        """
+        candidates = self.mirror_stats.rank(list(dict.fromkeys([url] + mirror_urls)))
+        pending = set()
+        task_part_files: Dict[asyncio.Task, str] = {}
+        content_hash = None
+        last_error: Optional[BaseException] = None
+        try:
+            while candidates or pending:
+                if candidates:
+                    if task_part_files:
+                        part_file = f"{save_file_name}.{len(task_part_files)}{PART_FILE_SUFFIX}"
+                    else:
+                        part_file = save_file_name + PART_FILE_SUFFIX
+                    task = asyncio.create_task(
+                        self._timed_stream_to_file(candidates.pop(0), save_file_name, headers, part_file)
+                    )
+                    task_part_files[task] = part_file
+                    pending.add(task)
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=self.hedge_delay if candidates else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    if task.exception() is not None:
+                        last_error = task.exception()
+                    elif task.result():
+                        content_hash = task.result()
+                        break
+                if content_hash:
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            part_files = [part_file for part_file in task_part_files.values() if os.path.exists(part_file)]
+            keep_part_file = ""
+            if content_hash is None and part_files:
+                keep_part_file = save_file_name + PART_FILE_SUFFIX
+                os.replace(max(part_files, key=os.path.getsize), keep_part_file)
+            for part_file in part_files:
+                if part_file != keep_part_file and os.path.exists(part_file):
+                    os.remove(part_file)
+        if content_hash is None and last_error is not None:
+            raise last_error
+        return content_hash
+
+    async def _timed_stream_to_file(
+        self,
+        url: str,
+        save_file_name: str,
+        headers: Optional[Dict[str, str]],
+        part_file: str = "",
+    ) -> Optional[str]:
+        """
+        统计镜像耗时与成功率的 _stream_to_file
+        """
+        start_time = time.monotonic()
+        try:
+            content_hash = await self._stream_to_file(url, save_file_name, headers, part_file)
+        except asyncio.CancelledError:
+            self.mirror_stats.record_lost(url, time.monotonic() - start_time)
+            raise
+        except BaseException:
+            self.mirror_stats.record(url, time.monotonic() - start_time, False)
+            raise
+        self.mirror_stats.record(url, time.monotonic() - start_time, content_hash is not None)
+        return content_hash
+
+    async def _stream_to_file(
+        self,
+        url: str,
+        save_file_name: str,
+        headers: Optional[Dict[str, str]],
+        part_file: str = "",
+    ) -> Optional[str]:
+        """
+        流式写入临时文件，支持断点续传，返回内容的 sha256
+        """
+        pathlib.Path(save_file_name).parent.mkdir(parents=True, exist_ok=True)
+        part_file = part_file or save_file_name + PART_FILE_SUFFIX
+        resume_pos = os.path.getsize(part_file) if os.path.exists(part_file) else 0
+
+        req_headers = {**self.headers, **(headers or {})}
+        if resume_pos > 0:
+            req_headers["Range"] = f"bytes={resume_pos}-"
+
+        hasher = hashlib.sha256()
+        restart = False
+        async with self._get_client().stream("GET", url, headers=req_headers) as response:
+            if response.status_code == 416 and resume_pos > 0:
+                # 只有服务端返回的总大小和临时文件大小一致时，临时文件才是完整内容
+                _, total = self._parse_content_range(response.headers.get("Content-Range", ""))
+                restart = total != resume_pos
+            elif response.status_code == 206 and resume_pos > 0:
+                # 续传的起始位置必须是临时文件的大小
+                start, _ = self._parse_content_range(response.headers.get("Content-Range", ""))
+                restart = start != resume_pos
+                if not restart:
+                    await self._hash_file(part_file, hasher)
+                    async with aiofiles.open(part_file, "ab") as f:
+                        async for chunk in response.aiter_bytes(self.chunk_size):
+                            hasher.update(chunk)
+                            await f.write(chunk)
+            elif response.status_code in (200, 206):
+                async with aiofiles.open(part_file, "wb") as f:
+                    async for chunk in response.aiter_bytes(self.chunk_size):
+                        hasher.update(chunk)
+                        await f.write(chunk)
+            else:
+                utils.logger.error(
+                    f"[MediaDownloader._stream_to_file] request {url} err, status_code:{response.status_code}"
+                )
+                if response.status_code >= 500:
+                    # 服务端错误抛出 HTTPStatusError，由 download 重试
+                    response.raise_for_status()
+                return None
+
+        if restart:
+            return await self._restart_stream_to_file(url, save_file_name, headers, part_file)
+        if response.status_code == 416:
+            await self._hash_file(part_file, hasher)
+        os.replace(part_file, save_file_name)
+        return hasher.hexdigest()
+
+    async def _restart_stream_to_file(
+        self,
+        url: str,
+        save_file_name: str,
+        headers: Optional[Dict[str, str]],
+        part_file: str,
+    ) -> Optional[str]:
+        """
+        临时文件和服务端返回的 Content-Range 对不上(过期或者比完整文件更大)，删除临时文件后从头下载
+        """
+        utils.logger.warning(
+            f"[MediaDownloader._restart_stream_to_file] part file {part_file} does not match {url}, download again"
+        )
+        os.remove(part_file)
+        return await self._stream_to_file(url, save_file_name, headers, part_file)
+
+    @staticmethod
+    def _parse_content_range(content_range: str) -> Tuple[Optional[int], Optional[int]]:
+        """
+        解析 Content-Range 响应头，例如 `bytes 100-199/200` 和 `bytes */200`
+        Args:
+            content_range: Content-Range 响应头
+
+        Returns:
+            (起始位置, 总大小)，无法解析或者未知时为 None
+
+        """
+        unit, _, value = content_range.strip().partition(" ")
+        if unit != "bytes":
+            return None, None
+        byte_range, _, total = value.partition("/")
+        start = byte_range.split("-")[0]
+        return (int(start) if start.isdigit() else None), (int(total) if total.isdigit() else None)
+
+    async def _hash_file(self, file_name: str, hasher):
+        async with aiofiles.open(file_name, "rb") as f:
+            while True:
+                chunk = await f.read(self.chunk_size)
+                if not chunk:
+                    break
+                hasher.update(chunk)
+
+    def _dedup(self, url: str, content_hash: str, save_file_name: str):
+        exist_path = self.hash_index.get_by_hash(content_hash)
+        if exist_path and os.path.abspath(exist_path) != os.path.abspath(save_file_name):
+            # 内容相同的文件已存在，替换为硬链接只保留一份数据
+            link_or_copy(exist_path, save_file_name)
+            utils.logger.info(f"[MediaDownloader._dedup] {save_file_name} is duplicate of {exist_path}")
+        self.hash_index.add(url, content_hash, save_file_name)
+
+    async def submit(
+        self,
+        url: str,
+        save_file_name: str,
+        headers: Optional[Dict[str, str]] = None,
+        mirror_urls: Optional[List[str]] = None,
+    ):
+        """
+        提交下载任务到下载池，队列满时等待，不等待下载完成
+        Args:
+            url:
+            save_file_name:
+            headers:
+            mirror_urls:
+
+        Returns:
+
+        """
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_workers * 4)
+            self._workers = [asyncio.create_task(self._worker()) for _ in range(self.max_workers)]
+        await self._queue.put((url, save_file_name, headers, mirror_urls))
+
+    async def _worker(self):
+        while True:
+            url, save_file_name, headers, mirror_urls = await self._queue.get()
+            try:
+                await self.download(url, save_file_name, headers, mirror_urls)
+            except Exception as e:
+                utils.logger.error(f"[MediaDownloader._worker] download {url} unexpected err: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def join(self):
+        """
+        等待已提交的下载任务全部完成
+        """
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def close(self):
+        """
+        等待下载任务完成，关闭下载池并持久化去重索引
+        """
+        await self.join()
+        for worker in self._workers:
+            worker.cancel()
+        if self._workers:
+            await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self.hash_index.save()
+        for host, ewma_latency, success_count, error_count in self.mirror_stats.summary():
+            utils.logger.info(
+                f"[MediaDownloader.close] host:{host} ewma_latency:{ewma_latency}s "
+                f"success:{success_count} error:{error_count}"
+            )
@@ -0,0 +1,383 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/6/21 10:15
+# @Desc    : 热点路径耗时统计：请求、签名、解析、存储的耗时直方图，支持 Prometheus/OpenMetrics 导出和运行结束时的汇总表
+import bisect
+import functools
+import inspect
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+import config
+
+# 单位：秒
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+METRIC_HELP = {
+    "mediacrawler_request_seconds": "Platform api request latency, status is the http status code",
+    "mediacrawler_sign_seconds": "Request signing latency",
+    "mediacrawler_extract_seconds": "Html/json extraction latency",
+    "mediacrawler_store_seconds": "Store backend latency",
+}
+
+# 路径中包含数字且较长的片段认为是 id，统一替换掉避免 endpoint 标签过多
+_ID_SEGMENT_PATTERN = re.compile(r"^(?=.*\d)[\w-]{6,}$")
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+_response_status_var: ContextVar[Tuple[List[int], ...]] = ContextVar("response_status_var", default=())
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def merge(self, other: "Histogram"):
+        for index, bucket_count in enumerate(other.bucket_counts):
+            self.bucket_counts[index] += bucket_count
+        self.count += other.count
+        self.sum += other.sum
+
+    def quantile(self, q: float) -> float:
+        """
+        按桶估算分位数，返回所在桶的上界
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.bucket_counts):
+            cumulative += bucket_count
+            if cumulative >= rank:
+                return self.buckets[index] if index < len(self.buckets) else float("inf")
+        return float("inf")
+
+
+class MetricsRegistry:
+    """
+    进程内的耗时统计，config.ENABLE_METRICS 为 False 时 timer/timed 不做任何统计
+    """
+
+    def __init__(self):
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._lock = threading.Lock()
+        self._http_server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def enabled(self) -> bool:
+        return config.ENABLE_METRICS
+
+    def observe(self, name: str, value: float, **labels: str):
+        label_key: LabelKey = tuple(sorted((key, str(label_value)) for key, label_value in labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(label_key)
+            if histogram is None:
+                histogram = series[label_key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[Dict[str, str]]:
+        """
+        统计代码块的耗时，抛出异常时 status 标签为异常类名
+        Usage:
+            with metrics_registry.timer("mediacrawler_sign_seconds", platform="xhs", step="x-s"):
+                ...
+        """
+        if not self.enabled:
+            yield labels
+            return
+        labels.setdefault("status", "ok")
+        start_time = time.perf_counter()
+        try:
+            yield labels
+        except BaseException as e:
+            labels["status"] = type(e).__name__
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - start_time, **labels)
+
+    def timed(self, name: str, **labels: str) -> Callable:
+        """
+        统计函数耗时的装饰器，支持普通函数和协程函数
+        """
+
+        def decorator(func: Callable) -> Callable:
+            func_labels = dict(labels)
+            func_labels.setdefault("step", func.__name__)
+
+            if inspect.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    if not self.enabled:
+                        return await func(*args, **kwargs)
+                    with self.timer(name, **func_labels):
+                        return await func(*args, **kwargs)
+
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with self.timer(name, **func_labels):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def collect(self) -> List[Tuple[str, LabelKey, Histogram]]:
+        with self._lock:
+            return [
+                (name, label_key, histogram)
+                for name, series in self._histograms.items()
+                for label_key, histogram in series.items()
+            ]
+
+    def render(self) -> str:
+        """
+        输出 OpenMetrics 文本格式
+        """
+        lines: List[str] = []
+        last_name = ""
+        for name, label_key, histogram in sorted(self.collect(), key=lambda item: (item[0], item[1])):
+            if name != last_name:
+                lines.append(f"# HELP {name} {METRIC_HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+                last_name = name
+            labels = [f'{key}="{_escape_label_value(value)}"' for key, value in label_key]
+            cumulative = 0
+            for index, upper_bound in enumerate(histogram.buckets + (float("inf"),)):
+                cumulative += histogram.bucket_counts[index]
+                le = "+Inf" if upper_bound == float("inf") else repr(upper_bound)
+                bucket_labels = ",".join(labels + ['le="%s"' % le])
+                lines.append(f"{name}_bucket{{{bucket_labels}}} {cumulative}")
+            label_text = "{" + ",".join(labels) + "}" if labels else ""
+            lines.append(f"{name}_count{label_text} {histogram.count}")
+            lines.append(f"{name}_sum{label_text} {histogram.sum}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def start_http_server(self, port: int, host: str = "0.0.0.0"):
+        """
+        在后台线程中提供 /metrics 接口
+        """
+        if self._http_server is not None:
+            return
+        registry = self
+
+        class _MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                content = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/openmetrics-text; version=1.0.0; charset=utf-8")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._http_server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        self._http_server.daemon_threads = True
+        threading.Thread(target=self._http_server.serve_forever, name="metrics-server", daemon=True).start()
+
+    def stop_http_server(self):
+        if self._http_server is None:
+            return
+        self._http_server.shutdown()
+        self._http_server.server_close()
+        self._http_server = None
+
+    def report(self, top_n: int = 30, logger=None):
+        """
+        输出按总耗时排序的汇总表
+        """
+        if logger is None:
+            from tools import utils
+            logger = utils.logger
+        rows = sorted(self.collect(), key=lambda item: item[2].sum, reverse=True)[:top_n]
+        logger.info(f"[MetricsRegistry.report] {'metric':<32} {'count':>7} {'total_s':>9} {'avg_ms':>9} "
+                    f"{'p50_ms':>8} {'p99_ms':>8}  labels")
+        for name, label_key, histogram in rows:
+            avg_ms = histogram.sum / histogram.count * 1000 if histogram.count else 0
+            labels = ",".join(f"{key}={value}" for key, value in label_key)
+            logger.info(
+                f"[MetricsRegistry.report] {name.replace('mediacrawler_', ''):<32} {histogram.count:>7} "
+                f"{histogram.sum:>9.3f} {avg_ms:>9.1f} {histogram.quantile(0.5) * 1000:>8.0f} "
+                f"{histogram.quantile(0.99) * 1000:>8.0f}  {labels}"
+            )
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def drain(self) -> List[Tuple[str, LabelKey, Histogram]]:
+        """
+        取出并清空当前的统计，用于把子进程中的统计交给主进程合并
+        """
+        with self._lock:
+            histograms, self._histograms = self._histograms, {}
+        return [
+            (name, label_key, histogram)
+            for name, series in histograms.items()
+            for label_key, histogram in series.items()
+        ]
+
+    def merge(self, items: List[Tuple[str, LabelKey, Histogram]]):
+        """
+        合并 drain 取出的统计
+        """
+        with self._lock:
+            for name, label_key, histogram in items:
+                series = self._histograms.setdefault(name, {})
+                exist_histogram = series.get(label_key)
+                if exist_histogram is None:
+                    series[label_key] = histogram
+                else:
+                    exist_histogram.merge(histogram)
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def normalize_endpoint(url: str) -> str:
+    """
+    请求 URL 转换为 endpoint 标签：去掉 host 和查询参数，路径中的 id 替换为 :id
+    """
+    path = urlsplit(url).path or "/"
+    return "/".join(":id" if _ID_SEGMENT_PATTERN.match(segment) else segment for segment in path.split("/"))
+
+
+def proxy_label(proxies) -> str:
+    """
+    代理标签只保留 host:port，不暴露代理账号密码
+    """
+    if not proxies:
+        return "direct"
+    if isinstance(proxies, dict):
+        proxies = next(iter(proxies.values()), "")
+    split_result = urlsplit(str(proxies))
+    if not split_result.hostname:
+        return "unknown"
+    return f"{split_result.hostname}:{split_result.port}" if split_result.port else split_result.hostname
+
+
+def module_platform(module_name: str) -> str:
+    """
+    media_platform.xhs.client / store.xhs.xhs_store_impl -> xhs
+    """
+    parts = module_name.split(".")
+    return parts[1] if len(parts) > 1 else parts[0]
+
+
+@contextmanager
+def track_response_status() -> Iterator[List[int]]:
+    """
+    收集代码块内请求的 HTTP 状态码，可以嵌套使用，内层请求的状态码外层也会收到
+    """
+    status_codes: List[int] = []
+    token = _response_status_var.set(_response_status_var.get() + (status_codes,))
+    try:
+        yield status_codes
+    finally:
+        _response_status_var.reset(token)
+
+
+def record_response_status(status_code: int):
+    """
+    客户端的 request 方法拿到 HTTP 响应后调用，记录响应的状态码
+    """
+    for status_codes in _response_status_var.get():
+        status_codes.append(status_code)
+
+
+def instrument_request(func: Callable) -> Callable:
+    """
+    包装 AbstractApiClient.request，按 platform/endpoint/status/error/proxy 统计请求耗时，
+    status 为 HTTP 状态码(没有拿到响应时为 none)，error 为抛出的异常类名(没有异常时为 none)
+    """
+
+    @functools.wraps(func)
+    async def wrapper(self, method, url, *args, **kwargs):
+        if not metrics_registry.enabled:
+            return await func(self, method, url, *args, **kwargs)
+        proxies = kwargs.get("proxies") or getattr(self, "proxies", None) or getattr(self, "default_ip_proxy", None)
+        error = "none"
+        start_time = time.perf_counter()
+        with track_response_status() as status_codes:
+            try:
+                return await func(self, method, url, *args, **kwargs)
+            except BaseException as e:
+                error = type(e).__name__
+                if isinstance(e, httpx.HTTPStatusError):
+                    status_codes.append(e.response.status_code)
+                raise
+            finally:
+                metrics_registry.observe(
+                    "mediacrawler_request_seconds", time.perf_counter() - start_time,
+                    platform=module_platform(type(self).__module__),
+                    endpoint=normalize_endpoint(url),
+                    status=str(status_codes[-1]) if status_codes else "none",
+                    error=error,
+                    proxy=proxy_label(proxies),
+                )
+
+    return wrapper
+
+
+def instrument_store(func: Callable) -> Callable:
+    """
+    包装 AbstractStore.store_*，按 platform/backend/method/status 统计存储耗时
+    """
+
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        if not metrics_registry.enabled:
+            return await func(self, *args, **kwargs)
+        store_class = type(self)
+        backend = re.search(r"(Csv|Db|Json|Sqlite)", store_class.__name__)
+        with metrics_registry.timer(
+            "mediacrawler_store_seconds",
+            platform=module_platform(store_class.__module__),
+            backend=backend.group(1).lower() if backend else store_class.__name__,
+            method=func.__name__,
+        ):
+            return await func(self, *args, **kwargs)
+
+    return wrapper
+
+
+metrics_registry = MetricsRegistry()
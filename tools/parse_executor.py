@@ -0,0 +1,147 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/6/24 10:20
+# @Desc    : 解析执行器：大页面(HTML/内嵌JSON)的解析放到线程池或进程池中执行，避免一个大页面阻塞事件循环上所有进行中的请求
+import asyncio
+import functools
+import multiprocessing
+import pickle
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import config
+from tools import utils
+from tools.metrics import Histogram, LabelKey, metrics_registry
+
+
+def _config_values() -> Dict[str, Any]:
+    """
+    当前进程中的配置(包含命令行参数覆盖的配置)，只保留可以 pickle 的大写配置项
+    """
+    values = {}
+    for key, value in vars(config).items():
+        if not key.isupper():
+            continue
+        try:
+            pickle.dumps(value)
+        except (pickle.PicklingError, AttributeError, TypeError):
+            continue
+        values[key] = value
+    return values
+
+
+def _init_process_worker(config_values: Dict[str, Any]):
+    """
+    spawn 启动的子进程会重新导入 config，需要同步主进程中命令行参数覆盖之后的配置
+    """
+    for key, value in config_values.items():
+        setattr(config, key, value)
+
+
+def _parse_in_process(parse_func: Callable, content: Any, args: Tuple,
+                      kwargs: Dict) -> Tuple[Any, List[Tuple[str, LabelKey, Histogram]]]:
+    """
+    在子进程中解析，解析结果和子进程中统计的耗时一起返回，由主进程合并统计
+    """
+    result = parse_func(content, *args, **kwargs)
+    return result, metrics_registry.drain()
+
+
+class ParseExecutor:
+    """
+    config.PARSE_EXECUTOR:
+        thread: 线程池，lxml/re/json 解析过程中部分时间会释放 GIL，可以减少事件循环卡顿，没有序列化开销
+        process: 进程池，解析完全不占用主进程 CPU，解析函数、参数和返回值都需要能被 pickle
+                 (模块级函数、无状态 Extractor 的方法，返回 pydantic 模型或 dict)，
+                 子进程启动时同步主进程的配置，子进程中统计的耗时随解析结果返回主进程
+        none: 在事件循环中直接解析
+    """
+
+    def __init__(self):
+        self._executor: Optional[Executor] = None
+        self._executor_type = ""
+        self._picklable_cache: Dict[Tuple[str, str], bool] = {}
+
+    def _get_executor(self) -> Optional[Executor]:
+        executor_type = config.PARSE_EXECUTOR
+        if executor_type not in ("thread", "process"):
+            return None
+        if self._executor is None or self._executor_type != executor_type:
+            self.shutdown()
+            if executor_type == "process":
+                # 爬虫进程里有 playwright 等后台线程，fork 不安全，使用 spawn 启动子进程
+                self._executor = ProcessPoolExecutor(max_workers=config.PARSE_EXECUTOR_MAX_WORKERS,
+                                                     mp_context=multiprocessing.get_context("spawn"),
+                                                     initializer=_init_process_worker,
+                                                     initargs=(_config_values(),))
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=config.PARSE_EXECUTOR_MAX_WORKERS,
+                                                    thread_name_prefix="parse")
+            self._executor_type = executor_type
+        return self._executor
+
+    async def parse(self, parse_func: Callable, content: Any, *args, **kwargs) -> Any:
+        """
+        解析页面内容，content 为字符串且长度不小于 config.PARSE_OFFLOAD_MIN_SIZE 时放到执行器中解析，否则直接解析
+        Args:
+            parse_func: 解析函数，第一个参数为页面内容
+            content: 页面内容
+            *args: 解析函数的其他参数
+            **kwargs: 解析函数的其他参数
+
+        Returns:
+            解析函数的返回值
+        """
+        size = len(content) if isinstance(content, (str, bytes)) else 0
+        executor = self._get_executor() if size >= config.PARSE_OFFLOAD_MIN_SIZE else None
+        if executor is None:
+            return parse_func(content, *args, **kwargs)
+        loop = asyncio.get_running_loop()
+        if isinstance(executor, ProcessPoolExecutor):
+            if not self._is_picklable(parse_func):
+                return parse_func(content, *args, **kwargs)
+            result, worker_metrics = await loop.run_in_executor(
+                executor, _parse_in_process, parse_func, content, args, kwargs
+            )
+            metrics_registry.merge(worker_metrics)
+            return result
+        return await loop.run_in_executor(executor, functools.partial(parse_func, content, *args, **kwargs))
+
+    def _is_picklable(self, parse_func: Callable) -> bool:
+        """
+        闭包、lambda 等不能 pickle 的解析函数不能放到进程池中，退回到事件循环中解析
+        """
+        # functools.partial 绑定了不同的参数，按被包装的函数缓存检查结果
+        func = parse_func.func if isinstance(parse_func, functools.partial) else parse_func
+        cache_key = (getattr(func, "__module__", ""), getattr(func, "__qualname__", repr(func)))
+        picklable = self._picklable_cache.get(cache_key)
+        if picklable is None:
+            try:
+                pickle.dumps(parse_func)
+                picklable = True
+            except (pickle.PicklingError, AttributeError, TypeError) as e:
+                utils.logger.warning(f"[ParseExecutor._is_picklable] {cache_key[1]} "
+                                     f"can not run in process pool, parse in event loop instead: {e}")
+                picklable = False
+            self._picklable_cache[cache_key] = picklable
+        return picklable
+
+    def shutdown(self, wait: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+            self._executor_type = ""
+
+
+parse_executor = ParseExecutor()
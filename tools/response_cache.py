@@ -0,0 +1,128 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/7/5 11:00
+# @Desc    : 创作者信息、内容详情等不常变化的接口的响应缓存，TTL 内重复获取不再请求平台
+import copy
+import functools
+import inspect
+import json
+import os
+import typing
+from typing import Any, Callable, Dict, Optional
+
+import config
+from cache.abs_cache import AbstractCache
+from cache.cache_factory import CacheFactory
+from tools.metrics import metrics_registry, module_platform, track_response_status
+
+
+def cache_response(group: str) -> Callable:
+    """
+    缓存客户端方法解析好的结果，缓存时间为 RESPONSE_CACHE_TTL_SEC[group]:
+        - 缓存的 key 为方法名 + 参数(包括 enable_cookie 等默认参数) + 客户端是否带有 cookie
+        - 方法内所有请求都返回 200 并且结果非空时才缓存，验证码页面、出错时返回的空结果不缓存
+        - 结果可以是 dict/list/str，或者返回值注解中的 pydantic 模型(例如 Optional[ZhihuContent])
+    Args:
+        group: 接口分组，例如 creator_info、content_detail
+
+    Returns:
+
+    """
+
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+        result_model = _result_model(func)
+
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            expire_time = config.RESPONSE_CACHE_TTL_SEC.get(group, 0)
+            if not config.ENABLE_RESPONSE_CACHE or expire_time <= 0:
+                return await func(self, *args, **kwargs)
+
+            platform = module_platform(type(self).__module__)
+            response_cache = get_response_cache(platform)
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = list(bound.arguments.items())[1:]
+            cache_key = f"{group}:{func.__qualname__}:" + json.dumps(
+                [arguments, bool(getattr(self, "cookie_dict", None))], ensure_ascii=False, default=str
+            )
+            cached = response_cache.get(cache_key)
+            if cached is not None:
+                if metrics_registry.enabled:
+                    metrics_registry.observe("mediacrawler_response_cache_hits", 1, platform=platform,
+                                             method=func.__name__)
+                return result_model.model_validate(cached) if result_model else copy.deepcopy(cached)
+
+            with track_response_status() as status_codes:
+                result = await func(self, *args, **kwargs)
+            if result and status_codes and all(status_code == 200 for status_code in status_codes):
+                if result_model and isinstance(result, result_model):
+                    response_cache.set(cache_key, result.model_dump(mode="json"), expire_time)
+                elif isinstance(result, (dict, list, str)):
+                    response_cache.set(cache_key, copy.deepcopy(result), expire_time)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def _result_model(func: Callable) -> Optional[type]:
+    """
+    方法的返回值注解中的 pydantic 模型类，缓存中保存 model_dump 的结果，命中时再转换成模型
+    """
+    try:
+        return_type = typing.get_type_hints(func).get("return")
+    except (NameError, TypeError):
+        return None
+    for candidate in (return_type, *getattr(return_type, "__args__", ())):
+        if isinstance(candidate, type) and hasattr(candidate, "model_validate"):
+            return candidate
+    return None
+
+
+class ResponseCache:
+    """
+    两级响应缓存: 内存(本次运行) + 磁盘(RESPONSE_CACHE_TYPE 为 disk 时，下次运行也可以使用)
+    """
+
+    def __init__(self, platform: str):
+        self.memory: AbstractCache = CacheFactory.create_cache("memory", max_size=config.RESPONSE_CACHE_MAX_ITEMS)
+        self.disk: Optional[AbstractCache] = None
+        if config.RESPONSE_CACHE_TYPE == "disk":
+            self.disk = CacheFactory.create_cache(
+                "disk", os.path.join(os.getcwd(), config.RESPONSE_CACHE_DIR % platform),
+                max_size=config.RESPONSE_CACHE_MAX_DISK_ITEMS,
+            )
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            value = self.disk.get(key)
+        return value
+
+    def set(self, key: str, value: Any, expire_time: int):
+        self.memory.set(key, value, expire_time)
+        if self.disk is not None:
+            self.disk.set(key, value, expire_time)
+
+
+_response_caches: Dict[str, ResponseCache] = {}
+
+
+def get_response_cache(platform: str) -> ResponseCache:
+    if platform not in _response_caches:
+        _response_caches[platform] = ResponseCache(platform)
+    return _response_caches[platform]
@@ -0,0 +1,192 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/7/3 15:00
+# @Desc    : 请求重试策略：按错误类型决定是否重试，指数退避 + 随机抖动，整个运行共用重试预算
+import functools
+import random
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional
+
+import httpx
+from tenacity import RetryCallState, RetryError, retry, retry_if_exception
+
+import config
+from tools import utils
+from tools.metrics import metrics_registry, module_platform
+
+
+class ErrorKind:
+    RETRYABLE = "retryable"  # 网络错误、超时、5xx
+    RATE_LIMITED = "rate_limited"  # 429 限流
+    BLOCKED = "blocked"  # 验证码、IP 被封、风控，马上重试只会继续被拦截
+    PERMANENT = "permanent"  # 其他 4xx、业务错误码、解析失败，重试结果也一样
+
+
+def classify_error(exc: BaseException) -> str:
+    """
+    判断请求异常的类型
+    Args:
+        exc: 请求抛出的异常
+
+    Returns:
+        ErrorKind
+    """
+    if isinstance(exc, RetryError):
+        last_exc = exc.last_attempt.exception()
+        return classify_error(last_exc) if last_exc is not None else ErrorKind.PERMANENT
+    if isinstance(exc, httpx.HTTPStatusError):
+        status_code = exc.response.status_code
+        if status_code in (461, 471):
+            return ErrorKind.BLOCKED
+        if status_code == 429:
+            return ErrorKind.RATE_LIMITED
+        return ErrorKind.RETRYABLE if status_code >= 500 else ErrorKind.PERMANENT
+    if isinstance(exc, httpx.TransportError):
+        return ErrorKind.RETRYABLE
+    # 各平台的 IPBlockError 定义在各自的 exception 模块中，按类名判断
+    if type(exc).__name__ == "IPBlockError" or "blocked" in str(exc) or "验证码" in str(exc):
+        return ErrorKind.BLOCKED
+    return ErrorKind.PERMANENT
+
+
+def get_retry_after(exc: BaseException) -> Optional[float]:
+    """
+    429/503 响应头中的 Retry-After(秒数或 HTTP 日期)，没有时返回 None
+    """
+    if not isinstance(exc, httpx.HTTPStatusError):
+        return None
+    retry_after = exc.response.headers.get("Retry-After")
+    if not retry_after:
+        return None
+    try:
+        return max(float(retry_after), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(retry_after).timestamp() - utils.get_unix_timestamp(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryBudget:
+    """
+    一次运行中所有请求共用的重试次数，平台整体出问题时不会因为每个请求都重试而把请求量放大几倍
+    """
+
+    def __init__(self, total: int):
+        """
+        Args:
+            total: 最多重试的次数，0 为不限制
+        """
+        self.total = total
+        self.used = 0
+
+    @property
+    def exhausted(self) -> bool:
+        return 0 < self.total <= self.used
+
+    def consume(self):
+        self.used += 1
+        if self.exhausted:
+            utils.logger.warning(f"[RetryBudget] retry budget {self.total} exhausted, failed requests will not be retried")
+
+
+_retry_budget: Optional[RetryBudget] = None
+_retrying_var: ContextVar[bool] = ContextVar("retrying_var", default=False)
+
+
+def get_retry_budget() -> RetryBudget:
+    global _retry_budget
+    if _retry_budget is None:
+        _retry_budget = RetryBudget(config.RETRY_BUDGET)
+    return _retry_budget
+
+
+def backoff_seconds(attempt_number: int, exc: Optional[BaseException] = None) -> float:
+    """
+    第 attempt_number 次请求失败之后的等待时间: base * 2^(n-1)，不超过 RETRY_BACKOFF_MAX_SEC，取其中一半做随机抖动，
+    避免同时失败的请求在同一时刻一起重试；响应带有 Retry-After 时至少等待 Retry-After
+    """
+    backoff = min(config.RETRY_BACKOFF_BASE_SEC * 2 ** (attempt_number - 1), config.RETRY_BACKOFF_MAX_SEC)
+    backoff = backoff / 2 + random.uniform(0, backoff / 2)
+    retry_after = get_retry_after(exc) if exc is not None else None
+    return max(backoff, retry_after) if retry_after is not None else backoff
+
+
+def _should_retry(exc: BaseException) -> bool:
+    return classify_error(exc) in (ErrorKind.RETRYABLE, ErrorKind.RATE_LIMITED) and not get_retry_budget().exhausted
+
+
+def _wait(retry_state: RetryCallState) -> float:
+    exc = retry_state.outcome.exception() if retry_state.outcome is not None else None
+    return backoff_seconds(retry_state.attempt_number, exc)
+
+
+def _before_sleep(platform: str, func_name: str, retry_state: RetryCallState):
+    exc = retry_state.outcome.exception() if retry_state.outcome is not None else None
+    if exc is None:
+        # 只有抛出异常才会重试，没有异常时不会走到这里
+        return
+    kind = classify_error(exc)
+    wait = retry_state.next_action.sleep if retry_state.next_action else 0
+    get_retry_budget().consume()
+    if metrics_registry.enabled:
+        metrics_registry.observe("mediacrawler_retry_wait_seconds", wait, platform=platform, kind=kind)
+    utils.logger.info(
+        f"[retry_policy] {platform} {func_name} attempt {retry_state.attempt_number} failed ({kind}): "
+        f"{utils.truncate(str(exc))}, retry after {wait:.1f}s"
+    )
+
+
+def retry_policy(max_attempts: Optional[int] = None) -> Callable:
+    """
+    请求重试装饰器，替代 @retry(stop=stop_after_attempt(3), wait=wait_fixed(1)):
+        - 只重试网络错误、5xx 和 429 限流，验证码/风控和其他错误直接抛出
+        - 指数退避 + 随机抖动，429 按 Retry-After 等待
+        - 所有请求共用 RETRY_BUDGET 次重试
+        - 嵌套调用时只有最外层重试，例如获取笔记详情的方法内部调用 request，失败时不会重试 3 * 3 次
+        - 重试次数用完时和 tenacity 一样抛出 RetryError
+        - 用在客户端的 request 方法上时，AbstractApiClient 会把重试移到并发控制的外层，
+          重试等待时不占用平台的请求名额，也不计入请求耗时
+    Args:
+        max_attempts: 最多请求次数(包含第一次)，默认为 RETRY_MAX_ATTEMPTS
+
+    Returns:
+
+    """
+
+    def decorator(func: Callable) -> Callable:
+        retrying_func = retry(
+            stop=lambda retry_state: retry_state.attempt_number >= (max_attempts or config.RETRY_MAX_ATTEMPTS),
+            wait=_wait,
+            retry=retry_if_exception(_should_retry),
+            before_sleep=functools.partial(_before_sleep, module_platform(func.__module__), func.__name__),
+        )(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if _retrying_var.get():
+                return await func(*args, **kwargs)
+            token = _retrying_var.set(True)
+            try:
+                return await retrying_func(*args, **kwargs)
+            finally:
+                _retrying_var.reset(token)
+
+        # AbstractApiClient 通过 retry_decorator 把 request 上的重试移到并发控制的外层
+        setattr(wrapper, "retry_decorator", decorator)
+        return wrapper
+
+    return decorator
@@ -0,0 +1,129 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/6/26 10:30
+# @Desc    : 关键词搜索按发布时间分片，突破平台单次搜索最多返回的结果数量限制
+import asyncio
+from typing import Awaitable, Callable, List, NamedTuple, Tuple
+
+from tools import utils
+
+
+class TimeWindow(NamedTuple):
+    """
+    发布时间窗口，start 和 end 都是秒级时间戳，包含两端
+    """
+    start: int
+    end: int
+
+    def split(self) -> List["TimeWindow"]:
+        middle = (self.start + self.end) // 2
+        return [TimeWindow(self.start, middle), TimeWindow(middle + 1, self.end)]
+
+
+class SearchShardPlanner:
+    """
+    从整个时间范围开始探测结果数量:
+        - 结果数量达到平台上限的窗口对半拆分后继续探测，直到低于上限或者窗口已经不能再小
+        - 没有结果的窗口直接丢弃
+        - 结果数量低于上限的窗口不再拆分，结果稀疏的时间段只会是一个窗口，不会按天产生大量空请求
+        - 拆分完成后，结果数量相加仍低于上限的相邻窗口再合并成一个窗口，减少爬取时的搜索请求
+    同一层的窗口并发探测，并发数由 concurrency 控制
+    """
+
+    def __init__(self, result_cap: int, min_window_seconds: int = 3600, concurrency: int = 1):
+        """
+        Args:
+            result_cap: 平台单次搜索最多返回的结果数量，如 bilibili 为 1000
+            min_window_seconds: 最小窗口长度，窗口小于该长度时即使结果数量达到上限也不再拆分
+            concurrency: 并发探测的窗口数量
+        """
+        self.result_cap = result_cap
+        self.min_window_seconds = min_window_seconds
+        self.concurrency = max(concurrency, 1)
+
+    async def plan(self, start: int, end: int, count_window: Callable[[TimeWindow], Awaitable[int]]) -> List[TimeWindow]:
+        """
+        规划搜索窗口
+        Args:
+            start: 开始时间戳(秒)
+            end: 结束时间戳(秒)，包含
+            count_window: 返回窗口内搜索结果数量的协程函数，一般请求一次搜索第一页并读取结果总数
+
+        Returns:
+            按时间排序的窗口列表，每个窗口的结果数量都低于 result_cap(最小窗口除外)，相邻窗口的结果数量之和不低于 result_cap
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def count_with_semaphore(window: TimeWindow) -> int:
+            async with semaphore:
+                return await count_window(window)
+
+        planned: List[Tuple[TimeWindow, int]] = []
+        pending: List[TimeWindow] = [TimeWindow(start, end)]
+        while pending:
+            counts = await asyncio.gather(*[count_with_semaphore(window) for window in pending])
+            next_pending: List[TimeWindow] = []
+            for window, count in zip(pending, counts):
+                if count <= 0:
+                    continue
+                if count >= self.result_cap and window.end - window.start + 1 > self.min_window_seconds:
+                    utils.logger.info(f"[SearchShardPlanner.plan] window {window} has {count} results, split it")
+                    next_pending.extend(window.split())
+                else:
+                    planned.append((window, count))
+            pending = next_pending
+        planned.sort()
+        return self.merge(planned)
+
+    def merge(self, planned: List[Tuple[TimeWindow, int]]) -> List[TimeWindow]:
+        """
+        从前往后合并相邻的窗口，合并后的结果数量仍低于 result_cap 时才合并，
+        两个窗口之间被丢弃的空窗口也一起并入，空窗口没有结果，不影响结果数量
+        Args:
+            planned: 按时间排序的 (窗口, 结果数量) 列表
+
+        Returns:
+            合并后的窗口列表
+        """
+        merged: List[Tuple[TimeWindow, int]] = []
+        for window, count in planned:
+            if merged and merged[-1][1] + count < self.result_cap:
+                last_window, last_count = merged[-1]
+                merged[-1] = (TimeWindow(last_window.start, window.end), last_count + count)
+            else:
+                merged.append((window, count))
+        if len(merged) < len(planned):
+            utils.logger.info(f"[SearchShardPlanner.merge] merge {len(planned)} windows into {len(merged)}")
+        return [window for window, _ in merged]
+
+    async def run(self, windows: List[TimeWindow], crawl_window: Callable[[TimeWindow], Awaitable[None]]):
+        """
+        并发爬取规划好的窗口，单个窗口出错不影响其他窗口
+        Args:
+            windows: plan 返回的窗口列表
+            crawl_window: 爬取一个窗口内所有结果的协程函数
+
+        Returns:
+
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def crawl_with_semaphore(window: TimeWindow):
+            async with semaphore:
+                try:
+                    await crawl_window(window)
+                except Exception as e:
+                    utils.logger.error(f"[SearchShardPlanner.run] crawl window {window} error: {e}")
+
+        await asyncio.gather(*[crawl_with_semaphore(window) for window in windows])
@@ -0,0 +1,85 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/6/18 09:40
+# @Desc    : 登录态(cookie/localStorage)持久化，用于无浏览器快速启动
+import json
+import os
+import pathlib
+import time
+from typing import Dict, Optional
+
+from playwright.async_api import BrowserContext, Page
+
+import config
+from tools import utils
+
+
+def get_session_state_file(platform: str = "") -> str:
+    return os.path.join(os.getcwd(), config.SESSION_STATE_FILE % (platform or config.PLATFORM))
+
+
+async def save_session_state(browser_context: BrowserContext, page: Page, user_agent: str = "",
+                             platform: str = ""):
+    """
+    保存浏览器中的登录态，下次启动时可以直接复用而不用启动浏览器
+    Args:
+        browser_context: 已登录的浏览器上下文
+        page: 已打开平台首页的页面，用于读取 localStorage
+        user_agent: cookie 与 UA 绑定的平台需要一并保存 UA
+        platform:
+
+    Returns:
+
+    """
+    try:
+        session_state = {
+            "cookies": await browser_context.cookies(),
+            "local_storage": await page.evaluate("() => window.localStorage"),
+            "user_agent": user_agent,
+            "saved_at": int(time.time()),
+        }
+    except Exception as e:
+        utils.logger.error(f"[save_session_state] read session state from browser err: {e}")
+        return
+    session_file = get_session_state_file(platform)
+    pathlib.Path(session_file).parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = session_file + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(session_state, f, ensure_ascii=False)
+    os.replace(tmp_file, session_file)
+    utils.logger.info(f"[save_session_state] session state saved to {session_file}")
+
+
+def load_session_state(platform: str = "") -> Optional[Dict]:
+    """
+    读取保存的登录态，文件不存在或者超过 SESSION_STATE_MAX_AGE_HOURS 时返回 None
+    Args:
+        platform:
+
+    Returns:
+
+    """
+    session_file = get_session_state_file(platform)
+    if not os.path.exists(session_file):
+        return None
+    try:
+        with open(session_file, "r", encoding="utf-8") as f:
+            session_state: Dict = json.load(f)
+    except (OSError, ValueError) as e:
+        utils.logger.error(f"[load_session_state] load session state {session_file} err: {e}")
+        return None
+    if time.time() - session_state.get("saved_at", 0) > config.SESSION_STATE_MAX_AGE_HOURS * 3600:
+        utils.logger.info(f"[load_session_state] session state {session_file} expired")
+        return None
+    return session_state
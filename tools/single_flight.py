@@ -0,0 +1,150 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/7/4 15:00
+# @Desc    : 合并同时发出的相同请求(single-flight)，多个任务共用一次网络请求的结果
+import asyncio
+import copy
+import functools
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Mapping, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import config
+from tools.metrics import metrics_registry, module_platform, normalize_endpoint
+
+# 每次请求都会变化的签名参数，不参与请求的 key
+VOLATILE_PARAMS = frozenset({"w_rid", "wts", "a_bogus", "x-bogus", "mstoken", "verifyfp", "fp", "webid"})
+VOLATILE_HEADERS = frozenset({"x-s", "x-t", "x-s-common", "x-b3-traceid", "x-zse-96", "x-zst-81"})
+
+
+def _without_volatile(items, volatile: frozenset) -> Tuple:
+    return tuple(sorted((str(key), str(value)) for key, value in items if str(key).lower() not in volatile))
+
+
+def request_key(method: str, url: str, kwargs: Mapping[str, Any]) -> Tuple:
+    """
+    请求的 key: method + 去掉签名参数的 url 和 params + 请求体 + 去掉签名的请求头
+    Args:
+        method: 请求方法
+        url: 请求的URL
+        kwargs: 传给 request 的其他参数
+
+    Returns:
+
+    """
+    split_result = urlsplit(url)
+    query = _without_volatile(parse_qsl(split_result.query, keep_blank_values=True), VOLATILE_PARAMS)
+    params = kwargs.get("params")
+    if isinstance(params, Mapping):
+        query += _without_volatile(params.items(), VOLATILE_PARAMS)
+    body = kwargs.get("data") or kwargs.get("json")
+    if body is not None and not isinstance(body, (str, bytes)):
+        body = json.dumps(body, sort_keys=True, ensure_ascii=False, default=str)
+    headers = kwargs.get("headers")
+    return (
+        method.upper(),
+        urlunsplit(split_result._replace(query=urlencode(sorted(query)))),
+        body,
+        _without_volatile(headers.items(), VOLATILE_HEADERS) if isinstance(headers, Mapping) else (),
+        # return_response 等参数会影响返回值
+        _without_volatile(
+            ((key, value) for key, value in kwargs.items() if key not in ("params", "data", "json", "headers")), frozenset()
+        ),
+    )
+
+
+@dataclass
+class _Call:
+    future: asyncio.Future
+    followers: int = 0
+
+
+class SingleFlight:
+    """
+    相同 key 的调用同时只执行一次，执行期间的其他调用等待并共用这次调用的结果或异常
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable]) -> Tuple[Any, bool]:
+        """
+        Args:
+            key: 调用的 key
+            func: 没有相同调用在执行时执行的协程函数
+
+        Returns:
+            (结果, 是否共用了其他调用的结果)
+        """
+        call = self._calls.get(key)
+        if call is not None:
+            call.followers += 1
+            try:
+                return await asyncio.shield(call.future), True
+            except asyncio.CancelledError:
+                if not call.future.cancelled():
+                    raise
+                # 执行的任务被取消了，自己重新执行
+
+        call = _Call(asyncio.get_running_loop().create_future())
+        self._calls[key] = call
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            call.future.cancel()
+            raise
+        except Exception as e:
+            if call.followers:
+                call.future.set_exception(e)
+            raise
+        else:
+            if call.followers:
+                call.future.set_result(result)
+            return result, False
+        finally:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+
+
+_single_flight = SingleFlight()
+
+
+def coalesce_request(func: Callable) -> Callable:
+    """
+    包装 AbstractApiClient.request，同一个客户端同时发出的相同 GET 请求只请求一次，其他请求等待并共用结果
+    """
+
+    @functools.wraps(func)
+    async def wrapper(self, method, url, *args, **kwargs):
+        if not config.ENABLE_REQUEST_COALESCING or str(method).upper() != "GET":
+            return await func(self, method, url, *args, **kwargs)
+
+        start_time = time.perf_counter()
+        result, shared = await _single_flight.do(
+            (id(self), request_key(method, url, kwargs)),
+            functools.partial(func, self, method, url, *args, **kwargs),
+        )
+        if not shared:
+            return result
+        if metrics_registry.enabled:
+            metrics_registry.observe(
+                "mediacrawler_request_coalesced_seconds", time.perf_counter() - start_time,
+                platform=module_platform(type(self).__module__), endpoint=normalize_endpoint(url),
+            )
+        # 调用方可能会修改返回的数据，共用的结果复制一份
+        return copy.deepcopy(result) if isinstance(result, (dict, list)) else result
+
+    return wrapper
@@ -0,0 +1,127 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/6/19 10:30
+# @Desc    : 启动耗时分析，统计各个模块的导入耗时以及启动各阶段的耗时
+import importlib.abc
+import sys
+import time
+from typing import Dict, List, Tuple
+
+
+class _ProfiledLoader(importlib.abc.Loader):
+    """
+    代理真实的 loader，统计模块执行(导入)耗时
+    """
+
+    def __init__(self, loader, fullname: str, profiler: "StartupProfiler"):
+        self._loader = loader
+        self._fullname = fullname
+        self._profiler = profiler
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._profiler.enter(self._fullname)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler.exit(self._fullname)
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class StartupProfiler(importlib.abc.MetaPathFinder):
+    def __init__(self):
+        self._start_time = time.perf_counter()
+        self._last_phase_time = self._start_time
+        self._installed = False
+        # [module, start_time, children_time]
+        self._stack: List[List] = []
+        # module -> (inclusive_time, self_time)
+        self.import_times: Dict[str, Tuple[float, float]] = {}
+        self.phases: List[Tuple[str, float]] = []
+
+    @property
+    def installed(self) -> bool:
+        return self._installed
+
+    def install(self):
+        """
+        在导入其他模块之前调用，注册到 sys.meta_path 的最前面
+        """
+        if self._installed:
+            return
+        sys.meta_path.insert(0, self)
+        self._installed = True
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+        self._installed = False
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _ProfiledLoader(spec.loader, fullname, self)
+            return spec
+        return None
+
+    def enter(self, fullname: str):
+        self._stack.append([fullname, time.perf_counter(), 0.0])
+
+    def exit(self, fullname: str):
+        _, start_time, children_time = self._stack.pop()
+        inclusive_time = time.perf_counter() - start_time
+        self.import_times[fullname] = (inclusive_time, inclusive_time - children_time)
+        if self._stack:
+            self._stack[-1][2] += inclusive_time
+
+    def mark(self, phase: str):
+        """
+        记录一个启动阶段的结束，耗时为距离上一个阶段结束的时间
+        """
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last_phase_time))
+        self._last_phase_time = now
+
+    def package_self_times(self) -> List[Tuple[str, float]]:
+        """
+        按顶层包汇总导入耗时(self time，不会重复计算嵌套导入)
+        """
+        package_times: Dict[str, float] = {}
+        for fullname, (_, self_time) in self.import_times.items():
+            package = fullname.split(".")[0]
+            package_times[package] = package_times.get(package, 0.0) + self_time
+        return sorted(package_times.items(), key=lambda item: item[1], reverse=True)
+
+    def report(self, top_n: int = 15, logger=None):
+        if logger is None:
+            from tools import utils
+            logger = utils.logger
+        total = time.perf_counter() - self._start_time
+        logger.info(f"[StartupProfiler.report] startup total: {total:.3f}s, imported modules: {len(self.import_times)}")
+        for phase, cost in self.phases:
+            logger.info(f"[StartupProfiler.report] phase {phase:<24} {cost:.3f}s")
+        for package, self_time in self.package_self_times()[:top_n]:
+            logger.info(f"[StartupProfiler.report] package {package:<24} {self_time:.3f}s")
+
+
+startup_profiler = StartupProfiler()
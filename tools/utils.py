@@ -13,20 +13,26 @@ import argparse
 import logging
 
 from .crawler_util import *
-from .slider_util import *
+from .log_util import apply_logging_config, truncate
 from .time_util import *
 
 
+def __getattr__(name):
+    # 滑块验证码工具依赖 OpenCV，导入耗时较长，只在用到时才导入
+    if name in ("Slide", "get_tracks", "get_track_simple"):
+        from . import slider_util
+        return getattr(slider_util, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def init_loging_config():
-    level = logging.INFO
     logging.basicConfig(
-        level=level,
+        level=logging.INFO,
         format="%(asctime)s %(name)s %(levelname)s (%(filename)s:%(lineno)d) - %(message)s",
         datefmt='%Y-%m-%d %H:%M:%S'
     )
     _logger = logging.getLogger("MediaCrawler")
-    _logger.setLevel(level)
-    return _logger
+    return apply_logging_config(_logger)
 
 
 logger = init_loging_config()
@@ -0,0 +1,143 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Author  : relakkes@gmail.com
+# @Time    : 2025/7/1 10:00
+# @Desc    : 增量爬取，记录每个创作者/帖子已经爬取到的最新帖子/评论(高水位)，下次运行翻页到已爬取的数据就停止
+from typing import Any, Callable, List, Optional
+
+import config
+from tools import utils
+from tools.crawl_state import get_crawl_state_store
+
+CREATOR_WATERMARK_NAMESPACE = "creator_watermark"
+COMMENT_WATERMARK_NAMESPACE = "comment_watermark"
+
+
+class Watermark:
+    """
+    一个创作者/帖子的增量爬取状态，数据按发布时间从新到旧翻页:
+        - 只保留比上次爬取的最新数据更新的数据，某一页的最后一条数据不比水位新时停止翻页
+        - 按最后一条数据判断，置顶在第一页最前面的旧数据不会让翻页提前停止
+        - 只能用于按时间排序的接口，接口不按时间排序时，比水位旧的数据不一定已经爬取过，按水位过滤会漏掉数据
+    """
+
+    def __init__(self, namespace: str, key: str, enabled: bool, platform: str = ""):
+        """
+        Args:
+            namespace: 保存在 CRAWL_STATE_FILE 中的分组
+            key: 创作者ID/帖子ID
+            enabled: 是否读取和保存水位，不开启时只按子类的条件过滤
+            platform: 平台名称，默认为 config.PLATFORM
+        """
+        self.namespace = namespace
+        self.key = key
+        self.enabled = enabled
+        self.platform = platform
+        self.position: int = 0
+        if enabled:
+            saved = get_crawl_state_store(platform).get(namespace, key) or {}
+            self.position = saved.get("position", 0)
+        self.newest_position: int = self.position
+        self.reached: bool = False
+
+    def filter_page(self, items: List[Any], get_position: Callable[[Any], int], by_publish_time: bool = True) -> List[Any]:
+        """
+        过滤一页数据，翻页停止的条件记录在 self.reached 中
+        Args:
+            items: 一页数据，从新到旧排列
+            get_position: 获取数据位置的函数，越新的数据位置越大，一般是发布时间戳
+            by_publish_time: 数据位置是否是发布时间戳(秒)，不是发布时间戳时不按时间范围过滤
+
+        Returns:
+            需要爬取的数据
+        """
+        if not items:
+            return []
+        positions = [int(get_position(item) or 0) for item in items]
+        new_items = []
+        for item, position in zip(items, positions):
+            if self.position and position <= self.position:
+                continue
+            if by_publish_time and not self.in_range(position):
+                continue
+            new_items.append(item)
+            self.newest_position = max(self.newest_position, position)
+
+        last_position = positions[-1]
+        if self.position and last_position and last_position <= self.position:
+            self.reached = True
+        if by_publish_time and last_position and self.before_range(last_position):
+            self.reached = True
+        if self.reached or len(new_items) != len(items):
+            utils.logger.info(
+                f"[Watermark.filter_page] {self.namespace} {self.key} keep {len(new_items)}/{len(items)} items, "
+                f"reached watermark: {self.reached}"
+            )
+        return new_items
+
+    def in_range(self, position: int) -> bool:
+        return True
+
+    def before_range(self, position: int) -> bool:
+        return False
+
+    def commit(self):
+        """
+        爬取完成后保存新的水位，中途失败的不保存，下次运行会重新爬取没有完成的数据
+        """
+        if not self.enabled or self.newest_position <= self.position:
+            return
+        get_crawl_state_store(self.platform).set(
+            self.namespace, self.key,
+            {"position": self.newest_position, "updated_at": utils.get_unix_timestamp()}
+        )
+        self.position = self.newest_position
+
+
+class CreatorWatermark(Watermark):
+    """
+    创作者主页的帖子水位，开启 ENABLE_CREATOR_DAY_RANGE 时只保留 START_DAY 至 END_DAY 发布的帖子，翻到 START_DAY 之前的帖子时停止翻页
+    """
+
+    def __init__(self, creator_id: str, platform: str = ""):
+        super().__init__(CREATOR_WATERMARK_NAMESPACE, creator_id, config.ENABLE_CREATOR_INCREMENTAL, platform)
+        self.start_ts: int = 0
+        self.end_ts: int = 0
+        if config.ENABLE_CREATOR_DAY_RANGE:
+            self.start_ts = utils.get_unix_time_from_time_str(f"{config.START_DAY} 00:00:00")
+            self.end_ts = utils.get_unix_time_from_time_str(f"{config.END_DAY} 00:00:00") + 24 * 60 * 60
+
+    def in_range(self, position: int) -> bool:
+        return self.end_ts <= self.start_ts or self.start_ts <= position < self.end_ts
+
+    def before_range(self, position: int) -> bool:
+        return self.end_ts > self.start_ts and position < self.start_ts
+
+
+def get_creator_watermark(creator_id: str, platform: str = "") -> Optional[CreatorWatermark]:
+    """
+    获取创作者的增量爬取状态，没有开启增量爬取和发布时间范围时返回 None，按原来的方式爬取全部帖子
+    """
+    if not config.ENABLE_CREATOR_INCREMENTAL and not config.ENABLE_CREATOR_DAY_RANGE:
+        return None
+    return CreatorWatermark(creator_id, platform)
+
+
+def get_comment_watermark(content_id: str, platform: str = "") -> Optional[Watermark]:
+    """
+    获取帖子评论的增量爬取状态，没有开启评论增量爬取时返回 None，按原来的方式从第一页开始爬取评论
+    只用于评论接口支持按时间排序的平台(bilibili、知乎)
+    """
+    if not config.ENABLE_COMMENT_INCREMENTAL:
+        return None
+    return Watermark(COMMENT_WATERMARK_NAMESPACE, str(content_id), True, platform)